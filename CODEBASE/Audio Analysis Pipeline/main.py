@@ -17,6 +17,13 @@ os.environ['PYTHONWARNINGS'] = 'ignore::UserWarning'
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'  # Suppress TensorFlow warnings
 
 from pipeline.analysis_pipeline import AnalysisPipeline
+from pipeline.audio_cache import AudioCache, DEFAULT_CACHE_DIR
+from pipeline.result_cache import ResultCache, DEFAULT_RESULT_CACHE_PATH
+from pipeline.corpus_index import CorpusIndex, DEFAULT_INDEX_PATH
+from pipeline.output_formats import COLUMNAR_FORMATS
+from pipeline.audio_utilities import DECODER_BACKENDS
+from pipeline.stage_executor import SEGMENT_STAGES, parse_stage_workers, parse_stages
+from pipeline.resources import parse_cpu_budget
 
 
 def main():
@@ -32,14 +39,16 @@ Examples:
   python main.py -i ./data/input/conversation.mp3
   python main.py -i ./data/input/convo.wav --asr medium.en --speakers 2
   python main.py -i ./data/input/session.m4a -o ./results/
+  python main.py -i ./data/input/a.mp3 ./data/input/b.mp3 --prefetch 2
         """
     )
 
     parser.add_argument(
         "-i", "--input",
         required=True,
+        nargs="+",
         type=str,
-        help="Path to the input audio file (.wav, .mp3, .m4a, etc.)"
+        help="Path(s) to the input audio file(s) (.wav, .mp3, .m4a, etc.)"
     )
     parser.add_argument(
         "-o", "--output_dir",
@@ -59,12 +68,140 @@ Examples:
         type=int,
         help="Number of speakers to detect (default: 2)"
     )
+    parser.add_argument(
+        "--prefetch",
+        default=1,
+        type=int,
+        help="With several inputs, number of upcoming files to decode in the background "
+             "while the current one is analyzed; 0 disables (default: 1)"
+    )
+    parser.add_argument(
+        "--no_vad",
+        action="store_true",
+        help="Disable the voice-activity pre-pass (non-speech is then diarized and analyzed too)"
+    )
+    parser.add_argument(
+        "--split_channels",
+        action="store_true",
+        help="For stereo recordings with one speaker per channel, derive speaker turns from "
+             "channel energy and skip neural diarization (falls back to pyannote if the "
+             "channels bleed into each other)"
+    )
+    parser.add_argument(
+        "--stages",
+        default="all",
+        type=str,
+        help="Comma-separated stages to run: diarize, asr, acoustic, emotion (e.g. 'diarize,asr'); "
+             "models of other stages are never loaded (default: all)"
+    )
+    parser.add_argument(
+        "--stage_workers",
+        default=None,
+        type=str,
+        help="Run the segment stages pipelined with these threads per stage, e.g. "
+             "'asr=1,acoustic=2,emotion=1' (unlisted stages get 1), so different segments are in "
+             "different stages at once (default: off, segments are processed one after another)"
+    )
+    parser.add_argument(
+        "--acoustic_workers",
+        default=None,
+        type=int,
+        help="Worker processes for Praat acoustic features (segments are shared via shared "
+             "memory); 0 runs them in the main process (default: the acoustic share of the CPU budget)"
+    )
+    parser.add_argument(
+        "--cpus",
+        default=None,
+        type=int,
+        help="CPUs this run may use, shared out between the services' thread and process pools "
+             "(default: all available; give each of several concurrent runs its share)"
+    )
+    parser.add_argument(
+        "--cpu_budget",
+        default=None,
+        type=str,
+        help="Explicit CPUs per service, e.g. 'asr=8,emotion=6,acoustic=2' (services: diarize, "
+             "asr, acoustic, emotion); the others split what is left of --cpus"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue interrupted runs from their segment journal (<output>.journal.jsonl): "
+             "diarization and finished segments are not redone"
+    )
+    parser.add_argument(
+        "--metrics_textfile",
+        default=None,
+        type=str,
+        help="Also write each run's stage metrics to this Prometheus textfile "
+             "(e.g. for node_exporter's textfile collector)"
+    )
+    parser.add_argument(
+        "--decoder",
+        default="torchaudio",
+        choices=DECODER_BACKENDS,
+        help="Audio decoder: 'torchaudio' or 'ffmpeg' (streams 16kHz mono, lower peak memory; "
+             "requires ffmpeg on PATH) (default: torchaudio)"
+    )
+    parser.add_argument(
+        "--audio_cache",
+        nargs="?",
+        const=DEFAULT_CACHE_DIR,
+        default=None,
+        type=str,
+        help=f"Cache decoded audio in this directory ({DEFAULT_CACHE_DIR} if no directory is given), "
+             f"so later runs on the same recording skip decoding (default: off)"
+    )
+    parser.add_argument(
+        "--audio_cache_gb",
+        default=5.0,
+        type=float,
+        help="Maximum size of the decoded-audio cache in GB; least recently used entries are evicted (default: 5)"
+    )
+    parser.add_argument(
+        "--result_cache",
+        nargs="?",
+        const=DEFAULT_RESULT_CACHE_PATH,
+        default=None,
+        type=str,
+        help=f"Cache diarization, ASR, acoustic and emotion results per segment in this SQLite "
+             f"file ({DEFAULT_RESULT_CACHE_PATH} if no path is given). It is never pruned: it grows "
+             f"with every new recording and setting until deleted (default: off)"
+    )
+    parser.add_argument(
+        "--corpus_index",
+        nargs="?",
+        const=DEFAULT_INDEX_PATH,
+        default=None,
+        type=str,
+        help=f"Add each output to this SQLite corpus index, for scripts/corpus.py query/search "
+             f"({DEFAULT_INDEX_PATH} if no path is given; default: off)"
+    )
+    parser.add_argument(
+        "--compact_json",
+        action="store_true",
+        help="Write the output JSON without indentation (same content, ~40%% smaller)"
+    )
+    parser.add_argument(
+        "--columnar",
+        default=None,
+        choices=sorted(COLUMNAR_FORMATS),
+        help="Also write each output as Parquet or Arrow next to the JSON: one typed row per "
+             "segment, for analytics (needs pyarrow)"
+    )
 
     args = parser.parse_args()
 
-    # 1. Get Hugging Face Token (Critical)
+    try:
+        stages = parse_stages(args.stages)
+        stage_workers = parse_stage_workers(args.stage_workers, SEGMENT_STAGES) if args.stage_workers else None
+        cpu_budget = parse_cpu_budget(args.cpu_budget)
+    except ValueError as e:
+        parser.error(str(e))
+
+    # 1. Get Hugging Face Token (Critical; only the diarization model needs it)
     hf_token = os.environ.get("HF_TOKEN")
-    if hf_token is None:
+    if hf_token is None and "diarize" in stages:
         print("=" * 60)
         print("ERROR: HF_TOKEN environment variable not set")
         print("=" * 60)
@@ -84,32 +221,63 @@ Examples:
         print("\n" + "=" * 60)
         return
 
-    # 2. Validate input file
-    if not os.path.exists(args.input):
-        print(f"Error: Input file not found: {args.input}")
+    # 2. Validate input files
+    input_files = []
+    for input_path in args.input:
+        if not os.path.exists(input_path):
+            print(f"Error: Input file not found: {input_path}")
+        else:
+            input_files.append(input_path)
+    if not input_files:
         return
 
     # 3. Create output directory if it doesn't exist
     os.makedirs(args.output_dir, exist_ok=True)
 
-    # 4. Define output path
-    base_filename = os.path.basename(args.input)
-    output_filename = os.path.splitext(base_filename)[0] + ".json"
-    output_json_path = os.path.join(args.output_dir, output_filename)
+    # 4. Define output paths
+    jobs = []
+    for input_path in input_files:
+        base_filename = os.path.basename(input_path)
+        output_filename = os.path.splitext(base_filename)[0] + ".json"
+        jobs.append((input_path, os.path.join(args.output_dir, output_filename)))
+
+    # Decoded-audio cache (repeat runs on the same recording skip decoding)
+    audio_cache = None
+    if args.audio_cache:
+        audio_cache = AudioCache(args.audio_cache, max_bytes=int(args.audio_cache_gb * 1024 ** 3))
+    result_cache = ResultCache(args.result_cache) if args.result_cache else None
+    corpus_index = CorpusIndex(args.corpus_index) if args.corpus_index else None
 
     # 5. Initialize and run the pipeline
     # We use the default Phase 1 emotion model
+    pipeline = None
     try:
         pipeline = AnalysisPipeline(
             hf_token=hf_token,
             emotion_model_path="superb/hubert-base-superb-er",  # Phase 1 default
-            asr_model=args.asr
+            asr_model=args.asr,
+            audio_cache=audio_cache,
+            decoder_backend=args.decoder,
+            use_vad=not args.no_vad,
+            split_channels=args.split_channels,
+            stage_workers=stage_workers,
+            acoustic_workers=args.acoustic_workers,
+            cpus=args.cpus,
+            cpu_budget=cpu_budget,
+            metrics_textfile=args.metrics_textfile,
+            resume=args.resume,
+            result_cache=result_cache,
+            corpus_index=corpus_index,
+            stages=stages,
+            compact_json=args.compact_json,
+            columnar=args.columnar
         )
 
-        pipeline.run(
-            audio_file_path=args.input,
-            output_json_path=output_json_path,
-            num_speakers=args.speakers
+        # Upcoming files are decoded in the background while the current one is analyzed
+        pipeline.run_batch(
+            jobs,
+            num_speakers=args.speakers,
+            prefetch_depth=args.prefetch
         )
     except KeyboardInterrupt:
         print("\n\nPipeline interrupted by user.")
@@ -121,6 +289,9 @@ Examples:
         print(f"{'='*60}\n")
         import traceback
         traceback.print_exc()
+    finally:
+        if pipeline is not None:
+            pipeline.close()
 
 
 if __name__ == "__main__":
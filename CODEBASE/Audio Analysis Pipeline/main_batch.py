@@ -0,0 +1,327 @@
+"""
+Batch Execution Script for Clinical Audio Analysis Pipeline (Phase 1)
+Processes a directory, glob pattern or manifest of recordings with one set of loaded models.
+"""
+
+import os
+import time
+import warnings
+import argparse
+
+# Suppress warnings globally for performance
+warnings.filterwarnings('ignore', category=UserWarning)
+warnings.filterwarnings('ignore', category=DeprecationWarning)
+warnings.filterwarnings('ignore', category=FutureWarning)
+
+# Suppress torchaudio backend warnings
+os.environ['PYTHONWARNINGS'] = 'ignore::UserWarning'
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'  # Suppress TensorFlow warnings
+
+from pipeline.analysis_pipeline import AnalysisPipeline
+from pipeline.audio_cache import AudioCache, DEFAULT_CACHE_DIR
+from pipeline.result_cache import ResultCache, DEFAULT_RESULT_CACHE_PATH
+from pipeline.corpus_index import CorpusIndex, DEFAULT_INDEX_PATH
+from pipeline.output_formats import COLUMNAR_FORMATS
+from pipeline.audio_utilities import DECODER_BACKENDS
+from pipeline.stage_executor import SEGMENT_STAGES, parse_stage_workers, parse_stages
+from pipeline.resources import available_cpus, parse_cpu_budget
+from pipeline.worker_pool import SharedModelPool
+from pipeline.batch import collect_inputs, plan_jobs, throughput_summary, print_throughput_summary
+
+
+def main():
+    """
+    Batch entry point for the Clinical Audio Analysis Pipeline.
+    Loads all models once and processes every input that has no output yet.
+    """
+    parser = argparse.ArgumentParser(
+        description="Run the Clinical Audio Analysis Pipeline (Phase 1) over many recordings.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python main_batch.py -i ./data/input/
+  python main_batch.py -i "./data/input/*.mp3" -o ./results/
+  python main_batch.py -i ./manifests/clinic_week1.txt --asr medium.en
+  python main_batch.py -i ./data/input/ --recursive --overwrite
+  python main_batch.py -i ./data/input/ --workers 4
+        """
+    )
+
+    parser.add_argument(
+        "-i", "--input",
+        required=True,
+        nargs="+",
+        type=str,
+        help="Directories, glob patterns, manifest files (.txt/.lst with one path per line, "
+             "or .csv with a 'path' column) and/or audio files"
+    )
+    parser.add_argument(
+        "-o", "--output_dir",
+        default="./data/output/",
+        type=str,
+        help="Directory to save the output JSON files (default: ./data/output/)"
+    )
+    parser.add_argument(
+        "--recursive",
+        action="store_true",
+        help="Also search subdirectories of input directories (and '**' in glob patterns)"
+    )
+    parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="Re-process inputs whose output JSON already exists (default: skip them)"
+    )
+    parser.add_argument(
+        "--asr",
+        default="base.en",
+        type=str,
+        help="ASR model to use: 'base.en' or 'medium.en' (default: base.en)"
+    )
+    parser.add_argument(
+        "--speakers",
+        default=2,
+        type=int,
+        help="Number of speakers to detect (default: 2)"
+    )
+    parser.add_argument(
+        "--workers",
+        default=1,
+        type=int,
+        help="Worker processes analyzing recordings in parallel. The PyTorch models are loaded "
+             "once and shared with the forked workers (Linux, CPU only); each worker gets "
+             "--cpus / N CPUs and loads its own Whisper model (default: 1)"
+    )
+    parser.add_argument(
+        "--prefetch",
+        default=1,
+        type=int,
+        help="With several inputs, number of upcoming files to decode in the background "
+             "while the current one is analyzed; 0 disables (default: 1)"
+    )
+    parser.add_argument(
+        "--no_vad",
+        action="store_true",
+        help="Disable the voice-activity pre-pass (non-speech is then diarized and analyzed too)"
+    )
+    parser.add_argument(
+        "--split_channels",
+        action="store_true",
+        help="For stereo recordings with one speaker per channel, derive speaker turns from "
+             "channel energy and skip neural diarization (falls back to pyannote if the "
+             "channels bleed into each other)"
+    )
+    parser.add_argument(
+        "--stages",
+        default="all",
+        type=str,
+        help="Comma-separated stages to run: diarize, asr, acoustic, emotion (e.g. 'diarize,asr'); "
+             "models of other stages are never loaded (default: all)"
+    )
+    parser.add_argument(
+        "--stage_workers",
+        default=None,
+        type=str,
+        help="Run the segment stages pipelined with these threads per stage, e.g. "
+             "'asr=1,acoustic=2,emotion=1' (unlisted stages get 1), so different segments are in "
+             "different stages at once (default: off, segments are processed one after another)"
+    )
+    parser.add_argument(
+        "--acoustic_workers",
+        default=None,
+        type=int,
+        help="Worker processes for Praat acoustic features (segments are shared via shared "
+             "memory); 0 runs them in the main process (default: the acoustic share of the CPU budget)"
+    )
+    parser.add_argument(
+        "--cpus",
+        default=None,
+        type=int,
+        help="CPUs this run may use, shared out between the services' thread and process pools "
+             "(default: all available; give each of several concurrent runs its share)"
+    )
+    parser.add_argument(
+        "--cpu_budget",
+        default=None,
+        type=str,
+        help="Explicit CPUs per service, e.g. 'asr=8,emotion=6,acoustic=2' (services: diarize, "
+             "asr, acoustic, emotion); the others split what is left of --cpus"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue interrupted runs from their segment journal (<output>.journal.jsonl): "
+             "diarization and finished segments are not redone"
+    )
+    parser.add_argument(
+        "--metrics_textfile",
+        default=None,
+        type=str,
+        help="Also write each run's stage metrics to this Prometheus textfile "
+             "(e.g. for node_exporter's textfile collector)"
+    )
+    parser.add_argument(
+        "--decoder",
+        default="torchaudio",
+        choices=DECODER_BACKENDS,
+        help="Audio decoder: 'torchaudio' or 'ffmpeg' (streams 16kHz mono, lower peak memory; "
+             "requires ffmpeg on PATH) (default: torchaudio)"
+    )
+    parser.add_argument(
+        "--audio_cache",
+        nargs="?",
+        const=DEFAULT_CACHE_DIR,
+        default=None,
+        type=str,
+        help=f"Cache decoded audio in this directory ({DEFAULT_CACHE_DIR} if no directory is given), "
+             f"so later runs on the same recording skip decoding (default: off)"
+    )
+    parser.add_argument(
+        "--audio_cache_gb",
+        default=5.0,
+        type=float,
+        help="Maximum size of the decoded-audio cache in GB; least recently used entries are evicted (default: 5)"
+    )
+    parser.add_argument(
+        "--result_cache",
+        nargs="?",
+        const=DEFAULT_RESULT_CACHE_PATH,
+        default=None,
+        type=str,
+        help=f"Cache diarization, ASR, acoustic and emotion results per segment in this SQLite "
+             f"file ({DEFAULT_RESULT_CACHE_PATH} if no path is given). It is never pruned: it grows "
+             f"with every new recording and setting until deleted (default: off)"
+    )
+    parser.add_argument(
+        "--corpus_index",
+        nargs="?",
+        const=DEFAULT_INDEX_PATH,
+        default=None,
+        type=str,
+        help=f"Add each output to this SQLite corpus index, for scripts/corpus.py query/search "
+             f"({DEFAULT_INDEX_PATH} if no path is given; default: off)"
+    )
+    parser.add_argument(
+        "--compact_json",
+        action="store_true",
+        help="Write the output JSON without indentation (same content, ~40%% smaller)"
+    )
+    parser.add_argument(
+        "--columnar",
+        default=None,
+        choices=sorted(COLUMNAR_FORMATS),
+        help="Also write each output as Parquet or Arrow next to the JSON: one typed row per "
+             "segment, for analytics (needs pyarrow)"
+    )
+
+    args = parser.parse_args()
+
+    try:
+        stages = parse_stages(args.stages)
+        stage_workers = parse_stage_workers(args.stage_workers, SEGMENT_STAGES) if args.stage_workers else None
+        cpu_budget = parse_cpu_budget(args.cpu_budget)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    # 1. Get Hugging Face Token (Critical; only the diarization model needs it)
+    hf_token = os.environ.get("HF_TOKEN")
+    if hf_token is None and "diarize" in stages:
+        print("ERROR: HF_TOKEN environment variable not set (see main.py --help or USER_GUIDE.md)")
+        return
+
+    # 2. Resolve inputs and skip recordings that already have an output
+    input_files = collect_inputs(args.input, recursive=args.recursive)
+    if not input_files:
+        print("Error: No audio files found for the given inputs")
+        return
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    jobs, skipped = plan_jobs(input_files, args.output_dir, overwrite=args.overwrite)
+    print(f"✓ Found {len(input_files)} recordings: {len(jobs)} to process, "
+          f"{len(skipped)} skipped (output already exists)")
+    if not jobs:
+        return
+
+    # Decoded-audio cache (repeat runs on the same recording skip decoding)
+    audio_cache = None
+    if args.audio_cache:
+        audio_cache = AudioCache(args.audio_cache, max_bytes=int(args.audio_cache_gb * 1024 ** 3))
+    result_cache = ResultCache(args.result_cache) if args.result_cache else None
+    corpus_index = CorpusIndex(args.corpus_index) if args.corpus_index else None
+
+    # With a worker pool, each worker gets its share of the CPUs and extracts acoustics in-process
+    # (an acoustic pool started in the parent cannot be used by the forked workers)
+    workers = min(args.workers, len(jobs))
+    cpus, acoustic_workers = args.cpus, args.acoustic_workers
+    if workers > 1:
+        cpus = max(1, (args.cpus or available_cpus()) // workers)
+        if acoustic_workers:
+            print("⚠ --acoustic_workers is ignored with --workers; acoustics run inside each worker")
+        acoustic_workers = 0
+
+    # 3. Load all models once, then process every recording with the same pipeline
+    timings, init_seconds, batch_start, pool, pipeline = [], 0.0, None, None, None
+    try:
+        init_start = time.perf_counter()
+        pipeline = AnalysisPipeline(
+            hf_token=hf_token,
+            emotion_model_path="superb/hubert-base-superb-er",  # Phase 1 default
+            asr_model=args.asr,
+            audio_cache=audio_cache,
+            decoder_backend=args.decoder,
+            use_vad=not args.no_vad,
+            split_channels=args.split_channels,
+            stage_workers=stage_workers,
+            acoustic_workers=acoustic_workers,
+            cpus=cpus,
+            cpu_budget=cpu_budget,
+            metrics_textfile=args.metrics_textfile,
+            resume=args.resume,
+            result_cache=result_cache,
+            corpus_index=corpus_index,
+            stages=stages,
+            compact_json=args.compact_json,
+            columnar=args.columnar
+        )
+        if workers > 1:
+            # Only the shared PyTorch models load here; each worker loads Whisper after the fork
+            pool = SharedModelPool(pipeline, workers)
+            pool.load()
+        else:
+            pipeline.warm_up()
+        init_seconds = time.perf_counter() - init_start
+
+        batch_start = time.perf_counter()
+        if pool is not None:
+            timings = pool.run(jobs, num_speakers=args.speakers)
+        else:
+            timings = pipeline.run_batch(
+                jobs,
+                num_speakers=args.speakers,
+                prefetch_depth=args.prefetch
+            )
+    except KeyboardInterrupt:
+        print("\n\nBatch interrupted by user. Completed outputs are kept; rerun to resume.")
+    except Exception as e:
+        print(f"\n{'='*60}")
+        print(f"An error occurred during batch execution:")
+        print(f"{'='*60}")
+        print(f"{e}")
+        print(f"{'='*60}\n")
+        import traceback
+        traceback.print_exc()
+    finally:
+        if pipeline is not None:
+            pipeline.close()
+
+    # 4. Throughput summary
+    if timings and batch_start is not None:
+        summary = throughput_summary(timings, time.perf_counter() - batch_start)
+        print_throughput_summary(summary, init_seconds=init_seconds, skipped=len(skipped))
+    if pool is not None and pool.worker_reports:
+        pool.print_report()
+
+
+if __name__ == "__main__":
+    main()
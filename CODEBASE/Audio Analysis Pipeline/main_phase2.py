@@ -6,6 +6,12 @@ Runs the specialized clinical emotion model after fine-tuning.
 import os
 import argparse
 from pipeline.analysis_pipeline import AnalysisPipeline
+from pipeline.audio_cache import AudioCache, DEFAULT_CACHE_DIR
+from pipeline.result_cache import ResultCache, DEFAULT_RESULT_CACHE_PATH
+from pipeline.audio_utilities import DECODER_BACKENDS
+from pipeline.stage_executor import SEGMENT_STAGES, parse_stage_workers
+from pipeline.resources import parse_cpu_budget
+from pipeline.rescore import RescorePipeline, resolve_rescore_jobs
 
 
 def main():
@@ -22,6 +28,11 @@ Examples:
   python main_phase2.py -i ./data/input/conversation.mp3
   python main_phase2.py -i ./data/input/convo.wav --asr medium.en --speakers 2
   python main_phase2.py -i ./data/input/session.m4a -o ./results/
+
+  # Re-score an existing Phase 1 output (no diarization/ASR re-run)
+  python main_phase2.py -i ./data/input/conversation.mp3 --from_json ./data/output/conversation.json
+  # Re-score a whole corpus of Phase 1 outputs
+  python main_phase2.py -i ./data/input/ --from_json ./data/output/
         """
     )
 
@@ -29,7 +40,8 @@ Examples:
         "-i", "--input",
         required=True,
         type=str,
-        help="Path to the input audio file (.wav, .mp3, .m4a, etc.)"
+        help="Path to the input audio file (.wav, .mp3, .m4a, etc.); with --from_json "
+             "a directory of recordings is also accepted"
     )
     parser.add_argument(
         "-o", "--output_dir",
@@ -49,6 +61,104 @@ Examples:
         type=int,
         help="Number of speakers to detect (default: 2)"
     )
+    parser.add_argument(
+        "--no_vad",
+        action="store_true",
+        help="Disable the voice-activity pre-pass (non-speech is then diarized and analyzed too)"
+    )
+    parser.add_argument(
+        "--split_channels",
+        action="store_true",
+        help="For stereo recordings with one speaker per channel, derive speaker turns from "
+             "channel energy and skip neural diarization (falls back to pyannote if the "
+             "channels bleed into each other)"
+    )
+    parser.add_argument(
+        "--stage_workers",
+        default=None,
+        type=str,
+        help="Run the segment stages pipelined with these threads per stage, e.g. "
+             "'asr=1,acoustic=2,emotion=1' (unlisted stages get 1), so different segments are in "
+             "different stages at once (default: off, segments are processed one after another)"
+    )
+    parser.add_argument(
+        "--acoustic_workers",
+        default=None,
+        type=int,
+        help="Worker processes for Praat acoustic features (segments are shared via shared "
+             "memory); 0 runs them in the main process (default: the acoustic share of the CPU budget)"
+    )
+    parser.add_argument(
+        "--cpus",
+        default=None,
+        type=int,
+        help="CPUs this run may use, shared out between the services' thread and process pools "
+             "(default: all available; give each of several concurrent runs its share)"
+    )
+    parser.add_argument(
+        "--cpu_budget",
+        default=None,
+        type=str,
+        help="Explicit CPUs per service, e.g. 'asr=8,emotion=6,acoustic=2' (services: diarize, "
+             "asr, acoustic, emotion); the others split what is left of --cpus"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue interrupted runs from their segment journal (<output>.journal.jsonl): "
+             "diarization and finished segments are not redone"
+    )
+    parser.add_argument(
+        "--metrics_textfile",
+        default=None,
+        type=str,
+        help="Also write each run's stage metrics to this Prometheus textfile "
+             "(e.g. for node_exporter's textfile collector)"
+    )
+    parser.add_argument(
+        "--decoder",
+        default="torchaudio",
+        choices=DECODER_BACKENDS,
+        help="Audio decoder: 'torchaudio' or 'ffmpeg' (streams 16kHz mono, lower peak memory; "
+             "requires ffmpeg on PATH) (default: torchaudio)"
+    )
+    parser.add_argument(
+        "--audio_cache",
+        nargs="?",
+        const=DEFAULT_CACHE_DIR,
+        default=None,
+        type=str,
+        help=f"Cache decoded audio in this directory ({DEFAULT_CACHE_DIR} if no directory is given), "
+             f"so later runs on the same recording skip decoding (default: off)"
+    )
+    parser.add_argument(
+        "--audio_cache_gb",
+        default=5.0,
+        type=float,
+        help="Maximum size of the decoded-audio cache in GB; least recently used entries are evicted (default: 5)"
+    )
+    parser.add_argument(
+        "--result_cache",
+        nargs="?",
+        const=DEFAULT_RESULT_CACHE_PATH,
+        default=None,
+        type=str,
+        help=f"Cache diarization, ASR, acoustic and emotion results per segment in this SQLite "
+             f"file ({DEFAULT_RESULT_CACHE_PATH} if no path is given). It is never pruned: it grows "
+             f"with every new recording and setting until deleted (default: off)"
+    )
+    parser.add_argument(
+        "--from_json",
+        default=None,
+        type=str,
+        help="Phase 1 output JSON (or a directory of them) to re-score: segment boundaries and "
+             "transcripts are reused and only the emotion model runs"
+    )
+    parser.add_argument(
+        "--rescore_acoustics",
+        action="store_true",
+        help="With --from_json, also recompute the Praat acoustic features"
+    )
     parser.add_argument(
         "--model_path",
         default="./models/clinical_ser_model/",
@@ -58,6 +168,17 @@ Examples:
 
     args = parser.parse_args()
 
+    try:
+        stage_workers = parse_stage_workers(args.stage_workers, SEGMENT_STAGES) if args.stage_workers else None
+        cpu_budget = parse_cpu_budget(args.cpu_budget)
+    except ValueError as e:
+        parser.error(str(e))
+
+    # Re-scoring reuses Phase 1 diarization and transcripts, so no HF token is needed
+    if args.from_json:
+        rescore(args, cpu_budget)
+        return
+
     # 1. Get Hugging Face Token (Critical)
     hf_token = os.environ.get("HF_TOKEN")
     if hf_token is None:
@@ -103,8 +224,15 @@ Examples:
     output_filename = os.path.splitext(base_filename)[0] + "_phase2.json"
     output_json_path = os.path.join(args.output_dir, output_filename)
 
+    # Decoded-audio cache (repeat runs on the same recording skip decoding)
+    audio_cache = None
+    if args.audio_cache:
+        audio_cache = AudioCache(args.audio_cache, max_bytes=int(args.audio_cache_gb * 1024 ** 3))
+    result_cache = ResultCache(args.result_cache) if args.result_cache else None
+
     # 6. Initialize and run the pipeline
     # THIS IS THE HOT-SWAP: We use the fine-tuned clinical model
+    pipeline = None
     try:
         print("\n" + "=" * 60)
         print("PHASE 2: Using Fine-Tuned Clinical Emotion Model")
@@ -113,7 +241,18 @@ Examples:
         pipeline = AnalysisPipeline(
             hf_token=hf_token,
             emotion_model_path=args.model_path,  # <-- THIS IS THE HOT-SWAP
-            asr_model=args.asr
+            asr_model=args.asr,
+            audio_cache=audio_cache,
+            decoder_backend=args.decoder,
+            use_vad=not args.no_vad,
+            split_channels=args.split_channels,
+            stage_workers=stage_workers,
+            acoustic_workers=args.acoustic_workers,
+            cpus=args.cpus,
+            cpu_budget=cpu_budget,
+            metrics_textfile=args.metrics_textfile,
+            resume=args.resume,
+            result_cache=result_cache
         )
 
         pipeline.run(
@@ -131,6 +270,54 @@ Examples:
         print(f"{'='*60}\n")
         import traceback
         traceback.print_exc()
+    finally:
+        if pipeline is not None:
+            pipeline.close()
+
+
+def rescore(args, cpu_budget):
+    """Re-scores existing Phase 1 outputs with the fine-tuned emotion model."""
+    if not os.path.exists(args.input) or not os.path.exists(args.from_json):
+        print(f"Error: Input not found: {args.input if not os.path.exists(args.input) else args.from_json}")
+        return
+    if not os.path.exists(args.model_path):
+        print(f"Error: Fine-tuned model not found at {args.model_path}")
+        return
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    try:
+        jobs = resolve_rescore_jobs(args.from_json, args.input, args.output_dir)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    if not jobs:
+        print("Error: No Phase 1 outputs with matching audio found")
+        return
+
+    audio_cache = None
+    if args.audio_cache:
+        audio_cache = AudioCache(args.audio_cache, max_bytes=int(args.audio_cache_gb * 1024 ** 3))
+    result_cache = ResultCache(args.result_cache) if args.result_cache else None
+
+    pipeline = None
+    try:
+        pipeline = RescorePipeline(
+            emotion_model_path=args.model_path,
+            audio_cache=audio_cache,
+            decoder_backend=args.decoder,
+            rescore_acoustics=args.rescore_acoustics,
+            acoustic_workers=args.acoustic_workers,
+            cpus=args.cpus,
+            cpu_budget=cpu_budget,
+            result_cache=result_cache
+        )
+        for phase1_json, audio_path, output_json_path in jobs:
+            pipeline.run(phase1_json, audio_path, output_json_path)
+    except KeyboardInterrupt:
+        print("\n\nRescoring interrupted by user.")
+    finally:
+        if pipeline is not None:
+            pipeline.close()
 
 
 if __name__ == "__main__":
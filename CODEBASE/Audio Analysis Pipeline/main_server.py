@@ -0,0 +1,286 @@
+"""
+Server Execution Script for Clinical Audio Analysis Pipeline (Phase 1)
+Loads all models once and serves analysis jobs over a local HTTP or Unix-socket API.
+"""
+
+import os
+import warnings
+import argparse
+
+# Suppress warnings globally for performance
+warnings.filterwarnings('ignore', category=UserWarning)
+warnings.filterwarnings('ignore', category=DeprecationWarning)
+warnings.filterwarnings('ignore', category=FutureWarning)
+
+# Suppress torchaudio backend warnings
+os.environ['PYTHONWARNINGS'] = 'ignore::UserWarning'
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'  # Suppress TensorFlow warnings
+
+from pipeline.analysis_pipeline import AnalysisPipeline
+from pipeline.audio_cache import AudioCache, DEFAULT_CACHE_DIR
+from pipeline.result_cache import ResultCache, DEFAULT_RESULT_CACHE_PATH
+from pipeline.corpus_index import CorpusIndex, DEFAULT_INDEX_PATH
+from pipeline.output_formats import COLUMNAR_FORMATS
+from pipeline.audio_utilities import DECODER_BACKENDS
+from pipeline.stage_executor import SEGMENT_STAGES, parse_stage_workers, parse_stages
+from pipeline.resources import parse_cpu_budget
+from pipeline.server import (
+    AnalysisServer, make_http_server, describe_address,
+    DEFAULT_HOST, DEFAULT_PORT, DEFAULT_OUTPUT_DIR, DEFAULT_UPLOAD_DIR
+)
+
+
+def main():
+    """
+    Server entry point for the Clinical Audio Analysis Pipeline.
+    Loads all models once, then analyzes submitted jobs one at a time until interrupted.
+    """
+    parser = argparse.ArgumentParser(
+        description="Serve the Clinical Audio Analysis Pipeline (Phase 1) with warm models.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python main_server.py                                   # http://127.0.0.1:8765
+  python main_server.py --unix_socket /tmp/audio-analysis.sock
+
+  curl -s localhost:8765/health
+  curl -s -X POST localhost:8765/jobs -H 'Content-Type: application/json' \\
+       -d '{"path": "data/input/session.mp3"}'
+  curl -s -X POST 'localhost:8765/jobs?filename=clip.wav&wait=1' --data-binary @clip.wav
+  curl -s localhost:8765/jobs/<job_id>/result
+        """
+    )
+
+    parser.add_argument(
+        "--host",
+        default=DEFAULT_HOST,
+        type=str,
+        help=f"Interface to listen on; keep the default to accept local connections only (default: {DEFAULT_HOST})"
+    )
+    parser.add_argument(
+        "--port",
+        default=DEFAULT_PORT,
+        type=int,
+        help=f"TCP port (default: {DEFAULT_PORT})"
+    )
+    parser.add_argument(
+        "--unix_socket",
+        default=None,
+        type=str,
+        help="Listen on this Unix socket path instead of TCP"
+    )
+    parser.add_argument(
+        "-o", "--output_dir",
+        default=DEFAULT_OUTPUT_DIR,
+        type=str,
+        help=f"Directory for job results, <job_id>.json (default: {DEFAULT_OUTPUT_DIR})"
+    )
+    parser.add_argument(
+        "--upload_dir",
+        default=DEFAULT_UPLOAD_DIR,
+        type=str,
+        help=f"Directory holding uploaded audio until it is analyzed (default: {DEFAULT_UPLOAD_DIR})"
+    )
+    parser.add_argument(
+        "--max_queue",
+        default=100,
+        type=int,
+        help="Reject new jobs (HTTP 503) while this many are waiting (default: 100)"
+    )
+    parser.add_argument(
+        "--max_upload_mb",
+        default=1024,
+        type=int,
+        help="Largest accepted request body (upload or JSON) in MB; larger ones get HTTP 413 (default: 1024)"
+    )
+    parser.add_argument(
+        "--asr",
+        default="base.en",
+        type=str,
+        help="ASR model to use: 'base.en' or 'medium.en' (default: base.en)"
+    )
+    parser.add_argument(
+        "--speakers",
+        default=2,
+        type=int,
+        help="Number of speakers for jobs that do not specify num_speakers (default: 2)"
+    )
+    parser.add_argument(
+        "--no_vad",
+        action="store_true",
+        help="Disable the voice-activity pre-pass (non-speech is then diarized and analyzed too)"
+    )
+    parser.add_argument(
+        "--split_channels",
+        action="store_true",
+        help="For stereo recordings with one speaker per channel, derive speaker turns from "
+             "channel energy and skip neural diarization (falls back to pyannote if the "
+             "channels bleed into each other)"
+    )
+    parser.add_argument(
+        "--stages",
+        default="all",
+        type=str,
+        help="Comma-separated stages to run: diarize, asr, acoustic, emotion (e.g. 'diarize,asr'); "
+             "models of other stages are never loaded (default: all)"
+    )
+    parser.add_argument(
+        "--stage_workers",
+        default=None,
+        type=str,
+        help="Run the segment stages pipelined with these threads per stage, e.g. "
+             "'asr=1,acoustic=2,emotion=1' (unlisted stages get 1), so different segments are in "
+             "different stages at once (default: off, segments are processed one after another)"
+    )
+    parser.add_argument(
+        "--acoustic_workers",
+        default=None,
+        type=int,
+        help="Worker processes for Praat acoustic features (segments are shared via shared "
+             "memory); 0 runs them in the main process (default: the acoustic share of the CPU budget)"
+    )
+    parser.add_argument(
+        "--cpus",
+        default=None,
+        type=int,
+        help="CPUs this run may use, shared out between the services' thread and process pools "
+             "(default: all available; give each of several concurrent runs its share)"
+    )
+    parser.add_argument(
+        "--cpu_budget",
+        default=None,
+        type=str,
+        help="Explicit CPUs per service, e.g. 'asr=8,emotion=6,acoustic=2' (services: diarize, "
+             "asr, acoustic, emotion); the others split what is left of --cpus"
+    )
+    parser.add_argument(
+        "--metrics_textfile",
+        default=None,
+        type=str,
+        help="Also write each run's stage metrics to this Prometheus textfile "
+             "(e.g. for node_exporter's textfile collector)"
+    )
+    parser.add_argument(
+        "--decoder",
+        default="torchaudio",
+        choices=DECODER_BACKENDS,
+        help="Audio decoder: 'torchaudio' or 'ffmpeg' (streams 16kHz mono, lower peak memory; "
+             "requires ffmpeg on PATH) (default: torchaudio)"
+    )
+    parser.add_argument(
+        "--audio_cache",
+        nargs="?",
+        const=DEFAULT_CACHE_DIR,
+        default=None,
+        type=str,
+        help=f"Cache decoded audio in this directory ({DEFAULT_CACHE_DIR} if no directory is given), "
+             f"so later runs on the same recording skip decoding (default: off)"
+    )
+    parser.add_argument(
+        "--audio_cache_gb",
+        default=5.0,
+        type=float,
+        help="Maximum size of the decoded-audio cache in GB; least recently used entries are evicted (default: 5)"
+    )
+    parser.add_argument(
+        "--result_cache",
+        nargs="?",
+        const=DEFAULT_RESULT_CACHE_PATH,
+        default=None,
+        type=str,
+        help=f"Cache diarization, ASR, acoustic and emotion results per segment in this SQLite "
+             f"file ({DEFAULT_RESULT_CACHE_PATH} if no path is given). It is never pruned: it grows "
+             f"with every new recording and setting until deleted (default: off)"
+    )
+    parser.add_argument(
+        "--corpus_index",
+        nargs="?",
+        const=DEFAULT_INDEX_PATH,
+        default=None,
+        type=str,
+        help=f"Add each output to this SQLite corpus index, for scripts/corpus.py query/search "
+             f"({DEFAULT_INDEX_PATH} if no path is given; default: off)"
+    )
+    parser.add_argument(
+        "--compact_json",
+        action="store_true",
+        help="Write the output JSON without indentation (same content, ~40%% smaller)"
+    )
+    parser.add_argument(
+        "--columnar",
+        default=None,
+        choices=sorted(COLUMNAR_FORMATS),
+        help="Also write each output as Parquet or Arrow next to the JSON: one typed row per "
+             "segment, for analytics (needs pyarrow)"
+    )
+
+    args = parser.parse_args()
+
+    try:
+        stages = parse_stages(args.stages)
+        stage_workers = parse_stage_workers(args.stage_workers, SEGMENT_STAGES) if args.stage_workers else None
+        cpu_budget = parse_cpu_budget(args.cpu_budget)
+    except ValueError as e:
+        parser.error(str(e))
+
+    # 1. Get Hugging Face Token (Critical; only the diarization model needs it)
+    hf_token = os.environ.get("HF_TOKEN")
+    if hf_token is None and "diarize" in stages:
+        print("ERROR: HF_TOKEN environment variable not set (see main.py --help or USER_GUIDE.md)")
+        return
+
+    # Decoded-audio cache (repeat runs on the same recording skip decoding)
+    audio_cache = None
+    if args.audio_cache:
+        audio_cache = AudioCache(args.audio_cache, max_bytes=int(args.audio_cache_gb * 1024 ** 3))
+    result_cache = ResultCache(args.result_cache) if args.result_cache else None
+    corpus_index = CorpusIndex(args.corpus_index) if args.corpus_index else None
+
+    # 2. Load the models of the selected stages once
+    pipeline = AnalysisPipeline(
+        hf_token=hf_token,
+        emotion_model_path="superb/hubert-base-superb-er",  # Phase 1 default
+        asr_model=args.asr,
+        audio_cache=audio_cache,
+        decoder_backend=args.decoder,
+        use_vad=not args.no_vad,
+        split_channels=args.split_channels,
+        stage_workers=stage_workers,
+        acoustic_workers=args.acoustic_workers,
+        cpus=args.cpus,
+        cpu_budget=cpu_budget,
+        metrics_textfile=args.metrics_textfile,
+        result_cache=result_cache,
+        corpus_index=corpus_index,
+        stages=stages,
+        compact_json=args.compact_json,
+        columnar=args.columnar
+    )
+    # Load the selected models now so the first request does not pay for them
+    pipeline.warm_up()
+
+    # 3. Serve jobs until interrupted
+    app = AnalysisServer(
+        pipeline,
+        output_dir=args.output_dir,
+        upload_dir=args.upload_dir,
+        max_queue=args.max_queue,
+        max_upload_bytes=args.max_upload_mb * 1024 ** 2,
+        default_speakers=args.speakers
+    )
+    server = make_http_server(app, host=args.host, port=args.port, unix_socket=args.unix_socket)
+    print(f"✓ Listening on {describe_address(server)} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n\nShutting down: finishing the running job, queued jobs are dropped.")
+    finally:
+        server.server_close()
+        if args.unix_socket and os.path.exists(args.unix_socket):
+            os.remove(args.unix_socket)
+        app.close()
+        pipeline.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Streaming Execution Script for Clinical Audio Analysis Pipeline
+Analyzes a live consultation turn by turn while the audio is still arriving.
+"""
+
+import os
+import sys
+import json
+import time
+import warnings
+import argparse
+
+# Suppress warnings globally for performance
+warnings.filterwarnings('ignore', category=UserWarning)
+warnings.filterwarnings('ignore', category=DeprecationWarning)
+warnings.filterwarnings('ignore', category=FutureWarning)
+
+# Suppress torchaudio backend warnings
+os.environ['PYTHONWARNINGS'] = 'ignore::UserWarning'
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'  # Suppress TensorFlow warnings
+
+from pipeline.audio_utilities import DECODER_BACKENDS
+from pipeline.resources import parse_cpu_budget, plan_resources
+from pipeline.services.asr_service import ASRService
+from pipeline.services.acoustic_service import AcousticService
+from pipeline.services.emotion_service import EmotionService
+from pipeline.stage_executor import SEGMENT_STAGES, parse_stage_workers
+from pipeline.streaming import (
+    StreamingAnalyzer, StreamingTurnDetector, replay_file, read_pcm_stream, print_latency_summary,
+    DEFAULT_CHUNK_SECONDS, DEFAULT_LATENCY_TARGET_SECONDS, PCM_FORMATS
+)
+
+
+def main():
+    """
+    Main entry point for streaming analysis.
+    Parses command-line arguments, loads the models and analyzes the stream until it ends.
+    """
+    parser = argparse.ArgumentParser(
+        description="Analyze a live consultation turn by turn (streaming mode).",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python main_stream.py -i ./data/input/consultation.mp3                   # replay at real-time speed
+  python main_stream.py -i ./data/input/stereo.wav --split_channels --speed 2
+  arecord -f S16_LE -r 16000 -c 1 | python main_stream.py --stdin
+  ffmpeg -i rtsp://... -f s16le -ac 1 -ar 16000 - | python main_stream.py --stdin -o -
+        """
+    )
+
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
+        "-i", "--input",
+        type=str,
+        help="Audio file to replay as a live stream"
+    )
+    source.add_argument(
+        "--stdin",
+        action="store_true",
+        help="Read raw 16kHz PCM from stdin (see --pcm_format and --channels)"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        default=None,
+        type=str,
+        help="JSON Lines file receiving one record per turn and a final summary; '-' writes to "
+             "stdout (default: ./data/output/<name>_stream.jsonl)"
+    )
+    parser.add_argument(
+        "--speed",
+        default=1.0,
+        type=float,
+        help="Replay speed for --input (1 = real time, 0 = as fast as possible) (default: 1)"
+    )
+    parser.add_argument(
+        "--pcm_format",
+        default="s16le",
+        choices=sorted(PCM_FORMATS),
+        help="Sample format of the PCM on stdin (default: s16le)"
+    )
+    parser.add_argument(
+        "--channels",
+        default=1,
+        type=int,
+        help="Interleaved channels of the PCM on stdin; with 2, speakers are taken from channel energy (default: 1)"
+    )
+    parser.add_argument(
+        "--split_channels",
+        action="store_true",
+        help="Keep the channels of --input so turns are labelled by channel (one speaker per channel)"
+    )
+    parser.add_argument(
+        "--chunk_ms",
+        default=int(DEFAULT_CHUNK_SECONDS * 1000),
+        type=int,
+        help=f"Chunk size in milliseconds (default: {int(DEFAULT_CHUNK_SECONDS * 1000)})"
+    )
+    parser.add_argument(
+        "--end_silence_ms",
+        default=600,
+        type=int,
+        help="Silence that ends a turn; lower answers faster but splits more pauses (default: 600)"
+    )
+    parser.add_argument(
+        "--max_turn_seconds",
+        default=10.0,
+        type=float,
+        help="Continuous speech is cut into turns of at most this length (default: 10)"
+    )
+    parser.add_argument(
+        "--latency_target",
+        default=DEFAULT_LATENCY_TARGET_SECONDS,
+        type=float,
+        help="Seconds from end of speech to result; turns that are already later skip acoustics "
+             f"and emotion so the backlog drains (default: {DEFAULT_LATENCY_TARGET_SECONDS:g})"
+    )
+    parser.add_argument(
+        "--asr",
+        default="base.en",
+        type=str,
+        help="ASR model to use: 'base.en' or 'medium.en' (default: base.en)"
+    )
+    parser.add_argument(
+        "--stage_workers",
+        default=None,
+        type=str,
+        help="Threads per turn stage, e.g. 'asr=2,acoustic=1,emotion=1' (default: 1 each)"
+    )
+    parser.add_argument(
+        "--cpus",
+        default=None,
+        type=int,
+        help="CPUs the stream may use, shared out between ASR, acoustics and emotion "
+             "(default: all available)"
+    )
+    parser.add_argument(
+        "--cpu_budget",
+        default=None,
+        type=str,
+        help="Explicit CPUs per service, e.g. 'asr=4,emotion=3' (services: asr, acoustic, emotion); "
+             "the others split what is left of --cpus"
+    )
+    parser.add_argument(
+        "--decoder",
+        default="torchaudio",
+        choices=DECODER_BACKENDS,
+        help="Audio decoder for --input (default: torchaudio)"
+    )
+
+    args = parser.parse_args()
+
+    try:
+        stage_workers = parse_stage_workers(args.stage_workers, SEGMENT_STAGES)
+        cpu_budget = parse_cpu_budget(args.cpu_budget)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.input and not os.path.exists(args.input):
+        print(f"Error: Input file not found: {args.input}")
+        return
+
+    # 1. Open the output
+    to_stdout = args.output == "-"
+    if to_stdout:
+        # Results own stdout; everything else that prints (model loading, progress) goes to stderr
+        output, log = sys.stdout, sys.stderr
+        sys.stdout = sys.stderr
+    else:
+        name = os.path.splitext(os.path.basename(args.input))[0] if args.input else \
+            time.strftime("stdin_%Y%m%d_%H%M%S")
+        output_path = args.output or os.path.join("./data/output/", f"{name}_stream.jsonl")
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        output, log = open(output_path, 'w', encoding='utf-8'), sys.stdout
+
+    def emit(turn):
+        output.write(json.dumps(dict(turn, type="turn"), ensure_ascii=False) + "\n")
+        output.flush()
+        emotion = (turn["predicted_emotion"] or {}).get("label", "-")
+        print(f"[{turn['start_time']:7.1f}s-{turn['end_time']:7.1f}s] {turn['speaker'] or 'speaker?'}: "
+              f"{turn['transcript'] or '...'} ({emotion}) ⏱ {turn['latency_seconds']:.2f}s", file=log)
+
+    # 2. Load the services (no diarization model: turns come from the streaming endpointer)
+    # Turn stages overlap; acoustics stay in-process, where a turn has no pool round trip
+    resources = plan_resources(SEGMENT_STAGES, cpus=args.cpus, budget=cpu_budget,
+                               stage_workers=stage_workers, acoustic_workers=0)
+    print(f"✓ CPU budget ({resources.cpus} CPUs): {resources.describe()}", file=log)
+    try:
+        emotion_service = EmotionService(mode='triple_ensemble')
+        resources.apply_torch("emotion")
+        analyzer = StreamingAnalyzer(
+            ASRService(model_name=args.asr, **resources.asr_options()),
+            AcousticService(),
+            emotion_service,
+            detector=StreamingTurnDetector(end_silence_ms=args.end_silence_ms,
+                                           max_turn_seconds=args.max_turn_seconds),
+            latency_target=args.latency_target,
+            stage_workers=stage_workers
+        )
+
+        # 3. Open the stream
+        chunk_seconds = args.chunk_ms / 1000.0
+        if args.stdin:
+            chunks = read_pcm_stream(sys.stdin.buffer, chunk_seconds, channels=args.channels,
+                                     pcm_format=args.pcm_format)
+        else:
+            chunks = replay_file(args.input, chunk_seconds, speed=args.speed,
+                                 keep_channels=args.split_channels, backend=args.decoder)
+
+        # 4. Analyze until the stream ends (Ctrl+C stops listening and still reports latencies)
+        print("✓ Streaming - results are emitted per turn", file=log)
+        summary = analyzer.run(chunks, emit)
+        output.write(json.dumps(dict(summary, type="summary"), ensure_ascii=False) + "\n")
+        print(file=log)
+        print_latency_summary(summary, stream=log)
+    except KeyboardInterrupt:
+        print("\n\nStreaming interrupted by user.", file=log)
+    finally:
+        if not to_stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,35 +3,76 @@ Analysis Pipeline Orchestrator
 Manages the entire end-to-end data flow of the clinical audio analysis system.
 """
 
-import json
 import os
+import time
+import threading
 import warnings
-import torch
+import numpy as np
 from tqdm import tqdm
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Tuple
 
 # Suppress warnings for performance
 warnings.filterwarnings('ignore')
 
-# Enable PyTorch optimizations
-if torch.cuda.is_available():
-    torch.backends.cudnn.benchmark = True
-    torch.backends.cudnn.enabled = True
-
 # Import all our modules
 from . import audio_utilities as au
+from .audio_segment import padded_segment_view, SEGMENT_PADDING_SECONDS
+from .audio_cache import AudioCache
+from .prefetch import AudioPrefetcher
+from .vad import VoiceActivityDetector, TimeMap
+from .channel_diarization import ChannelDiarizer
+from .stage_executor import Stage, StageExecutor, StageGraph, SEGMENT_STAGES, PIPELINE_STAGES, segment_stage
+from .metrics import MetricsCollector, measure, print_stage_table, write_prometheus_textfile
+from .journal import SegmentJournal, journal_path_for, write_streamed_json
+from .output_formats import COLUMNAR_FORMATS, columnar_path, require_pyarrow, write_columnar
+from .result_cache import ResultCache, MISS, content_id
+from .corpus_index import CorpusIndex
+from .resources import ResourcePlan, plan_resources
 from .services.diarization_service import DiarizationService
 from .services.asr_service import ASRService
 from .services.acoustic_service import AcousticService
 from .services.emotion_service import EmotionService
 
+# Segment length used when neither diarization nor voice activity provides boundaries
+UNDIARIZED_WINDOW_SECONDS = 30.0
+
+# Speaker-segment merging (see `AnalysisPipeline._merge_segments`)
+MERGE_MAX_GAP_SECONDS = 1.0
+MERGE_MIN_DURATION_SECONDS = 0.3
+MERGE_MAX_DURATION_SECONDS = 30.0
+
+# Fixed members of the emotion ensemble (the HuBERT model is configurable)
+WAV2VEC2_EMOTION_MODEL = "ehcalabres/wav2vec2-lg-xlsr-en-speech-emotion-recognition"
+TEXT_EMOTION_MODEL = "j-hartmann/emotion-english-distilroberta-base"
+
+
+def _settings(component: Any) -> Optional[Dict[str, Any]]:
+    """The scalar settings of a VAD or channel diarizer (None when it is not used)."""
+    if component is None:
+        return None
+    return {name: value for name, value in sorted(vars(component).items())
+            if not name.startswith("_") and isinstance(value, (bool, int, float, str))}
+
+
+def enable_torch_optimizations() -> None:
+    """
+    Enables cuDNN autotuning when a GPU is present.
+
+    Called before the first model is loaded rather than at import time, so importing the
+    pipeline (and every CLI's --help or argument validation) does not load torch.
+    """
+    import torch
+    if torch.cuda.is_available():
+        torch.backends.cudnn.benchmark = True
+        torch.backends.cudnn.enabled = True
+
 
 class AnalysisPipeline:
     """
     Orchestrates the entire audio analysis pipeline from end-to-end.
 
-    This is the "brain" of the system. It initializes all services once
-    (loading all ML models into memory) and manages the complete data flow:
+    This is the "brain" of the system. It loads each service once, on first use
+    (only the selected `stages` are ever loaded), and manages the complete data flow:
     1. Load audio file
     2. Run diarization to get speaker segments
     3. For each segment:
@@ -40,14 +81,33 @@ class AnalysisPipeline:
         c. Run emotion recognition
         d. Run acoustic feature extraction
     4. Aggregate results and save as JSON
+
+    The per-segment steps form a stage graph (see pipeline/stage_executor.py): each
+    stage declares the fields it reads and writes, so ASR and acoustics run side by side
+    and emotion waits for both. Further analyzers plug in with `add_stage`.
     """
 
     def __init__(self,
                  hf_token: Optional[str] = None,
                  emotion_model_path: str = "superb/hubert-base-superb-er",
-                 asr_model: str = "base.en"):
+                 asr_model: str = "base.en",
+                 audio_cache: Optional[AudioCache] = None,
+                 decoder_backend: str = "torchaudio",
+                 use_vad: bool = True,
+                 split_channels: bool = False,
+                 stage_workers: Optional[Dict[str, int]] = None,
+                 acoustic_workers: Optional[int] = 0,
+                 metrics_textfile: Optional[str] = None,
+                 resume: bool = False,
+                 result_cache: Optional[ResultCache] = None,
+                 corpus_index: Optional[CorpusIndex] = None,
+                 stages: Tuple[str, ...] = PIPELINE_STAGES,
+                 compact_json: bool = False,
+                 columnar: Optional[str] = None,
+                 cpus: Optional[int] = None,
+                 cpu_budget: Optional[Dict[str, int]] = None):
         """
-        Initializes the pipeline by loading all ML models into memory.
+        Initializes the pipeline. Models are loaded lazily, when a run first needs them.
 
         Args:
             hf_token (Optional[str]): Hugging Face auth token (for Diarization). If omitted,
@@ -55,29 +115,208 @@ class AnalysisPipeline:
                                       or cached CLI credentials.
             emotion_model_path (str): Path for the EmotionService (supports hot-swap)
             asr_model (str): The faster-whisper model to use
+            audio_cache (Optional[AudioCache]): On-disk cache of decoded audio. When set,
+                                                repeat runs on the same recording skip decoding.
+            decoder_backend (str): 'torchaudio' or 'ffmpeg' (streaming, bounded peak memory)
+            use_vad (bool): Run the voice-activity pre-pass that trims non-speech before
+                            diarization and skips non-speech segments downstream
+            split_channels (bool): Keep stereo channels and, when they are well separated
+                                   (one speaker per channel), derive speaker segments from
+                                   channel energy instead of running pyannote
+            stage_workers (Optional[Dict[str, int]]): Threads per segment stage ('asr', 'acoustic',
+                                                      'emotion'). Stages then run pipelined, with
+                                                      different segments in different stages at the
+                                                      same time. None runs the segments serially.
+            acoustic_workers (Optional[int]): Processes for Praat feature extraction (segments are
+                                              read from shared memory); 0 extracts on the calling
+                                              thread, None sizes the pool from the CPU budget
+            metrics_textfile (Optional[str]): Also export each run's metrics to this Prometheus
+                                              textfile (for node_exporter's textfile collector)
+            resume (bool): Continue an interrupted run from its segment journal
+                           (<output>.journal.jsonl) instead of starting over
+            result_cache (Optional[ResultCache]): Per-stage result cache; diarization, ASR,
+                                                  acoustics and emotion reuse results for audio
+                                                  they have already analyzed with the same settings
+            corpus_index (Optional[CorpusIndex]): Corpus segment/transcript index every written
+                                                  output is added to (see scripts/corpus.py)
+            stages (Tuple[str, ...]): Stages to run, a subset of 'diarize', 'asr', 'acoustic',
+                                      'emotion'. Models of other stages are never loaded. Without
+                                      'diarize', segments come from channel energy (split_channels),
+                                      voice activity, or fixed 30 s windows.
+            compact_json (bool): Write the output JSON without indentation (same content)
+            columnar (Optional[str]): Also write the output as 'parquet' or 'arrow' next to the
+                                      JSON, one typed row per segment (needs pyarrow)
+            cpus (Optional[int]): CPUs this pipeline may use (default: all available); the
+                                  PyTorch, CTranslate2 and Praat pools are sized to share them
+            cpu_budget (Optional[Dict[str, int]]): Explicit CPUs per service ('diarize', 'asr',
+                                                   'acoustic', 'emotion'); see pipeline/resources.py
         """
         print("=" * 60)
         print("Initializing Clinical Audio Analysis Pipeline...")
         print("=" * 60)
 
-        self.diarization_service = DiarizationService(auth_token=hf_token)
-        self.asr_service = ASRService(model_name=asr_model)
-        self.acoustic_service = AcousticService()
-
-        # Initialize Triple Ensemble Emotion Service
-        # Mode options: 'dual_audio' or 'triple_ensemble'
-        self.emotion_service = EmotionService(
-            mode='triple_ensemble',  # Use all three models for maximum accuracy
-            hubert_model=emotion_model_path,  # Prosody analysis
-            wav2vec2_model="ehcalabres/wav2vec2-lg-xlsr-en-speech-emotion-recognition",  # Phonetic analysis
-            text_model="j-hartmann/emotion-english-distilroberta-base"  # Semantic analysis
+        self.audio_cache = audio_cache
+        self.decoder_backend = decoder_backend
+        self.vad = VoiceActivityDetector() if use_vad else None
+        self.channel_diarizer = ChannelDiarizer() if split_channels else None
+        self.stage_workers = stage_workers
+        self.metrics_textfile = metrics_textfile
+        self.resume = resume
+        self.result_cache = result_cache
+        self.corpus_index = corpus_index
+        self.stages = tuple(stage for stage in PIPELINE_STAGES if stage in stages)
+        # Analyzers registered with `add_stage`, run after/alongside the built-in segment stages
+        self.extra_stages: List[Stage] = []
+        self.compact_json = compact_json
+        self.columnar = columnar
+        if columnar is not None:
+            if columnar not in COLUMNAR_FORMATS:
+                raise ValueError(f"Unknown columnar format '{columnar}'. Expected one of: {', '.join(COLUMNAR_FORMATS)}")
+            require_pyarrow()  # fail now rather than after the first recording
+        # Settings that change results; a journal is only resumed if they match
+        self._run_params = {
+            "asr_model": asr_model,
+            "emotion_model": emotion_model_path,
+            "emotion_ensemble": [WAV2VEC2_EMOTION_MODEL, TEXT_EMOTION_MODEL],
+            "decoder_backend": decoder_backend,
+            "vad": _settings(self.vad),
+            "channel_diarizer": _settings(self.channel_diarizer),
+            "stages": list(self.stages),
+            "segment_padding_seconds": SEGMENT_PADDING_SECONDS,
+            "undiarized_window_seconds": UNDIARIZED_WINDOW_SECONDS,
+            "merge": {"max_gap": MERGE_MAX_GAP_SECONDS, "min_duration": MERGE_MIN_DURATION_SECONDS,
+                      "max_duration": MERGE_MAX_DURATION_SECONDS},
+        }
+        # One CPU budget for the thread and process pools of every service
+        self.resources: ResourcePlan = plan_resources(
+            self.stages, cpus=cpus, budget=cpu_budget, stage_workers=stage_workers,
+            acoustic_workers=acoustic_workers
         )
+        print(f"✓ CPU budget ({self.resources.cpus} CPUs): {self.resources.describe()}")
+        if self.resources.oversubscribed:
+            print(f"⚠ The CPU budget gives the overlapping segment stages more than {self.resources.cpus} CPUs")
+
+        # Metrics of the run in progress (per-stage timings end up in the output's `metrics` block)
+        self._metrics: Optional[MetricsCollector] = None
+
+        # Praat loads no model; its pool is started now so the forked workers do not inherit the models
+        self.acoustic_service = None
+        if "acoustic" in self.stages:
+            self.acoustic_service = AcousticService(workers=self.resources.acoustic_workers,
+                                                    result_cache=result_cache)
+
+        # Model-backed services are constructed on first use (see `_service`)
+        self._services: Dict[str, Any] = {}
+        self._service_lock = threading.Lock()
+        self._service_factories = {
+            "diarize": lambda: DiarizationService(auth_token=hf_token, result_cache=result_cache),
+            "asr": lambda: ASRService(model_name=asr_model, result_cache=result_cache,
+                                      **self.resources.asr_options()),
+            # Triple ensemble (HuBERT + Wav2Vec2 + text); without ASR there is no text to classify,
+            # so the text model is not loaded at all
+            "emotion": lambda: EmotionService(
+                mode='triple_ensemble' if "asr" in self.stages else 'dual_audio',
+                hubert_model=emotion_model_path,  # Prosody analysis
+                wav2vec2_model=WAV2VEC2_EMOTION_MODEL,  # Phonetic analysis
+                text_model=TEXT_EMOTION_MODEL,  # Semantic analysis
+                result_cache=result_cache
+            ),
+        }
 
+        print(f"✓ Stages: {', '.join(self.stages)} (models load on first use)")
         print("=" * 60)
-        print("All services initialized successfully!")
-        print("=" * 60)
 
-    def run(self, audio_file_path: str, output_json_path: str, num_speakers: int = 2):
+    def add_stage(self, stage: Stage) -> None:
+        """
+        Registers an additional per-segment analyzer.
+
+        The stage's `fn` receives the segment payload ({"view": audio slice, "segment":
+        output dict}) and writes its declared `outputs` into payload["segment"]; its
+        `inputs` may name 'audio' and the outputs of other stages ('transcript',
+        'acoustic_features', 'predicted_emotion', ...). Output fields start out as null.
+
+        Args:
+            stage (Stage): Stage with declared inputs and outputs
+
+        Raises:
+            ValueError: If the stage does not fit the graph (unknown input, duplicate
+                        output or name, dependency cycle)
+        """
+        if stage.inputs is None:
+            raise ValueError(f"Stage '{stage.name}' must declare its inputs")
+        graph = StageGraph(self._segment_stages() + [stage])
+        self.extra_stages.append(stage)
+        # Results depend on the plugged-in analyzers, so journals from other graphs are not resumed
+        self._run_params["stages"] = list(self.stages) + [extra.name for extra in self.extra_stages]
+        print(f"✓ Stage '{stage.name}' added: {graph.describe()}")
+
+    @property
+    def diarization_service(self) -> DiarizationService:
+        return self._service("diarize")
+
+    @property
+    def asr_service(self) -> ASRService:
+        return self._service("asr")
+
+    @property
+    def emotion_service(self) -> EmotionService:
+        return self._service("emotion")
+
+    def warm_up(self, stages: Optional[Tuple[str, ...]] = None) -> None:
+        """
+        Loads models now instead of on first use (e.g. for a server).
+
+        Args:
+            stages (Optional[Tuple[str, ...]]): Model-backed stages to load (default: every
+                                                selected one); unselected stages are ignored
+        """
+        for stage in self._service_factories:
+            if stage in self.stages and (stages is None or stage in stages):
+                self._service(stage)
+
+    def close(self) -> None:
+        """Shuts down the acoustic worker pool (the pipeline can still run; it restarts the pool)."""
+        if self.acoustic_service is not None:
+            self.acoustic_service.close()
+
+    def __enter__(self) -> "AnalysisPipeline":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _service(self, stage: str):
+        """
+        Returns the service of `stage`, constructing (and loading its models) on first use.
+
+        Raises:
+            RuntimeError: If the stage was not selected
+        """
+        service = self._services.get(stage)
+        if service is not None:
+            return service
+        if stage not in self.stages:
+            raise RuntimeError(f"Stage '{stage}' is not enabled (stages: {', '.join(self.stages)})")
+        with self._service_lock:
+            service = self._services.get(stage)
+            if service is None:
+                if stage != "asr":  # CTranslate2 (faster-whisper) does not use cuDNN settings
+                    enable_torch_optimizations()
+                    self.resources.apply_torch(stage)
+                with measure(self._metrics, f"model_load.{stage}"):
+                    service = self._service_factories[stage]()
+                if stage == "asr":
+                    # Loading it imported torch, which otherwise starts a thread per core
+                    self.resources.apply_torch(stage)
+                if stage == "emotion":
+                    service.metrics = self._metrics
+                self._services[stage] = service
+        return service
+
+    def run(self, audio_file_path: str, output_json_path: str, num_speakers: int = 2,
+            preloaded_audio: Optional[Tuple[np.ndarray, int]] = None,
+            decode_seconds: Optional[float] = None, source_name: Optional[str] = None,
+            link_audio: bool = True) -> Optional[Dict[str, Any]]:
         """
         Runs the full analysis pipeline on a single audio file.
 
@@ -85,29 +324,409 @@ class AnalysisPipeline:
             audio_file_path (str): Path to the input audio file
             output_json_path (str): Path where the JSON output will be saved
             num_speakers (int): Number of speakers to detect (default: 2)
+            preloaded_audio (Optional[Tuple[np.ndarray, int]]): Already decoded (audio, sample_rate),
+                                                                e.g. from the batch prefetcher.
+                                                                The audio may be (channels, samples)
+                                                                when split_channels is enabled.
+            decode_seconds (Optional[float]): Time spent decoding `preloaded_audio`, for the metrics
+            source_name (Optional[str]): Name recorded as the output's "file" (default: the
+                                         audio file's name), e.g. the client's name for an upload
+            link_audio (bool): Store `audio_file_path` in the corpus index so search hits link
+                               to the recording; False for temporary files deleted after the run
+
+        Returns:
+            Optional[Dict[str, Any]]: The saved output's top-level fields (file, metrics, ...) plus
+                                      segment_count, or None if the run failed. Segments are
+                                      written to the output file, not kept in memory.
         """
         print(f"\n{'='*60}")
         print(f"Starting pipeline for: {audio_file_path}")
         print(f"{'='*60}\n")
 
+        metrics = self._metrics = MetricsCollector()
+        if "emotion" in self._services:
+            self._services["emotion"].metrics = metrics
+        cache_stats = self.result_cache.stats() if self.result_cache is not None else None
+
         # 1. Load and resample audio
         try:
-            full_audio_array, sample_rate = au.load_and_resample_audio(audio_file_path)
+            if preloaded_audio is not None:
+                full_audio_array, sample_rate = preloaded_audio
+                if decode_seconds is not None:
+                    # Decoded ahead of time (prefetch), so this did not add to the run's wall time
+                    metrics.add("decode_prefetched", decode_seconds)
+            else:
+                with metrics.measure("decode"):
+                    full_audio_array, sample_rate = self._load_audio(audio_file_path)
+            channels = None
+            if full_audio_array.ndim == 2:
+                # Keep the channels for channel diarization; every other stage uses the mono mix
+                channels = full_audio_array
+                full_audio_array = au.downmix(channels)
             duration = len(full_audio_array) / sample_rate
             print(f"✓ Audio loaded successfully")
             print(f"  Duration: {duration:.2f} seconds")
             print(f"  Sample rate: {sample_rate} Hz")
-            print(f"  Total samples: {len(full_audio_array):,}\n")
+            print(f"  Total samples: {len(full_audio_array):,}")
+            if channels is not None:
+                print(f"  Channels: {channels.shape[0]}")
+            print()
         except Exception as e:
             print(f"✗ Error loading audio file: {e}")
             return
 
+        journal = SegmentJournal(journal_path_for(output_json_path))
+        source = self._source_identity(audio_file_path)
+        params = dict(self._run_params, num_speakers=num_speakers,
+                      extra_stages=[[stage.name, list(stage.outputs)] for stage in self.extra_stages])
+        resumed = self.resume and journal.load() and journal.matches(source, params)
+        if self.resume and not resumed and os.path.exists(journal.path):
+            print("⚠ Journal does not match this input or these settings, starting over\n")
+
+        if resumed:
+            # The plan (diarized and merged segments) comes from the journal: no re-diarization
+            header = journal.header
+            merged_segments = [{"speaker": speaker, "start_time": start, "end_time": end}
+                               for speaker, start, end in header["plan"]]
+            diarization_method = header["diarization_method"]
+            channel_stats = header.get("channel_diarization")
+            diarized_seconds = header["diarized_seconds"]
+            del channels
+            vad_result = None
+            if self.vad is not None:
+                with metrics.measure("vad"):
+                    vad_result = self.vad.process(full_audio_array, sample_rate)
+            print(f"✓ Resuming from journal: {len(journal.offsets)} of {len(merged_segments)} "
+                  f"segments already done\n")
+            journal.reopen()
+        else:
+            planned = self._plan_segments(full_audio_array, channels, sample_rate, duration, num_speakers, metrics)
+            del channels
+            if planned is None:
+                return
+            merged_segments, vad_result, diarization_method, channel_stats, diarized_seconds = planned
+            journal.start({
+                "source": source,
+                "params": params,
+                "diarization_method": diarization_method,
+                "channel_diarization": channel_stats,
+                "diarized_seconds": diarized_seconds,
+                "plan": [[seg["speaker"], seg["start_time"], seg["end_time"]] for seg in merged_segments],
+            })
+
+        file_name = source_name or os.path.basename(audio_file_path)
+        skipped_segments, skipped_seconds = 0, 0.0
+        # Segments are identified by content for the result cache, so renamed copies still hit
+        source_id = self._content_id(audio_file_path) if self.result_cache is not None else file_name
+
+        # 3. Iterate segments and process
+        stage_graph = StageGraph(self._segment_stages()) if self._segment_stages() else None
+        print(f"Step 2/4: Processing segments ({stage_graph.describe() if stage_graph else 'no segment stages'})...")
+        extra_fields = [field for stage in self.extra_stages for field in stage.outputs]
+        payloads = []
+        try:
+            for i, segment in enumerate(merged_segments):
+                start_sec = segment["start_time"]
+                end_sec = segment["end_time"]
+
+                # Segments without speech are kept in the output but skipped by every service
+                non_speech = vad_result is not None and \
+                    vad_result.speech_fraction(start_sec, end_sec) < self.vad.min_speech_fraction
+                if non_speech:
+                    skipped_segments += 1
+                    skipped_seconds += end_sec - start_sec
+                if journal.done(i):
+                    continue
+
+                segment_data = {
+                    "segment_id": i,
+                    "speaker": segment["speaker"],
+                    "start_time": round(start_sec, 3),
+                    "end_time": round(end_sec, 3),
+                    "duration": round(end_sec - start_sec, 3),
+                }
+                if non_speech:
+                    segment_data.update({
+                        "transcript": "",
+                        "predicted_emotion": None,
+                        "acoustic_features": None,
+                    })
+                    segment_data.update(dict.fromkeys(extra_fields))
+                    segment_data["skipped"] = "non_speech"
+                    journal.append(segment_data)
+                    continue
+
+                # IMPROVEMENT #8: Add padding for better context (0.1s before and after)
+                # a. Slice audio with padding (a zero-copy view onto the decoded buffer),
+                #    from the times written to the output so a rescore slices identically
+                audio_slice = padded_segment_view(
+                    full_audio_array, sample_rate, start_sec, end_sec, source_id=source_id
+                )
+
+                if audio_slice.size == 0:
+                    continue  # Skip empty slices
+
+                # Placeholders keep the output key order; the stages fill them in. Fields of
+                # stages that are not selected stay null (listed under "stages" in the output)
+                segment_data.update({
+                    "transcript": "" if "asr" in self.stages else None,
+                    "predicted_emotion": None,
+                    "acoustic_features": None
+                })
+                segment_data.update(dict.fromkeys(extra_fields))
+                payloads.append({"view": audio_slice, "segment": segment_data})
+
+            # b. Run analyses (ASR and acoustics, then emotion with both as context)
+            shared_audio = None
+            if self.acoustic_service is not None and self.acoustic_service.parallel and payloads:
+                # Queue every uncached segment on the acoustic pool up front; the acoustic stage collects results
+                shared_audio = self.acoustic_service.share(full_audio_array)
+                for payload in payloads:
+                    features = self.acoustic_service.lookup(payload["view"])
+                    if features is not MISS:
+                        payload["acoustic_cached"] = features
+                        continue
+                    payload["shared_audio"] = shared_audio
+                    payload["acoustic_future"] = self.acoustic_service.submit(shared_audio, payload["view"])
+            self.resources.apply_torch("emotion")
+            try:
+                for payload in tqdm(self._process_segments(payloads), total=len(payloads),
+                                    desc="Analyzing", unit="segment"):
+                    # Journaled as soon as it is done, so a crash loses at most the segments in flight
+                    journal.append(payload["segment"])
+                    payload.clear()
+            finally:
+                if shared_audio is not None:
+                    shared_audio.close()
+        finally:
+            journal.close()
+
+        summary_fields = [
+            ("file", file_name),
+            ("diarization_method", diarization_method),
+            ("segments", None),
+        ]
+        if self.stages != PIPELINE_STAGES:
+            summary_fields.append(("stages", {
+                "run": list(self.stages),
+                "skipped": [stage for stage in PIPELINE_STAGES if stage not in self.stages],
+            }))
+        if channel_stats is not None:
+            summary_fields.append(("channel_diarization", channel_stats))
+        if vad_result is not None:
+            voice_activity = self.vad.summary(vad_result, diarized_seconds, skipped_segments, skipped_seconds)
+            summary_fields.append(("voice_activity", voice_activity))
+            print(f"\n✓ Voice activity: skipped {voice_activity['skipped_fraction']:.1%} "
+                  f"of the audio ({skipped_segments} non-speech segments skipped downstream)")
+
+        metrics.count("segments_total", len(journal.offsets))
+        metrics.count("segments_analyzed", len(payloads))
+        metrics.count("segments_skipped_non_speech", skipped_segments)
+        if resumed:
+            metrics.count("segments_resumed", len(journal.offsets) - len(payloads))
+        run_metrics = metrics.summary(duration)
+        run_metrics["resources"] = self.resources.as_dict()
+        summary_fields.append(("metrics", run_metrics))
+
+        # 4. Save final JSON, streamed from the journal one segment at a time
+        print("\nStep 3/4: Saving results...")
+        final_output = {key: value for key, value in summary_fields if key != "segments"}
+        try:
+            written = write_streamed_json(
+                output_json_path, summary_fields, "segments",
+                journal.iter_segments(range(len(merged_segments))),
+                compact=self.compact_json
+            )
+            if self.columnar:
+                table_path = columnar_path(output_json_path, self.columnar)
+                write_columnar(table_path, self.columnar, journal.iter_segments(range(len(merged_segments))),
+                               final_output, key_order=[key for key, _ in summary_fields])
+            journal.remove()
+            print(f"✓ Analysis complete!")
+            print(f"  Output saved to: {output_json_path}")
+            if self.columnar:
+                print(f"  {self.columnar.capitalize()} copy saved to: {table_path}")
+            print(f"  Total segments processed: {written}")
+            final_output["segment_count"] = written
+        except Exception as e:
+            print(f"✗ Error saving JSON output: {e} (segment results are kept in {journal.path})")
+            final_output = None
+
+        if self.corpus_index is not None and final_output is not None:
+            try:
+                indexed = self.corpus_index.index_output(output_json_path,
+                                                       audio_path=audio_file_path if link_audio else None)
+                print(f"✓ Added {indexed} segments to the corpus index ({self.corpus_index.path})")
+            except Exception as e:
+                # The output is already saved; `scripts/corpus.py index` can add it later
+                print(f"⚠ Could not update the corpus index: {e}")
+
+        print("\n⏱ Stage timings:")
+        print_stage_table(final_output["metrics"] if final_output else metrics.summary(duration))
+        if self.metrics_textfile and final_output is not None:
+            try:
+                write_prometheus_textfile(final_output["metrics"], self.metrics_textfile,
+                                          labels={"file": final_output["file"]})
+            except OSError as e:
+                print(f"⚠ Could not write metrics textfile: {e}")
+
+        if self.audio_cache is not None:
+            print()
+            self.audio_cache.print_report()
+        if self.result_cache is not None:
+            print()
+            self.result_cache.print_report(since=cache_stats)
+
+        print(f"\n{'='*60}")
+        print("Pipeline execution completed")
+        print(f"{'='*60}\n")
+
+        return final_output
+
+    def run_batch(self, jobs: List[Tuple[str, str]], num_speakers: int = 2,
+                  prefetch_depth: int = 1) -> List[Dict[str, Any]]:
+        """
+        Runs the pipeline over several files, decoding upcoming files in the background.
+
+        While file N is analyzed, file N+1 (up to `prefetch_depth` files ahead) is decoded
+        on a background thread, so the models do not sit idle during decoding.
+
+        Args:
+            jobs (List[Tuple[str, str]]): (audio_file_path, output_json_path) pairs in order
+            num_speakers (int): Number of speakers to detect (default: 2)
+            prefetch_depth (int): Files decoded ahead of the current one; 0 disables prefetching
+
+        Returns:
+            List[Dict[str, Any]]: Per-file timing records with keys file, ok, audio_seconds,
+                                  decode_seconds, decode_wait_seconds, analysis_seconds
+        """
+        timings = []
+        if prefetch_depth > 0:
+            prefetcher = AudioPrefetcher([path for path, _ in jobs], self._load_audio, depth=prefetch_depth)
+            decoded = iter(prefetcher)
+        else:
+            prefetcher, decoded = None, None
+
+        try:
+            for audio_file_path, output_json_path in jobs:
+                wait_start = time.perf_counter()
+                if decoded is not None:
+                    item = next(decoded)
+                    decode_wait = time.perf_counter() - wait_start
+                    decode_seconds = item.decode_seconds
+                    error = item.error
+                    preloaded = (item.audio, item.sample_rate) if error is None else None
+                else:
+                    try:
+                        preloaded, error = self._load_audio(audio_file_path), None
+                    except Exception as e:
+                        preloaded, error = None, e
+                    decode_wait = decode_seconds = time.perf_counter() - wait_start
+
+                record = {
+                    "file": audio_file_path,
+                    "ok": False,
+                    "audio_seconds": preloaded[0].shape[-1] / preloaded[1] if preloaded else 0.0,
+                    "decode_seconds": decode_seconds,
+                    "decode_wait_seconds": decode_wait,
+                    "analysis_seconds": 0.0,
+                }
+
+                if error is not None:
+                    print(f"✗ Error loading audio file {audio_file_path}: {error}")
+                else:
+                    analysis_start = time.perf_counter()
+                    result = self.run(audio_file_path, output_json_path, num_speakers,
+                                      preloaded_audio=preloaded, decode_seconds=decode_seconds)
+                    record["analysis_seconds"] = time.perf_counter() - analysis_start
+                    record["ok"] = result is not None
+                del preloaded
+
+                overlapped = max(0.0, record["decode_seconds"] - record["decode_wait_seconds"])
+                print(f"⏱ {os.path.basename(audio_file_path)}: decode {record['decode_seconds']:.2f}s "
+                      f"(waited {record['decode_wait_seconds']:.2f}s, {overlapped:.2f}s overlapped "
+                      f"with analysis) | analysis {record['analysis_seconds']:.2f}s")
+                timings.append(record)
+        finally:
+            if prefetcher is not None:
+                prefetcher.close()
+
+        return timings
+
+    def _plan_segments(self, full_audio_array: np.ndarray, channels: Optional[np.ndarray],
+                       sample_rate: int, duration: float, num_speakers: int, metrics: MetricsCollector):
+        """
+        Runs VAD and diarization and merges the speaker segments.
+
+        Without the 'diarize' stage (and no channel-energy result), segments are the VAD
+        speech regions, or fixed windows, with no speaker label.
+
+        Returns:
+            (merged_segments, vad_result, diarization_method, channel_stats, diarized_seconds),
+            or None if no speaker segments were found
+        """
+        # Channel-separated recordings: speaker turns follow directly from channel energy
+        speaker_segments, channel_stats = None, None
+        if self.channel_diarizer is not None and channels is not None:
+            with metrics.measure("channel_diarization"):
+                speaker_segments = self.channel_diarizer.process(channels, sample_rate)
+            channel_stats = dict(self.channel_diarizer.last_stats)
+            if speaker_segments:
+                print(f"✓ Channel-separated recording (correlation {channel_stats['correlation']:.2f}, "
+                      f"separation {channel_stats['separation']:.0%}): skipping neural diarization\n")
+            else:
+                speaker_segments = None
+                fallback = "pyannote" if "diarize" in self.stages else "unlabelled segments"
+                print(f"⚠ Channel diarization declined ({channel_stats['reason']}), "
+                      f"falling back to {fallback}\n")
+
+        # Voice-activity pre-pass: one vectorized pass over the whole buffer
+        vad_result, time_map = None, None
+        diarization_audio = full_audio_array
+        if self.vad is not None:
+            with metrics.measure("vad"):
+                vad_result = self.vad.process(full_audio_array, sample_rate)
+        if vad_result is not None and speaker_segments is None and "diarize" in self.stages:
+            with metrics.measure("vad"):
+                compacted, time_map = self.vad.compact(full_audio_array, vad_result)
+            if compacted.size > 0:
+                diarization_audio = compacted
+                print(f"✓ Voice activity: {vad_result.speech_seconds:.1f}s speech detected, "
+                      f"diarizing {len(diarization_audio) / sample_rate:.1f}s of {duration:.1f}s\n")
+            else:
+                time_map = None
+                print("⚠ Voice activity: no speech detected, diarizing the full recording\n")
+
         # 2. Get speaker segments
         print("Step 1/4: Running Speaker Diarization...")
-        speaker_segments = self.diarization_service.process(audio_file_path, num_speakers)
+        diarization_method = "channel_energy" if speaker_segments is not None else "pyannote"
+        if speaker_segments is None and "diarize" not in self.stages:
+            # Diarization not selected: speech regions (or fixed windows) without speaker labels
+            if vad_result is not None and vad_result.speech_seconds > 0:
+                diarization_method = "voice_activity"
+                regions = vad_result.speech_regions()
+            else:
+                diarization_method = "fixed_windows"
+                starts = np.arange(0.0, duration, UNDIARIZED_WINDOW_SECONDS)
+                regions = [(start, min(duration, start + UNDIARIZED_WINDOW_SECONDS)) for start in starts]
+            speaker_segments = [{"start_time": float(start), "end_time": float(end), "speaker": None}
+                                for start, end in regions]
+            print(f"✓ Diarization not selected: {len(speaker_segments)} unlabelled segments "
+                  f"({diarization_method})")
+        elif speaker_segments is None:
+            # Diarization runs alone, so it gets the whole budget (emotion had a share of it)
+            self.resources.apply_torch("diarize")
+            # Reuse the decoded 16kHz buffer instead of decoding the file a second time
+            with metrics.measure("diarization"):
+                speaker_segments = self.diarization_service.process(
+                    diarization_audio, num_speakers, sample_rate=sample_rate
+                )
         if not speaker_segments:
             print("✗ No speaker segments found. Exiting.")
-            return
+            return None
+
+        if time_map is not None and not time_map.is_identity:
+            speaker_segments = self._remap_segments(speaker_segments, time_map)
 
         print(f"✓ Found {len(speaker_segments)} speaker segments")
 
@@ -115,70 +734,93 @@ class AnalysisPipeline:
         merged_segments = self._merge_segments(speaker_segments)
         print(f"✓ Merged to {len(merged_segments)} segments (filtered & merged)\n")
 
-        final_output = {
-            "file": os.path.basename(audio_file_path),
-            "segments": []
-        }
-
-        # 3. Iterate segments and process
-        print("Step 2/4: Processing segments...")
-        for i, segment in enumerate(tqdm(merged_segments, desc="Analyzing", unit="segment")):
-            start_sec = segment["start_time"]
-            end_sec = segment["end_time"]
+        diarized_seconds = len(diarization_audio) / sample_rate
+        return merged_segments, vad_result, diarization_method, channel_stats, diarized_seconds
 
-            # IMPROVEMENT #8: Add padding for better context (0.1s before and after)
-            padding = 0.1
-            padded_start = max(0, start_sec - padding)
-            padded_end = min(duration, end_sec + padding)
+    @staticmethod
+    def _source_identity(audio_file_path: str) -> Dict[str, Any]:
+        """Cheap identity of the input file, used to validate a journal before resuming."""
+        stat = os.stat(audio_file_path)
+        return {"name": os.path.basename(audio_file_path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
 
-            # a. Slice audio with padding
-            audio_slice = au.slice_audio(full_audio_array, sample_rate, padded_start, padded_end)
-
-            if audio_slice.size == 0:
-                continue  # Skip empty slices
+    def _content_id(self, audio_file_path: str) -> str:
+        """
+        Result-cache identity of the decoded recording: the file's content hash plus
+        everything that changes the decoded samples (decoder backend, channel downmix).
+        """
+        return content_id(audio_file_path, self.decoder_backend, downmix=self.channel_diarizer is not None)
 
-            # b. Run analyses (ASR first, then pass transcript to emotion service)
-            transcript = self.asr_service.process(audio_slice)
+    def _segment_stages(self) -> List[Stage]:
+        """The selected built-in segment stages followed by the plugged-in ones."""
+        stage_fns = {"asr": self._asr_stage, "acoustic": self._acoustic_stage, "emotion": self._emotion_stage}
+        workers = self.stage_workers or {}
+        stages = [segment_stage(name, stage_fns[name], workers.get(name, 1)) for name in SEGMENT_STAGES
+                  if name in self.stages]
+        return stages + self.extra_stages
 
-            # Get acoustic features first
-            acoustics = self.acoustic_service.process(audio_slice)
+    def _process_segments(self, payloads: List[Dict[str, Any]]):
+        """
+        Runs the segment stages for every payload, yielding them in order.
 
-            # Pass transcript AND acoustic features to emotion service for hybrid analysis
-            emotion = self.emotion_service.process(
-                audio_slice,
-                transcript=transcript if transcript else "",
-                acoustic_features=acoustics
+        With `stage_workers` set the stage graph runs on worker threads (independent
+        stages of one segment in parallel, different segments in different stages);
+        otherwise each segment goes through all stages, in graph order, before the next one starts.
+        """
+        stages = self._segment_stages()
+        if self.stage_workers is None or not stages:
+            order = StageGraph(stages).order if stages else []
+            for payload in payloads:
+                for stage in order:
+                    stage.fn(payload)
+                yield payload
+        else:
+            yield from StageExecutor(stages).run(payloads)
+
+    def _asr_stage(self, payload: Dict[str, Any]) -> None:
+        with measure(self._metrics, "asr"):
+            payload["segment"]["transcript"] = self.asr_service.process(payload["view"])
+
+    def _acoustic_stage(self, payload: Dict[str, Any]) -> None:
+        with measure(self._metrics, "acoustic"):
+            if "acoustic_cached" in payload:
+                features = payload["acoustic_cached"]
+            elif "acoustic_future" in payload:
+                features = self.acoustic_service.result(
+                    payload["acoustic_future"], payload["shared_audio"], payload["view"]
+                )
+            else:
+                features = self.acoustic_service.process(payload["view"])
+        payload["segment"]["acoustic_features"] = features
+
+    def _emotion_stage(self, payload: Dict[str, Any]) -> None:
+        # Pass transcript AND acoustic features to emotion service for hybrid analysis
+        segment = payload["segment"]
+        with measure(self._metrics, "emotion"):
+            segment["predicted_emotion"] = self.emotion_service.process(
+                payload["view"],
+                transcript=segment["transcript"] or "",
+                acoustic_features=segment["acoustic_features"]
             )
 
-            # c. Collect data into the specified schema
-            segment_data = {
-                "segment_id": i,
-                "speaker": segment["speaker"],
-                "start_time": round(start_sec, 3),
-                "end_time": round(end_sec, 3),
-                "duration": round(end_sec - start_sec, 3),
-                "transcript": transcript,
-                "predicted_emotion": emotion,
-                "acoustic_features": acoustics
-            }
-            final_output["segments"].append(segment_data)
-
-        # 4. Save final JSON
-        print("\nStep 3/4: Saving results...")
-        try:
-            with open(output_json_path, 'w', encoding='utf-8') as f:
-                json.dump(final_output, f, indent=4, ensure_ascii=False)
-            print(f"✓ Analysis complete!")
-            print(f"  Output saved to: {output_json_path}")
-            print(f"  Total segments processed: {len(final_output['segments'])}")
-        except Exception as e:
-            print(f"✗ Error saving JSON output: {e}")
-
-        print(f"\n{'='*60}")
-        print("Pipeline execution completed")
-        print(f"{'='*60}\n")
+    def _load_audio(self, audio_file_path: str) -> Tuple[np.ndarray, int]:
+        """Decodes a file with the configured cache and decoder backend."""
+        return au.load_and_resample_audio(
+            audio_file_path, cache=self.audio_cache, backend=self.decoder_backend,
+            keep_channels=self.channel_diarizer is not None
+        )
 
-    def _merge_segments(self, segments, max_gap: float = 1.0, min_duration: float = 0.3, max_duration: float = 30.0):
+    @staticmethod
+    def _remap_segments(segments: List[Dict[str, Any]], time_map: TimeMap) -> List[Dict[str, Any]]:
+        """Maps diarization segments from the VAD-compacted buffer back to original time."""
+        remapped = []
+        for segment in segments:
+            for start, end in time_map.map_segment(segment["start_time"], segment["end_time"]):
+                remapped.append({"speaker": segment["speaker"], "start_time": start, "end_time": end})
+        return remapped
+
+    def _merge_segments(self, segments, max_gap: float = MERGE_MAX_GAP_SECONDS,
+                        min_duration: float = MERGE_MIN_DURATION_SECONDS,
+                        max_duration: float = MERGE_MAX_DURATION_SECONDS):
         """
         Merge adjacent segments from the same speaker and filter out too-short segments.
 
@@ -0,0 +1,249 @@
+"""
+Decoded Audio Cache Module
+Persists decoded 16kHz float32 PCM on disk so repeat runs skip decoding entirely.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+import numpy as np
+from typing import Dict, Any, Optional
+
+from .profiling import format_bytes
+
+
+DEFAULT_CACHE_DIR = os.path.join(".", "data", "cache", "audio")
+DEFAULT_MAX_BYTES = 5 * 1024 ** 3  # 5 GB
+
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+# (path, size, mtime_ns) -> digest, so the decode cache and the result cache hash a file only once
+_hash_memo: Dict[tuple, str] = {}
+
+
+def file_content_hash(file_path: str) -> str:
+    """
+    Computes a SHA-256 digest of a file's bytes.
+
+    Hashing the content (rather than path or mtime) means renamed or copied
+    recordings still hit the cache, and edited recordings never do.
+
+    Args:
+        file_path (str): Path to the file to hash
+
+    Returns:
+        str: Hex digest of the file content
+    """
+    stat = os.stat(file_path)
+    memo_key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    if memo_key in _hash_memo:
+        return _hash_memo[memo_key]
+
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    _hash_memo[memo_key] = digest.hexdigest()
+    return _hash_memo[memo_key]
+
+
+class AudioCache:
+    """
+    Size-bounded, content-addressed on-disk cache of decoded audio arrays.
+
+    Entries are stored as `.npy` files named after the source content hash and are
+    opened with a copy-on-write memory map, so cached multi-hour recordings are
+    paged in lazily instead of being read into RAM up front. The least recently
+    used entries are evicted once the cache grows beyond `max_bytes`.
+    """
+
+    STATS_FILENAME = "stats.json"
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initializes the cache, creating the cache directory if needed.
+
+        Args:
+            cache_dir (str): Directory that holds the cached `.npy` files
+            max_bytes (int): Upper bound on the total size of cached entries
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_bytes)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # Counters for this process only; lifetime totals live in stats.json
+        self.session_stats = {"hits": 0, "misses": 0, "bytes_saved": 0, "evictions": 0}
+
+    def key_for(self, file_path: str, target_sample_rate: int, variant: str = "") -> str:
+        """
+        Builds the cache key for a source file.
+
+        Args:
+            file_path (str): Path to the source (compressed) audio file
+            target_sample_rate (int): Sample rate of the decoded audio
+            variant (str): Extra discriminator, e.g. decoder backend or channel layout
+
+        Returns:
+            str: Cache key (also used as the file stem)
+        """
+        key = f"{file_content_hash(file_path)}_{int(target_sample_rate)}"
+        return f"{key}_{variant}" if variant else key
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        Opens a cached entry as a memory map.
+
+        Args:
+            key (str): Key returned by `key_for`
+
+        Returns:
+            Optional[np.ndarray]: The memory-mapped array, or None on a cache miss
+        """
+        path = self._entry_path(key)
+        try:
+            # 'c' (copy-on-write) keeps the mapping writable for torch.from_numpy
+            # while never modifying the cached file
+            audio_array = np.load(path, mmap_mode="c")
+        except (OSError, ValueError):
+            self._record(misses=1)
+            return None
+
+        try:
+            # Touch the entry so eviction treats it as recently used
+            os.utime(path, None)
+        except OSError:
+            pass
+
+        self._record(hits=1, bytes_saved=int(audio_array.nbytes))
+        return audio_array
+
+    def put(self, key: str, audio_array: np.ndarray) -> None:
+        """
+        Stores a decoded array and evicts old entries if the cache is over budget.
+
+        Args:
+            key (str): Key returned by `key_for`
+            audio_array (np.ndarray): Decoded audio to persist
+        """
+        if audio_array.nbytes > self.max_bytes:
+            return  # Would evict everything else and still not fit
+
+        path = self._entry_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                np.save(f, audio_array, allow_pickle=False)
+            # Eviction counts file sizes, which include the .npy header
+            if os.path.getsize(tmp_path) > self.max_bytes:
+                return
+            # Atomic rename: concurrent readers never observe a half-written entry
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Removes least recently used entries until the cache fits in `max_bytes`.
+
+        Returns:
+            int: Number of entries evicted
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".npy"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                # Still memory-mapped by another process (Windows) - try next time
+                continue
+            total -= size
+            evicted += 1
+
+        if evicted:
+            self._record(evictions=evicted)
+        return evicted
+
+    def size_bytes(self) -> int:
+        """Returns the total size of all cached entries in bytes."""
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".npy"):
+                try:
+                    total += os.path.getsize(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+        return total
+
+    def lifetime_stats(self) -> Dict[str, Any]:
+        """Returns the cumulative statistics persisted across runs."""
+        try:
+            with open(self._stats_path(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"hits": 0, "misses": 0, "bytes_saved": 0, "evictions": 0}
+
+    def clear(self) -> None:
+        """Deletes every cached entry and resets the lifetime statistics."""
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".npy") or name == self.STATS_FILENAME:
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+    def print_report(self) -> None:
+        """Prints session and lifetime hit/miss/bytes-saved statistics."""
+        lifetime = self.lifetime_stats()
+        print("Audio cache:")
+        for label, stats in (("this run", self.session_stats), ("lifetime", lifetime)):
+            lookups = stats["hits"] + stats["misses"]
+            hit_rate = (stats["hits"] / lookups * 100) if lookups else 0.0
+            print(f"  {label:<9} hits {stats['hits']}, misses {stats['misses']} "
+                  f"({hit_rate:.0f}% hit rate), decoded bytes saved "
+                  f"{format_bytes(stats['bytes_saved'])}, evictions {stats['evictions']}")
+        print(f"  size      {format_bytes(self.size_bytes())} / {format_bytes(self.max_bytes)} "
+              f"in {self.cache_dir}")
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.npy")
+
+    def _stats_path(self) -> str:
+        return os.path.join(self.cache_dir, self.STATS_FILENAME)
+
+    def _record(self, **deltas: int) -> None:
+        """Updates session counters and folds the same deltas into stats.json."""
+        with self._lock:
+            for name, delta in deltas.items():
+                self.session_stats[name] += delta
+
+            lifetime = self.lifetime_stats()
+            for name, delta in deltas.items():
+                lifetime[name] = lifetime.get(name, 0) + delta
+            lifetime["updated"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+
+            tmp_path = f"{self._stats_path()}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(lifetime, f, indent=4)
+                os.replace(tmp_path, self._stats_path())
+            except OSError:
+                pass
@@ -0,0 +1,180 @@
+"""
+Audio Segment Module
+Defines the zero-copy segment view that every service accepts.
+
+The pipeline decodes each recording exactly once into a contiguous float32 buffer.
+Segments are windows onto that buffer; services read the samples in place and only
+copy where a library strictly requires its own memory (e.g. Praat wants float64).
+"""
+
+import numpy as np
+from typing import Optional, Union
+
+# Context added before and after every diarized segment before analysis
+SEGMENT_PADDING_SECONDS = 0.1
+
+
+class AudioSegmentView:
+    """
+    A zero-copy window [start_sample, end_sample) onto a decoded recording.
+
+    Attributes:
+        buffer (np.ndarray): The full 1D float32 recording (shared, never copied)
+        sample_rate (int): Sample rate of the buffer in Hz
+        start_sample (int): First sample of the segment (inclusive)
+        end_sample (int): Last sample of the segment (exclusive)
+        source_id (Optional[str]): Identifier of the recording (e.g. its content hash)
+    """
+
+    __slots__ = ("buffer", "sample_rate", "start_sample", "end_sample", "source_id")
+
+    def __init__(self, buffer: np.ndarray, sample_rate: int, start_sample: int,
+                 end_sample: int, source_id: Optional[str] = None):
+        self.buffer = buffer
+        self.sample_rate = sample_rate
+        self.start_sample = start_sample
+        self.end_sample = end_sample
+        self.source_id = source_id
+
+    @property
+    def samples(self) -> np.ndarray:
+        """The segment samples as a NumPy view (no copy)."""
+        return self.buffer[self.start_sample:self.end_sample]
+
+    @property
+    def size(self) -> int:
+        """Number of samples in the segment."""
+        return self.end_sample - self.start_sample
+
+    @property
+    def start_time(self) -> float:
+        """Segment start in seconds."""
+        return self.start_sample / self.sample_rate
+
+    @property
+    def end_time(self) -> float:
+        """Segment end in seconds."""
+        return self.end_sample / self.sample_rate
+
+    @property
+    def duration(self) -> float:
+        """Segment duration in seconds."""
+        return self.size / self.sample_rate
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __array__(self, dtype=None, copy=None):
+        # Lets np.asarray(view) work for callers that expect a plain array
+        samples = self.samples
+        if dtype is not None and np.dtype(dtype) != samples.dtype:
+            return samples.astype(dtype)
+        return samples
+
+    def __repr__(self) -> str:
+        return (f"AudioSegmentView({self.start_time:.3f}s-{self.end_time:.3f}s, "
+                f"{self.size} samples @ {self.sample_rate} Hz)")
+
+
+AudioInput = Union[np.ndarray, AudioSegmentView]
+
+
+def segment_view(full_audio_array: np.ndarray, sample_rate: int,
+                 start_time_sec: float, end_time_sec: float,
+                 source_id: Optional[str] = None) -> AudioSegmentView:
+    """
+    Creates a segment view from time boundaries (same clamping rules as `slice_audio`).
+
+    Args:
+        full_audio_array (np.ndarray): The full 1D audio array
+        sample_rate (int): The sample rate of the audio in Hz
+        start_time_sec (float): Start time of the segment in seconds
+        end_time_sec (float): End time of the segment in seconds
+        source_id (Optional[str]): Identifier of the recording
+
+    Returns:
+        AudioSegmentView: The view (size 0 if the window is invalid)
+    """
+    start_sample = max(0, int(start_time_sec * sample_rate))
+    end_sample = min(len(full_audio_array), int(end_time_sec * sample_rate))
+    if start_sample >= end_sample:
+        end_sample = start_sample = min(start_sample, len(full_audio_array))
+    return AudioSegmentView(full_audio_array, sample_rate, start_sample, end_sample, source_id)
+
+
+def padded_segment_view(full_audio_array: np.ndarray, sample_rate: int,
+                        start_time_sec: float, end_time_sec: float,
+                        source_id: Optional[str] = None) -> AudioSegmentView:
+    """
+    The window the segment stages analyze for one output segment.
+
+    The bounds are the segment's times as written to the output (rounded to the
+    millisecond) plus `SEGMENT_PADDING_SECONDS` on both sides, clamped to the recording.
+    Slicing from the written times lets a rescore of the output rebuild the exact same
+    samples, and so the same result-cache keys.
+
+    Args:
+        full_audio_array (np.ndarray): The full 1D audio array
+        sample_rate (int): The sample rate of the audio in Hz
+        start_time_sec (float): Segment start in seconds
+        end_time_sec (float): Segment end in seconds
+        source_id (Optional[str]): Identifier of the recording
+
+    Returns:
+        AudioSegmentView: The padded view (size 0 if the window is invalid)
+    """
+    duration = len(full_audio_array) / sample_rate
+    padded_start = max(0, round(start_time_sec, 3) - SEGMENT_PADDING_SECONDS)
+    padded_end = min(duration, round(end_time_sec, 3) + SEGMENT_PADDING_SECONDS)
+    return segment_view(full_audio_array, sample_rate, padded_start, padded_end, source_id=source_id)
+
+
+def as_float32_samples(audio: AudioInput) -> np.ndarray:
+    """
+    Returns the samples of a view or array as a contiguous float32 array.
+
+    This is a no-op for audio produced by `load_and_resample_audio`; a copy is made
+    only for foreign arrays that are not already contiguous float32.
+
+    Args:
+        audio (AudioInput): An AudioSegmentView or a 1D NumPy array
+
+    Returns:
+        np.ndarray: Contiguous float32 samples (a view whenever possible)
+    """
+    samples = audio.samples if isinstance(audio, AudioSegmentView) else audio
+    if samples.dtype == np.float32 and samples.flags.c_contiguous:
+        return samples
+    return np.ascontiguousarray(samples, dtype=np.float32)
+
+
+def peak_amplitude(samples: np.ndarray) -> float:
+    """
+    Returns max(|x|) without allocating the temporary that np.abs would create.
+
+    Args:
+        samples (np.ndarray): 1D audio samples
+
+    Returns:
+        float: Peak absolute amplitude (0.0 for empty input)
+    """
+    if samples.size == 0:
+        return 0.0
+    return float(max(samples.max(), -samples.min()))
+
+
+def zero_mean_unit_variance(samples: np.ndarray) -> np.ndarray:
+    """
+    Normalizes samples exactly like HuggingFace Wav2Vec2FeatureExtractor(do_normalize=True).
+
+    Uses a single output allocation (subtract, then divide in place).
+
+    Args:
+        samples (np.ndarray): 1D float32 samples
+
+    Returns:
+        np.ndarray: New normalized float32 array
+    """
+    normalized = samples - samples.mean()
+    normalized /= np.sqrt(samples.var() + 1e-7)
+    return normalized
@@ -3,13 +3,29 @@ Audio Utilities Module
 Provides stateless helper functions for audio processing.
 """
 
-import torchaudio
-import torch
+import os
+import shutil
+import subprocess
+import functools
 import numpy as np
-from typing import Tuple
+from typing import Tuple, Optional, BinaryIO, TYPE_CHECKING
 
+if TYPE_CHECKING:
+    import torchaudio
+    from .audio_cache import AudioCache
 
-def load_and_resample_audio(file_path: str, target_sample_rate: int = 16000) -> Tuple[np.ndarray, int]:
+
+# Decoder backends selectable from the CLI (--decoder)
+DECODER_BACKENDS = ("torchaudio", "ffmpeg")
+
+# Samples read from the ffmpeg pipe per chunk (~4 seconds at 16kHz)
+FFMPEG_CHUNK_SAMPLES = 16000 * 4
+
+
+def load_and_resample_audio(file_path: str, target_sample_rate: int = 16000,
+                            cache: Optional["AudioCache"] = None,
+                            backend: str = "torchaudio",
+                            keep_channels: bool = False) -> Tuple[np.ndarray, int]:
     """
     Robustly loads any audio file and resamples to target sample rate.
 
@@ -19,34 +35,58 @@ def load_and_resample_audio(file_path: str, target_sample_rate: int = 16000) ->
     Args:
         file_path (str): Path to the audio file to load
         target_sample_rate (int): Target sample rate in Hz (default: 16000)
+        cache (Optional[AudioCache]): Decoded-audio cache. On a hit the decode is skipped
+                                      and the array is a lazily paged memory map.
+        backend (str): 'torchaudio' (default) decodes the whole file at its native rate and
+                       resamples in memory; 'ffmpeg' streams mono 16kHz frames out of an
+                       ffmpeg pipe so peak memory stays close to the output size.
+        keep_channels (bool): Skip the downmix and return every channel (for channel-based
+                              diarization of dual-mic recordings)
 
     Returns:
         Tuple[np.ndarray, int]: A tuple containing:
-            - audio: 1D NumPy array of the audio signal
+            - audio: 1D contiguous float32 NumPy array of the audio signal, or a
+                     (channels, samples) float32 array if keep_channels is set
             - target_sample_rate: The sample rate of the returned audio
 
     Raises:
         FileNotFoundError: If the audio file doesn't exist
+        ValueError: If the backend is unknown
         RuntimeError: If the audio file is corrupted or cannot be loaded
     """
+    if backend not in DECODER_BACKENDS:
+        raise ValueError(f"Unknown decoder backend '{backend}'. Choose from {DECODER_BACKENDS}.")
+
     try:
-        # Load the audio file
-        waveform, original_sample_rate = torchaudio.load(file_path)
+        cache_key = None
+        if cache is not None:
+            # The backends resample differently, so each keeps its own entries
+            variant = "" if backend == "torchaudio" else backend
+            if keep_channels:
+                variant = f"{variant}_channels" if variant else "channels"
+            cache_key = _cache_lookup_key(cache, file_path, target_sample_rate, variant)
+            cached = cache.get(cache_key) if cache_key else None
+            if cached is not None:
+                return cached, target_sample_rate
 
-        # Convert to Mono: If stereo (shape [2, N]), average the channels
-        if waveform.shape[0] > 1:
-            waveform = torch.mean(waveform, dim=0, keepdim=True)
+        if backend == "ffmpeg":
+            audio_array = _decode_with_ffmpeg(file_path, target_sample_rate, keep_channels=keep_channels)
+        else:
+            audio_array = _decode_with_torchaudio(file_path, target_sample_rate, keep_channels=keep_channels)
 
-        # Resample if necessary
-        if original_sample_rate != target_sample_rate:
-            resampler = torchaudio.transforms.Resample(
-                orig_freq=original_sample_rate,
-                new_freq=target_sample_rate
-            )
-            waveform = resampler(waveform)
+        if keep_channels:
+            # Channel planes may be a strided view of interleaved PCM; they are only read
+            audio_array = audio_array.astype(np.float32, copy=False)
+        else:
+            # Contract for all services: one contiguous float32 buffer (no-op for both backends)
+            audio_array = np.ascontiguousarray(audio_array, dtype=np.float32)
 
-        # Convert to 1D NumPy array
-        audio_array = waveform.squeeze().numpy()
+        if cache_key is not None:
+            try:
+                cache.put(cache_key, audio_array)
+            except OSError as e:
+                # A full or read-only cache disk must never fail the analysis
+                print(f"⚠ Could not write decoded audio to cache: {e}")
 
         return audio_array, target_sample_rate
 
@@ -56,6 +96,188 @@ def load_and_resample_audio(file_path: str, target_sample_rate: int = 16000) ->
         raise RuntimeError(f"Error loading audio file {file_path}: {str(e)}")
 
 
+def downmix(channels: np.ndarray) -> np.ndarray:
+    """Mono mix of a (channels, samples) array as one contiguous float32 buffer."""
+    return np.ascontiguousarray(channels.mean(axis=0, dtype=np.float32))
+
+
+def _decode_with_torchaudio(file_path: str, target_sample_rate: int,
+                            keep_channels: bool = False) -> np.ndarray:
+    """Decodes the whole file with torchaudio, downmixes and resamples in memory."""
+    # Imported here so the ffmpeg backend (and every CLI's --help) never loads torch
+    import torch
+    import torchaudio
+
+    # Load the audio file
+    waveform, original_sample_rate = torchaudio.load(file_path)
+
+    # Convert to Mono: If stereo (shape [2, N]), average the channels
+    if waveform.shape[0] > 1 and not keep_channels:
+        waveform = torch.mean(waveform, dim=0, keepdim=True)
+
+    # Resample if necessary
+    if original_sample_rate != target_sample_rate:
+        waveform = _get_resampler(original_sample_rate, target_sample_rate)(waveform)
+
+    if keep_channels:
+        # (channels, samples) NumPy array
+        return waveform.numpy()
+
+    # Convert to 1D NumPy array
+    return waveform.squeeze().numpy()
+
+
+@functools.lru_cache(maxsize=8)
+def _get_resampler(orig_freq: int, new_freq: int) -> "torchaudio.transforms.Resample":
+    """Returns a cached Resample transform (its sinc kernel is built only once per rate pair)."""
+    import torchaudio
+    return torchaudio.transforms.Resample(orig_freq=orig_freq, new_freq=new_freq)
+
+
+def _decode_with_ffmpeg(file_path: str, target_sample_rate: int,
+                        chunk_samples: int = FFMPEG_CHUNK_SAMPLES,
+                        keep_channels: bool = False) -> np.ndarray:
+    """
+    Streams mono float32 PCM at the target rate out of an ffmpeg pipe.
+
+    ffmpeg performs the downmix and resampling while decoding, so the native-rate,
+    multi-channel waveform never exists in Python memory. The output buffer is
+    preallocated from the probed duration and filled in place chunk by chunk.
+    With keep_channels, all channels are streamed interleaved and returned as a
+    (channels, samples) strided view of that buffer.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(file_path)
+
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise RuntimeError("ffmpeg decoder backend requested but 'ffmpeg' was not found on PATH")
+
+    channels = (_probe_channels(file_path) or 1) if keep_channels else 1
+    duration = _probe_duration(file_path)
+    # One second of slack absorbs resampler tail and container duration rounding
+    expected_samples = (int(duration * target_sample_rate) + target_sample_rate) * channels if duration else None
+
+    command = [
+        ffmpeg, "-nostdin", "-v", "error",
+        "-i", file_path,
+        "-vn", "-ac", str(channels), "-ar", str(target_sample_rate),
+        "-f", "f32le", "-acodec", "pcm_f32le", "pipe:1"
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0)
+    try:
+        audio_array = read_pcm_stream(process.stdout, expected_samples, chunk_samples)
+        stderr = process.stderr.read()
+    finally:
+        process.stdout.close()
+        process.stderr.close()
+        return_code = process.wait()
+
+    if return_code != 0:
+        raise RuntimeError(f"ffmpeg exited with code {return_code}: "
+                           f"{stderr.decode('utf-8', 'replace').strip()}")
+
+    if keep_channels:
+        # Interleaved frames -> (channels, samples) view without copying
+        usable = (len(audio_array) // channels) * channels
+        return audio_array[:usable].reshape(-1, channels).T
+    return audio_array
+
+
+def read_pcm_stream(stream: BinaryIO, expected_samples: Optional[int] = None,
+                    chunk_samples: int = FFMPEG_CHUNK_SAMPLES) -> np.ndarray:
+    """
+    Reads raw little-endian float32 PCM from a binary stream into one array.
+
+    Data is read with `readinto` directly into the output buffer, so no per-chunk
+    intermediate arrays are created. The buffer only grows if `expected_samples`
+    underestimates the stream length; a view of the filled part is returned, copied
+    only when more than a quarter of the buffer would otherwise stay allocated unused.
+
+    Args:
+        stream (BinaryIO): Stream supporting `readinto` (e.g. a subprocess pipe)
+        expected_samples (Optional[int]): Size hint for the preallocated buffer
+        chunk_samples (int): Samples requested per read
+
+    Returns:
+        np.ndarray: 1D float32 array of the decoded samples
+    """
+    itemsize = np.dtype(np.float32).itemsize
+    chunk_bytes = chunk_samples * itemsize
+    # One spare sample, so an exact hint detects the end of the stream without growing
+    capacity = expected_samples + 1 if expected_samples else chunk_samples * 16
+    buffer = np.empty(capacity, dtype="<f4")
+    raw = buffer.view(np.uint8)
+    filled = 0
+
+    while True:
+        if filled == raw.size:
+            # Only reached when the probe was missing or short: grow geometrically
+            growth = 1.25 if expected_samples else 2.0
+            new_capacity = max(int(buffer.size * growth), buffer.size + chunk_samples)
+            grown = np.empty(new_capacity, dtype="<f4")
+            grown.view(np.uint8)[:filled] = raw[:filled]
+            buffer, raw = grown, grown.view(np.uint8)
+
+        # The last read of a buffer may be shorter than a chunk (the slice is clamped)
+        read = stream.readinto(memoryview(raw[filled:filled + chunk_bytes]))
+        if not read:
+            break
+        filled += read
+
+    # Drop the unused tail (and a trailing partial sample). A view is enough when the
+    # size hint was close; a large tail (missing or overestimated hint) is released by a copy
+    num_samples = filled // itemsize
+    samples = buffer[:num_samples]
+    if buffer.size - num_samples > num_samples // 4:
+        samples = samples.copy()
+    return samples.astype(np.float32, copy=False)
+
+
+def _probe_duration(file_path: str) -> Optional[float]:
+    """Returns the container duration in seconds using ffprobe, or None if unavailable."""
+    ffprobe = shutil.which("ffprobe")
+    if ffprobe is None:
+        return None
+    try:
+        completed = subprocess.run(
+            [ffprobe, "-v", "error", "-show_entries", "format=duration",
+             "-of", "default=noprint_wrappers=1:nokey=1", file_path],
+            capture_output=True, text=True, timeout=30
+        )
+        return float(completed.stdout.strip())
+    except (subprocess.SubprocessError, ValueError, OSError):
+        return None
+
+
+def _probe_channels(file_path: str) -> Optional[int]:
+    """Returns the channel count of the first audio stream using ffprobe, or None if unavailable."""
+    ffprobe = shutil.which("ffprobe")
+    if ffprobe is None:
+        return None
+    try:
+        completed = subprocess.run(
+            [ffprobe, "-v", "error", "-select_streams", "a:0", "-show_entries", "stream=channels",
+             "-of", "default=noprint_wrappers=1:nokey=1", file_path],
+            capture_output=True, text=True, timeout=30
+        )
+        return int(completed.stdout.strip().splitlines()[0])
+    except (subprocess.SubprocessError, ValueError, IndexError, OSError):
+        return None
+
+
+def _cache_lookup_key(cache: "AudioCache", file_path: str, target_sample_rate: int,
+                      variant: str = "") -> Optional[str]:
+    """Builds the cache key, treating hashing failures as a cache bypass."""
+    try:
+        return cache.key_for(file_path, target_sample_rate, variant)
+    except FileNotFoundError:
+        raise
+    except OSError as e:
+        print(f"⚠ Audio cache unavailable for {file_path}: {e}")
+        return None
+
+
 def slice_audio(full_audio_array: np.ndarray, sample_rate: int,
                 start_time_sec: float, end_time_sec: float) -> np.ndarray:
     """
@@ -72,9 +294,10 @@ def slice_audio(full_audio_array: np.ndarray, sample_rate: int,
         end_time_sec (float): End time of the slice in seconds
 
     Returns:
-        np.ndarray: The sliced audio segment as a 1D NumPy array
+        np.ndarray: The sliced audio segment as a 1D NumPy array (a view, not a copy)
 
     Note:
+        - Services also accept `audio_segment.AudioSegmentView` via `segment_view`
         - If start_time_sec < 0, it will be clamped to 0
         - If end_time_sec exceeds audio length, it will be clamped to the array length
         - Returns an empty array if the slice is invalid (start >= end)
@@ -87,9 +310,9 @@ def slice_audio(full_audio_array: np.ndarray, sample_rate: int,
     start_sample = max(0, start_sample)
     end_sample = min(len(full_audio_array), end_sample)
 
-    # Ensure valid slice
+    # Ensure valid slice (an empty view keeps the float32 dtype, unlike np.array([]))
     if start_sample >= end_sample:
-        return np.array([])
+        return full_audio_array[0:0]
 
     # Return the slice
     return full_audio_array[start_sample:end_sample]
@@ -0,0 +1,158 @@
+"""
+Batch Input Module
+Resolves directories, glob patterns and manifest files into pipeline jobs and
+summarizes batch throughput.
+"""
+
+import csv
+import glob
+import os
+from typing import Dict, Any, Iterable, List, Tuple
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".m4a", ".flac", ".ogg", ".aac", ".wma", ".opus", ".webm", ".mp4")
+MANIFEST_EXTENSIONS = (".txt", ".lst", ".csv")
+
+
+def _is_audio(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in AUDIO_EXTENSIONS
+
+
+def _read_manifest(manifest_path: str) -> List[str]:
+    """
+    Reads a manifest file.
+
+    Plain text manifests (.txt, .lst) list one audio path per line; blank lines and
+    lines starting with '#' are ignored. CSV manifests must have a 'path' column.
+    Relative paths are resolved against the manifest's directory.
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    with open(manifest_path, 'r', encoding='utf-8', newline='') as f:
+        if manifest_path.lower().endswith(".csv"):
+            reader = csv.DictReader(f)
+            if not reader.fieldnames or "path" not in reader.fieldnames:
+                raise ValueError(f"CSV manifest {manifest_path} needs a 'path' column")
+            entries = [row["path"].strip() for row in reader if row.get("path", "").strip()]
+        else:
+            entries = [line.strip() for line in f]
+            entries = [line for line in entries if line and not line.startswith("#")]
+    return [entry if os.path.isabs(entry) else os.path.join(base_dir, entry) for entry in entries]
+
+
+def collect_inputs(sources: Iterable[str], recursive: bool = False) -> List[str]:
+    """
+    Expands directories, glob patterns, manifest files and plain audio paths.
+
+    Args:
+        sources (Iterable[str]): Any mix of directories, glob patterns
+                                 (e.g. 'data/input/*.mp3'), manifests and audio files
+        recursive (bool): Also search subdirectories of directory sources
+
+    Returns:
+        List[str]: Existing audio files, de-duplicated, in a stable order
+    """
+    found: List[str] = []
+    for source in sources:
+        if os.path.isdir(source):
+            if recursive:
+                paths = [os.path.join(root, name) for root, _, names in os.walk(source) for name in names]
+            else:
+                paths = [os.path.join(source, name) for name in os.listdir(source)]
+            found.extend(sorted(path for path in paths if os.path.isfile(path) and _is_audio(path)))
+        elif os.path.isfile(source) and source.lower().endswith(MANIFEST_EXTENSIONS):
+            for path in _read_manifest(source):
+                if os.path.isfile(path):
+                    found.append(path)
+                else:
+                    print(f"⚠ Manifest entry not found, skipping: {path}")
+        elif os.path.isfile(source):
+            found.append(source)
+        elif glob.has_magic(source):
+            matches = sorted(path for path in glob.glob(source, recursive=recursive)
+                             if os.path.isfile(path) and _is_audio(path))
+            if not matches:
+                print(f"⚠ No audio files match: {source}")
+            found.extend(matches)
+        else:
+            print(f"⚠ Input not found, skipping: {source}")
+
+    unique, seen = [], set()
+    for path in found:
+        key = os.path.normcase(os.path.abspath(path))
+        if key not in seen:
+            seen.add(key)
+            unique.append(path)
+    return unique
+
+
+def plan_jobs(input_files: List[str], output_dir: str,
+              overwrite: bool = False) -> Tuple[List[Tuple[str, str]], List[str]]:
+    """
+    Maps inputs to output JSON paths, skipping inputs that already have an output.
+
+    Args:
+        input_files (List[str]): Audio files to process
+        output_dir (str): Directory for the output JSON files
+        overwrite (bool): Re-process inputs whose output already exists
+
+    Returns:
+        Tuple[List[Tuple[str, str]], List[str]]: (input, output) jobs and the skipped inputs
+    """
+    jobs, skipped, claimed = [], [], {}
+    for input_path in input_files:
+        output_name = os.path.splitext(os.path.basename(input_path))[0] + ".json"
+        output_path = os.path.join(output_dir, output_name)
+        if output_path in claimed:
+            print(f"⚠ {input_path} would overwrite the output of {claimed[output_path]}, skipping")
+            skipped.append(input_path)
+            continue
+        claimed[output_path] = input_path
+        if not overwrite and os.path.exists(output_path):
+            skipped.append(input_path)
+            continue
+        jobs.append((input_path, output_path))
+    return jobs, skipped
+
+
+def throughput_summary(timings: List[Dict[str, Any]], wall_seconds: float) -> Dict[str, Any]:
+    """
+    Aggregates the per-file records returned by AnalysisPipeline.run_batch.
+
+    Args:
+        timings (List[Dict[str, Any]]): Records from `run_batch`
+        wall_seconds (float): Wall time of the whole batch (excluding model loading)
+
+    Returns:
+        Dict[str, Any]: files, succeeded, failed, audio_seconds, wall_seconds,
+                        files_per_hour and real_time_factor (wall / audio; < 1 is faster
+                        than real time)
+    """
+    succeeded = [record for record in timings if record["ok"]]
+    audio_seconds = sum(record["audio_seconds"] for record in succeeded)
+    return {
+        "files": len(timings),
+        "succeeded": len(succeeded),
+        "failed": len(timings) - len(succeeded),
+        "audio_seconds": audio_seconds,
+        "wall_seconds": wall_seconds,
+        "files_per_hour": len(succeeded) * 3600.0 / wall_seconds if wall_seconds > 0 else 0.0,
+        "real_time_factor": wall_seconds / audio_seconds if audio_seconds > 0 else 0.0,
+    }
+
+
+def print_throughput_summary(summary: Dict[str, Any], init_seconds: float = 0.0,
+                             skipped: int = 0) -> None:
+    """Prints the batch throughput summary."""
+    print("=" * 60)
+    print("BATCH THROUGHPUT SUMMARY")
+    print("=" * 60)
+    print(f"  Files processed: {summary['succeeded']}/{summary['files']}"
+          + (f" ({summary['failed']} failed)" if summary['failed'] else ""))
+    if skipped:
+        print(f"  Skipped (output already exists): {skipped}")
+    print(f"  Audio processed: {summary['audio_seconds'] / 60:.1f} min")
+    print(f"  Model loading: {init_seconds:.1f}s (paid once)")
+    print(f"  Processing time: {summary['wall_seconds'] / 60:.1f} min")
+    print(f"  Throughput: {summary['files_per_hour']:.1f} files/hour")
+    print(f"  Real-time factor: {summary['real_time_factor']:.3f} "
+          f"({'faster' if 0 < summary['real_time_factor'] < 1 else 'slower'} than real time)")
+    print("=" * 60)
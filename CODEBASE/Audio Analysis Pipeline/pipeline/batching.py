@@ -0,0 +1,203 @@
+"""
+Batching Module
+Groups segments of similar length into batches for batched model inference.
+
+Merged segments range from 0.3 s to 30 s. A batch is padded to its longest member,
+so batching segments in recording order spends most of the compute on padding (one
+30 s segment next to twenty 1 s segments pads every one of them to 30 s). The
+scheduler sorts segments by length - optionally within fixed duration buckets -
+and packs neighbours into batches under a total padded-samples budget. Results are
+mapped back to the original segment order, so callers never see the reordering.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Padded samples per batch (two minutes of 16kHz audio)
+DEFAULT_BATCH_SAMPLES = 16000 * 120
+
+
+class SegmentBatch:
+    """
+    One batch: the original indices of its segments and their lengths in samples.
+
+    Attributes:
+        indices (List[int]): Positions of the segments in the scheduler's input
+        lengths (List[int]): Sample count of each segment (same order as `indices`)
+    """
+
+    __slots__ = ("indices", "lengths")
+
+    def __init__(self, indices: List[int], lengths: List[int]):
+        self.indices = indices
+        self.lengths = lengths
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    @property
+    def padded_length(self) -> int:
+        """Length every member is padded to."""
+        return max(self.lengths) if self.lengths else 0
+
+    @property
+    def real_samples(self) -> int:
+        return sum(self.lengths)
+
+    @property
+    def padded_samples(self) -> int:
+        return self.padded_length * len(self.lengths)
+
+    @property
+    def efficiency(self) -> float:
+        """Fraction of the padded batch that is real audio (1.0 = no padding)."""
+        padded = self.padded_samples
+        return self.real_samples / padded if padded else 1.0
+
+
+class LengthBucketScheduler:
+    """
+    Forms length-sorted batches under a padded-samples budget.
+
+    Any batched service can consume it: `schedule` returns the batches, and `map`
+    runs a batch function over them and returns results in input order.
+    """
+
+    def __init__(self,
+                 max_batch_samples: int = DEFAULT_BATCH_SAMPLES,
+                 max_batch_size: Optional[int] = None,
+                 bucket_boundaries: Optional[Sequence[int]] = None):
+        """
+        Args:
+            max_batch_samples (int): Upper bound on (batch size x longest member) per batch.
+                                     A single segment longer than this gets a batch of its own
+            max_batch_size (Optional[int]): Upper bound on segments per batch (None = no limit)
+            bucket_boundaries (Optional[Sequence[int]]): Sample lengths separating buckets;
+                                                         batches never span a boundary. None
+                                                         sorts all segments together, which
+                                                         pads the least
+        """
+        if max_batch_samples <= 0:
+            raise ValueError("max_batch_samples must be positive")
+        if max_batch_size is not None and max_batch_size <= 0:
+            raise ValueError("max_batch_size must be positive")
+        self.max_batch_samples = max_batch_samples
+        self.max_batch_size = max_batch_size
+        self.bucket_boundaries = sorted(bucket_boundaries) if bucket_boundaries else None
+
+    def schedule(self, lengths: Sequence[int]) -> List[SegmentBatch]:
+        """
+        Groups segments into batches, shortest first.
+
+        Args:
+            lengths (Sequence[int]): Sample count per segment, in original order
+
+        Returns:
+            List[SegmentBatch]: Batches covering every index exactly once
+        """
+        # Stable sort: equal lengths keep their original order
+        order = sorted(range(len(lengths)), key=lambda i: (self._bucket(lengths[i]), lengths[i]))
+        return self._pack(order, lengths, split_buckets=True)
+
+    def schedule_in_order(self, lengths: Sequence[int]) -> List[SegmentBatch]:
+        """Batches in original order under the same budget (the naive baseline for reports)."""
+        return self._pack(range(len(lengths)), lengths, split_buckets=False)
+
+    def map(self, items: Sequence[Any], lengths: Sequence[int],
+            batch_fn: Callable[[List[Any]], Sequence[Any]]) -> List[Any]:
+        """
+        Runs `batch_fn` over scheduled batches and returns results in input order.
+
+        Args:
+            items (Sequence[Any]): Inputs (e.g. segment views)
+            lengths (Sequence[int]): Sample count per item
+            batch_fn (Callable[[List[Any]], Sequence[Any]]): Processes one batch, returning
+                                                             one result per item, in order
+
+        Returns:
+            List[Any]: One result per item, in the order of `items`
+
+        Raises:
+            ValueError: If `batch_fn` returns a different number of results than it was given
+        """
+        results: List[Any] = [None] * len(items)
+        for batch in self.schedule(lengths):
+            outputs = batch_fn([items[i] for i in batch.indices])
+            if len(outputs) != len(batch):
+                raise ValueError(f"Batch function returned {len(outputs)} results for {len(batch)} inputs")
+            for index, output in zip(batch.indices, outputs):
+                results[index] = output
+        return results
+
+    def _bucket(self, length: int) -> int:
+        if self.bucket_boundaries is None:
+            return 0
+        for bucket, boundary in enumerate(self.bucket_boundaries):
+            if length <= boundary:
+                return bucket
+        return len(self.bucket_boundaries)
+
+    def _pack(self, order: Sequence[int], lengths: Sequence[int], split_buckets: bool) -> List[SegmentBatch]:
+        batches: List[SegmentBatch] = []
+        indices: List[int] = []
+        batch_lengths: List[int] = []
+        longest = 0
+        for i in order:
+            length = int(lengths[i])
+            grown = max(longest, length) * (len(indices) + 1)
+            full = (grown > self.max_batch_samples
+                    or (self.max_batch_size is not None and len(indices) >= self.max_batch_size)
+                    or (split_buckets and indices and self._bucket(length) != self._bucket(batch_lengths[-1])))
+            if indices and full:
+                batches.append(SegmentBatch(indices, batch_lengths))
+                indices, batch_lengths, longest = [], [], 0
+            indices.append(i)
+            batch_lengths.append(length)
+            longest = max(longest, length)
+        if indices:
+            batches.append(SegmentBatch(indices, batch_lengths))
+        return batches
+
+
+def padding_report(scheduler: LengthBucketScheduler, lengths: Sequence[int]) -> Dict[str, Any]:
+    """
+    Padding efficiency of the scheduled batches vs batching in recording order.
+
+    Args:
+        scheduler (LengthBucketScheduler): The scheduler to evaluate
+        lengths (Sequence[int]): Sample count per segment
+
+    Returns:
+        Dict[str, Any]: Batch count, real/padded samples and efficiency of both plans, plus
+                        per-batch size, padded length and efficiency of the scheduled plan
+    """
+    def totals(batches: List[SegmentBatch]) -> Dict[str, Any]:
+        real = sum(batch.real_samples for batch in batches)
+        padded = sum(batch.padded_samples for batch in batches)
+        return {
+            "batches": len(batches),
+            "real_samples": real,
+            "padded_samples": padded,
+            "efficiency": round(real / padded, 4) if padded else 1.0,
+        }
+
+    batches = scheduler.schedule(lengths)
+    report = totals(batches)
+    report["max_batch_samples"] = scheduler.max_batch_samples
+    report["in_order"] = totals(scheduler.schedule_in_order(lengths))
+    report["per_batch"] = [
+        {"size": len(batch), "padded_length": batch.padded_length, "efficiency": round(batch.efficiency, 4)}
+        for batch in batches
+    ]
+    return report
+
+
+def print_padding_report(report: Dict[str, Any], sample_rate: int = 16000, per_batch: bool = False) -> None:
+    """Prints a `padding_report` summary (and optionally one line per batch)."""
+    in_order = report["in_order"]
+    print(f"✓ Batch plan: {report['batches']} batches of ≤{report['max_batch_samples'] / sample_rate:.0f}s padded audio, "
+          f"padding efficiency {report['efficiency']:.0%} "
+          f"(recording order: {in_order['efficiency']:.0%} in {in_order['batches']} batches)")
+    if per_batch:
+        for number, batch in enumerate(report["per_batch"]):
+            print(f"  batch {number:>3}: {batch['size']:>3} segments × {batch['padded_length'] / sample_rate:5.1f}s, "
+                  f"efficiency {batch['efficiency']:.0%}")
@@ -0,0 +1,147 @@
+"""
+Channel Diarization Module
+Derives speaker segments from per-channel energy for dual-channel recordings.
+
+Many clinic recordings put the clinician and the patient on separate microphones /
+channels. When the channels are well separated, "who spoke when" is simply "which
+channel is active when", which a vectorized frame-energy pass answers in well under
+a second - no neural diarization model required. When the channels bleed into each
+other (room mics, dual-mono files) the detector declines and the pipeline falls
+back to pyannote.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+from typing import Dict, Any, List, Optional
+
+from .vad import find_runs
+
+
+class ChannelDiarizer:
+    """
+    Energy-based speaker segmentation for recordings with one speaker per channel.
+
+    Produces the same `{speaker, start_time, end_time}` list as DiarizationService.process,
+    with channel 0 labelled SPEAKER_00 and channel 1 labelled SPEAKER_01.
+    """
+
+    def __init__(self,
+                 frame_ms: float = 30.0,
+                 margin_db: float = 12.0,
+                 floor_db: float = -55.0,
+                 dominance_db: float = 10.0,
+                 min_separation: float = 0.75,
+                 max_correlation: float = 0.6,
+                 hangover_ms: float = 200.0,
+                 min_turn_ms: float = 250.0):
+        """
+        Initializes the channel diarizer.
+
+        Args:
+            frame_ms (float): Frame length in milliseconds
+            margin_db (float): Speech threshold above each channel's noise floor
+            floor_db (float): Absolute minimum threshold (dBFS)
+            dominance_db (float): A channel counts as a speaker only if it is within this many dB
+                                  of the other channel; quieter activity is treated as bleed
+            min_separation (float): Minimum fraction of active frames in which exactly one
+                                    channel is active; below this the channels are considered mixed
+            max_correlation (float): Maximum absolute correlation between channels (dual-mono or
+                                     heavily bleeding recordings correlate strongly)
+            hangover_ms (float): Activity is extended by this much to bridge short pauses
+            min_turn_ms (float): Shorter activity bursts are dropped
+        """
+        self.frame_ms = frame_ms
+        self.margin_db = margin_db
+        self.floor_db = floor_db
+        self.dominance_db = dominance_db
+        self.min_separation = min_separation
+        self.max_correlation = max_correlation
+        self.hangover_ms = hangover_ms
+        self.min_turn_ms = min_turn_ms
+        # Diagnostics of the last call (reported by the pipeline)
+        self.last_stats: Dict[str, Any] = {}
+
+    def process(self, channels: np.ndarray, sample_rate: int = 16000) -> Optional[List[Dict[str, Any]]]:
+        """
+        Derives speaker segments from a two-channel recording.
+
+        Args:
+            channels (np.ndarray): (channels, samples) float32 array
+            sample_rate (int): Sample rate in Hz
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: Segments sorted by start time, or None if the
+                                            recording is not well channel-separated
+        """
+        self.last_stats = {"channels": int(channels.shape[0]) if channels.ndim == 2 else 1}
+        if channels.ndim != 2 or channels.shape[0] != 2:
+            self.last_stats["reason"] = "not a two-channel recording"
+            return None
+
+        frame_samples = max(1, int(sample_rate * self.frame_ms / 1000))
+        num_frames = channels.shape[1] // frame_samples
+        if num_frames == 0:
+            self.last_stats["reason"] = "recording too short"
+            return None
+
+        # (2, num_frames, frame_samples) strided view of either layout - (channels, samples)
+        # rows or the transposed interleaved ffmpeg buffer - so no frame is copied;
+        # energies via einsum avoid squaring copies
+        channel_stride, sample_stride = channels.strides
+        frames = as_strided(channels, shape=(2, num_frames, frame_samples),
+                            strides=(channel_stride, sample_stride * frame_samples, sample_stride),
+                            writeable=False)
+        energy = np.einsum("cij,cij->ci", frames, frames, dtype=np.float64) / frame_samples
+        cross = np.einsum("ij,ij->i", frames[0], frames[1], dtype=np.float64) / frame_samples
+        energy_db = 10.0 * np.log10(energy + 1e-12)
+
+        correlation = float(cross.sum() / np.sqrt(energy[0].sum() * energy[1].sum() + 1e-24))
+        self.last_stats["correlation"] = round(correlation, 4)
+
+        # Per-channel adaptive thresholds (mics usually have different gains)
+        noise_floor_db = np.percentile(energy_db, 10, axis=1)
+        loud_db = np.percentile(energy_db, 95, axis=1)
+        threshold_db = np.maximum(self.floor_db, np.minimum(noise_floor_db + self.margin_db, loud_db - 6.0))
+        loud = energy_db > threshold_db[:, None]
+
+        # A channel is a speaker only where it is not just bleed of the other channel
+        difference = energy_db[0] - energy_db[1]
+        active = np.stack([
+            loud[0] & (difference > -self.dominance_db),
+            loud[1] & (difference < self.dominance_db),
+        ])
+
+        any_active = active[0] | active[1]
+        active_frames = int(any_active.sum())
+        if active_frames == 0:
+            self.last_stats["reason"] = "no speech detected"
+            return None
+
+        separation = float((active[0] ^ active[1]).sum()) / active_frames
+        self.last_stats["separation"] = round(separation, 4)
+        if abs(correlation) > self.max_correlation or separation < self.min_separation:
+            self.last_stats["reason"] = "channels bleed into each other"
+            return None
+
+        frame_seconds = frame_samples / sample_rate
+        hangover_frames = int(self.hangover_ms / self.frame_ms)
+        min_frames = int(self.min_turn_ms / self.frame_ms) + 2 * hangover_frames
+
+        segments = []
+        for channel in range(2):
+            mask = active[channel]
+            if hangover_frames > 0:
+                kernel = np.ones(2 * hangover_frames + 1, dtype=np.int32)
+                mask = np.convolve(mask.astype(np.int32), kernel, mode="same") > 0
+            starts, ends = find_runs(mask)
+            keep = (ends - starts) >= min_frames
+            for start, end in zip(starts[keep], ends[keep]):
+                segments.append({
+                    "speaker": f"SPEAKER_{channel:02d}",
+                    "start_time": float(start) * frame_seconds,
+                    "end_time": float(end) * frame_seconds
+                })
+
+        segments.sort(key=lambda seg: seg["start_time"])
+        self.last_stats["reason"] = "channel-separated"
+        return segments
@@ -0,0 +1,551 @@
+"""
+Corpus Index Module
+SQLite index of the segments of many pipeline outputs, for filtered queries across a corpus.
+
+Answering "patient segments flagged sarcastic with HNR below 10 dB in last quarter's
+recordings" from the output files means parsing every one of them. The index stores
+one row per segment with the same flattened columns as the columnar output (times,
+speaker, transcript, emotion labels and scores, acoustic features) and B-tree indexes
+on file, speaker, time, emotion label/score and the acoustic features, so such a query
+reads only the matching rows.
+
+Transcripts are also indexed for full-text search (SQLite FTS5, Porter-stemmed): word,
+phrase ("scan results"), prefix (hosp*) and boolean queries, ranked by BM25, with every
+hit pointing back to its recording and audio offsets.
+
+Indexing is incremental: a file whose size and modification time are unchanged is not
+read again, changed files are replaced and deleted files are dropped. The pipeline adds
+each output as it is written (`index_output`).
+"""
+
+import os
+import re
+import time
+import sqlite3
+import threading
+from datetime import datetime
+from urllib.parse import quote
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
+
+from .output_formats import (
+    ACOUSTIC_FIELDS, COLUMNAR_FORMATS, EMOTION_FIELDS, SEGMENT_FIELDS, SEGMENTS_KEY, read_output
+)
+from .profiling import format_bytes
+
+
+DEFAULT_INDEX_PATH = os.path.join(".", "data", "index", "corpus.sqlite")
+
+# Bumped when the tables change; an index with another version is rebuilt from scratch
+SCHEMA_VERSION = 2
+
+# Output files the indexer picks up (a columnar copy is skipped if its JSON is present)
+OUTPUT_EXTENSIONS = (".json",) + tuple(COLUMNAR_FORMATS.values())
+
+_SQL_TYPES = {"string": "TEXT", "float64": "REAL", "int32": "INTEGER", "bool": "INTEGER"}
+
+# (output key, column, type) of every indexed segment field, grouped by where it lives in a segment
+_FIELD_GROUPS = ((None, SEGMENT_FIELDS), ("predicted_emotion", EMOTION_FIELDS), ("acoustic_features", ACOUSTIC_FIELDS))
+SEGMENT_COLUMNS = [column for _, fields in _FIELD_GROUPS for _, column, _ in fields] + ["skipped"]
+NUMERIC_COLUMNS = [column for _, fields in _FIELD_GROUPS for _, column, type_name in fields
+                   if type_name in ("float64", "int32")]
+FLAG_COLUMNS = [column for _, fields in _FIELD_GROUPS for _, column, type_name in fields if type_name == "bool"]
+# (group, key, type) per column in `SEGMENT_COLUMNS` order, for `segment_row`
+_ROW_SPEC = [(group, key, type_name) for group, fields in _FIELD_GROUPS for key, _, type_name in fields]
+
+# Segments written per transaction while indexing (committing per file is slower)
+COMMIT_SEGMENTS = 50000
+
+# Secondary indexes: (name, columns, partial-index condition)
+_INDEXES = [
+    ("idx_segments_file", "file_id, start_time", None),
+    ("idx_segments_speaker", "speaker, file_id", None),
+    ("idx_segments_emotion", "emotion_label, emotion_score", None),
+    ("idx_segments_emotion_score", "emotion_score", None),
+    ("idx_segments_duration", "duration", None),
+    ("idx_segments_pitch", "pitch_mean_f0", None),
+    ("idx_segments_jitter", "jitter_local", None),
+    ("idx_segments_shimmer", "shimmer_local", None),
+    ("idx_segments_hnr", "hnr_mean", None),
+    ("idx_segments_sarcasm", "file_id", "sarcasm_flag = 1"),
+    ("idx_segments_mixed", "file_id", "mixed_emotion_flag = 1"),
+]
+
+
+def find_outputs(paths: Iterable[str]) -> List[str]:
+    """
+    Collects output files from files and directories (searched recursively).
+
+    Journals, temporary files and columnar copies of an existing JSON output are skipped.
+
+    Args:
+        paths (Iterable[str]): Output files or directories
+
+    Returns:
+        List[str]: Absolute paths, sorted
+    """
+    found = set()
+    for path in paths:
+        if os.path.isfile(path):
+            found.add(os.path.abspath(path))
+            continue
+        for root, _, files in os.walk(path):
+            for name in files:
+                if name.endswith(OUTPUT_EXTENSIONS) and ".journal." not in name:
+                    found.add(os.path.abspath(os.path.join(root, name)))
+    return sorted(path for path in found
+                  if path.endswith(".json") or os.path.splitext(path)[0] + ".json" not in found)
+
+
+def segment_row(segment: Dict[str, Any]) -> List[Any]:
+    """
+    Values of `SEGMENT_COLUMNS` for one output segment.
+
+    Unlike the columnar writer this never falls back to raw JSON: numbers are stored as
+    REAL/INTEGER whatever their JSON spelling, and fields of other stages are not indexed.
+    """
+    sources = {None: segment}
+    for group in ("predicted_emotion", "acoustic_features"):
+        nested = segment.get(group)
+        sources[group] = nested if isinstance(nested, dict) else {}
+    row = []
+    for group, key, type_name in _ROW_SPEC:
+        value = sources[group].get(key)
+        if value is not None:
+            if type_name == "bool":
+                value = int(value) if isinstance(value, bool) else None
+            elif type_name == "string":
+                value = str(value)
+            elif isinstance(value, bool) or not isinstance(value, (int, float)):
+                value = None
+        row.append(value)
+    row.append(segment.get("skipped"))
+    return row
+
+
+def fts_query(text: str) -> str:
+    """
+    Turns a search box string into a valid FTS5 query.
+
+    Words must all match, "quoted phrases" match in order, a trailing * matches a prefix
+    (hosp*), and AND / OR / NOT keep their meaning. Punctuation inside words ("don't",
+    "x-ray") is quoted instead of being read as FTS5 syntax.
+
+    Raises:
+        ValueError: If the text contains no searchable term
+    """
+    terms = []
+    for part in re.findall(r'"[^"]*"|\S+', text):
+        if part in ("AND", "OR", "NOT"):
+            terms.append(part)
+            continue
+        prefix = part.endswith("*")
+        word = part.strip('"').rstrip("*").replace('"', '""')
+        if word.strip():
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    # A dangling operator is a syntax error
+    while terms and terms[0] in ("AND", "OR", "NOT"):
+        terms.pop(0)
+    while terms and terms[-1] in ("AND", "OR", "NOT"):
+        terms.pop()
+    if not terms:
+        raise ValueError(f"Nothing to search for in '{text}'")
+    return " ".join(terms)
+
+
+def audio_link(file: Optional[str], start: float, end: float, audio_path: Optional[str] = None,
+               audio_dir: Optional[str] = None) -> str:
+    """
+    Link to a segment's audio as a media-fragment URI (`...#t=start,end`).
+
+    Args:
+        file (Optional[str]): Input file name recorded in the output
+        start (float): Segment start (seconds)
+        end (float): Segment end (seconds)
+        audio_path (Optional[str]): Recording path stored when the pipeline indexed the output
+        audio_dir (Optional[str]): Directory to look for `file` in otherwise
+
+    Returns:
+        str: A file:// URI if the recording is found (browsers seek to the fragment),
+             otherwise the file name with the fragment
+    """
+    fragment = f"#t={start:.3f},{end:.3f}"
+    candidates = [audio_path] + ([os.path.join(audio_dir, file)] if audio_dir and file else [])
+    for candidate in candidates:
+        if candidate and os.path.exists(candidate):
+            return "file://" + quote(os.path.abspath(candidate)) + fragment
+    return f"{file or 'unknown'}{fragment}"
+
+
+def parse_date(value: Optional[str]) -> Optional[float]:
+    """Parses 'YYYY-MM-DD' (or an ISO date-time) into a local timestamp; None passes through."""
+    if value is None:
+        return None
+    return datetime.fromisoformat(value).timestamp()
+
+
+class CorpusIndex:
+    """
+    SQLite segment index over a corpus of pipeline outputs.
+
+    Like the result cache, one connection is shared behind a lock and WAL mode lets
+    readers query while another process updates the index.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        """
+        Opens (or creates) the index database.
+
+        Args:
+            path (str): SQLite file holding the index
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self._create_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        # Eleven secondary indexes take random inserts; keep their pages in memory (64 MB)
+        conn.execute("PRAGMA cache_size=-65536")
+        # ANALYZE samples each index instead of reading it whole
+        conn.execute("PRAGMA analysis_limit=2000")
+        return conn
+
+    def reopen(self) -> None:
+        """Gives a forked worker process its own connection (see `ResultCache.reopen`)."""
+        self._lock = threading.Lock()
+        self._inherited_conn = self._conn
+        self._conn = self._connect()
+
+    def _create_schema(self) -> None:
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        tables = [row[0] for row in self._conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('files', 'segments', 'segments_fts')")]
+        if version != SCHEMA_VERSION and tables:
+            # The index only holds derived data: drop it and let the next update re-read the outputs
+            print(f"⚠ Corpus index {self.path} has an older layout; rebuilding it "
+                  f"(run `python scripts/corpus.py index <output dir>` to re-add existing outputs)")
+            self._conn.executescript("".join(f"DROP TABLE IF EXISTS {table};"
+                                             for table in ("segments_fts", "segments", "files")))
+        columns = [f"{column} {_SQL_TYPES[type_name]}"
+                   for _, fields in _FIELD_GROUPS for _, column, type_name in fields]
+        self._conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS files (
+                file_id INTEGER PRIMARY KEY,
+                path TEXT NOT NULL UNIQUE,
+                file TEXT,
+                audio_path TEXT,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                modified REAL NOT NULL,
+                segments INTEGER NOT NULL,
+                indexed REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_files_modified ON files (modified);
+            CREATE INDEX IF NOT EXISTS idx_files_file ON files (file);
+            CREATE TABLE IF NOT EXISTS segments (
+                row_id INTEGER PRIMARY KEY,
+                file_id INTEGER NOT NULL REFERENCES files (file_id) ON DELETE CASCADE,
+                {', '.join(columns)},
+                skipped TEXT
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5 (
+                transcript, content = 'segments', content_rowid = 'row_id', tokenize = 'porter unicode61'
+            );
+            CREATE TRIGGER IF NOT EXISTS segments_fts_insert AFTER INSERT ON segments
+            WHEN new.transcript IS NOT NULL BEGIN
+                INSERT INTO segments_fts (rowid, transcript) VALUES (new.row_id, new.transcript);
+            END;
+            CREATE TRIGGER IF NOT EXISTS segments_fts_delete AFTER DELETE ON segments
+            WHEN old.transcript IS NOT NULL BEGIN
+                INSERT INTO segments_fts (segments_fts, rowid, transcript) VALUES ('delete', old.row_id, old.transcript);
+            END;
+            PRAGMA user_version = {SCHEMA_VERSION};
+        """)
+        for name, columns, condition in _INDEXES:
+            where = f" WHERE {condition}" if condition else ""
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON segments ({columns}){where}")
+        self._conn.commit()
+
+    def update(self, paths: Iterable[str], prune: bool = True) -> Dict[str, int]:
+        """
+        Brings the index up to date with the output files under `paths`.
+
+        Args:
+            paths (Iterable[str]): Output files or directories
+            prune (bool): Drop indexed files that no longer exist on disk
+
+        Returns:
+            Dict[str, int]: Counts of added, updated, unchanged, removed and failed files
+                            and of segments written
+        """
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0, "failed": 0, "segments": 0}
+        with self._lock:
+            known = {row["path"]: tuple(row) for row in self._conn.execute(
+                "SELECT path, file_id, size, mtime_ns, audio_path FROM files")}
+        pending = 0
+        for path in find_outputs(paths):
+            stat = os.stat(path)
+            previous = known.get(path)
+            if previous is not None and previous[2:4] == (stat.st_size, stat.st_mtime_ns):
+                counts["unchanged"] += 1
+                continue
+            written = self._index_file(path, stat, previous, audio_path=previous[4] if previous else None)
+            if written is None:
+                counts["failed"] += 1
+                continue
+            counts["updated" if previous is not None else "added"] += 1
+            counts["segments"] += written
+            pending += written
+            if pending >= COMMIT_SEGMENTS:
+                with self._lock:
+                    self._conn.commit()
+                pending = 0
+
+        with self._lock:
+            self._conn.commit()
+
+        if prune:
+            missing = [(row[1],) for path, row in known.items() if not os.path.exists(path)]
+            with self._lock, self._conn:
+                self._conn.executemany("DELETE FROM files WHERE file_id = ?", missing)
+            counts["removed"] = len(missing)
+
+        if counts["added"] or counts["updated"] or counts["removed"]:
+            self._analyze()
+        return counts
+
+    def index_output(self, output_path: str, audio_path: Optional[str] = None) -> Optional[int]:
+        """
+        Adds (or replaces) one output, e.g. right after the pipeline wrote it.
+
+        Args:
+            output_path (str): The output file (.json, .parquet or .arrow)
+            audio_path (Optional[str]): The analyzed recording, so search hits can link to it
+
+        Returns:
+            Optional[int]: Segments indexed, or None if the file is not a pipeline output
+        """
+        path = os.path.abspath(output_path)
+        with self._lock:
+            previous = self._conn.execute(
+                "SELECT path, file_id, size, mtime_ns, audio_path FROM files WHERE path = ?", (path,)).fetchone()
+        written = self._index_file(path, os.stat(path), tuple(previous) if previous else None,
+                                   audio_path=os.path.abspath(audio_path) if audio_path else None)
+        with self._lock:
+            self._conn.commit()
+        return written
+
+    def _index_file(self, path: str, stat: os.stat_result, previous: Optional[tuple],
+                    audio_path: Optional[str]) -> Optional[int]:
+        """Replaces the rows of one output inside the open transaction; returns its segment count."""
+        try:
+            output = read_output(path)
+            segments = output.get(SEGMENTS_KEY)
+            if not isinstance(segments, list):
+                raise ValueError("no segment list")
+        except Exception as e:
+            # Not a pipeline output (e.g. a config file in the same folder) or unreadable
+            print(f"⚠ Skipping {path}: {e}")
+            return None
+
+        insert = (f"INSERT INTO segments (file_id, {', '.join(SEGMENT_COLUMNS)}) "
+                  f"VALUES (?{', ?' * len(SEGMENT_COLUMNS)})")
+        # Whole files per transaction: readers never see a half-indexed file
+        with self._lock:
+            try:
+                if previous is not None:
+                    self._conn.execute("DELETE FROM files WHERE file_id = ?", (previous[1],))
+                file_id = self._conn.execute(
+                    "INSERT INTO files (path, file, audio_path, size, mtime_ns, modified, segments, indexed) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (path, output.get("file"), audio_path, stat.st_size, stat.st_mtime_ns, stat.st_mtime,
+                     len(segments), time.time())
+                ).lastrowid
+                self._conn.executemany(insert, ([file_id] + segment_row(segment) for segment in segments))
+            except BaseException:
+                self._conn.rollback()
+                raise
+        return len(segments)
+
+    def _analyze(self) -> None:
+        # Refresh the planner statistics so it picks the most selective index
+        with self._lock:
+            self._conn.execute("ANALYZE")
+            self._conn.commit()
+
+    def _where(self,
+               file: Optional[str] = None,
+               speakers: Optional[Sequence[str]] = None,
+               emotions: Optional[Sequence[str]] = None,
+               modified_since: Optional[float] = None,
+               modified_until: Optional[float] = None,
+               ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+               flags: Optional[Dict[str, bool]] = None,
+               include_skipped: bool = False) -> Tuple[str, List[Any]]:
+        """SQL WHERE clause and parameters of the `query` filters."""
+        clauses: List[str] = []
+        params: List[Any] = []
+        file_clauses = []
+        if file is not None:
+            file_clauses.append("(file GLOB ? OR path GLOB ?)")
+            params += [file, file]
+        # The output file's modification time, not the recording date (which outputs do not carry)
+        if modified_since is not None:
+            file_clauses.append("modified >= ?")
+            params.append(modified_since)
+        if modified_until is not None:
+            file_clauses.append("modified < ?")
+            params.append(modified_until)
+        if file_clauses:
+            clauses.append(f"s.file_id IN (SELECT file_id FROM files WHERE {' AND '.join(file_clauses)})")
+        for column, values in (("speaker", speakers), ("emotion_label", emotions)):
+            if values:
+                clauses.append(f"s.{column} IN ({', '.join('?' * len(values))})")
+                params += list(values)
+        for column, (low, high) in (ranges or {}).items():
+            if column not in NUMERIC_COLUMNS:
+                raise ValueError(f"Unknown numeric column '{column}'. Expected one of: {', '.join(NUMERIC_COLUMNS)}")
+            if low is not None:
+                clauses.append(f"s.{column} >= ?")
+                params.append(low)
+            if high is not None:
+                clauses.append(f"s.{column} < ?")
+                params.append(high)
+        for column, value in (flags or {}).items():
+            if column not in FLAG_COLUMNS:
+                raise ValueError(f"Unknown flag column '{column}'. Expected one of: {', '.join(FLAG_COLUMNS)}")
+            # A literal (not a parameter) lets SQLite use the partial flag indexes
+            clauses.append(f"s.{column} = {int(bool(value))}")
+        if not include_skipped:
+            clauses.append("s.skipped IS NULL")
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self,
+              file: Optional[str] = None,
+              speakers: Optional[Sequence[str]] = None,
+              emotions: Optional[Sequence[str]] = None,
+              modified_since: Optional[float] = None,
+              modified_until: Optional[float] = None,
+              ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+              flags: Optional[Dict[str, bool]] = None,
+              include_skipped: bool = False,
+              limit: Optional[int] = 100) -> List[Dict[str, Any]]:
+        """
+        Returns the segments matching every given filter.
+
+        Args:
+            file (Optional[str]): Glob on the input file name or the output path (e.g. 'GAS*')
+            speakers (Optional[Sequence[str]]): Speaker labels to include
+            emotions (Optional[Sequence[str]]): Final emotion labels to include
+            modified_since (Optional[float]): Outputs whose file was modified at or after this timestamp
+            modified_until (Optional[float]): Outputs whose file was modified before this timestamp
+            ranges (Optional[Dict[str, Tuple[Optional[float], Optional[float]]]]):
+                Numeric column -> [low, high) bounds, either may be None (e.g. {'hnr_mean': (None, 10)})
+            flags (Optional[Dict[str, bool]]): Flag column -> required value (e.g. {'sarcasm_flag': True})
+            include_skipped (bool): Also return non-speech segments that were not analyzed
+            limit (Optional[int]): Maximum rows returned (None = all)
+
+        Returns:
+            List[Dict[str, Any]]: Matching segments with `path` and `file` of their output,
+                                  ordered by file and start time
+        """
+        where, params = self._where(file=file, speakers=speakers, emotions=emotions,
+                                    modified_since=modified_since, modified_until=modified_until, ranges=ranges, flags=flags, include_skipped=include_skipped)
+        sql = (f"SELECT f.path, f.file, {', '.join('s.' + column for column in SEGMENT_COLUMNS)} "
+               f"FROM segments s JOIN files f ON f.file_id = s.file_id{where} "
+               # With filters, '+' keeps the planner from walking the file index just to avoid a sort
+               f"ORDER BY {'+' if where else ''}s.file_id, s.start_time")
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        results = []
+        for row in rows:
+            result = dict(row)
+            for column in FLAG_COLUMNS:
+                if result[column] is not None:
+                    result[column] = bool(result[column])
+            results.append(result)
+        return results
+
+    def search(self, text: str, limit: Optional[int] = 20, **filters: Any) -> List[Dict[str, Any]]:
+        """
+        Full-text search over the transcripts, best matches first.
+
+        Args:
+            text (str): Search string (see `fts_query`): words, "phrases", prefix*, OR, NOT
+            limit (Optional[int]): Maximum hits returned (None = all)
+            **filters: Any filter of `query` (file, speakers, emotions, modified_since, ranges, ...)
+
+        Returns:
+            List[Dict[str, Any]]: Hits with the output `path`, input `file`, `audio_path` (if
+                                  known), segment_id, speaker, start/end time, transcript,
+                                  `match` (transcript with matches in [brackets]) and `score`
+                                  (BM25, higher is better)
+
+        Raises:
+            ValueError: If the search string cannot be searched for
+        """
+        where, params = self._where(**filters)
+        sql = ("SELECT f.path, f.file, f.audio_path, s.segment_id, s.speaker, s.start_time, s.end_time, "
+               "s.duration, s.transcript, s.emotion_label, "
+               "highlight(segments_fts, 0, '[', ']') AS match, -bm25(segments_fts) AS score "
+               "FROM segments_fts JOIN segments s ON s.row_id = segments_fts.rowid "
+               "JOIN files f ON f.file_id = s.file_id "
+               "WHERE segments_fts MATCH ?" + where.replace(" WHERE ", " AND ", 1) +
+               " ORDER BY bm25(segments_fts)")
+        params = [fts_query(text)] + params
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        try:
+            with self._lock:
+                rows = self._conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Cannot search for '{text}': {e}")
+        return [dict(row) for row in rows]
+
+    def count(self, **filters: Any) -> int:
+        """Number of segments matching the filters of `query` (without a limit)."""
+        where, params = self._where(**filters)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM segments s{where}", params).fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Indexed files and segments, labels per count, and the database size."""
+        with self._lock:
+            files, segments = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(segments), 0) FROM files").fetchone()
+            speakers = self._conn.execute("SELECT COUNT(DISTINCT speaker) FROM segments").fetchone()[0]
+            emotions = dict(self._conn.execute(
+                "SELECT emotion_label, COUNT(*) FROM segments WHERE emotion_label IS NOT NULL "
+                "GROUP BY emotion_label ORDER BY COUNT(*) DESC").fetchall())
+            span = self._conn.execute("SELECT MIN(modified), MAX(modified) FROM files").fetchone()
+        # Recent writes may still sit in the write-ahead log
+        size = sum(os.path.getsize(path) for path in (self.path, self.path + "-wal") if os.path.exists(path))
+        return {"files": files, "segments": segments, "speakers": speakers, "emotions": emotions,
+                "oldest": span[0], "newest": span[1], "size_bytes": size}
+
+    def print_report(self) -> None:
+        """Prints `stats()`."""
+        stats = self.stats()
+        print("Corpus index:")
+        print(f"  files        {stats['files']}")
+        print(f"  segments     {stats['segments']} ({stats['speakers']} distinct speakers)")
+        if stats["oldest"] is not None:
+            print(f"  outputs modified {datetime.fromtimestamp(stats['oldest']):%Y-%m-%d} "
+                  f"to {datetime.fromtimestamp(stats['newest']):%Y-%m-%d}")
+        if stats["emotions"]:
+            print("  emotions     " + ", ".join(f"{label} {count}" for label, count in stats["emotions"].items()))
+        print(f"  size         {format_bytes(stats['size_bytes'])} in {self.path}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,210 @@
+"""
+Segment Journal Module
+Crash-safe, append-only JSONL record of a run in progress.
+
+The first line is a header with the segment plan (the diarized and merged segments
+plus run parameters); every finished segment is appended as one line and flushed
+immediately. If the process dies (Praat segfault, OOM, Ctrl+C), a rerun with
+`resume=True` reads the journal, skips diarization and every finished segment,
+and continues where it stopped.
+
+The final JSON is streamed from the journal one segment at a time, so memory
+does not grow with the number of segments.
+"""
+
+import json
+import os
+from typing import Dict, Any, IO, Iterable, List, Optional, Tuple
+
+JOURNAL_SUFFIX = ".journal.jsonl"
+JOURNAL_VERSION = 1
+
+
+def journal_path_for(output_json_path: str) -> str:
+    """Journal file used while `output_json_path` is being produced."""
+    return output_json_path + JOURNAL_SUFFIX
+
+
+class SegmentJournal:
+    """
+    Append-only journal of segment results for one output file.
+
+    Attributes:
+        path (str): Journal file path
+        header (Optional[Dict[str, Any]]): Header record (plan and parameters)
+        offsets (Dict[int, int]): segment_id -> byte offset of its record
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.header: Optional[Dict[str, Any]] = None
+        self.offsets: Dict[int, int] = {}
+        self._file: Optional[IO[bytes]] = None
+        self._valid_end = 0
+
+    def load(self) -> bool:
+        """
+        Reads an existing journal (header and segment offsets).
+
+        A torn last line (the process died mid-write) is ignored and truncated away
+        when the journal is reopened for appending.
+
+        Returns:
+            bool: True if a valid header was found
+        """
+        self.header, self.offsets = None, {}
+        if not os.path.exists(self.path):
+            return False
+        valid_end = 0
+        with open(self.path, 'rb') as f:
+            offset = 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if self.header is None:
+                    if record.get("type") != "header" or record.get("version") != JOURNAL_VERSION:
+                        return False
+                    self.header = record
+                elif record.get("type") == "segment":
+                    self.offsets[record["segment"]["segment_id"]] = offset
+                offset += len(line)
+                valid_end = offset
+        self._valid_end = valid_end
+        return self.header is not None
+
+    def matches(self, source: Dict[str, Any], params: Dict[str, Any]) -> bool:
+        """True if the loaded journal was written for the same input and parameters."""
+        return self.header is not None and self.header.get("source") == source and self.header.get("params") == params
+
+    def start(self, header: Dict[str, Any]) -> None:
+        """Starts a new journal, discarding any previous one."""
+        self.close()
+        self.header = dict(header, type="header", version=JOURNAL_VERSION)
+        self.offsets = {}
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._file = open(self.path, 'wb')
+        self._write_line(self.header)
+        self._sync()
+
+    def reopen(self) -> None:
+        """Opens a loaded journal for appending (after `load` returned True)."""
+        self.close()
+        self._file = open(self.path, 'r+b')
+        self._file.truncate(self._valid_end)
+        self._file.seek(self._valid_end)
+
+    def append(self, segment: Dict[str, Any]) -> None:
+        """Appends one finished segment and flushes it to the OS."""
+        offset = self._file.tell()
+        self._write_line({"type": "segment", "segment": segment})
+        self._file.flush()
+        self.offsets[segment["segment_id"]] = offset
+
+    def done(self, segment_id: int) -> bool:
+        return segment_id in self.offsets
+
+    def read_segment(self, segment_id: int, reader: IO[bytes]) -> Dict[str, Any]:
+        """Reads one segment record back (`reader` is an open binary handle of the journal)."""
+        reader.seek(self.offsets[segment_id])
+        return json.loads(reader.readline())["segment"]
+
+    def iter_segments(self, segment_ids: Iterable[int]) -> Iterable[Dict[str, Any]]:
+        """Yields the journaled segments in the given order, one at a time."""
+        if self._file is not None:
+            self._file.flush()
+        with open(self.path, 'rb') as reader:
+            for segment_id in segment_ids:
+                if segment_id in self.offsets:
+                    yield self.read_segment(segment_id, reader)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._sync()
+            self._file.close()
+            self._file = None
+
+    def remove(self) -> None:
+        """Deletes the journal (after the final JSON was written)."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _write_line(self, record: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b"\n")
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+
+def _compact(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _indented(value: Any, level: int) -> str:
+    """json.dumps(indent=4) of `value` as it appears nested `level` levels deep."""
+    return json.dumps(value, indent=4, ensure_ascii=False).replace("\n", "\n" + "    " * level)
+
+
+def write_streamed_json(output_json_path: str, fields: List[Tuple[str, Any]],
+                        segments_key: str, segments: Iterable[Dict[str, Any]],
+                        compact: bool = False) -> int:
+    """
+    Writes a JSON object whose segment list is streamed from an iterator.
+
+    The result is byte-identical to `json.dump(obj, f, indent=4, ensure_ascii=False)`
+    of the same object, or with `compact` to `json.dump(obj, f, ensure_ascii=False,
+    separators=(",", ":"))`. The file is written to a temp path and moved into place.
+
+    Args:
+        output_json_path (str): Target path
+        fields (List[Tuple[str, Any]]): Top-level (key, value) pairs in order; the segment
+                                       list is emitted where `segments_key` appears, and
+                                       callable values are evaluated after the segments
+                                       (so they can use totals gathered while streaming)
+        segments_key (str): Key of the streamed list
+        segments (Iterable[Dict[str, Any]]): The list items
+        compact (bool): No indentation or spaces (smaller files)
+
+    Returns:
+        int: Number of segments written
+    """
+    count = 0
+    tmp_path = output_json_path + ".tmp"
+    if compact:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write("{")
+            for position, (key, value) in enumerate(fields):
+                f.write(("," if position else "") + json.dumps(key) + ":")
+                if key == segments_key:
+                    f.write("[")
+                    for segment in segments:
+                        f.write(("," if count else "") + _compact(segment))
+                        count += 1
+                    f.write("]")
+                else:
+                    f.write(_compact(value() if callable(value) else value))
+            f.write("}")
+        os.replace(tmp_path, output_json_path)
+        return count
+
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write("{")
+        for position, (key, value) in enumerate(fields):
+            f.write(",\n" if position else "\n")
+            f.write(f"    {json.dumps(key)}: ")
+            if key == segments_key:
+                for segment in segments:
+                    f.write(",\n" if count else "[\n")
+                    f.write("        " + _indented(segment, 2))
+                    count += 1
+                f.write("\n    ]" if count else "[]")
+            else:
+                f.write(_indented(value() if callable(value) else value, 1))
+        f.write("\n}" if fields else "}")
+    os.replace(tmp_path, output_json_path)
+    return count
@@ -0,0 +1,176 @@
+"""
+Metrics Module
+Collects per-stage and per-model timings for one pipeline run.
+
+Every service call is wrapped in `measure(metrics, name)`, which costs a few
+microseconds per call against service calls of tens of milliseconds. Totals are kept
+per stage name; nothing is stored per call, so memory does not grow with the
+number of segments.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Any, Iterator, Optional
+
+from .profiling import peak_rss_bytes
+
+
+class MetricsCollector:
+    """
+    Accumulates wall time, CPU time and call counts per stage.
+
+    Stage names use dots for sub-stages, e.g. 'emotion.hubert' inside 'emotion'.
+
+    CPU time is process CPU time (all threads of this process) during the call, so it
+    includes native threads of CTranslate2 and PyTorch. When stages run pipelined,
+    concurrently active stages see each other's CPU time; the run-level `cpu_seconds`
+    is always exact. Time spent in acoustic pool workers is not included in CPU time.
+    """
+
+    def __init__(self):
+        self._stages: Dict[str, Dict[str, float]] = {}
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        """Times the enclosed block and adds it to stage `name`."""
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - wall_start, time.process_time() - cpu_start)
+
+    def add(self, name: str, wall_seconds: float, cpu_seconds: float = 0.0, calls: int = 1) -> None:
+        """Adds an externally measured duration to stage `name`."""
+        with self._lock:
+            stage = self._stages.get(name)
+            if stage is None:
+                stage = self._stages[name] = {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0}
+            stage["calls"] += calls
+            stage["wall_seconds"] += wall_seconds
+            stage["cpu_seconds"] += cpu_seconds
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Increments counter `name` (e.g. analyzed or skipped segments)."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def summary(self, audio_seconds: float) -> Dict[str, Any]:
+        """
+        Builds the `metrics` block for the output JSON.
+
+        Args:
+            audio_seconds (float): Duration of the analyzed recording
+
+        Returns:
+            Dict[str, Any]: Run totals (wall/CPU seconds, real-time factor, peak RSS),
+                            counters and per-stage calls, wall/CPU seconds and mean ms per call
+        """
+        wall = time.perf_counter() - self._wall_start
+        with self._lock:
+            stages = {
+                name: {
+                    "calls": int(stage["calls"]),
+                    "wall_seconds": round(stage["wall_seconds"], 4),
+                    "cpu_seconds": round(stage["cpu_seconds"], 4),
+                    "mean_ms": round(1000.0 * stage["wall_seconds"] / stage["calls"], 2) if stage["calls"] else 0.0,
+                    "real_time_factor": round(stage["wall_seconds"] / audio_seconds, 4) if audio_seconds > 0 else None,
+                }
+                for name, stage in sorted(self._stages.items())
+            }
+            counters = dict(self._counters)
+        return {
+            "audio_seconds": round(audio_seconds, 3),
+            "wall_seconds": round(wall, 3),
+            "cpu_seconds": round(time.process_time() - self._cpu_start, 3),
+            "real_time_factor": round(wall / audio_seconds, 4) if audio_seconds > 0 else None,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "counters": counters,
+            "stages": stages,
+        }
+
+
+def measure(metrics: Optional[MetricsCollector], name: str):
+    """`metrics.measure(name)`, or a no-op context when metrics are disabled."""
+    return metrics.measure(name) if metrics is not None else nullcontext()
+
+
+def print_stage_table(summary: Dict[str, Any]) -> None:
+    """Prints the per-stage breakdown of a `summary` block, slowest first."""
+    print(f"  {'stage':<24}{'calls':>7}{'wall s':>10}{'cpu s':>10}{'ms/call':>10}{'RTF':>8}")
+    for name, stage in sorted(summary["stages"].items(), key=lambda item: -item[1]["wall_seconds"]):
+        rtf = stage["real_time_factor"]
+        print(f"  {name:<24}{stage['calls']:>7}{stage['wall_seconds']:>10.2f}{stage['cpu_seconds']:>10.2f}"
+              f"{stage['mean_ms']:>10.1f}{rtf if rtf is not None else 0.0:>8.3f}")
+    rtf = summary["real_time_factor"]
+    print(f"  Total: {summary['wall_seconds']:.1f}s wall, {summary['cpu_seconds']:.1f}s CPU, "
+          f"RTF {rtf if rtf is not None else 0.0:.3f}")
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def write_prometheus_textfile(summary: Dict[str, Any], path: str, labels: Optional[Dict[str, str]] = None) -> None:
+    """
+    Writes a `summary` block in the Prometheus text exposition format.
+
+    Intended for node_exporter's textfile collector. The file is written atomically
+    and replaced on every run, so it always describes the most recent recording.
+
+    Args:
+        summary (Dict[str, Any]): Output of `MetricsCollector.summary`
+        path (str): Target .prom file
+        labels (Optional[Dict[str, str]]): Extra labels for every sample (e.g. file name)
+    """
+    base = ",".join(f'{key}="{_escape_label(value)}"' for key, value in (labels or {}).items())
+
+    def sample(metric: str, value: Any, extra: str = "") -> str:
+        label_text = ",".join(part for part in (base, extra) if part)
+        return f"{metric}{{{label_text}}} {value}" if label_text else f"{metric} {value}"
+
+    lines = []
+    run_metrics = [
+        ("audio_pipeline_audio_seconds", "Duration of the analyzed recording", summary["audio_seconds"]),
+        ("audio_pipeline_wall_seconds", "Wall time of the run", summary["wall_seconds"]),
+        ("audio_pipeline_cpu_seconds", "Process CPU time of the run", summary["cpu_seconds"]),
+        ("audio_pipeline_real_time_factor", "Wall time divided by audio duration", summary["real_time_factor"]),
+        ("audio_pipeline_peak_rss_bytes", "Peak resident set size of the process", summary["peak_rss_bytes"]),
+    ]
+    for metric, help_text, value in run_metrics:
+        if value is None:
+            continue
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge", sample(metric, value)]
+
+    stage_metrics = [
+        ("audio_pipeline_stage_wall_seconds", "Wall time per stage", "wall_seconds"),
+        ("audio_pipeline_stage_cpu_seconds", "Process CPU time per stage", "cpu_seconds"),
+        ("audio_pipeline_stage_calls", "Calls per stage", "calls"),
+    ]
+    for metric, help_text, key in stage_metrics:
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge"]
+        for name, stage in summary["stages"].items():
+            lines.append(sample(metric, stage[key], f'stage="{_escape_label(name)}"'))
+
+    if summary["counters"]:
+        lines += ["# HELP audio_pipeline_segments Segment counts by outcome", "# TYPE audio_pipeline_segments gauge"]
+        for name, value in summary["counters"].items():
+            lines.append(sample("audio_pipeline_segments", value, f'outcome="{_escape_label(name)}"'))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    # The collector only reads *.prom files, so it never sees the partial file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
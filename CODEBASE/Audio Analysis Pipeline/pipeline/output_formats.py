@@ -0,0 +1,300 @@
+"""
+Output Formats Module
+Columnar (Parquet / Arrow IPC) copies of the pipeline's JSON output.
+
+The JSON output nests `predicted_emotion` and `acoustic_features` per segment and is
+indented, so analytics over thousands of recordings spend most of their time parsing.
+The columnar writer emits one row per segment with typed columns (times, speaker,
+transcript, per-model emotion labels and scores, acoustic features). Everything
+outside the segment list (file, metrics, voice activity, ...) is kept as JSON in the
+file's schema metadata, and a segment the typed columns cannot represent exactly
+(e.g. fields added by a plugged-in stage) carries its original JSON in the
+`segment_json` column - so `read_output` of a columnar file returns exactly the
+object `json.load` returns for the JSON file.
+
+pyarrow is only needed when a columnar format is written or read.
+"""
+
+import os
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Columnar formats selectable from the CLI (--columnar), with their file extensions
+COLUMNAR_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+# Segments per Parquet row group / Arrow record batch when writing
+COLUMNAR_BATCH_ROWS = 1024
+
+# Schema metadata key holding the non-segment part of the output (JSON)
+SUMMARY_METADATA_KEY = b"audio_pipeline.summary"
+SEGMENTS_KEY = "segments"
+
+# (output key, column, arrow type name); order is the key order of the JSON output
+SEGMENT_FIELDS = [
+    ("segment_id", "segment_id", "int32"),
+    ("speaker", "speaker", "string"),
+    ("start_time", "start_time", "float64"),
+    ("end_time", "end_time", "float64"),
+    ("duration", "duration", "float64"),
+    ("transcript", "transcript", "string"),
+]
+EMOTION_FIELDS = [
+    ("label", "emotion_label", "string"),
+    ("score", "emotion_score", "float64"),
+    ("confidence", "emotion_confidence", "string"),
+    ("hubert_emotion", "hubert_emotion", "string"),
+    ("hubert_score", "hubert_score", "float64"),
+    ("wav2vec2_emotion", "wav2vec2_emotion", "string"),
+    ("wav2vec2_score", "wav2vec2_score", "float64"),
+    ("text_emotion", "text_emotion", "string"),
+    ("text_score", "text_score", "float64"),
+    ("agreement", "emotion_agreement", "string"),
+    ("sarcasm_flag", "sarcasm_flag", "bool"),
+    ("mixed_emotion_flag", "mixed_emotion_flag", "bool"),
+    ("method", "emotion_method", "string"),
+    ("note", "emotion_note", "string"),
+]
+ACOUSTIC_FIELDS = [
+    ("pitch_mean_f0", "pitch_mean_f0", "float64"),
+    ("jitter_local", "jitter_local", "float64"),
+    ("shimmer_local", "shimmer_local", "float64"),
+    ("hnr_mean", "hnr_mean", "float64"),
+]
+# Presence of the nested dicts (a dict whose fields are all null is not the same as null)
+STATUS_FIELDS = [
+    ("has_emotion", "bool"),
+    ("has_acoustic_features", "bool"),
+    ("skipped", "string"),
+    ("segment_json", "string"),
+]
+
+
+# Arrow type name per column
+_COLUMN_TYPES = {column: type_name for _, column, type_name in SEGMENT_FIELDS + EMOTION_FIELDS + ACOUSTIC_FIELDS}
+_COLUMN_TYPES.update(STATUS_FIELDS)
+
+
+def _fits(value: Any, type_name: str) -> bool:
+    """True if `value` is stored unchanged in a column of `type_name`."""
+    if type_name == "string":
+        return isinstance(value, str)
+    if type_name == "bool":
+        return isinstance(value, bool)
+    if type_name == "int32":
+        return isinstance(value, int) and not isinstance(value, bool) and -2 ** 31 <= value < 2 ** 31
+    return isinstance(value, float)
+
+
+def require_pyarrow():
+    """Returns the pyarrow module, or raises ImportError with an install hint."""
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError as e:
+        raise ImportError("Parquet/Arrow output requires pyarrow (pip install pyarrow)") from e
+
+
+def columnar_path(output_json_path: str, fmt: str) -> str:
+    """Path of the columnar copy of an output JSON (same name, format extension)."""
+    return os.path.splitext(output_json_path)[0] + COLUMNAR_FORMATS[fmt]
+
+
+def schema():
+    """Arrow schema of the segment table."""
+    pa = require_pyarrow()
+    # pyarrow's boolean type factory is bool_ (pa.bool does not exist)
+    types = {"string": pa.string, "float64": pa.float64, "int32": pa.int32, "bool": pa.bool_}
+    return pa.schema([pa.field(column, types[type_name]()) for column, type_name in _COLUMN_TYPES.items()])
+
+
+def flatten_segment(segment: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    One table row for a segment.
+
+    Returns:
+        Dict[str, Any]: Column values; `segment_json` holds the original segment if
+                        `unflatten_segment` would not reproduce it byte for byte
+    """
+    row: Dict[str, Any] = {column: segment.get(key) for key, column, _ in SEGMENT_FIELDS}
+    emotion = segment.get("predicted_emotion")
+    acoustic = segment.get("acoustic_features")
+    for key, column, _ in EMOTION_FIELDS:
+        row[column] = emotion.get(key) if isinstance(emotion, dict) else None
+    for key, column, _ in ACOUSTIC_FIELDS:
+        row[column] = acoustic.get(key) if isinstance(acoustic, dict) else None
+    row["has_emotion"] = isinstance(emotion, dict)
+    row["has_acoustic_features"] = isinstance(acoustic, dict)
+    row["skipped"] = segment.get("skipped")
+    row["segment_json"] = None
+
+    # Values of another type than their column (e.g. an int time) are not stored typed
+    exact = True
+    for column, type_name in _COLUMN_TYPES.items():
+        if row[column] is not None and not _fits(row[column], type_name):
+            row[column] = None
+            exact = False
+    original = json.dumps(segment, ensure_ascii=False)
+    if not exact or json.dumps(unflatten_segment(row), ensure_ascii=False) != original:
+        # Typed columns stay filled where possible; the reader uses the original
+        row["segment_json"] = original
+    return row
+
+
+def unflatten_segment(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuilds the output segment dict from a table row."""
+    if row.get("segment_json") is not None:
+        return json.loads(row["segment_json"])
+    segment = {key: row[column] for key, column, _ in SEGMENT_FIELDS}
+    emotion = None
+    if row["has_emotion"]:
+        emotion = {key: row[column] for key, column, _ in EMOTION_FIELDS}
+        if emotion["note"] is None:
+            del emotion["note"]
+    acoustic = {key: row[column] for key, column, _ in ACOUSTIC_FIELDS} if row["has_acoustic_features"] else None
+    segment["predicted_emotion"] = emotion
+    segment["acoustic_features"] = acoustic
+    if row["skipped"] is not None:
+        segment["skipped"] = row["skipped"]
+    return segment
+
+
+def _summary_metadata(summary: Dict[str, Any], key_order: Optional[List[str]]) -> Dict[bytes, bytes]:
+    """Schema metadata holding the non-segment part of the output and the top-level key order."""
+    if key_order is None:
+        key_order = list(summary)
+        key_order.insert(min(2, len(key_order)), SEGMENTS_KEY)
+    return {SUMMARY_METADATA_KEY: json.dumps({"key_order": key_order, "summary": summary},
+                                             ensure_ascii=False).encode("utf-8")}
+
+
+def record_batches(segments: Iterable[Dict[str, Any]], batch_rows: int = COLUMNAR_BATCH_ROWS):
+    """
+    Flattens segments into record batches of `schema()`, holding one batch at a time.
+
+    Args:
+        segments (Iterable[Dict[str, Any]]): Output segments, in order
+        batch_rows (int): Rows per batch
+
+    Yields:
+        pyarrow.RecordBatch: Up to `batch_rows` rows
+    """
+    pa = require_pyarrow()
+    batch_schema = schema()
+    rows: List[Dict[str, Any]] = []
+
+    def to_batch():
+        return pa.RecordBatch.from_arrays(
+            [pa.array([row[field.name] for row in rows], type=field.type) for field in batch_schema],
+            schema=batch_schema)
+
+    for segment in segments:
+        rows.append(flatten_segment(segment))
+        if len(rows) >= batch_rows:
+            yield to_batch()
+            rows = []
+    if rows:
+        yield to_batch()
+
+
+def segments_to_table(segments: Iterable[Dict[str, Any]], summary: Dict[str, Any],
+                      key_order: Optional[List[str]] = None):
+    """
+    Builds the Arrow table of an output in memory (`write_columnar` streams instead).
+
+    Args:
+        segments (Iterable[Dict[str, Any]]): Output segments, in order
+        summary (Dict[str, Any]): The other top-level fields of the output
+        key_order (Optional[List[str]]): Top-level key order including 'segments'
+                                         (default: 'segments' after 'diarization_method')
+
+    Returns:
+        pyarrow.Table: One row per segment, the summary in the schema metadata
+    """
+    pa = require_pyarrow()
+    table_schema = schema().with_metadata(_summary_metadata(summary, key_order))
+    return pa.Table.from_batches(list(record_batches(segments)), schema=table_schema)
+
+
+def table_to_output(table) -> Dict[str, Any]:
+    """Rebuilds the output dict (as `json.load` of the JSON output returns it) from a table."""
+    metadata = json.loads((table.schema.metadata or {})[SUMMARY_METADATA_KEY].decode("utf-8"))
+    segments = [unflatten_segment(row) for row in table.to_pylist()]
+    summary = metadata["summary"]
+    return {key: segments if key == SEGMENTS_KEY else summary[key] for key in metadata["key_order"]}
+
+
+def write_columnar(path: str, fmt: str, segments: Iterable[Dict[str, Any]], summary: Dict[str, Any],
+                   key_order: Optional[List[str]] = None, batch_rows: int = COLUMNAR_BATCH_ROWS) -> int:
+    """
+    Writes an output as Parquet or Arrow IPC (Feather v2), atomically.
+
+    Like the streamed JSON writer, segments are consumed from the iterator and written
+    `batch_rows` at a time (a Parquet row group / an IPC record batch each), so memory
+    does not grow with the length of the recording.
+
+    Args:
+        path (str): Target file
+        fmt (str): 'parquet' or 'arrow'
+        segments (Iterable[Dict[str, Any]]): Output segments, in order
+        summary (Dict[str, Any]): The other top-level fields of the output
+        key_order (Optional[List[str]]): Top-level key order including 'segments'
+        batch_rows (int): Rows per row group / record batch
+
+    Returns:
+        int: Number of rows written
+    """
+    if fmt not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unknown columnar format '{fmt}'. Expected one of: {', '.join(COLUMNAR_FORMATS)}")
+    pa = require_pyarrow()
+    # Declared up front: the summary is known before the first segment is written
+    file_schema = schema().with_metadata(_summary_metadata(summary, key_order))
+    tmp_path = path + ".tmp"
+    rows = 0
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(tmp_path, file_schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_file(tmp_path, file_schema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+    try:
+        with writer:
+            for batch in record_batches(segments, batch_rows):
+                writer.write_batch(batch)
+                rows += batch.num_rows
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    return rows
+
+
+def read_table(path: str):
+    """Reads the segment table of a .parquet or .arrow output (for analytics)."""
+    require_pyarrow()
+    if path.endswith(COLUMNAR_FORMATS["parquet"]):
+        import pyarrow.parquet as pq
+        return pq.read_table(path)
+    import pyarrow.feather as feather
+    return feather.read_table(path)
+
+
+def read_output(path: str) -> Dict[str, Any]:
+    """
+    Loads an output in any format as the JSON output's dict.
+
+    Args:
+        path (str): A .json, .parquet or .arrow output file
+
+    Returns:
+        Dict[str, Any]: The output object (identical for every format of the same run)
+    """
+    if path.endswith(".json"):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return table_to_output(read_table(path))
+
+
+def split_output(output: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Dict[str, Any], List[str]]:
+    """Splits an output dict into (segments, summary, key order) for `write_columnar`."""
+    summary = {key: value for key, value in output.items() if key != SEGMENTS_KEY}
+    return output.get(SEGMENTS_KEY, []), summary, list(output)
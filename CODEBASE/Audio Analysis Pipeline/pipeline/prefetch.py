@@ -0,0 +1,108 @@
+"""
+Audio Prefetch Module
+Decodes upcoming recordings on a background thread while the current one is analyzed.
+"""
+
+import queue
+import threading
+import time
+import numpy as np
+from typing import Callable, Iterator, List, Optional, Tuple
+
+
+class PrefetchedAudio:
+    """
+    A decoded recording handed from the prefetch thread to the pipeline.
+
+    Attributes:
+        path (str): Source audio path
+        audio (Optional[np.ndarray]): Decoded 16kHz mono buffer (None if decoding failed)
+        sample_rate (int): Sample rate of `audio`
+        decode_seconds (float): Wall time spent decoding on the background thread
+        error (Optional[Exception]): Decoding error, re-raised by the consumer if needed
+    """
+
+    __slots__ = ("path", "audio", "sample_rate", "decode_seconds", "error")
+
+    def __init__(self, path: str, audio: Optional[np.ndarray], sample_rate: int,
+                 decode_seconds: float, error: Optional[Exception] = None):
+        self.path = path
+        self.audio = audio
+        self.sample_rate = sample_rate
+        self.decode_seconds = decode_seconds
+        self.error = error
+
+
+class AudioPrefetcher:
+    """
+    Decodes file N+1 (and optionally N+2, ...) while file N is being analyzed.
+
+    Decoding runs on one daemon thread; torchaudio/ffmpeg decoding and cache reads
+    release the GIL, so it overlaps with model inference on the main thread. A
+    bounded queue of size `depth` caps memory: at most `depth` decoded recordings
+    wait in the queue, plus one being decoded and one being analyzed.
+    """
+
+    _DONE = object()
+
+    def __init__(self, paths: List[str],
+                 loader: Callable[[str], Tuple[np.ndarray, int]],
+                 depth: int = 1):
+        """
+        Starts the background decoding thread.
+
+        Args:
+            paths (List[str]): Audio files in processing order
+            loader (Callable[[str], Tuple[np.ndarray, int]]): Decoder, e.g. a partial of
+                                                             `load_and_resample_audio`
+            depth (int): How many decoded files may wait ahead of the consumer (>= 1)
+        """
+        self.paths = list(paths)
+        self.loader = loader
+        self.depth = max(1, int(depth))
+        self._queue = queue.Queue(maxsize=self.depth)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._worker, name="audio-prefetch", daemon=True)
+        self._thread.start()
+
+    def __iter__(self) -> Iterator[PrefetchedAudio]:
+        """Yields decoded recordings in input order, blocking only if decoding is behind."""
+        while True:
+            item = self._queue.get()
+            if item is self._DONE:
+                return
+            yield item
+
+    def close(self) -> None:
+        """Stops decoding further files (the file currently being decoded is finished)."""
+        self._stop.set()
+        # Drain so a worker blocked on a full queue can observe the stop flag
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _worker(self) -> None:
+        for path in self.paths:
+            if self._stop.is_set():
+                break
+            start = time.perf_counter()
+            try:
+                audio, sample_rate = self.loader(path)
+                item = PrefetchedAudio(path, audio, sample_rate, time.perf_counter() - start)
+            except Exception as e:
+                item = PrefetchedAudio(path, None, 0, time.perf_counter() - start, error=e)
+            if not self._put(item):
+                return
+        self._put(self._DONE)
+
+    def _put(self, item) -> bool:
+        """Blocking put that gives up once the prefetcher is closed."""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
@@ -0,0 +1,104 @@
+"""
+Profiling Utilities Module
+Provides lightweight, cross-platform helpers for measuring process memory.
+"""
+
+import os
+import sys
+from typing import Dict, Optional
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """
+    Returns the peak resident set size of the current process in bytes.
+
+    Uses the `resource` module on Linux/macOS and psutil (if installed) on Windows.
+
+    Returns:
+        Optional[int]: Peak RSS in bytes, or None if it cannot be measured
+    """
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+        return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+    except ImportError:
+        pass
+
+    try:
+        import psutil
+        info = psutil.Process(os.getpid()).memory_info()
+        # Windows exposes the peak working set directly
+        return int(getattr(info, "peak_wset", info.rss))
+    except ImportError:
+        return None
+
+
+def current_rss_bytes() -> Optional[int]:
+    """
+    Returns the current resident set size of the current process in bytes.
+
+    Returns:
+        Optional[int]: Current RSS in bytes, or None if it cannot be measured
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    try:
+        import psutil
+        return int(psutil.Process(os.getpid()).memory_info().rss)
+    except ImportError:
+        return None
+
+
+def memory_breakdown(pid: Optional[int] = None) -> Optional[Dict[str, int]]:
+    """
+    Splits the resident memory of a process into shared and private pages (Linux only).
+
+    RSS counts every page the process maps, including pages it shares with forked
+    siblings, so summing RSS over workers overstates their footprint; PSS divides each
+    shared page between the processes mapping it and sums to the real total.
+
+    Args:
+        pid (Optional[int]): Process to inspect (default: the current process)
+
+    Returns:
+        Optional[Dict[str, int]]: rss, pss, shared and private bytes, or None if
+                                  /proc/<pid>/smaps_rollup is not available
+    """
+    fields = {"Rss": "rss", "Pss": "pss", "Shared_Clean": "shared", "Shared_Dirty": "shared",
+              "Private_Clean": "private", "Private_Dirty": "private"}
+    breakdown = {"rss": 0, "pss": 0, "shared": 0, "private": 0}
+    try:
+        with open(f"/proc/{pid or 'self'}/smaps_rollup", "r") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name in fields:
+                    breakdown[fields[name]] += int(value.split()[0]) * 1024
+    except (OSError, ValueError, IndexError):
+        return None
+    return breakdown
+
+
+def format_bytes(num_bytes: Optional[int]) -> str:
+    """
+    Formats a byte count for human-readable console output.
+
+    Args:
+        num_bytes (Optional[int]): Number of bytes (None is rendered as "n/a")
+
+    Returns:
+        str: e.g. "512.0 MB"
+    """
+    if num_bytes is None:
+        return "n/a"
+    value = float(num_bytes)
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(value) < 1024.0 or unit == "GB":
+            return f"{value:.1f} {unit}"
+        value /= 1024.0
+    return f"{value:.1f} GB"
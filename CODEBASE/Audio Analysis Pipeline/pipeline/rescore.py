@@ -0,0 +1,265 @@
+"""
+Rescore Pipeline
+Re-runs emotion recognition (and optionally acoustics) on an existing Phase 1 output.
+
+Trying a new emotion model with `main_phase2.py` used to repeat diarization and
+ASR over audio that had already been analyzed. The rescore pipeline instead takes
+the segment boundaries and transcripts from a Phase 1 JSON, decodes the source
+audio once and runs only EmotionService - so neither pyannote nor faster-whisper
+is loaded at all.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import Future
+from tqdm import tqdm
+from typing import Dict, Any, List, Optional, Tuple
+
+from . import audio_utilities as au
+from .audio_segment import padded_segment_view
+from .audio_cache import AudioCache
+from .metrics import MetricsCollector, print_stage_table
+from .resources import plan_resources
+from .result_cache import ResultCache, MISS, content_id
+from .services.acoustic_service import AcousticService
+from .services.emotion_service import EmotionService
+
+
+class RescorePipeline:
+    """
+    Re-scores Phase 1 outputs with a different emotion model.
+
+    Segments marked as skipped (non-speech) and segments without a transcript field are
+    passed through unchanged. Segment windows are rebuilt from the (millisecond) times
+    stored in the JSON, which are the times the full pipeline slices at, so with the same
+    decoder backend both share result-cache entries.
+    """
+
+    def __init__(self,
+                 emotion_model_path: str = "superb/hubert-base-superb-er",
+                 audio_cache: Optional[AudioCache] = None,
+                 decoder_backend: str = "torchaudio",
+                 rescore_acoustics: bool = False,
+                 acoustic_workers: Optional[int] = 0,
+                 result_cache: Optional[ResultCache] = None,
+                 cpus: Optional[int] = None,
+                 cpu_budget: Optional[Dict[str, int]] = None):
+        """
+        Loads only the models needed for rescoring.
+
+        Args:
+            emotion_model_path (str): HuBERT-slot emotion model (e.g. a fine-tuned clinical model)
+            audio_cache (Optional[AudioCache]): On-disk cache of decoded audio
+            decoder_backend (str): 'torchaudio' or 'ffmpeg'
+            rescore_acoustics (bool): Recompute Praat features instead of reusing the JSON's
+            acoustic_workers (Optional[int]): Processes for Praat extraction when rescoring acoustics
+                                              (None: the acoustic share of the CPU budget)
+            result_cache (Optional[ResultCache]): Per-stage result cache shared with the full pipeline
+            cpus (Optional[int]): CPUs this pipeline may use (default: all available)
+            cpu_budget (Optional[Dict[str, int]]): Explicit CPUs for 'acoustic' and 'emotion'
+        """
+        print("=" * 60)
+        print("Initializing Rescore Pipeline (emotion only)...")
+        print("=" * 60)
+
+        self.emotion_model_path = emotion_model_path
+        self.audio_cache = audio_cache
+        self.decoder_backend = decoder_backend
+        self.rescore_acoustics = rescore_acoustics
+        self.result_cache = result_cache
+        # The acoustic pool runs alongside emotion scoring, so they split the CPUs
+        self.resources = plan_resources(("acoustic", "emotion") if rescore_acoustics else ("emotion",),
+                                        cpus=cpus, budget=cpu_budget, acoustic_workers=acoustic_workers)
+        print(f"✓ CPU budget ({self.resources.cpus} CPUs): {self.resources.describe()}")
+        self.acoustic_service = (AcousticService(workers=self.resources.acoustic_workers, result_cache=result_cache)
+                                 if rescore_acoustics else None)
+        self.emotion_service = EmotionService(
+            mode='triple_ensemble',
+            hubert_model=emotion_model_path,
+            wav2vec2_model="ehcalabres/wav2vec2-lg-xlsr-en-speech-emotion-recognition",
+            text_model="j-hartmann/emotion-english-distilroberta-base",
+            result_cache=result_cache
+        )
+        self.resources.apply_torch("emotion")
+
+        print("=" * 60)
+        print("Rescore services initialized successfully!")
+        print("=" * 60)
+
+    def close(self) -> None:
+        """Shuts down the acoustic worker pool."""
+        if self.acoustic_service is not None:
+            self.acoustic_service.close()
+
+    def __enter__(self) -> "RescorePipeline":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def run(self, phase1_json_path: str, audio_file_path: str, output_json_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Re-scores one Phase 1 output.
+
+        Args:
+            phase1_json_path (str): Output JSON of main.py for this recording
+            audio_file_path (str): The source audio of that output
+            output_json_path (str): Where to save the re-scored JSON
+
+        Returns:
+            Optional[Dict[str, Any]]: The saved output, or None if the run failed
+        """
+        print(f"\n{'='*60}")
+        print(f"Rescoring: {phase1_json_path}")
+        print(f"{'='*60}\n")
+
+        metrics = MetricsCollector()
+        self.emotion_service.metrics = metrics
+        cache_stats = self.result_cache.stats() if self.result_cache is not None else None
+
+        try:
+            with open(phase1_json_path, 'r', encoding='utf-8') as f:
+                phase1 = json.load(f)
+            segments = phase1["segments"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"✗ Could not read Phase 1 output {phase1_json_path}: {e}")
+            return None
+
+        # A Phase 1 run with channel diarization decoded the channels and mixed them itself;
+        # doing the same gives the same samples (and result-cache keys)
+        downmix = "channel_diarization" in phase1
+        try:
+            with metrics.measure("decode"):
+                full_audio_array, sample_rate = au.load_and_resample_audio(
+                    audio_file_path, cache=self.audio_cache, backend=self.decoder_backend,
+                    keep_channels=downmix
+                )
+            if full_audio_array.ndim == 2:
+                full_audio_array = au.downmix(full_audio_array)
+        except Exception as e:
+            print(f"✗ Error loading audio file: {e}")
+            return None
+        duration = len(full_audio_array) / sample_rate
+        print(f"✓ Audio loaded ({duration:.1f}s), {len(segments)} segments from Phase 1\n")
+
+        # Same content id and segment windows as the full pipeline, so cached results are shared
+        source_id = os.path.basename(audio_file_path)
+        if self.result_cache is not None:
+            source_id = content_id(audio_file_path, self.decoder_backend, downmix=downmix)
+        work: List[Tuple[Dict[str, Any], Any]] = []
+        for segment in segments:
+            if segment.get("skipped") or "transcript" not in segment:
+                continue
+            view = padded_segment_view(full_audio_array, sample_rate, segment["start_time"],
+                                       segment["end_time"], source_id=source_id)
+            if view.size > 0:
+                work.append((segment, view))
+
+        shared_audio, futures = None, {}
+        if self.acoustic_service is not None and self.acoustic_service.parallel and work:
+            shared_audio = self.acoustic_service.share(full_audio_array)
+            for _, view in work:
+                features = self.acoustic_service.lookup(view)
+                futures[id(view)] = (features if features is not MISS
+                                     else self.acoustic_service.submit(shared_audio, view))
+
+        try:
+            for segment, view in tqdm(work, desc="Rescoring", unit="segment"):
+                if self.acoustic_service is not None:
+                    with metrics.measure("acoustic"):
+                        if futures:
+                            pending = futures.pop(id(view))
+                            segment["acoustic_features"] = (
+                                self.acoustic_service.result(pending, shared_audio, view)
+                                if isinstance(pending, Future) else pending)
+                        else:
+                            segment["acoustic_features"] = self.acoustic_service.process(view)
+                with metrics.measure("emotion"):
+                    segment["predicted_emotion"] = self.emotion_service.process(
+                        view,
+                        transcript=segment.get("transcript") or "",
+                        acoustic_features=segment.get("acoustic_features")
+                    )
+        finally:
+            if shared_audio is not None:
+                shared_audio.close()
+
+        metrics.count("segments_total", len(segments))
+        metrics.count("segments_rescored", len(work))
+        phase1["rescored"] = {
+            "source_json": os.path.basename(phase1_json_path),
+            "emotion_model": self.emotion_model_path,
+            "acoustic_features": "recomputed" if self.rescore_acoustics else "reused",
+            "rescored_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        phase1["metrics"] = metrics.summary(duration)
+        phase1["metrics"]["resources"] = self.resources.as_dict()
+
+        try:
+            tmp_path = output_json_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(phase1, f, indent=4, ensure_ascii=False)
+            os.replace(tmp_path, output_json_path)
+            print(f"\n✓ Rescoring complete: {len(work)} segments")
+            print(f"  Output saved to: {output_json_path}")
+        except Exception as e:
+            print(f"✗ Error saving JSON output: {e}")
+            return None
+
+        print("\n⏱ Stage timings:")
+        print_stage_table(phase1["metrics"])
+        if self.result_cache is not None:
+            print()
+            self.result_cache.print_report(since=cache_stats)
+        return phase1
+
+
+def resolve_rescore_jobs(from_json: str, audio_input: str, output_dir: str,
+                         suffix: str = "_phase2") -> List[Tuple[str, str, str]]:
+    """
+    Pairs Phase 1 outputs with their source audio.
+
+    Args:
+        from_json (str): A Phase 1 JSON file, or a directory of them
+        audio_input (str): The source audio file, or a directory containing the recordings
+                           (matched by the JSON's "file" field). A directory of JSONs needs
+                           a directory of recordings
+        output_dir (str): Directory for the re-scored outputs
+        suffix (str): Appended to the Phase 1 JSON's name for each output file
+
+    Returns:
+        List[Tuple[str, str, str]]: (phase1_json, audio_file, output_json) triples
+
+    Raises:
+        ValueError: If `from_json` is a directory but `audio_input` is a single file
+    """
+    if os.path.isdir(from_json) and not os.path.isdir(audio_input):
+        # Every output would be re-scored against the same recording
+        raise ValueError(f"--from_json {from_json} is a directory, so -i must be the directory of "
+                         f"recordings its outputs were made from, not the file {audio_input}")
+    if os.path.isdir(from_json):
+        json_paths = sorted(os.path.join(from_json, name) for name in os.listdir(from_json)
+                            if name.endswith(".json") and not name.endswith(f"{suffix}.json"))
+    else:
+        json_paths = [from_json]
+
+    jobs = []
+    for json_path in json_paths:
+        if os.path.isdir(audio_input):
+            try:
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    recording = json.load(f).get("file")
+            except (OSError, ValueError) as e:
+                print(f"⚠ Skipping unreadable {json_path}: {e}")
+                continue
+            audio_path = os.path.join(audio_input, recording) if recording else None
+        else:
+            audio_path = audio_input
+        if not audio_path or not os.path.exists(audio_path):
+            print(f"⚠ Source audio for {json_path} not found, skipping")
+            continue
+        # Named after the Phase 1 output: distinct outputs never map to the same file
+        stem = os.path.splitext(os.path.basename(json_path))[0]
+        jobs.append((json_path, audio_path, os.path.join(output_dir, stem + suffix + ".json")))
+    return jobs
@@ -0,0 +1,233 @@
+"""
+Resources Module
+Splits one CPU budget across the thread and process pools of the services.
+
+Every model library sizes its own pool for the whole machine: PyTorch (HuBERT,
+Wav2Vec2, the text model, pyannote) starts one intra-op thread per core, CTranslate2
+(faster-whisper) its own threads, and the Praat pool defaulted to every core but one.
+With stages running side by side - or two pipelines on one box - that is several
+times more busy threads than cores, and everything slows down. A ResourcePlan gives
+each service a share of the CPUs and applies it consistently:
+
+- ASR: CTranslate2 `num_workers` (= ASR stage threads, the concurrent transcriptions)
+  and `cpu_threads` per transcription
+- acoustic: size of the Praat process pool
+- emotion / diarize: `torch.set_num_threads` while that service runs, and one
+  inter-op thread (eager inference does not use the inter-op pool)
+- ASR without emotion or diarization: torch is still imported (the ASR device check and
+  the torchaudio decoder), so its pool gets the ASR share instead of every core
+
+Diarization runs before the segment stages, so it may use every CPU of the budget;
+the segment stages overlap (the acoustic pool always runs alongside ASR and emotion),
+so their shares add up to the budget. A serial run given no CPU count or budget is not
+split: the Praat pool keeps every core but one, as before budgets existed.
+"""
+
+import os
+import sys
+from typing import Dict, Any, Optional, Tuple
+
+# Services with a CPU budget
+RESOURCE_SERVICES = ("diarize", "asr", "acoustic", "emotion")
+
+# Split of the CPUs between segment stages that run at the same time
+DEFAULT_SHARES = {"asr": 0.4, "acoustic": 0.2, "emotion": 0.4}
+
+
+def available_cpus() -> int:
+    """Number of CPUs this process may run on (respects taskset / cgroup affinity)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def parse_cpu_budget(spec: Optional[str]) -> Dict[str, int]:
+    """
+    Parses a CPU budget such as 'asr=8,emotion=6,acoustic=2'.
+
+    Args:
+        spec (Optional[str]): Comma-separated service=cpus pairs (services: diarize, asr,
+                              acoustic, emotion); services left out share the remaining CPUs
+
+    Returns:
+        Dict[str, int]: CPUs per listed service
+    """
+    budget: Dict[str, int] = {}
+    if not spec:
+        return budget
+    for part in spec.split(","):
+        name, _, count = part.strip().partition("=")
+        name = name.strip()
+        if name not in RESOURCE_SERVICES or not count.strip().isdigit() or int(count) < 1:
+            raise ValueError(f"Invalid CPU budget '{part}'. "
+                             f"Expected service=cpus with service in {', '.join(RESOURCE_SERVICES)}")
+        budget[name] = int(count)
+    return budget
+
+
+class ResourcePlan:
+    """
+    Thread and process counts per service, derived from one CPU budget (see `plan_resources`).
+
+    Attributes:
+        cpus (int): CPUs the pipeline may use
+        budgets (Dict[str, int]): CPUs per service
+        asr_workers (int): Concurrent transcriptions (CTranslate2 num_workers)
+        asr_threads (int): CTranslate2 cpu_threads per transcription
+        acoustic_workers (int): Praat worker processes (0 = in the calling thread)
+        torch_threads (Dict[str, int]): PyTorch intra-op threads for 'diarize' and 'emotion'
+                                        (for 'asr' when neither is selected)
+        torch_interop_threads (int): PyTorch inter-op threads (set once per process)
+        oversubscribed (bool): True if the segment stages were given more CPUs than the budget
+    """
+
+    def __init__(self, cpus: int, budgets: Dict[str, int], asr_workers: int, acoustic_workers: int,
+                 oversubscribed: bool = False):
+        self.cpus = cpus
+        self.budgets = budgets
+        self.asr_workers = asr_workers
+        self.asr_threads = max(1, budgets.get("asr", 1) // asr_workers)
+        self.acoustic_workers = acoustic_workers
+        self.torch_threads = {name: budgets[name] for name in ("diarize", "emotion") if name in budgets}
+        if not self.torch_threads and "asr" in budgets:
+            # No model runs on torch, but decoding and resampling still do
+            self.torch_threads["asr"] = budgets["asr"]
+        self.torch_interop_threads = 1
+        self.oversubscribed = oversubscribed
+
+    def asr_options(self) -> Dict[str, int]:
+        """Keyword arguments for CTranslate2 / faster-whisper's WhisperModel."""
+        return {"cpu_threads": self.asr_threads, "num_workers": self.asr_workers}
+
+    def apply_torch(self, service: str) -> None:
+        """
+        Sizes PyTorch's thread pools for `service` ('diarize', 'emotion' or 'asr').
+
+        Called before the service loads and again before it runs, since diarization and
+        emotion share the process-wide pool. Does nothing until torch has been imported;
+        every run imports it (ASRService checks for CUDA with it, and the default decoder
+        is torchaudio), so a run without diarization or emotion sizes it for 'asr' once
+        ASRService has loaded.
+        """
+        threads = self.torch_threads.get(service)
+        torch = sys.modules.get("torch")
+        if threads is None or torch is None:
+            return
+        if torch.get_num_threads() != threads:
+            torch.set_num_threads(threads)
+        try:
+            torch.set_num_interop_threads(self.torch_interop_threads)
+        except RuntimeError:
+            pass  # Only allowed before the first inter-op work; it stays as first set
+
+    def as_dict(self) -> Dict[str, Any]:
+        """The plan as recorded in the output's `metrics.resources`."""
+        return {
+            "cpus": self.cpus,
+            "budgets": dict(self.budgets),
+            "asr_workers": self.asr_workers,
+            "asr_threads": self.asr_threads,
+            "acoustic_workers": self.acoustic_workers,
+            "torch_threads": dict(self.torch_threads),
+            "torch_interop_threads": self.torch_interop_threads,
+        }
+
+    def describe(self) -> str:
+        """One-line summary, e.g. 'diarize 32 threads, asr 12 (2×6 threads), acoustic 6 processes, ...'."""
+        parts = []
+        for name in RESOURCE_SERVICES:
+            if name not in self.budgets:
+                continue
+            if name == "asr":
+                parts.append(f"asr {self.budgets[name]} ({self.asr_workers}×{self.asr_threads} threads)")
+            elif name == "acoustic":
+                parts.append(f"acoustic {self.acoustic_workers} processes" if self.acoustic_workers
+                             else "acoustic in-process")
+            else:
+                parts.append(f"{name} {self.budgets[name]} threads")
+        return ", ".join(parts)
+
+
+def plan_resources(stages: Tuple[str, ...] = RESOURCE_SERVICES,
+                   cpus: Optional[int] = None,
+                   budget: Optional[Dict[str, int]] = None,
+                   stage_workers: Optional[Dict[str, int]] = None,
+                   acoustic_workers: Optional[int] = None) -> ResourcePlan:
+    """
+    Splits a CPU budget across the selected services.
+
+    Args:
+        stages (Tuple[str, ...]): Selected stages ('diarize', 'asr', 'acoustic', 'emotion')
+        cpus (Optional[int]): CPUs for this pipeline (default: every CPU it may run on).
+                              Give each of several pipelines on one machine its share
+        budget (Optional[Dict[str, int]]): Explicit CPUs per service (see `parse_cpu_budget`)
+        stage_workers (Optional[Dict[str, int]]): Threads per segment stage, or None for the
+                                                  serial segment loop (ASR and emotion then
+                                                  take turns, so each gets what acoustics leave).
+                                                  A serial run given neither `cpus` nor `budget`
+                                                  keeps the unshared sizes: a Praat pool of every
+                                                  CPU but one, ASR and emotion on every CPU
+        acoustic_workers (Optional[int]): Explicit Praat pool size (0 = in-process); None
+                                          sizes the pool from the budget
+
+    Returns:
+        ResourcePlan: Thread/process counts per service
+    """
+    # Without --cpus / --cpu_budget a serial run is not split (see `stage_workers`)
+    split = cpus is not None or bool(budget)
+    cpus = max(1, cpus or available_cpus())
+    budget = dict(budget or {})
+    budgets: Dict[str, int] = {}
+    if "diarize" in stages:
+        budgets["diarize"] = budget.get("diarize", cpus)
+
+    segment_stages = [name for name in ("asr", "acoustic", "emotion") if name in stages]
+    if "acoustic" in segment_stages and acoustic_workers is not None:
+        # An in-process extraction still occupies one core
+        budget.setdefault("acoustic", max(1, acoustic_workers))
+    pipelined = stage_workers is not None
+    if pipelined:
+        # Stages overlap: split what the explicit budgets leave by the default shares
+        unassigned = [name for name in segment_stages if name not in budget]
+        remaining = cpus - sum(budget.get(name, 0) for name in segment_stages)
+        total_share = sum(DEFAULT_SHARES[name] for name in unassigned)
+        for name in segment_stages:
+            if name in budget:
+                budgets[name] = budget[name]
+            else:
+                budgets[name] = max(1, int(remaining * DEFAULT_SHARES[name] / total_share))
+        # Rounding down leaves CPUs over; hand them out, largest share first
+        leftover = remaining - sum(budgets[name] for name in unassigned)
+        for name in sorted(unassigned, key=lambda n: -DEFAULT_SHARES[n]) * max(0, leftover):
+            if leftover <= 0:
+                break
+            budgets[name] += 1
+            leftover -= 1
+    elif split:
+        # ASR and emotion alternate; only the acoustic pool runs alongside them
+        if "acoustic" in segment_stages:
+            budgets["acoustic"] = budget.get("acoustic", max(1, int(cpus * DEFAULT_SHARES["acoustic"])))
+        for name in ("asr", "emotion"):
+            if name in segment_stages:
+                budgets[name] = budget.get(name, max(1, cpus - budgets.get("acoustic", 0)))
+    else:
+        # No budget asked for: the Praat pool keeps every core but one for the main process
+        if "acoustic" in segment_stages:
+            budgets["acoustic"] = budget.get("acoustic", max(1, cpus - 1))
+        for name in ("asr", "emotion"):
+            if name in segment_stages:
+                budgets[name] = cpus
+
+    in_parallel = sum(budgets.get(name, 0) for name in segment_stages) if pipelined else \
+        budgets.get("acoustic", 0) + max(budgets.get("asr", 0), budgets.get("emotion", 0))
+    asr_workers = max(1, (stage_workers or {}).get("asr", 1))
+    if "acoustic" not in segment_stages:
+        pool = 0
+    elif acoustic_workers is not None:
+        pool = acoustic_workers
+    else:
+        pool = budgets["acoustic"]
+    # With fewer CPUs than overlapping stages, one each is the least that can be given
+    return ResourcePlan(cpus, budgets, asr_workers=asr_workers, acoustic_workers=pool,
+                        oversubscribed=(split or pipelined) and in_parallel > max(cpus, len(segment_stages)))
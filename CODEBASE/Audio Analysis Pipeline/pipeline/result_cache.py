@@ -0,0 +1,260 @@
+"""
+Result Cache Module
+Content-addressed cache of per-stage results (diarization, ASR, acoustics, emotion).
+
+Entries are keyed by (stage, audio content id, segment bounds, parameter fingerprint).
+The fingerprint covers the model id and revision, the library version, the settings
+that change the output and a digest of the service's own source file, so changing any
+of them simply stops matching the old entries - nothing has to be invalidated by hand.
+Re-running with different merge parameters, padding or one swapped model only
+recomputes the stages and segments whose key actually changed.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+from importlib import metadata
+from typing import Dict, Any, Optional, Tuple
+
+from .audio_cache import file_content_hash
+from .audio_segment import AudioSegmentView, AudioInput
+from .profiling import format_bytes
+
+
+DEFAULT_RESULT_CACHE_PATH = os.path.join(".", "data", "cache", "results.sqlite")
+
+# Returned by `ResultCache.get` on a miss (None is a valid cached result)
+MISS = object()
+
+SegmentKey = Tuple[str, int, int]
+
+
+def fingerprint(**parts: Any) -> str:
+    """
+    Digest of the parameters that determine a stage's output.
+
+    Args:
+        **parts: JSON-serializable values (model ids, revisions, settings, inputs)
+
+    Returns:
+        str: Hex digest, stable across processes and runs
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def source_digest(path: str) -> str:
+    """Digest of a source file, so editing a service's post-processing invalidates its entries."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()[:16]
+    except OSError:
+        return "unknown"
+
+
+def library_version(distribution: str) -> str:
+    """Installed version of a package, or 'unknown'."""
+    try:
+        return metadata.version(distribution)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def buffer_digest(samples: np.ndarray) -> str:
+    """
+    Content id of an in-memory buffer (e.g. the VAD-compacted audio given to diarization).
+
+    BLAKE2b runs at roughly 1 GB/s, so an hour of 16kHz float32 audio costs well under a second.
+    """
+    samples = np.ascontiguousarray(samples)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{samples.dtype.str}{samples.shape}".encode("ascii"))
+    digest.update(memoryview(samples).cast("B"))
+    return digest.hexdigest()
+
+
+def content_id(audio_file_path: str, decoder_backend: str, downmix: bool = False) -> str:
+    """
+    Result-cache identity of a decoded recording: the file's content hash plus everything
+    that changes the decoded samples.
+
+    Args:
+        audio_file_path (str): The recording
+        decoder_backend (str): 'torchaudio' or 'ffmpeg' (they resample differently)
+        downmix (bool): The channels were decoded separately and mixed afterwards (for
+                        channel diarization), which rounds differently from a mono decode
+
+    Returns:
+        str: e.g. '<sha256>-torchaudio-downmix'
+    """
+    return f"{file_content_hash(audio_file_path)}-{decoder_backend}{'-downmix' if downmix else ''}"
+
+
+def segment_key(audio_slice: AudioInput) -> Optional[SegmentKey]:
+    """
+    (content id, start sample, end sample) of a segment, or None if it cannot be cached.
+
+    Only AudioSegmentViews with a `source_id` are cacheable; plain arrays carry no
+    identity of the recording they came from.
+    """
+    if not isinstance(audio_slice, AudioSegmentView) or not audio_slice.source_id:
+        return None
+    source = f"{audio_slice.source_id}@{audio_slice.sample_rate}"
+    return source, int(audio_slice.start_sample), int(audio_slice.end_sample)
+
+
+class ResultCache:
+    """
+    SQLite store of stage results, shared by all services of a process.
+
+    Values are stored as JSON. One connection is shared by all threads behind a lock
+    (pipelined stages call in concurrently); WAL mode lets several processes, e.g.
+    parallel batch runs, use the same file.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS results (
+            stage TEXT NOT NULL,
+            source TEXT NOT NULL,
+            start_sample INTEGER NOT NULL,
+            end_sample INTEGER NOT NULL,
+            params TEXT NOT NULL,
+            value TEXT NOT NULL,
+            created REAL NOT NULL,
+            PRIMARY KEY (stage, source, start_sample, end_sample, params)
+        )
+    """
+
+    def __init__(self, path: str = DEFAULT_RESULT_CACHE_PATH):
+        """
+        Opens (or creates) the cache database.
+
+        Args:
+            path (str): SQLite file holding the results
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self._conn.execute(self._SCHEMA)
+        self._conn.commit()
+        # Per-stage counters for this process
+        self.session_stats: Dict[str, Dict[str, int]] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def reopen(self) -> None:
+        """
+        Gives a forked worker process its own connection (an SQLite connection must not be
+        used on both sides of a fork). The inherited one is left unclosed: closing it in the
+        child could release locks the parent still relies on.
+        """
+        self._lock = threading.Lock()
+        self._inherited_conn = self._conn
+        self._conn = self._connect()
+        self.session_stats = {}
+
+    def get(self, stage: str, key: SegmentKey, params: str) -> Any:
+        """
+        Looks up a result.
+
+        Args:
+            stage (str): Stage name ('diarization', 'asr', 'acoustic', 'emotion')
+            key (SegmentKey): (content id, start sample, end sample)
+            params (str): Parameter fingerprint of the stage (see `fingerprint`)
+
+        Returns:
+            Any: The cached value, or `MISS`
+        """
+        source, start, end = key
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM results WHERE stage=? AND source=? AND start_sample=? "
+                "AND end_sample=? AND params=?", (stage, source, start, end, params)
+            ).fetchone()
+            self._record(stage, "hits" if row is not None else "misses")
+        return json.loads(row[0]) if row is not None else MISS
+
+    def put(self, stage: str, key: SegmentKey, params: str, value: Any) -> None:
+        """
+        Stores a result. Values that are not JSON-serializable are silently not cached.
+
+        Args:
+            stage (str): Stage name
+            key (SegmentKey): (content id, start sample, end sample)
+            params (str): Parameter fingerprint of the stage
+            value (Any): The stage output
+        """
+        try:
+            encoded = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return
+        source, start, end = key
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (stage, source, start, end, params, encoded, time.time())
+                )
+                self._conn.commit()
+            except sqlite3.OperationalError as e:
+                # e.g. the database is locked by another process for longer than the timeout
+                print(f"⚠ Could not store {stage} result in the result cache: {e}")
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Returns a copy of the per-stage hit/miss counters of this process."""
+        with self._lock:
+            return {stage: dict(counts) for stage, counts in self.session_stats.items()}
+
+    def entry_counts(self) -> Dict[str, int]:
+        """Returns the number of stored entries per stage."""
+        with self._lock:
+            rows = self._conn.execute("SELECT stage, COUNT(*) FROM results GROUP BY stage").fetchall()
+        return dict(rows)
+
+    def clear(self) -> None:
+        """Deletes every cached result."""
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._conn.commit()
+            self._conn.execute("VACUUM")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def print_report(self, since: Optional[Dict[str, Dict[str, int]]] = None) -> None:
+        """
+        Prints hit rates per stage.
+
+        Args:
+            since (Optional[Dict[str, Dict[str, int]]]): A `stats()` snapshot; only lookups
+                                                         after it are reported (e.g. one run)
+        """
+        since = since or {}
+        entries = self.entry_counts()
+        print("Result cache:")
+        for stage, counts in sorted(self.stats().items()):
+            hits = counts.get("hits", 0) - since.get(stage, {}).get("hits", 0)
+            misses = counts.get("misses", 0) - since.get(stage, {}).get("misses", 0)
+            if hits + misses == 0:
+                continue
+            print(f"  {stage:<12} hits {hits}, misses {misses} "
+                  f"({hits / (hits + misses) * 100:.0f}% hit rate), {entries.get(stage, 0)} entries stored")
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        print(f"  size         {format_bytes(size)} in {self.path}")
+
+    def _record(self, stage: str, outcome: str) -> None:
+        counts = self.session_stats.setdefault(stage, {"hits": 0, "misses": 0})
+        counts[outcome] += 1
@@ -0,0 +1,491 @@
+"""
+Analysis Server Module
+Keeps one AnalysisPipeline (all models loaded) alive and serves jobs over a local
+HTTP or Unix-socket API.
+
+Loading the five models takes longer than analyzing a short clip, so a daemon that
+loads them once removes that cost from every request. Jobs are queued and run one at
+a time on a single worker thread (the pipeline and its models are not shared between
+concurrent runs); the HTTP side only accepts jobs and reports on them.
+
+Endpoints:
+    GET    /health             Liveness, uptime and job totals
+    GET    /queue              Queue depth and the running job
+    POST   /jobs               Submit a job: JSON {"path": ..., "num_speakers": 2} or raw audio
+                               bytes (?filename=x.wav&num_speakers=2). Add ?wait=1 to block
+                               until the result is ready instead of receiving a job id.
+    GET    /jobs               All known jobs
+    GET    /jobs/<id>          Status of one job
+    GET    /jobs/<id>/result   The job's output JSON (once finished)
+    DELETE /jobs/<id>          Cancel a queued job
+"""
+
+import json
+import os
+import queue
+import re
+import socket
+import socketserver
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse, parse_qs
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_OUTPUT_DIR = os.path.join(".", "data", "server", "output")
+DEFAULT_UPLOAD_DIR = os.path.join(".", "data", "server", "uploads")
+
+_UPLOAD_CHUNK_BYTES = 1024 * 1024
+_JOB_PATH = re.compile(r"^/jobs/([0-9a-f]+)(/result)?$")
+
+
+def parse_speakers(value: Any, default: int) -> int:
+    """
+    Reads a job's `num_speakers` (JSON value or query string).
+
+    Args:
+        value (Any): The client's value (None when not given)
+        default (int): Speakers to use when the client did not say
+
+    Returns:
+        int: Number of speakers (>= 1)
+
+    Raises:
+        ValueError: If the value is not a positive whole number
+    """
+    if value is None:
+        return default
+    try:
+        if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+            raise TypeError
+        speakers = int(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f"num_speakers must be a whole number, got {value!r}")
+    if speakers < 1:
+        raise ValueError(f"num_speakers must be at least 1, got {speakers}")
+    return speakers
+
+
+def parse_wait(value: Any, default: bool = False) -> bool:
+    """
+    Reads a job's `wait` flag from the JSON body.
+
+    Only JSON booleans are accepted: a string such as "false" would otherwise be truthy.
+
+    Args:
+        value (Any): The client's value (None when not given)
+        default (bool): Flag to use when the client did not say (e.g. from the query string)
+
+    Returns:
+        bool: Whether the request waits for the result
+
+    Raises:
+        ValueError: If the value is not a JSON boolean
+    """
+    if value is None:
+        return default
+    if not isinstance(value, bool):
+        raise ValueError(f"wait must be true or false, got {value!r}")
+    return value
+
+
+class Job:
+    """
+    One analysis request.
+
+    Attributes:
+        job_id (str): Identifier returned to the client
+        audio_path (str): File to analyze (the saved upload for uploaded audio)
+        num_speakers (int): Speakers to diarize
+        uploaded (bool): True if `audio_path` is a temporary upload (deleted after the run)
+        source_name (str): Name reported for the recording (the client's filename for uploads)
+        status (str): 'queued', 'running', 'done', 'failed' or 'cancelled'
+        output_path (str): Where the pipeline writes the result JSON
+    """
+
+    def __init__(self, job_id: str, audio_path: str, num_speakers: int, uploaded: bool, output_path: str,
+                 source_name: Optional[str] = None):
+        self.job_id = job_id
+        self.audio_path = audio_path
+        self.num_speakers = num_speakers
+        self.uploaded = uploaded
+        self.source_name = source_name or os.path.basename(audio_path)
+        self.output_path = output_path
+        self.status = "queued"
+        self.error: Optional[str] = None
+        self.summary: Optional[Dict[str, Any]] = None
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.done = threading.Event()
+
+    def to_dict(self) -> Dict[str, Any]:
+        info = {
+            "job_id": self.job_id,
+            "status": self.status,
+            "file": self.source_name,
+            "num_speakers": self.num_speakers,
+            "created": round(self.created, 3),
+        }
+        if self.started is not None:
+            info["queue_seconds"] = round(self.started - self.created, 3)
+        if self.finished is not None and self.started is not None:
+            info["run_seconds"] = round(self.finished - self.started, 3)
+        if self.error:
+            info["error"] = self.error
+        if self.summary is not None:
+            info["segment_count"] = self.summary.get("segment_count")
+            info["metrics"] = self.summary.get("metrics")
+        return info
+
+
+class AnalysisServer:
+    """
+    Job queue in front of a loaded pipeline.
+
+    `pipeline` only needs a `run(audio_file_path, output_json_path, num_speakers)` method
+    returning a summary dict or None (for uploads it is also given `source_name`, the
+    client's filename, and `link_audio=False`, since the saved upload is deleted after the
+    run), so the server can be exercised on localhost with a stand-in pipeline that loads
+    no models.
+    """
+
+    def __init__(self, pipeline, output_dir: str = DEFAULT_OUTPUT_DIR, upload_dir: str = DEFAULT_UPLOAD_DIR,
+                 max_queue: int = 100, max_upload_bytes: int = 1024 ** 3, keep_finished: int = 1000,
+                 default_speakers: int = 2):
+        """
+        Args:
+            pipeline: Loaded AnalysisPipeline (or anything with the same `run` signature)
+            output_dir (str): Directory for result JSONs (<job_id>.json)
+            upload_dir (str): Directory for uploaded audio while it waits to be analyzed
+            max_queue (int): Jobs accepted beyond this many queued ones are rejected
+            max_upload_bytes (int): Largest accepted upload
+            keep_finished (int): Finished jobs remembered for status queries (oldest are forgotten)
+            default_speakers (int): Speakers to diarize when a job does not say
+        """
+        self.pipeline = pipeline
+        self.output_dir = output_dir
+        self.upload_dir = upload_dir
+        self.max_queue = max_queue
+        self.max_upload_bytes = max_upload_bytes
+        self.keep_finished = keep_finished
+        self.default_speakers = default_speakers
+        os.makedirs(output_dir, exist_ok=True)
+        os.makedirs(upload_dir, exist_ok=True)
+
+        self.started_at = time.time()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue()
+        self._running: Optional[Job] = None
+        self._totals = {"done": 0, "failed": 0, "cancelled": 0}
+        self._worker = threading.Thread(target=self._work, name="analysis-worker", daemon=True)
+        self._worker.start()
+
+    def new_job(self, audio_path: str, num_speakers: int = 2, uploaded: bool = False,
+                job_id: Optional[str] = None, source_name: Optional[str] = None) -> Job:
+        """
+        Queues a job.
+
+        Raises:
+            OverflowError: If the queue is full
+        """
+        job_id = job_id or uuid.uuid4().hex[:12]
+        job = Job(job_id, audio_path, num_speakers, uploaded, os.path.join(self.output_dir, f"{job_id}.json"),
+                  source_name=source_name)
+        with self._lock:
+            if sum(1 for queued in self._jobs.values() if queued.status == "queued") >= self.max_queue:
+                raise OverflowError(f"queue is full ({self.max_queue} jobs waiting)")
+            self._jobs[job_id] = job
+            self._forget_old_jobs()
+        self._queue.put(job)
+        return job
+
+    def upload_path(self, job_id: str, filename: str) -> str:
+        """Where the upload of `job_id` is stored (keeps the extension for the decoder)."""
+        extension = os.path.splitext(os.path.basename(filename or ""))[1].lower() or ".wav"
+        return os.path.join(self.upload_dir, f"{job_id}{extension}")
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"jobs": [job.to_dict() for job in self._jobs.values()]}
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancels a queued job (running jobs finish). Returns the job, or None if unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.status == "queued":
+                job.status = "cancelled"
+                self._totals["cancelled"] += 1
+        if job is not None and job.status == "cancelled":
+            self._discard_upload(job)
+            job.done.set()
+        return job
+
+    def queue_state(self) -> Dict[str, Any]:
+        """Queue depth and the running job (for GET /queue)."""
+        with self._lock:
+            queued = [job.job_id for job in self._jobs.values() if job.status == "queued"]
+            running = self._running.to_dict() if self._running is not None else None
+        return {"queued": len(queued), "queued_jobs": queued, "running": running, "max_queue": self.max_queue}
+
+    def health(self) -> Dict[str, Any]:
+        """Liveness and totals (for GET /health)."""
+        with self._lock:
+            totals = dict(self._totals)
+            queued = sum(1 for job in self._jobs.values() if job.status == "queued")
+            busy = self._running is not None
+        return {
+            "status": "ok" if self._worker.is_alive() else "worker_stopped",
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "busy": busy,
+            "queued": queued,
+            "jobs": totals,
+        }
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stops the worker after the running job (queued jobs are left unprocessed)."""
+        self._queue.put(None)
+        self._worker.join(timeout)
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            with self._lock:
+                if job.status != "queued":
+                    continue  # cancelled while waiting
+                job.status, job.started = "running", time.time()
+                self._running = job
+            try:
+                if job.uploaded:
+                    # The output names the client's file; the index gets no link to the deleted upload
+                    summary = self.pipeline.run(job.audio_path, job.output_path, job.num_speakers,
+                                                source_name=job.source_name, link_audio=False)
+                else:
+                    summary = self.pipeline.run(job.audio_path, job.output_path, job.num_speakers)
+                status, error = ("done", None) if summary is not None else ("failed", "analysis failed (see server log)")
+            except Exception as e:
+                summary, status, error = None, "failed", f"{type(e).__name__}: {e}"
+            finally:
+                self._discard_upload(job)
+            with self._lock:
+                job.summary, job.status, job.error, job.finished = summary, status, error, time.time()
+                self._totals[status] += 1
+                self._running = None
+            job.done.set()
+
+    def _forget_old_jobs(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.done.is_set()]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
+
+    @staticmethod
+    def _discard_upload(job: Job) -> None:
+        if job.uploaded and os.path.exists(job.audio_path):
+            try:
+                os.remove(job.audio_path)
+            except OSError:
+                pass
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """Routes the HTTP API onto `self.server.app` (an AnalysisServer)."""
+
+    server_version = "AudioAnalysisServer/1.0"
+
+    def do_GET(self) -> None:
+        app: AnalysisServer = self.server.app
+        path = urlparse(self.path).path.rstrip("/") or "/"
+        if path == "/health":
+            return self._send_json(200, app.health())
+        if path == "/queue":
+            return self._send_json(200, app.queue_state())
+        if path == "/jobs":
+            return self._send_json(200, app.list_jobs())
+        match = _JOB_PATH.match(path)
+        if not match:
+            return self._send_json(404, {"error": f"unknown endpoint {path}"})
+        job = app.get(match.group(1))
+        if job is None:
+            return self._send_json(404, {"error": "unknown job"})
+        if not match.group(2):
+            return self._send_json(200, job.to_dict())
+        if job.status != "done":
+            return self._send_json(409, {"error": f"job is {job.status}", "job": job.to_dict()})
+        self._send_file(job.output_path)
+
+    def do_POST(self) -> None:
+        app: AnalysisServer = self.server.app
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/jobs":
+            return self._send_json(404, {"error": f"unknown endpoint {url.path}"})
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        length = self.headers.get("Content-Length")
+        if length is None or not length.isdigit():
+            return self._send_json(411, {"error": "Content-Length required"})
+        length = int(length)
+        content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+        if length > app.max_upload_bytes:
+            # Neither a JSON body nor an upload is buffered beyond the limit
+            self._discard_body(length)
+            return self._send_json(413, {"error": f"request body exceeds {app.max_upload_bytes} bytes"})
+
+        try:
+            if content_type == "application/json":
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if not isinstance(body, dict):
+                    return self._send_json(400, {"error": "JSON body must be an object"})
+                audio_path = body.get("path")
+                if not isinstance(audio_path, str) or not os.path.isfile(audio_path):
+                    return self._send_json(400, {"error": f"file not found: {audio_path}"})
+                num_speakers = parse_speakers(body.get("num_speakers"), app.default_speakers)
+                wait = parse_wait(body.get("wait"), default=query.get("wait") in ("1", "true"))
+                job = app.new_job(os.path.abspath(audio_path), num_speakers)
+            else:
+                if length == 0:
+                    return self._send_json(400, {"error": "empty upload"})
+                try:
+                    num_speakers = parse_speakers(query.get("num_speakers"), app.default_speakers)
+                except ValueError:
+                    self._discard_body(length)
+                    raise
+                job_id = uuid.uuid4().hex[:12]
+                filename = os.path.basename(query.get("filename", ""))
+                upload_path = app.upload_path(job_id, filename)
+                self._save_body(length, upload_path)
+                try:
+                    job = app.new_job(upload_path, num_speakers, uploaded=True, job_id=job_id,
+                                      source_name=filename or None)
+                except OverflowError:
+                    os.remove(upload_path)
+                    raise
+                wait = query.get("wait") in ("1", "true")
+        except OverflowError as e:
+            return self._send_json(503, {"error": str(e)})
+        except (ValueError, TypeError) as e:
+            # Malformed JSON (JSONDecodeError is a ValueError) or a field of the wrong type
+            return self._send_json(400, {"error": f"bad request: {e}"})
+
+        if not wait:
+            return self._send_json(202, job.to_dict())
+        job.done.wait()
+        if job.status != "done":
+            return self._send_json(500, job.to_dict())
+        self._send_file(job.output_path)
+
+    def do_DELETE(self) -> None:
+        match = _JOB_PATH.match(urlparse(self.path).path.rstrip("/"))
+        if not match or match.group(2):
+            return self._send_json(404, {"error": "unknown endpoint"})
+        job = self.server.app.cancel(match.group(1))
+        if job is None:
+            return self._send_json(404, {"error": "unknown job"})
+        status = 200 if job.status == "cancelled" else 409
+        self._send_json(status, job.to_dict())
+
+    def address_string(self) -> str:
+        # Unix-socket clients have no address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        print(f"[server] {self.address_string()} {format % args}")
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_file(self, path: str) -> None:
+        try:
+            size = os.path.getsize(path)
+            with open(path, "rb") as f:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(size))
+                self.end_headers()
+                while True:
+                    chunk = f.read(_UPLOAD_CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
+        except OSError as e:
+            self._send_json(410, {"error": f"result no longer available: {e}"})
+
+    def _save_body(self, length: int, path: str) -> None:
+        remaining = length
+        with open(path, "wb") as f:
+            while remaining > 0:
+                chunk = self.rfile.read(min(_UPLOAD_CHUNK_BYTES, remaining))
+                if not chunk:
+                    break
+                f.write(chunk)
+                remaining -= len(chunk)
+        if remaining:
+            os.remove(path)
+            raise ValueError("upload ended early")
+
+    def _discard_body(self, length: int) -> None:
+        while length > 0:
+            chunk = self.rfile.read(min(_UPLOAD_CHUNK_BYTES, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_http_server(app: AnalysisServer, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                     unix_socket: Optional[str] = None):
+    """
+    Creates the HTTP server for an AnalysisServer (call `serve_forever()` on it).
+
+    Args:
+        app (AnalysisServer): The job queue to expose
+        host (str): Interface to bind; the default only accepts connections from this machine
+        port (int): TCP port (0 picks a free one; see `server_address`)
+        unix_socket (Optional[str]): Serve on this Unix socket path instead of TCP
+
+    Returns:
+        socketserver.BaseServer: The bound (not yet serving) server
+    """
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            # A stale socket from a previous run would make bind fail
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(unix_socket)
+                raise OSError(f"another server is already listening on {unix_socket}")
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.remove(unix_socket)
+            finally:
+                probe.close()
+        server = _UnixHTTPServer(unix_socket, _RequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), _RequestHandler)
+        server.daemon_threads = True
+    server.app = app
+    return server
+
+
+def describe_address(server) -> str:
+    """Human-readable address of a server from `make_http_server`."""
+    address = server.server_address
+    if isinstance(address, tuple):
+        return f"http://{address[0]}:{address[1]}"
+    return f"unix:{address}"
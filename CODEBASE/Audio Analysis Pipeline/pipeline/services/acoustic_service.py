@@ -1,12 +1,167 @@
 """
 Acoustic Service
 Extracts objective acoustic features from audio using parselmouth-praat.
+
+Features can be extracted in-process (`process`) or on a pool of worker processes
+(`submit` / `result`). Pool workers read segments from a shared-memory copy of the
+decoded recording, so only offsets are sent to them - never pickled sample arrays.
 """
 
-import parselmouth
+import os
+import sys
+import threading
+import weakref
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import resource_tracker, shared_memory
+
 import numpy as np
 from typing import Dict, Optional, Any
 
+from ..audio_segment import AudioInput, AudioSegmentView, as_float32_samples, peak_amplitude
+from ..result_cache import ResultCache, MISS, fingerprint, library_version, segment_key, source_digest
+
+# A small floor to prevent Praat from crashing on near-silence
+SILENCE_THRESHOLD = 0.01
+
+
+def extract_acoustic_features(samples: np.ndarray, sample_rate: int,
+                              silence_threshold: float = SILENCE_THRESHOLD) -> Optional[Dict[str, Any]]:
+    """
+    Analyzes audio samples for pitch, jitter, shimmer, and HNR.
+
+    Module-level so that pool workers run exactly the same code as the in-process path.
+
+    Args:
+        samples (np.ndarray): 1D float32 samples
+        sample_rate (int): Sample rate in Hz
+        silence_threshold (float): Peak amplitude below which the segment is treated as silence
+
+    Returns:
+        Optional[Dict[str, Any]]: pitch_mean_f0, jitter_local, shimmer_local and hnr_mean,
+                                  or None if the segment is silent or Praat fails
+    """
+    # Check for silence to prevent Praat crashes
+    if samples.size == 0 or peak_amplitude(samples) < silence_threshold:
+        return None
+
+    # Imported on first use (cached by Python after that), so importing the pipeline stays cheap
+    import parselmouth
+
+    try:
+        # Load audio slice into parselmouth
+        # (Praat stores float64 samples, so this is the one unavoidable copy)
+        snd = parselmouth.Sound(samples, sampling_frequency=sample_rate)
+
+        # Get pitch
+        # Pitch floor/ceiling appropriate for human speech
+        pitch = snd.to_pitch(pitch_floor=75.0, pitch_ceiling=600.0)
+        # Use Praat call to get mean pitch
+        mean_f0 = parselmouth.praat.call(pitch, "Get mean", 0, 0, "Hertz")
+
+        # Get jitter and shimmer
+        # PointProcess is needed for jitter/shimmer calculations
+        point_process = parselmouth.praat.call(pitch, "To PointProcess")
+        jitter_local = parselmouth.praat.call(
+            point_process, "Get jitter (local)",
+            0.0, 0.0, 0.0001, 0.02, 1.3
+        )
+        shimmer_local = parselmouth.praat.call(
+            [snd, point_process], "Get shimmer (local)",
+            0.0, 0.0, 0.0001, 0.02, 1.3, 1.6
+        )
+
+        # Get HNR (Harmonics-to-Noise Ratio)
+        harmonicity = snd.to_harmonicity(time_step=0.01, minimum_pitch=75.0)
+        # Use Praat call to get mean HNR
+        hnr = parselmouth.praat.call(harmonicity, "Get mean", 0, 0)
+
+        return {
+            "pitch_mean_f0": mean_f0 if not np.isnan(mean_f0) else None,
+            "jitter_local": jitter_local if not np.isnan(jitter_local) else None,
+            "shimmer_local": shimmer_local if not np.isnan(shimmer_local) else None,
+            "hnr_mean": hnr if not np.isnan(hnr) else None
+        }
+
+    except Exception as e:
+        # Praat errors are common on very short or unusual audio
+        # We must not crash the whole pipeline
+        print(f"⚠ Could not process acoustic features: {e}")
+        return None
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """Attaches to an existing segment without registering it with the resource tracker."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before 3.13 attaching registers the segment too, and the tracker would unlink it
+    # (or warn about a leak) when this worker exits; only the creating process owns it
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+# Worker-side cache of the attached recording (one recording is processed at a time)
+_attached: Dict[str, Any] = {}
+
+
+def _extract_shared(name: str, length: int, start: int, end: int, sample_rate: int,
+                    silence_threshold: float) -> Optional[Dict[str, Any]]:
+    """Pool worker entry point: extracts features from a window of a shared recording."""
+    if _attached.get("name") != name:
+        previous = _attached.pop("shm", None)
+        if previous is not None:
+            previous.close()
+        _attached["shm"] = _attach_shared_memory(name)
+        _attached["name"] = name
+    buffer = np.ndarray((length,), dtype=np.float32, buffer=_attached["shm"].buf)
+    try:
+        return extract_acoustic_features(buffer[start:end], sample_rate, silence_threshold)
+    finally:
+        del buffer
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class SharedAudioBuffer:
+    """
+    A decoded recording copied once into shared memory for the acoustic worker pool.
+
+    Use as a context manager; the segment is unlinked on exit.
+
+    Attributes:
+        name (str): Shared-memory segment name
+        length (int): Number of float32 samples
+        source (np.ndarray): The recording that was shared (segment views must refer to it)
+    """
+
+    def __init__(self, buffer: np.ndarray):
+        self.source = buffer
+        self.length = len(buffer)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, buffer.nbytes))
+        self.name = self._shm.name
+        shared = np.ndarray((self.length,), dtype=np.float32, buffer=self._shm.buf)
+        shared[:] = buffer
+        del shared
+
+    def close(self) -> None:
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self) -> "SharedAudioBuffer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
 
 class AcousticService:
     """
@@ -16,77 +171,191 @@ class AcousticService:
     Provides quantitative, physical features of speech.
     """
 
-    def __init__(self, sample_rate: int = 16000):
+    def __init__(self, sample_rate: int = 16000, workers: int = 0,
+                 result_cache: Optional[ResultCache] = None):
         """
         Initializes the service.
 
         Args:
             sample_rate (int): The sample rate of the incoming audio
+            workers (int): Size of the feature-extraction process pool; 0 extracts in-process.
+                           The pool is started here, so construct the service before loading
+                           large models to keep the forked workers small.
+            result_cache (Optional[ResultCache]): Features of segments seen before are
+                                                  returned from this cache
         """
         self.sample_rate = sample_rate
-        # A small floor to prevent Praat from crashing on near-silence
-        self.silence_threshold = 0.01
+        self.silence_threshold = SILENCE_THRESHOLD
+        self.workers = max(0, int(workers))
+        self.result_cache = result_cache
+        self.cache_params = fingerprint(
+            sample_rate=sample_rate, silence_threshold=self.silence_threshold,
+            parselmouth=library_version("praat-parselmouth"), code=source_digest(__file__)
+        )
+        self._context = multiprocessing.get_context(
+            "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+        )
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Stage threads submit and resolve concurrently; the lock makes sure that a broken
+        # pool is replaced by exactly one new pool (and that no pool is left running)
+        self._pool_lock = threading.Lock()
+        # Pool that ran each pending future, so a failure only discards that pool
+        self._future_pools: "weakref.WeakKeyDictionary[Future, ProcessPoolExecutor]" = weakref.WeakKeyDictionary()
+        if self.workers > 0:
+            self._start_pool()
+            print(f"✓ Acoustic feature pool started ({self.workers} worker processes)")
+
+    @property
+    def parallel(self) -> bool:
+        """True when features are extracted on the process pool."""
+        return self.workers > 0
 
-    def process(self, audio_slice: np.ndarray) -> Optional[Dict[str, Any]]:
+    def lookup(self, audio_slice: AudioInput) -> Any:
         """
-        Analyzes an audio slice for pitch, jitter, shimmer, and HNR.
+        Cached features of a segment.
+
+        `process` consults the cache itself; callers of `submit` should look segments up
+        first and only queue the misses (`result` stores what the pool computes).
+
+        Returns:
+            Any: The cached features (possibly None), or `MISS`
+        """
+        key = segment_key(audio_slice) if self.result_cache is not None else None
+        return self.result_cache.get("acoustic", key, self.cache_params) if key is not None else MISS
+
+    def store(self, audio_slice: AudioInput, features: Optional[Dict[str, Any]]) -> None:
+        """Adds a segment's features to the result cache (no-op without one)."""
+        key = segment_key(audio_slice) if self.result_cache is not None else None
+        if key is not None:
+            self.result_cache.put("acoustic", key, self.cache_params, features)
+
+    def share(self, buffer: np.ndarray) -> SharedAudioBuffer:
+        """
+        Copies a decoded recording into shared memory once, for `submit`.
 
         Args:
-            audio_slice (np.ndarray): The 1D audio array (at 16kHz)
+            buffer (np.ndarray): The full 1D float32 recording
 
         Returns:
-            Optional[Dict[str, Any]]: A dictionary of features containing:
-                - pitch_mean_f0: Mean fundamental frequency (Hz)
-                - jitter_local: Local jitter (vocal stability measure)
-                - shimmer_local: Local shimmer (amplitude variation)
-                - hnr_mean: Mean Harmonics-to-Noise Ratio (voice quality)
-            Returns None if analysis fails.
+            SharedAudioBuffer: Context manager owning the shared segment
+        """
+        return SharedAudioBuffer(np.ascontiguousarray(buffer, dtype=np.float32))
 
-        Note:
-            Praat is fragile and will fail on very short or silent audio.
-            This method handles failures gracefully to prevent pipeline crashes.
+    def submit(self, shared: SharedAudioBuffer, audio_slice: AudioSegmentView) -> Future:
         """
-        # Check for silence to prevent Praat crashes
-        if audio_slice.size == 0 or np.max(np.abs(audio_slice)) < self.silence_threshold:
-            return None
+        Queues feature extraction for a segment of a shared recording on the pool.
+
+        Only the segment name and sample offsets are sent to the worker.
 
+        Args:
+            shared (SharedAudioBuffer): The shared recording (from `share`)
+            audio_slice (AudioSegmentView): A view onto `shared.source`
+
+        Returns:
+            Future: Resolve it with `result`
+        """
+        executor = self._pool()
         try:
-            # Load audio slice into parselmouth
-            snd = parselmouth.Sound(audio_slice, sampling_frequency=self.sample_rate)
-
-            # Get pitch
-            # Pitch floor/ceiling appropriate for human speech
-            pitch = snd.to_pitch(pitch_floor=75.0, pitch_ceiling=600.0)
-            # Use Praat call to get mean pitch
-            mean_f0 = parselmouth.praat.call(pitch, "Get mean", 0, 0, "Hertz")
-
-            # Get jitter and shimmer
-            # PointProcess is needed for jitter/shimmer calculations
-            point_process = parselmouth.praat.call(pitch, "To PointProcess")
-            jitter_local = parselmouth.praat.call(
-                point_process, "Get jitter (local)",
-                0.0, 0.0, 0.0001, 0.02, 1.3
-            )
-            shimmer_local = parselmouth.praat.call(
-                [snd, point_process], "Get shimmer (local)",
-                0.0, 0.0, 0.0001, 0.02, 1.3, 1.6
+            future = executor.submit(
+                _extract_shared, shared.name, shared.length, audio_slice.start_sample,
+                audio_slice.end_sample, self.sample_rate, self.silence_threshold
             )
+        except BrokenProcessPool as e:
+            # Surface it through the future so `result` retries the segment in isolation
+            future = Future()
+            future.set_exception(e)
+        with self._pool_lock:
+            self._future_pools[future] = executor
+        return future
 
-            # Get HNR (Harmonics-to-Noise Ratio)
-            harmonicity = snd.to_harmonicity(time_step=0.01, minimum_pitch=75.0)
-            # Use Praat call to get mean HNR
-            hnr = parselmouth.praat.call(harmonicity, "Get mean", 0, 0)
+    def result(self, future: Future, shared: SharedAudioBuffer,
+               audio_slice: AudioSegmentView) -> Optional[Dict[str, Any]]:
+        """
+        Waits for a submitted segment.
 
-            return {
-                "pitch_mean_f0": mean_f0 if not np.isnan(mean_f0) else None,
-                "jitter_local": jitter_local if not np.isnan(jitter_local) else None,
-                "shimmer_local": shimmer_local if not np.isnan(shimmer_local) else None,
-                "hnr_mean": hnr if not np.isnan(hnr) else None
-            }
+        Praat errors are handled inside the worker exactly as in `process`. If the worker
+        process itself died (e.g. a native crash), the segment is retried serially in a
+        fresh single-worker pool, so one bad segment never takes down the others.
 
+        Returns:
+            Optional[Dict[str, Any]]: Same result as `process` for this segment
+        """
+        try:
+            features = future.result()
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                # The shared pool is unusable now; a new one is started for later submissions
+                with self._pool_lock:
+                    executor = self._future_pools.get(future)
+                if executor is not None:
+                    self._discard_pool(executor)
+            print(f"⚠ Acoustic worker failed ({type(e).__name__}), retrying segment in isolation")
+            return self._run_isolated(shared, audio_slice)
+        self.store(audio_slice, features)
+        return features
+
+    def close(self) -> None:
+        """Shuts down the worker pool (a later `submit` starts a new one)."""
+        with self._pool_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        """The running pool, started first if there is none (or the last one broke)."""
+        with self._pool_lock:
+            if self._executor is None:
+                self._start_pool()
+            return self._executor
+
+    def _discard_pool(self, executor: ProcessPoolExecutor) -> None:
+        """Drops a broken pool, unless another thread has already replaced it."""
+        with self._pool_lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _start_pool(self) -> None:
+        executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=self._context)
+        # Start the workers now rather than on first use (see __init__)
+        for future in [executor.submit(_ping) for _ in range(self.workers)]:
+            future.result()
+        self._executor = executor
+
+    def _run_isolated(self, shared: SharedAudioBuffer,
+                      audio_slice: AudioSegmentView) -> Optional[Dict[str, Any]]:
+        try:
+            with ProcessPoolExecutor(max_workers=1, mp_context=self._context) as executor:
+                return executor.submit(
+                    _extract_shared, shared.name, shared.length, audio_slice.start_sample,
+                    audio_slice.end_sample, self.sample_rate, self.silence_threshold
+                ).result()
         except Exception as e:
-            # Praat errors are common on very short or unusual audio
-            # We must not crash the whole pipeline
             print(f"⚠ Could not process acoustic features: {e}")
             return None
 
+    def process(self, audio_slice: AudioInput) -> Optional[Dict[str, Any]]:
+        """
+        Analyzes an audio slice for pitch, jitter, shimmer, and HNR.
+
+        Args:
+            audio_slice (AudioInput): An AudioSegmentView or 1D audio array (at 16kHz)
+
+        Returns:
+            Optional[Dict[str, Any]]: A dictionary of features containing:
+                - pitch_mean_f0: Mean fundamental frequency (Hz)
+                - jitter_local: Local jitter (vocal stability measure)
+                - shimmer_local: Local shimmer (amplitude variation)
+                - hnr_mean: Mean Harmonics-to-Noise Ratio (voice quality)
+            Returns None if analysis fails.
+
+        Note:
+            Praat is fragile and will fail on very short or silent audio.
+            This method handles failures gracefully to prevent pipeline crashes.
+        """
+        features = self.lookup(audio_slice)
+        if features is MISS:
+            features = extract_acoustic_features(as_float32_samples(audio_slice), self.sample_rate,
+                                                 self.silence_threshold)
+            self.store(audio_slice, features)
+        return features
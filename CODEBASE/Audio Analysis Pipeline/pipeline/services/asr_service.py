@@ -7,11 +7,44 @@ import os
 import warnings
 warnings.filterwarnings('ignore')
 
-import torch
 import numpy as np
-from faster_whisper import WhisperModel
 from typing import Optional
 
+from ..audio_segment import AudioInput, as_float32_samples
+from ..result_cache import ResultCache, MISS, fingerprint, library_version, segment_key, source_digest
+
+
+def whisper_revision(model_name: str) -> Optional[str]:
+    """
+    Revision of the Whisper weights a model name resolves to.
+
+    For hub models this is the commit of the downloaded snapshot; for a local model
+    directory, the size and mtime of its `model.bin`. Updated weights under the same
+    name therefore miss the old result-cache entries.
+
+    Args:
+        model_name (str): Model size / hub id (e.g. "base.en") or a local CTranslate2 model directory
+
+    Returns:
+        Optional[str]: The revision, or None if the weights cannot be located
+    """
+    path = model_name
+    if not os.path.isdir(path):
+        try:
+            from faster_whisper.utils import download_model
+            path = download_model(model_name, local_files_only=True)
+        except Exception:
+            return None
+    path = os.path.normpath(path)
+    if os.path.basename(os.path.dirname(path)) == "snapshots":
+        # Hugging Face cache layout: .../models--<org>--<name>/snapshots/<commit>
+        return os.path.basename(path)
+    try:
+        stat = os.stat(os.path.join(path, "model.bin"))
+    except OSError:
+        return None
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
 
 class ASRService:
     """
@@ -24,7 +57,10 @@ class ASRService:
         self,
         model_name: str = "base.en",
         device: Optional[str] = None,
-        compute_type: Optional[str] = None
+        compute_type: Optional[str] = None,
+        result_cache: Optional[ResultCache] = None,
+        cpu_threads: int = 0,
+        num_workers: int = 1
     ):
         """
         Initializes the ASR service.
@@ -34,7 +70,14 @@ class ASRService:
             device (Optional[str]): Preferred device ("cuda", "cpu", "auto"). Defaults to auto-detect.
             compute_type (Optional[str]): ctranslate2 compute type. If omitted we select sensible defaults
                                           per device. Float16 is automatically downgraded on CPU.
+            result_cache (Optional[ResultCache]): Transcripts of segments seen before are
+                                                  returned from this cache
+            cpu_threads (int): CTranslate2 threads per transcription on CPU (0 = library default)
+            num_workers (int): Transcriptions that may run concurrently (one per calling thread)
         """
+        # Heavy imports are deferred to construction, so importing the pipeline stays cheap
+        from faster_whisper import WhisperModel
+
         requested_device = (
             device
             or os.environ.get("ASR_DEVICE")
@@ -52,16 +95,27 @@ class ASRService:
         self.model = WhisperModel(
             model_name,
             device=self.device,
-            compute_type=self.compute_type
+            compute_type=self.compute_type,
+            cpu_threads=cpu_threads,
+            num_workers=num_workers
+        )
+        threads = f", {num_workers}×{cpu_threads or 'default'} CPU threads" if self.device == "cpu" else ""
+        print(f"ASRService loaded model '{model_name}' on {self.device} with {self.compute_type}{threads}.")
+
+        self.result_cache = result_cache
+        # Everything that changes the transcript; a change simply misses the old cache entries
+        self.cache_params = fingerprint(
+            model=model_name, revision=whisper_revision(model_name),
+            device=self.device, compute_type=self.compute_type, language="en",
+            faster_whisper=library_version("faster-whisper"), code=source_digest(__file__)
         )
-        print(f"ASRService loaded model '{model_name}' on {self.device} with {self.compute_type}.")
 
-    def process(self, audio_slice: np.ndarray) -> str:
+    def process(self, audio_slice: AudioInput) -> str:
         """
-        Transcribes a single audio slice (NumPy array).
+        Transcribes a single audio slice.
 
         Args:
-            audio_slice (np.ndarray): The 1D audio array (at 16kHz)
+            audio_slice (AudioInput): An AudioSegmentView or 1D audio array (at 16kHz)
 
         Returns:
             str: The transcribed text
@@ -72,17 +126,25 @@ class ASRService:
         if audio_slice.size == 0:
             return ""
 
+        key = segment_key(audio_slice) if self.result_cache is not None else None
+        if key is not None:
+            cached = self.result_cache.get("asr", key, self.cache_params)
+            if cached is not MISS:
+                return cached
+
         try:
-            # faster-whisper expects a 16kHz float32 NumPy array
-            if audio_slice.dtype != np.float32:
-                audio_slice = audio_slice.astype(np.float32)
+            # faster-whisper expects a 16kHz float32 NumPy array (already true for
+            # pipeline buffers, so this is a view rather than a copy)
+            samples = as_float32_samples(audio_slice)
 
             # We are transcribing short, pre-segmented audio
-            segments, _ = self.model.transcribe(audio_slice, language="en")
+            segments, _ = self.model.transcribe(samples, language="en")
 
             # Concatenate segments for a single transcript
             transcript = " ".join(segment.text for segment in segments).strip()
 
+            if key is not None:
+                self.result_cache.put("asr", key, self.cache_params, transcript)
             return transcript
         except Exception as e:
             print(f"⚠ ASR processing error: {e}")
@@ -92,6 +154,8 @@ class ASRService:
         """
         Decide which device to use across platforms with graceful fallbacks.
         """
+        import torch
+
         normalized = (requested_device or "auto").lower()
 
         if normalized == "cpu":
@@ -6,7 +6,7 @@ Encapsulates the pyannote.audio pipeline for speaker diarization.
 import warnings
 import os
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Union, TYPE_CHECKING
 
 # Suppress deprecation warnings for better performance
 warnings.filterwarnings('ignore', category=UserWarning)
@@ -16,14 +16,13 @@ warnings.filterwarnings('ignore', category=FutureWarning)
 # Suppress torchaudio backend warnings
 os.environ['PYTHONWARNINGS'] = 'ignore::UserWarning'
 
-import torch
-import torchaudio
-from pyannote.audio import Pipeline
+import numpy as np
 
-try:
-    from huggingface_hub import HfFolder
-except ImportError:
-    HfFolder = None
+if TYPE_CHECKING:
+    import torch
+
+from ..audio_cache import file_content_hash
+from ..result_cache import ResultCache, MISS, buffer_digest, fingerprint, library_version, source_digest
 
 
 class DiarizationService:
@@ -34,7 +33,8 @@ class DiarizationService:
     This service answers the question: "Who spoke, and when?"
     """
 
-    def __init__(self, model_name: str = "pyannote/speaker-diarization-3.1", auth_token: Optional[str] = None):
+    def __init__(self, model_name: str = "pyannote/speaker-diarization-3.1", auth_token: Optional[str] = None,
+                 result_cache: Optional[ResultCache] = None):
         """
         Initializes the service by loading the diarization pipeline.
 
@@ -43,11 +43,17 @@ class DiarizationService:
             auth_token (Optional[str]): Hugging Face auth token. If omitted, we look for
                                         HF_TOKEN / HUGGINGFACEHUB_API_TOKEN env vars or
                                         cached CLI credentials.
+            result_cache (Optional[ResultCache]): Diarizations of audio seen before are
+                                                  returned from this cache
 
         Raises:
             ValueError: If no auth token can be found
             RuntimeError: If the model fails to load
         """
+        # Heavy imports are deferred to construction, so importing the pipeline stays cheap
+        import torch
+        from pyannote.audio import Pipeline
+
         hf_token, token_source = self._resolve_hf_token(auth_token)
         if hf_token is None:
             raise ValueError(
@@ -85,14 +91,24 @@ class DiarizationService:
             print(f"Error loading pyannote pipeline: {e}")
             raise
 
-    def process(self, audio_file_path: str, num_speakers: int = 2) -> List[Dict[str, Any]]:
+        self.result_cache = result_cache
+        self.cache_params = fingerprint(
+            model=model_name, device=device_str,
+            pyannote=library_version("pyannote.audio"), code=source_digest(__file__)
+        )
+
+    def process(self, audio: Union[str, np.ndarray], num_speakers: int = 2,
+                sample_rate: int = 16000) -> List[Dict[str, Any]]:
         """
-        Processes a single audio file to identify speaker segments.
+        Identifies speaker segments in an audio file or an already-decoded buffer.
 
         Args:
-            audio_file_path (str): The path to the audio file
+            audio (Union[str, np.ndarray]): Either the path to the audio file, or the
+                                            1D mono float32 array the pipeline has already
+                                            decoded (preferred - avoids a second decode)
             num_speakers (int): The number of speakers to detect
                               (default: 2, for clinical practitioner-patient conversations)
+            sample_rate (int): Sample rate of `audio` when a buffer is passed (default: 16000)
 
         Returns:
             List[Dict[str, Any]]: A list of segment dictionaries, each containing:
@@ -103,19 +119,35 @@ class DiarizationService:
         Note:
             Returns an empty list if diarization fails.
         """
+        key, params = None, None
+        if self.result_cache is not None:
+            # Keyed on the content of exactly what is diarized (e.g. the VAD-compacted buffer)
+            if isinstance(audio, str):
+                key = (file_content_hash(audio), 0, 0)
+            else:
+                key = (buffer_digest(audio), 0, len(audio))
+            params = fingerprint(model=self.cache_params, num_speakers=num_speakers, sample_rate=sample_rate)
+            cached = self.result_cache.get("diarization", key, params)
+            if cached is not MISS:
+                return cached
+
         try:
-            # Load audio with torchaudio and prepare for pyannote.audio 4.0.1
-            # This works around torchcodec issues on Windows
-            waveform, sample_rate = torchaudio.load(audio_file_path)
+            if isinstance(audio, str):
+                # Load audio with torchaudio and prepare for pyannote.audio 4.0.1
+                # This works around torchcodec issues on Windows
+                import torchaudio
+                waveform, sample_rate = torchaudio.load(audio)
+            else:
+                waveform = self._wrap_buffer(audio)
 
             # Prepare audio dictionary format required by pyannote.audio 4.0.1
-            audio = {
+            audio_input = {
                 'waveform': waveform,
                 'sample_rate': sample_rate
             }
 
             # The pipeline is configured for a specific number of speakers
-            diarization_output = self.pipeline(audio, num_speakers=num_speakers)
+            diarization_output = self.pipeline(audio_input, num_speakers=num_speakers)
 
             segments = []
             # Handle different pyannote.audio API versions:
@@ -137,11 +169,27 @@ class DiarizationService:
                 }
                 segments.append(seg_dict)
 
+            if key is not None and segments:
+                self.result_cache.put("diarization", key, params, segments)
             return segments
         except Exception as e:
             print(f"Error during diarization processing: {e}")
             return []
 
+    @staticmethod
+    def _wrap_buffer(audio_array: np.ndarray) -> "torch.Tensor":
+        """
+        Wrap a decoded mono buffer as a (1, N) tensor without copying the samples.
+
+        torch.from_numpy shares memory with the array, and unsqueeze only adds a view,
+        so pyannote reads the exact buffer the pipeline already holds.
+        """
+        import torch
+        if audio_array.dtype != np.float32 or not audio_array.flags.c_contiguous:
+            # Only hit for callers that bypass load_and_resample_audio
+            audio_array = np.ascontiguousarray(audio_array, dtype=np.float32)
+        return torch.from_numpy(audio_array).unsqueeze(0)
+
     def _resolve_hf_token(self, auth_token: Optional[str]) -> Tuple[Optional[str], str]:
         """
         Resolve the Hugging Face token from multiple sources for robustness.
@@ -156,6 +204,10 @@ class DiarizationService:
             if value:
                 return value.strip(), f"environment variable {env_var}"
 
+        try:
+            from huggingface_hub import HfFolder
+        except ImportError:
+            HfFolder = None
         if HfFolder:
             stored = HfFolder.get_token()
             if stored:
@@ -11,10 +11,15 @@ Supports flexible modes: 'dual_audio' or 'triple_ensemble'
 import warnings
 warnings.filterwarnings('ignore')
 
-import torch
 import numpy as np
-from transformers import AutoFeatureExtractor, AutoModelForAudioClassification, pipeline
-from typing import Dict, Optional, Any, Literal
+from typing import Dict, Optional, Any, Literal, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import torch
+
+from ..audio_segment import AudioInput, as_float32_samples, peak_amplitude, zero_mean_unit_variance
+from ..metrics import MetricsCollector, measure
+from ..result_cache import ResultCache, MISS, fingerprint, library_version, segment_key, source_digest
 
 
 class EmotionService:
@@ -38,7 +43,8 @@ class EmotionService:
                  hubert_model: str = "superb/hubert-base-superb-er",
                  wav2vec2_model: str = "ehcalabres/wav2vec2-lg-xlsr-en-speech-emotion-recognition",
                  text_model: str = "j-hartmann/emotion-english-distilroberta-base",
-                 sample_rate: int = 16000):
+                 sample_rate: int = 16000,
+                 result_cache: Optional[ResultCache] = None):
         """
         Initializes the triple ensemble emotion service.
 
@@ -48,7 +54,13 @@ class EmotionService:
             wav2vec2_model: Wav2Vec2 model for phonetic analysis (8 emotions)
             text_model: Text model for semantic analysis (7 emotions)
             sample_rate: Audio sample rate (16000 Hz)
+            result_cache: Predictions for segments seen before (same audio, transcript and
+                          acoustic features) are returned from this cache
         """
+        # Heavy imports are deferred to construction, so importing the pipeline stays cheap
+        import torch
+        from transformers import AutoFeatureExtractor, AutoModelForAudioClassification, pipeline
+
         self.mode = mode
         # Detect device: CUDA (NVIDIA) > MPS (Apple Silicon) > CPU
         if torch.cuda.is_available():
@@ -63,6 +75,8 @@ class EmotionService:
             print(f"EmotionService: Using CPU (GPU not available)")
         
         self.sample_rate = sample_rate
+        # Optional per-model timing, set by the pipeline for each run
+        self.metrics: Optional[MetricsCollector] = None
 
         try:
             # Load MODEL 1: HuBERT (prosody-focused, 4 emotions)
@@ -105,12 +119,25 @@ class EmotionService:
             print(f"Error loading emotion models: {e}")
             raise
 
-    def process(self, audio_slice: np.ndarray, transcript: str = "", acoustic_features: Optional[Dict] = None) -> Optional[Dict[str, Any]]:
+        self.result_cache = result_cache
+        # Model ids and hub revisions; swapping any model misses the old cache entries
+        text_revision = None
+        if self.text_classifier is not None:
+            text_revision = getattr(self.text_classifier.model.config, "_commit_hash", None)
+        self.cache_params = fingerprint(
+            mode=mode, sample_rate=sample_rate, device=self.device,
+            hubert=[hubert_model, getattr(self.hubert_model.config, "_commit_hash", None)],
+            wav2vec2=[wav2vec2_model, getattr(self.wav2vec2_model.config, "_commit_hash", None)],
+            text=[text_model, text_revision] if mode == 'triple_ensemble' else None,
+            transformers=library_version("transformers"), code=source_digest(__file__)
+        )
+
+    def process(self, audio_slice: AudioInput, transcript: str = "", acoustic_features: Optional[Dict] = None) -> Optional[Dict[str, Any]]:
         """
         Predicts emotion using TRIPLE ENSEMBLE (or dual-audio mode) with quality filtering.
 
         Args:
-            audio_slice (np.ndarray): The 1D audio array (at 16kHz)
+            audio_slice (AudioInput): An AudioSegmentView or 1D audio array (at 16kHz)
             transcript (str): The text transcript of the audio
             acoustic_features (Optional[Dict]): Pre-computed acoustic features (pitch, jitter, etc.)
 
@@ -131,48 +158,69 @@ class EmotionService:
                 - method (str): 'dual_audio' or 'triple_ensemble'
             Returns None if analysis fails.
         """
+        samples = as_float32_samples(audio_slice)
+
         # Quality check: Segment too short or empty
-        duration = len(audio_slice) / self.sample_rate
-        if audio_slice.size == 0 or duration < 0.3:  # Minimum 0.3 seconds
+        duration = len(samples) / self.sample_rate
+        if samples.size == 0 or duration < 0.3:  # Minimum 0.3 seconds
             return None
 
         # Quality check: Very quiet (likely silence)
-        if np.max(np.abs(audio_slice)) < 0.01:
+        if peak_amplitude(samples) < 0.01:
             return None
 
+        # The prediction also depends on the transcript and acoustic features, so they are part of the key
+        key = segment_key(audio_slice) if self.result_cache is not None else None
+        if key is not None:
+            params = fingerprint(model=self.cache_params, transcript=transcript or "",
+                                 acoustic_features=acoustic_features)
+            cached = self.result_cache.get("emotion", key, params)
+            if cached is not MISS:
+                return cached
+
         result = {}
+        # Set when a model raised; such (possibly transient) failures are not cached
+        failed = False
+        # Normalized samples are computed at most once and shared by both audio models
+        normalized_cache = {}
 
         # 1. HuBERT analysis (prosody)
         try:
-            hubert_emotion = self._analyze_hubert(audio_slice)
+            with measure(self.metrics, "emotion.hubert"):
+                hubert_emotion = self._analyze_hubert(samples, normalized_cache)
             if hubert_emotion:
                 result['hubert_emotion'] = hubert_emotion['label']
                 result['hubert_score'] = hubert_emotion['score']
         except Exception as e:
             print(f"⚠ HuBERT analysis failed: {e}")
+            failed = True
             result['hubert_emotion'] = None
             result['hubert_score'] = 0.0
 
         # 2. Wav2Vec2 analysis (phonetic)
         try:
-            wav2vec2_emotion = self._analyze_wav2vec2(audio_slice)
+            with measure(self.metrics, "emotion.wav2vec2"):
+                wav2vec2_emotion = self._analyze_wav2vec2(samples, normalized_cache)
             if wav2vec2_emotion:
                 result['wav2vec2_emotion'] = wav2vec2_emotion['label']
                 result['wav2vec2_score'] = wav2vec2_emotion['score']
         except Exception as e:
             print(f"⚠ Wav2Vec2 analysis failed: {e}")
+            failed = True
             result['wav2vec2_emotion'] = None
             result['wav2vec2_score'] = 0.0
 
         # 3. Text analysis (semantic) - only if triple mode and transcript available
         if self.mode == 'triple_ensemble' and transcript and transcript.strip():
             try:
-                text_emotion = self._analyze_text(transcript)
+                with measure(self.metrics, "emotion.text"):
+                    text_emotion = self._analyze_text(transcript)
                 if text_emotion:
                     result['text_emotion'] = text_emotion['label']
                     result['text_score'] = text_emotion['score']
             except Exception as e:
                 print(f"⚠ Text analysis failed: {e}")
+                failed = True
                 result['text_emotion'] = None
                 result['text_score'] = 0.0
         else:
@@ -182,16 +230,17 @@ class EmotionService:
         # 4. COMBINE all predictions with acoustic features
         final = self._combine_predictions(result, acoustic_features)
 
+        if key is not None and final and not failed:
+            self.result_cache.put("emotion", key, params, final)
         return final if final else None
 
-    def _analyze_hubert(self, audio_slice: np.ndarray) -> Optional[Dict[str, Any]]:
+    def _analyze_hubert(self, samples: np.ndarray,
+                        normalized_cache: Optional[Dict[str, np.ndarray]] = None) -> Optional[Dict[str, Any]]:
         """Analyze emotion using HuBERT (prosody: tone, pitch, rhythm)."""
         try:
-            inputs = self.hubert_extractor(
-                audio_slice,
-                sampling_rate=self.sample_rate,
-                return_tensors="pt",
-                padding=True
+            import torch
+            inputs = build_model_inputs(
+                self.hubert_extractor, samples, self.sample_rate, normalized_cache
             )
             inputs = {k: v.to(self.device) for k, v in inputs.items()}
 
@@ -208,14 +257,13 @@ class EmotionService:
         except Exception as e:
             return None
 
-    def _analyze_wav2vec2(self, audio_slice: np.ndarray) -> Optional[Dict[str, Any]]:
+    def _analyze_wav2vec2(self, samples: np.ndarray,
+                        normalized_cache: Optional[Dict[str, np.ndarray]] = None) -> Optional[Dict[str, Any]]:
         """Analyze emotion using Wav2Vec2 (phonetic: articulation under emotion)."""
         try:
-            inputs = self.wav2vec2_extractor(
-                audio_slice,
-                sampling_rate=self.sample_rate,
-                return_tensors="pt",
-                padding=True
+            import torch
+            inputs = build_model_inputs(
+                self.wav2vec2_extractor, samples, self.sample_rate, normalized_cache
             )
             inputs = {k: v.to(self.device) for k, v in inputs.items()}
 
@@ -714,3 +762,50 @@ class EmotionService:
 
         return 'neu'  # Default to neutral if unknown
 
+
+def build_model_inputs(extractor, samples: np.ndarray, sample_rate: int,
+                       normalized_cache: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, "torch.Tensor"]:
+    """
+    Build model inputs for one unpadded segment without the feature extractor's copies.
+
+    For raw-waveform extractors (Wav2Vec2FeatureExtractor: one feature, optional
+    zero-mean/unit-variance normalization) the result is identical to calling the
+    extractor with padding=True on a single segment: the padding is a no-op and an
+    all-ones attention mask is equivalent to passing none. The tensor wraps the
+    segment (or its one normalized copy) via torch.from_numpy. Any other extractor
+    type falls back to the regular extractor call.
+
+    Args:
+        extractor: A HuggingFace feature extractor
+        samples (np.ndarray): Contiguous float32 segment samples
+        sample_rate (int): Sample rate of `samples`
+        normalized_cache (Optional[Dict[str, np.ndarray]]): Per-segment dict used to share
+                                                            the normalized copy between models
+
+    Returns:
+        Dict[str, torch.Tensor]: Keyword arguments for the audio classification model
+    """
+    is_raw_waveform_extractor = (
+        getattr(extractor, "feature_size", None) == 1
+        and hasattr(extractor, "do_normalize")
+        and getattr(extractor, "sampling_rate", sample_rate) == sample_rate
+    )
+    if not is_raw_waveform_extractor:
+        return dict(extractor(
+            samples,
+            sampling_rate=sample_rate,
+            return_tensors="pt",
+            padding=True
+        ))
+
+    if extractor.do_normalize:
+        if normalized_cache is None:
+            normalized_cache = {}
+        if "normalized" not in normalized_cache:
+            normalized_cache["normalized"] = zero_mean_unit_variance(samples)
+        values = normalized_cache["normalized"]
+    else:
+        values = samples
+
+    import torch
+    return {"input_values": torch.from_numpy(values).unsqueeze(0)}
@@ -0,0 +1,312 @@
+"""
+Stage Executor Module
+Runs per-segment analysis stages as a dependency graph, so different segments are
+in different stages at the same time and independent stages of one segment run
+side by side.
+
+Every stage declares the fields it reads and writes ('audio' is the segment's
+audio slice; the rest live in the segment's output dict). StageGraph derives the
+execution order from these declarations, and a segment enters a stage as soon as
+all of its inputs exist: acoustics does not wait for ASR, while emotion waits for
+both. faster-whisper (CTranslate2) and parselmouth release the GIL while they
+compute, so this overlap is real parallelism. The number of segments in flight is
+bounded, and results are yielded in input order.
+"""
+
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_QUEUE_SIZE = 4
+# Per-segment stages of AnalysisPipeline, in registration order
+SEGMENT_STAGES = ("asr", "acoustic", "emotion")
+# Everything AnalysisPipeline can run (selectable with --stages)
+PIPELINE_STAGES = ("diarize",) + SEGMENT_STAGES
+
+# Field every segment starts with: its audio slice
+AUDIO_FIELD = "audio"
+
+# Data flow of the built-in segment stages: (inputs, optional inputs, outputs).
+# Optional inputs are waited for only if a registered stage produces them.
+SEGMENT_STAGE_FIELDS = {
+    "asr": ((AUDIO_FIELD,), (), ("transcript",)),
+    "acoustic": ((AUDIO_FIELD,), (), ("acoustic_features",)),
+    "emotion": ((AUDIO_FIELD,), ("transcript", "acoustic_features"), ("predicted_emotion",)),
+}
+
+
+class Stage:
+    """
+    One step of the per-segment pipeline.
+
+    Attributes:
+        name (str): Stage name (used in thread names and worker-count knobs)
+        fn (Callable[[Dict[str, Any]], None]): Works on a segment's payload dict in place
+        workers (int): Number of threads running this stage concurrently
+        inputs (Optional[Tuple[str, ...]]): Fields the stage reads. None means "after the
+                                            previous stage in the list" (a plain chain)
+        optional_inputs (Tuple[str, ...]): Fields read if some stage produces them
+        outputs (Tuple[str, ...]): Fields the stage writes
+    """
+
+    def __init__(self, name: str, fn: Callable[[Dict[str, Any]], None], workers: int = 1,
+                 inputs: Optional[Sequence[str]] = None, outputs: Sequence[str] = (),
+                 optional_inputs: Sequence[str] = ()):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, int(workers))
+        self.inputs = tuple(inputs) if inputs is not None else None
+        self.optional_inputs = tuple(optional_inputs)
+        self.outputs = tuple(outputs)
+
+
+def segment_stage(name: str, fn: Callable[[Dict[str, Any]], None], workers: int = 1) -> Stage:
+    """Builds one of the built-in segment stages with its declared data flow."""
+    inputs, optional_inputs, outputs = SEGMENT_STAGE_FIELDS[name]
+    return Stage(name, fn, workers, inputs=inputs, outputs=outputs, optional_inputs=optional_inputs)
+
+
+class StageGraph:
+    """
+    Execution order and dependencies of a set of stages, derived from their fields.
+
+    Raises ValueError for duplicate stage names, a field written by two stages, a
+    required input that nothing produces, or a dependency cycle.
+    """
+
+    def __init__(self, stages: List[Stage], sources: Sequence[str] = (AUDIO_FIELD,)):
+        """
+        Args:
+            stages (List[Stage]): Stages in registration order (ties in the order keep it)
+            sources (Sequence[str]): Fields every segment has before any stage runs
+        """
+        names = [stage.name for stage in stages]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate stage names in {', '.join(names)}")
+
+        producers: Dict[str, str] = {}
+        for stage in stages:
+            for field in stage.outputs:
+                if field in producers:
+                    raise ValueError(f"Field '{field}' is written by both '{producers[field]}' and '{stage.name}'")
+                producers[field] = stage.name
+
+        self.dependencies: Dict[str, Tuple[str, ...]] = {}
+        for position, stage in enumerate(stages):
+            if stage.inputs is None:
+                deps = [stages[position - 1].name] if position > 0 else []
+            else:
+                deps = []
+                for field in stage.inputs + stage.optional_inputs:
+                    if field in producers:
+                        deps.append(producers[field])
+                    elif field not in sources and field in stage.inputs:
+                        raise ValueError(f"Stage '{stage.name}' needs '{field}', which no stage produces")
+            if stage.name in deps:
+                raise ValueError(f"Stage '{stage.name}' depends on its own output")
+            self.dependencies[stage.name] = tuple(dict.fromkeys(deps))
+
+        self.dependents: Dict[str, List[str]] = {name: [] for name in names}
+        for name, deps in self.dependencies.items():
+            for dep in deps:
+                self.dependents[dep].append(name)
+
+        # Kahn's algorithm in waves: each level only depends on earlier levels
+        by_name = {stage.name: stage for stage in stages}
+        done: set = set()
+        self.levels: List[List[Stage]] = []
+        while len(done) < len(stages):
+            level = [by_name[name] for name in names
+                     if name not in done and all(dep in done for dep in self.dependencies[name])]
+            if not level:
+                cycle = [name for name in names if name not in done]
+                raise ValueError(f"Dependency cycle between stages {', '.join(cycle)}")
+            self.levels.append(level)
+            done.update(stage.name for stage in level)
+        self.order: List[Stage] = [stage for level in self.levels for stage in level]
+
+    def describe(self) -> str:
+        """Execution plan, e.g. 'asr | acoustic -> emotion' (| = in parallel)."""
+        return " -> ".join(" | ".join(stage.name for stage in level) for level in self.levels)
+
+
+class _Item:
+    __slots__ = ("index", "payload", "error", "waiting", "remaining", "lock")
+
+    def __init__(self, index: int, payload: Dict[str, Any], waiting: Dict[str, int], remaining: int):
+        self.index = index
+        self.payload = payload
+        self.error: Optional[BaseException] = None
+        # Unfinished dependencies per stage, and stages still to run
+        self.waiting = waiting
+        self.remaining = remaining
+        self.lock = threading.Lock()
+
+
+class StageExecutor:
+    """
+    Dependency-driven executor: a feeder thread, `workers` threads per stage and one
+    queue per stage. A segment is queued for a stage once all of the stage's
+    dependencies have finished it; the consumer receives payloads strictly in input order.
+
+    A stage that raises marks the item as failed; stages that have not started on it
+    skip it and the exception is re-raised to the consumer when that item's turn comes,
+    so errors surface in the same order as in a serial loop.
+    """
+
+    _DONE = object()
+
+    def __init__(self, stages: List[Stage], queue_size: int = DEFAULT_QUEUE_SIZE):
+        """
+        Args:
+            stages (List[Stage]): Stages in registration order (see StageGraph)
+            queue_size (int): Segments in flight per stage; at most
+                              queue_size x (stages + 1) segments are in flight in total
+        """
+        if not stages:
+            raise ValueError("StageExecutor needs at least one stage")
+        self.graph = StageGraph(stages)
+        self.stages = self.graph.order
+        self.queue_size = max(1, int(queue_size))
+        self.max_in_flight = self.queue_size * (len(stages) + 1)
+
+    def run(self, payloads: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Pushes every payload through all stages.
+
+        Args:
+            payloads (Iterable[Dict[str, Any]]): Per-segment payload dicts (mutated in place)
+
+        Yields:
+            Dict[str, Any]: The processed payloads, in input order
+        """
+        stop = threading.Event()
+        slots = threading.Semaphore(self.max_in_flight)
+        stage_queues = {stage.name: queue.Queue() for stage in self.stages}
+        done_queue: queue.Queue = queue.Queue()
+        threads = [threading.Thread(target=self._feed, args=(payloads, stage_queues, done_queue, slots, stop),
+                                    name="stage-feeder", daemon=True)]
+        for stage in self.stages:
+            for worker in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._work, args=(stage, stage_queues, done_queue, stop),
+                    name=f"stage-{stage.name}-{worker}", daemon=True))
+        for thread in threads:
+            thread.start()
+
+        # Reorder buffer: segments finish out of order when stages have several workers
+        pending: Dict[int, _Item] = {}
+        next_index, total = 0, None
+        try:
+            while total is None or next_index < total:
+                item = done_queue.get()
+                if isinstance(item, tuple) and item[0] is self._DONE:
+                    total = item[1]
+                    continue
+                pending[item.index] = item
+                while next_index in pending:
+                    ready = pending.pop(next_index)
+                    next_index += 1
+                    slots.release()
+                    if ready.error is not None:
+                        raise ready.error
+                    yield ready.payload
+        finally:
+            stop.set()
+            for stage in self.stages:
+                for _ in range(stage.workers):
+                    stage_queues[stage.name].put(self._DONE)
+
+    def _feed(self, payloads: Iterable[Dict[str, Any]], stage_queues: Dict[str, queue.Queue],
+              done_queue: queue.Queue, slots: threading.Semaphore, stop: threading.Event) -> None:
+        dependencies = self.graph.dependencies
+        roots = [stage.name for stage in self.stages if not dependencies[stage.name]]
+        fed = 0
+        try:
+            for index, payload in enumerate(payloads):
+                while not slots.acquire(timeout=0.5):
+                    if stop.is_set():
+                        return
+                if stop.is_set():
+                    return
+                item = _Item(index, payload, {name: len(deps) for name, deps in dependencies.items()},
+                             len(self.stages))
+                fed += 1
+                for name in roots:
+                    stage_queues[name].put(item)
+        finally:
+            done_queue.put((self._DONE, fed))
+
+    def _work(self, stage: Stage, stage_queues: Dict[str, queue.Queue],
+              done_queue: queue.Queue, stop: threading.Event) -> None:
+        dependents = self.graph.dependents[stage.name]
+        in_queue = stage_queues[stage.name]
+        while not stop.is_set():
+            try:
+                item = in_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if item is self._DONE:
+                break
+            if item.error is None:
+                try:
+                    stage.fn(item.payload)
+                except BaseException as e:
+                    item.error = e
+            # Release the dependents whose last dependency this was
+            with item.lock:
+                item.remaining -= 1
+                finished = item.remaining == 0
+                ready = []
+                for name in dependents:
+                    item.waiting[name] -= 1
+                    if item.waiting[name] == 0:
+                        ready.append(name)
+            for name in ready:
+                stage_queues[name].put(item)
+            if finished:
+                done_queue.put(item)
+
+
+def parse_stage_workers(spec: Optional[str], stage_names: Tuple[str, ...]) -> Dict[str, int]:
+    """
+    Parses a worker-count knob such as 'asr=1,acoustic=2,emotion=1'.
+
+    Args:
+        spec (Optional[str]): Comma-separated name=count pairs; unspecified stages get 1
+        stage_names (Tuple[str, ...]): Valid stage names
+
+    Returns:
+        Dict[str, int]: Worker count per stage
+    """
+    workers = {name: 1 for name in stage_names}
+    if not spec:
+        return workers
+    for part in spec.split(","):
+        name, _, count = part.strip().partition("=")
+        name = name.strip()
+        if name not in workers or not count.strip().isdigit() or int(count) < 1:
+            raise ValueError(f"Invalid stage worker spec '{part}'. "
+                             f"Expected name=count with name in {', '.join(stage_names)}")
+        workers[name] = int(count)
+    return workers
+
+
+def parse_stages(spec: Optional[str]) -> Tuple[str, ...]:
+    """
+    Parses a stage selection such as 'diarize,asr' or 'asr,acoustic'.
+
+    Args:
+        spec (Optional[str]): Comma-separated stage names, or None/'all' for every stage
+
+    Returns:
+        Tuple[str, ...]: The selected stages in pipeline order
+    """
+    if not spec or spec.strip() == "all":
+        return PIPELINE_STAGES
+    selected = {name.strip() for name in spec.split(",") if name.strip()}
+    unknown = selected.difference(PIPELINE_STAGES)
+    if unknown or not selected:
+        raise ValueError(f"Invalid stage selection '{spec}'. "
+                         f"Expected a comma-separated subset of {', '.join(PIPELINE_STAGES)}")
+    return tuple(name for name in PIPELINE_STAGES if name in selected)
@@ -0,0 +1,420 @@
+"""
+Streaming Analysis Module
+Incremental turn detection and per-turn analysis for live consultations.
+
+PCM arrives in small chunks (a file replayed at real-time speed, or raw PCM on stdin).
+An online energy endpointer closes a turn once the speaker has been silent for
+`end_silence_ms`, or after `max_turn_seconds` of continuous speech, so no turn waits
+for the end of the recording. Closed turns go through the same ASR, acoustic and
+emotion services as the file pipeline, pipelined on the StageExecutor, and every
+result is emitted as soon as it is ready together with its end-to-end latency
+(from the arrival of the turn's last sample to the emitted result).
+
+Pyannote needs the whole recording, so speaker labels come from channel energy when
+the stream has one speaker per channel; mono streams get turns without speaker labels.
+"""
+
+import collections
+import queue
+import sys
+import threading
+import time
+import numpy as np
+from typing import Any, BinaryIO, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import audio_utilities as au
+from .audio_segment import AudioSegmentView, SEGMENT_PADDING_SECONDS
+from .metrics import MetricsCollector, measure
+from .stage_executor import StageExecutor, SEGMENT_STAGES, segment_stage
+
+DEFAULT_CHUNK_SECONDS = 0.25
+DEFAULT_LATENCY_TARGET_SECONDS = 3.0
+# Raw PCM layouts accepted on stdin (little-endian, interleaved channels)
+PCM_FORMATS = {"s16le": "<i2", "f32le": "<f4"}
+
+Turn = Tuple[int, int, int]
+
+
+def replay_file(file_path: str, chunk_seconds: float = DEFAULT_CHUNK_SECONDS, speed: float = 1.0,
+                keep_channels: bool = False, sample_rate: int = 16000, **load_options: Any) -> Iterator[np.ndarray]:
+    """
+    Yields a decoded recording in chunks, paced as if it were being recorded.
+
+    A chunk is yielded once its last sample would have been captured, i.e. at
+    (chunk end / sample rate) / speed seconds after the first chunk.
+
+    Args:
+        file_path (str): Audio file to replay
+        chunk_seconds (float): Chunk length in seconds
+        speed (float): Replay speed (1.0 = real time); 0 yields as fast as possible
+        keep_channels (bool): Yield (channels, samples) chunks instead of the mono mix
+        sample_rate (int): Sample rate to decode to
+        **load_options: Passed to `load_and_resample_audio` (cache, backend)
+
+    Yields:
+        np.ndarray: float32 chunks, 1D or (channels, samples)
+    """
+    audio, sample_rate = au.load_and_resample_audio(file_path, sample_rate, keep_channels=keep_channels,
+                                                    **load_options)
+    chunk = max(1, int(chunk_seconds * sample_rate))
+    started = time.perf_counter()
+    for offset in range(0, audio.shape[-1], chunk):
+        end = min(offset + chunk, audio.shape[-1])
+        if speed > 0:
+            delay = started + end / sample_rate / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        yield audio[..., offset:end]
+
+
+def read_pcm_stream(stream: BinaryIO, chunk_seconds: float = DEFAULT_CHUNK_SECONDS, channels: int = 1,
+                    pcm_format: str = "s16le", sample_rate: int = 16000) -> Iterator[np.ndarray]:
+    """
+    Yields chunks of raw interleaved PCM read from a binary stream (e.g. stdin).
+
+    Args:
+        stream (BinaryIO): Source of raw PCM, read until EOF
+        chunk_seconds (float): Chunk length in seconds
+        channels (int): Interleaved channels in the stream
+        pcm_format (str): 's16le' or 'f32le'
+        sample_rate (int): Sample rate of the stream
+
+    Yields:
+        np.ndarray: float32 chunks, 1D for mono or (channels, samples)
+    """
+    dtype = np.dtype(PCM_FORMATS[pcm_format])
+    frame_bytes = dtype.itemsize * channels
+    chunk_bytes = max(1, int(chunk_seconds * sample_rate)) * frame_bytes
+    while True:
+        data = stream.read(chunk_bytes)
+        if not data:
+            return
+        usable = len(data) - len(data) % frame_bytes
+        if usable == 0:
+            return
+        samples = np.frombuffer(data[:usable], dtype=dtype)
+        if dtype.kind == "i":
+            samples = samples.astype(np.float32) / 32768.0
+        else:
+            samples = samples.astype(np.float32)
+        yield samples if channels == 1 else samples.reshape(-1, channels).T
+
+
+def latency_percentiles(latencies: List[float]) -> Dict[str, Optional[float]]:
+    """p50/p90/p95/p99/max of a list of latencies in seconds (None when empty)."""
+    if not latencies:
+        return {"p50": None, "p90": None, "p95": None, "p99": None, "max": None}
+    p50, p90, p95, p99 = np.percentile(latencies, [50, 90, 95, 99])
+    return {"p50": round(float(p50), 3), "p90": round(float(p90), 3), "p95": round(float(p95), 3),
+            "p99": round(float(p99), 3), "max": round(float(max(latencies)), 3)}
+
+
+class StreamingTurnDetector:
+    """
+    Online frame-energy endpointer.
+
+    Uses the same adaptive threshold as VoiceActivityDetector, computed over a sliding
+    window of recent frames instead of the whole recording. Turns are returned as
+    (start_sample, end_sample, dominant_channel) as soon as they end.
+    """
+
+    def __init__(self,
+                 sample_rate: int = 16000,
+                 frame_ms: float = 30.0,
+                 margin_db: float = 12.0,
+                 floor_db: float = -55.0,
+                 end_silence_ms: float = 600.0,
+                 min_turn_ms: float = 300.0,
+                 max_turn_seconds: float = 10.0,
+                 noise_window_seconds: float = 30.0):
+        """
+        Initializes the detector.
+
+        Args:
+            sample_rate (int): Sample rate in Hz
+            frame_ms (float): Frame length in milliseconds
+            margin_db (float): How far above the noise floor a frame must be to count as speech
+            floor_db (float): Absolute minimum threshold (dBFS)
+            end_silence_ms (float): Silence that ends a turn (the endpointing delay)
+            min_turn_ms (float): Shorter turns (clicks, coughs) are dropped
+            max_turn_seconds (float): Longer speech is cut into turns of this length, which
+                                      bounds how long a result can wait for its turn to end
+            noise_window_seconds (float): History used to track the noise floor
+        """
+        self.sample_rate = sample_rate
+        self.frame_samples = max(1, int(sample_rate * frame_ms / 1000))
+        self.margin_db = margin_db
+        self.floor_db = floor_db
+        self.end_silence_frames = max(1, int(end_silence_ms / frame_ms))
+        self.min_turn_frames = max(1, int(min_turn_ms / frame_ms))
+        self.max_turn_frames = max(self.min_turn_frames, int(max_turn_seconds * 1000 / frame_ms))
+        self._history: Deque[float] = collections.deque(maxlen=max(1, int(noise_window_seconds * 1000 / frame_ms)))
+        self._pending: Optional[np.ndarray] = None  # (channels, samples) shorter than one frame
+        self._frame_index = 0
+        self._turn_start: Optional[int] = None
+        self._last_speech = 0
+        self._turn_energy: Optional[np.ndarray] = None
+
+    @property
+    def open_turn_start(self) -> Optional[int]:
+        """First sample of the turn in progress, or None between turns."""
+        return self._turn_start * self.frame_samples if self._turn_start is not None else None
+
+    def push(self, chunk: np.ndarray) -> List[Turn]:
+        """
+        Feeds the next chunk of audio.
+
+        Args:
+            chunk (np.ndarray): 1D mono or (channels, samples) float32 samples
+
+        Returns:
+            List[Turn]: Turns that ended within this chunk
+        """
+        chunk = chunk.reshape(1, -1) if chunk.ndim == 1 else chunk
+        if self._pending is not None and self._pending.shape[1]:
+            chunk = np.concatenate([self._pending, chunk], axis=1)
+        num_frames = chunk.shape[1] // self.frame_samples
+        self._pending = chunk[:, num_frames * self.frame_samples:]
+        if num_frames == 0:
+            return []
+
+        frames = chunk[:, :num_frames * self.frame_samples].reshape(chunk.shape[0], num_frames, self.frame_samples)
+        channel_energy = np.einsum("cij,cij->ci", frames, frames, dtype=np.float64) / self.frame_samples
+        energy_db = 10.0 * np.log10(channel_energy.mean(axis=0) + 1e-12)
+        self._history.extend(energy_db.tolist())
+        noise_floor_db, loud_db = np.percentile(self._history, [10, 95])
+        threshold_db = max(self.floor_db, min(noise_floor_db + self.margin_db, loud_db - 6.0))
+
+        turns = []
+        for k in range(num_frames):
+            frame = self._frame_index
+            self._frame_index += 1
+            speech = energy_db[k] > threshold_db
+            if self._turn_start is None:
+                if speech:
+                    self._turn_start, self._last_speech = frame, frame
+                    self._turn_energy = channel_energy[:, k].copy()
+                continue
+            if speech:
+                self._last_speech = frame
+                self._turn_energy += channel_energy[:, k]
+            if frame - self._last_speech >= self.end_silence_frames:
+                self._close(self._last_speech + 1, turns)
+            elif frame + 1 - self._turn_start >= self.max_turn_frames:
+                # Continuous speech: cut here and carry on with a new turn
+                self._close(frame + 1, turns)
+                self._turn_start, self._last_speech = frame + 1, frame
+                self._turn_energy = np.zeros(chunk.shape[0])
+        return turns
+
+    def flush(self) -> List[Turn]:
+        """Ends the stream, closing a turn that is still open."""
+        turns = []
+        if self._turn_start is not None:
+            self._close(self._last_speech + 1, turns)
+        return turns
+
+    def _close(self, end_frame: int, turns: List[Turn]) -> None:
+        if end_frame - self._turn_start >= self.min_turn_frames:
+            turns.append((self._turn_start * self.frame_samples, end_frame * self.frame_samples,
+                          int(np.argmax(self._turn_energy))))
+        self._turn_start, self._turn_energy = None, None
+
+
+class StreamingAnalyzer:
+    """
+    Runs turn detection on incoming chunks and ASR, acoustics and emotion per turn.
+
+    Only the audio of the open turn (plus padding) is kept in memory. When a turn is
+    already older than `latency_target` by the time acoustics or emotion would start
+    (the models cannot keep up), those stages are skipped for it and the turn is marked
+    `"skipped": "latency_budget"`, so the backlog drains instead of growing.
+    """
+
+    def __init__(self, asr_service, acoustic_service, emotion_service,
+                 detector: Optional[StreamingTurnDetector] = None,
+                 sample_rate: int = 16000,
+                 latency_target: float = DEFAULT_LATENCY_TARGET_SECONDS,
+                 stage_workers: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            asr_service (ASRService): Loaded ASR service
+            acoustic_service (AcousticService): Acoustic service (in-process extraction)
+            emotion_service (EmotionService): Loaded emotion service
+            detector (Optional[StreamingTurnDetector]): Endpointer (default settings if omitted)
+            sample_rate (int): Sample rate of the stream
+            latency_target (float): Seconds from end of speech to result; turns later than this
+                                    skip acoustics and emotion
+            stage_workers (Optional[Dict[str, int]]): Threads per stage for the StageExecutor
+        """
+        self.asr_service = asr_service
+        self.acoustic_service = acoustic_service
+        self.emotion_service = emotion_service
+        self.detector = detector or StreamingTurnDetector(sample_rate)
+        self.sample_rate = sample_rate
+        self.latency_target = latency_target
+        self.stage_workers = stage_workers or {}
+        self._metrics: Optional[MetricsCollector] = None
+
+    def run(self, chunks: Iterable[np.ndarray], emit: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+        """
+        Consumes a chunk stream until it ends.
+
+        Args:
+            chunks (Iterable[np.ndarray]): 1D mono or (channels, samples) float32 chunks
+            emit (Callable[[Dict[str, Any]], None]): Called with each finished turn, in order
+
+        Returns:
+            Dict[str, Any]: Summary with turn counts, latency percentiles and stage metrics
+        """
+        metrics = self._metrics = MetricsCollector()
+        self.emotion_service.metrics = metrics
+        padding = int(SEGMENT_PADDING_SECONDS * self.sample_rate)
+        # (first sample, mono samples, arrival time) of the chunks still needed
+        buffered: Deque[Tuple[int, np.ndarray, float]] = collections.deque()
+        received = 0
+        channels = 1
+        latencies: List[float] = []
+        turn_queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        failure: List[BaseException] = []
+
+        def deliver():
+            stages = [segment_stage(name, fn, self.stage_workers.get(name, 1)) for name, fn in
+                      zip(SEGMENT_STAGES, (self._asr_stage, self._acoustic_stage, self._emotion_stage))]
+            try:
+                for payload in StageExecutor(stages).run(iter(turn_queue.get, None)):
+                    segment = payload["segment"]
+                    latency = time.perf_counter() - payload["speech_end_at"]
+                    segment["latency_seconds"] = round(latency, 3)
+                    latencies.append(latency)
+                    emit(segment)
+            except BaseException as e:
+                failure.append(e)
+                # Keep draining so the ingest side never blocks on a dead consumer
+                while turn_queue.get() is not None:
+                    pass
+
+        consumer = threading.Thread(target=deliver, name="stream-consumer", daemon=True)
+        consumer.start()
+
+        next_turn_id = [0]
+
+        def submit(turns: List[Turn]) -> None:
+            for start, end, channel in turns:
+                turn_id = next_turn_id[0]
+                next_turn_id[0] += 1
+                padded_start = max(0, start - padding)
+                padded_end = min(received, end + padding)
+                samples = self._slice(buffered, padded_start, padded_end)
+                turn_queue.put({
+                    "view": AudioSegmentView(samples, self.sample_rate, 0, len(samples)),
+                    "segment": {
+                        "turn_id": turn_id,
+                        "speaker": f"SPEAKER_{channel:02d}" if channels > 1 else None,
+                        "start_time": round(start / self.sample_rate, 3),
+                        "end_time": round(end / self.sample_rate, 3),
+                        "duration": round((end - start) / self.sample_rate, 3),
+                        "transcript": "",
+                        "predicted_emotion": None,
+                        "acoustic_features": None,
+                    },
+                    "speech_end_at": self._arrival(buffered, end - 1),
+                })
+
+        try:
+            try:
+                for chunk in chunks:
+                    if failure:
+                        break
+                    arrival = time.perf_counter()
+                    if chunk.ndim == 2:
+                        channels = chunk.shape[0]
+                        mono = np.ascontiguousarray(chunk.mean(axis=0, dtype=np.float32))
+                    else:
+                        mono = np.asarray(chunk, dtype=np.float32)
+                    buffered.append((received, mono, arrival))
+                    received += len(mono)
+                    with measure(metrics, "turn_detection"):
+                        turns = self.detector.push(chunk)
+                    submit(turns)
+                    # Keep the open turn (and padding) only; everything before it has been handed off
+                    open_start = self.detector.open_turn_start
+                    keep_from = (open_start if open_start is not None
+                                 else received - self.detector.frame_samples) - padding
+                    while buffered and buffered[0][0] + len(buffered[0][1]) <= keep_from:
+                        buffered.popleft()
+            except KeyboardInterrupt:
+                # Stop listening, but finish and report the turns captured so far
+                print("⚠ Stream interrupted, finishing the turns in progress")
+            submit(self.detector.flush())
+        finally:
+            turn_queue.put(None)
+            consumer.join()
+        if failure:
+            raise failure[0]
+
+        audio_seconds = received / self.sample_rate
+        within_target = sum(1 for latency in latencies if latency <= self.latency_target)
+        metrics.count("turns", len(latencies))
+        return {
+            "audio_seconds": round(audio_seconds, 3),
+            "turns": len(latencies),
+            "latency_target_seconds": self.latency_target,
+            "latency_seconds": latency_percentiles(latencies),
+            "within_target": round(within_target / len(latencies), 3) if latencies else None,
+            "metrics": metrics.summary(audio_seconds),
+        }
+
+    @staticmethod
+    def _slice(buffered: Deque[Tuple[int, np.ndarray, float]], start: int, end: int) -> np.ndarray:
+        """Copies samples [start, end) out of the buffered chunks."""
+        pieces = [mono[max(0, start - first):max(0, end - first)]
+                  for first, mono, _ in buffered if first < end and first + len(mono) > start]
+        return np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32)
+
+    @staticmethod
+    def _arrival(buffered: Deque[Tuple[int, np.ndarray, float]], sample: int) -> float:
+        """Arrival time of the chunk holding `sample`."""
+        for first, mono, arrival in buffered:
+            if first <= sample < first + len(mono):
+                return arrival
+        return buffered[-1][2] if buffered else time.perf_counter()
+
+    def _over_budget(self, payload: Dict[str, Any]) -> bool:
+        if time.perf_counter() - payload["speech_end_at"] <= self.latency_target:
+            return False
+        payload["segment"]["skipped"] = "latency_budget"
+        return True
+
+    def _asr_stage(self, payload: Dict[str, Any]) -> None:
+        with measure(self._metrics, "asr"):
+            payload["segment"]["transcript"] = self.asr_service.process(payload["view"])
+
+    def _acoustic_stage(self, payload: Dict[str, Any]) -> None:
+        if self._over_budget(payload):
+            return
+        with measure(self._metrics, "acoustic"):
+            payload["segment"]["acoustic_features"] = self.acoustic_service.process(payload["view"])
+
+    def _emotion_stage(self, payload: Dict[str, Any]) -> None:
+        segment = payload["segment"]
+        if segment.get("skipped") or self._over_budget(payload):
+            return
+        with measure(self._metrics, "emotion"):
+            segment["predicted_emotion"] = self.emotion_service.process(
+                payload["view"],
+                transcript=segment["transcript"] or "",
+                acoustic_features=segment["acoustic_features"]
+            )
+
+
+def print_latency_summary(summary: Dict[str, Any], stream=sys.stdout) -> None:
+    """Prints the latency block of a `StreamingAnalyzer.run` summary."""
+    latency = summary["latency_seconds"]
+    print(f"⏱ {summary['turns']} turns over {summary['audio_seconds']:.1f}s of audio", file=stream)
+    if latency["p50"] is None:
+        return
+    print(f"  end-to-end latency p50 {latency['p50']:.2f}s | p90 {latency['p90']:.2f}s | "
+          f"p95 {latency['p95']:.2f}s | p99 {latency['p99']:.2f}s | max {latency['max']:.2f}s", file=stream)
+    print(f"  {summary['within_target']:.0%} of turns within the {summary['latency_target_seconds']:.1f}s target",
+          file=stream)
@@ -0,0 +1,256 @@
+"""
+Worker Pool Module
+Runs several pipeline worker processes that share one copy of the PyTorch model weights.
+
+N independent pipeline processes hold N copies of HuBERT, Wav2Vec2-large, DistilRoBERTa
+and pyannote. The pool instead loads those models once
+in the parent process and then forks the workers: fork maps the parent's memory into
+every child copy-on-write, and since inference only reads the weights, their pages stay
+shared for as long as the workers live. Each worker takes whole recordings from a shared
+queue and writes their outputs exactly as a single-process run would.
+
+- faster-whisper (CTranslate2) is not carried across the fork - its native thread pool
+  does not survive into the child - so every worker loads its own ASR model after
+  forking.
+- Fork is required (Linux); CUDA state does not survive a fork either, so on a GPU run
+  one pipeline per device instead.
+- The parent loads the models with one PyTorch thread, so no OpenMP thread team exists
+  when it forks; each worker sizes its pools from its share of the CPU budget.
+"""
+
+import gc
+import os
+import queue
+import multiprocessing
+from typing import Dict, Any, List, Optional, Tuple
+
+from .analysis_pipeline import AnalysisPipeline
+from .profiling import current_rss_bytes, format_bytes, memory_breakdown, peak_rss_bytes
+
+# Stages whose (PyTorch) models are loaded in the parent and shared with the workers
+SHARED_STAGES = ("diarize", "emotion")
+
+# How long the parent waits for a message before checking that the workers are alive
+_POLL_SECONDS = 1.0
+
+
+def model_weight_bytes(service: Any, max_depth: int = 3) -> int:
+    """
+    Bytes of PyTorch parameters and buffers reachable from a service.
+
+    Modules are found through attributes (e.g. EmotionService.hubert_model, or the
+    segmentation and embedding models inside the pyannote pipeline); storages used by
+    several tensors (tied weights) are counted once.
+
+    Args:
+        service (Any): A loaded service
+        max_depth (int): How many attribute levels to search for modules
+
+    Returns:
+        int: Total bytes of the distinct weight storages
+    """
+    import torch
+    storages: Dict[int, int] = {}
+    seen = set()
+    stack = [(service, 0)]
+    while stack:
+        obj, depth = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, torch.nn.Module):
+            for tensor in list(obj.parameters()) + list(obj.buffers()):
+                storage = tensor.untyped_storage()
+                storages[storage.data_ptr()] = storage.nbytes()
+        elif depth < max_depth and hasattr(obj, "__dict__"):
+            stack.extend((value, depth + 1) for value in vars(obj).values())
+    return sum(storages.values())
+
+
+def _worker_main(pipeline: AnalysisPipeline, worker_id: int, jobs: "multiprocessing.Queue",
+                 results: "multiprocessing.Queue", num_speakers: int) -> None:
+    """Entry point of a forked worker: analyzes recordings from `jobs` until it gets None."""
+    # SQLite connections must not be shared with the parent
+    for store in (pipeline.result_cache, pipeline.corpus_index):
+        if store is not None:
+            store.reopen()
+    files = 0
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        results.put(("started", worker_id, job[0]))
+        record = pipeline.run_batch([job], num_speakers=num_speakers, prefetch_depth=0)[0]
+        record["worker"] = worker_id
+        results.put(("file", worker_id, record))
+        files += 1
+    results.put(("done", worker_id, {
+        "worker": worker_id,
+        "pid": os.getpid(),
+        "files": files,
+        "memory": memory_breakdown(),
+        "peak_rss_bytes": peak_rss_bytes(),
+    }))
+
+
+class SharedModelPool:
+    """
+    Worker processes forked from one pipeline whose PyTorch models are already loaded.
+
+    Usage:
+        pool = SharedModelPool(pipeline, workers=4)
+        pool.load()                      # load the shared models once, in this process
+        timings = pool.run(jobs)         # fork the workers and analyze every job
+        pool.print_report()
+    """
+
+    def __init__(self, pipeline: AnalysisPipeline, workers: int):
+        """
+        Args:
+            pipeline (AnalysisPipeline): Pipeline every worker runs. Build it with its
+                                         per-worker CPU share (`cpus`) and without an
+                                         acoustic process pool (`acoustic_workers=0`):
+                                         a pool started in the parent cannot be used
+                                         by the forked workers
+            workers (int): Worker processes (>= 1)
+        """
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("Shared-weight workers need the 'fork' start method (Linux); "
+                               "run independent processes instead")
+        if pipeline.acoustic_service is not None and pipeline.acoustic_service.parallel:
+            raise ValueError("Build the pipeline with acoustic_workers=0 for a worker pool")
+        self.pipeline = pipeline
+        self.workers = max(1, int(workers))
+        self._context = multiprocessing.get_context("fork")
+        self.loaded = False
+        self.weight_bytes: Dict[str, int] = {}
+        self.parent_memory: Optional[Dict[str, int]] = None
+        self.worker_reports: List[Dict[str, Any]] = []
+
+    def load(self) -> None:
+        """
+        Loads the shared (PyTorch) models in this process.
+
+        Raises:
+            RuntimeError: If a model was placed on a GPU, which forked workers cannot use
+        """
+        resources = self.pipeline.resources
+        planned = resources.torch_threads
+        # One thread while loading: a fork must not happen after OpenMP started its team
+        resources.torch_threads = {name: 1 for name in planned}
+        try:
+            self.pipeline.warm_up(SHARED_STAGES)
+        finally:
+            resources.torch_threads = planned
+
+        services = {"diarize": lambda: self.pipeline.diarization_service,
+                    "emotion": lambda: self.pipeline.emotion_service}
+        for stage in SHARED_STAGES:
+            if stage not in self.pipeline.stages:
+                continue
+            service = services[stage]()
+            if str(getattr(service, "device", "cpu")) != "cpu":
+                raise RuntimeError(f"The {stage} model is on '{service.device}'; forked workers can only "
+                                   f"share CPU models (run one pipeline per GPU instead)")
+            self.weight_bytes[stage] = model_weight_bytes(service)
+        self.parent_memory = memory_breakdown()
+        self.loaded = True
+        shared = sum(self.weight_bytes.values())
+        print(f"✓ Loaded shared models once: {format_bytes(shared)} of weights "
+              f"({', '.join(f'{stage} {format_bytes(size)}' for stage, size in self.weight_bytes.items())}), "
+              f"parent RSS {format_bytes(current_rss_bytes())}")
+
+    def run(self, jobs: List[Tuple[str, str]], num_speakers: int = 2) -> List[Dict[str, Any]]:
+        """
+        Forks the workers and analyzes every job on whichever worker is free.
+
+        Args:
+            jobs (List[Tuple[str, str]]): (audio_file_path, output_json_path) pairs
+            num_speakers (int): Number of speakers to detect
+
+        Returns:
+            List[Dict[str, Any]]: Per-file timing records (as from `AnalysisPipeline.run_batch`,
+                                  plus the worker id), in completion order
+        """
+        if not self.loaded:
+            self.load()
+        # Hugging Face tokenizers warn (and turn parallelism off) in forked children
+        os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+        job_queue, result_queue = self._context.Queue(), self._context.Queue()
+        # Objects loaded so far are never collected; the child's GC then does not write
+        # to (and so copy) the pages holding them
+        gc.freeze()
+        processes = {}
+        try:
+            for worker_id in range(self.workers):
+                process = self._context.Process(
+                    target=_worker_main, name=f"pipeline-worker-{worker_id}",
+                    args=(self.pipeline, worker_id, job_queue, result_queue, num_speakers)
+                )
+                process.start()
+                processes[worker_id] = process
+            print(f"✓ Started {self.workers} worker processes sharing the model weights")
+            for job in jobs:
+                job_queue.put(job)
+            for _ in processes:
+                job_queue.put(None)
+            return self._collect(processes, result_queue)
+        finally:
+            for process in processes.values():
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+            gc.unfreeze()
+
+    def _collect(self, processes: Dict[int, Any], results: "multiprocessing.Queue") -> List[Dict[str, Any]]:
+        timings: List[Dict[str, Any]] = []
+        in_flight: Dict[int, Optional[str]] = {worker_id: None for worker_id in processes}
+        finished = set()
+        self.worker_reports = []
+        while len(finished) < len(processes):
+            try:
+                kind, worker_id, payload = results.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                for worker_id, process in processes.items():
+                    if worker_id in finished or process.is_alive():
+                        continue
+                    # Exited without reporting: killed (e.g. out of memory) or crashed
+                    finished.add(worker_id)
+                    print(f"✗ Worker {worker_id} exited with code {process.exitcode}")
+                    if in_flight[worker_id] is not None:
+                        timings.append({"file": in_flight[worker_id], "ok": False, "audio_seconds": 0.0,
+                                        "decode_seconds": 0.0, "decode_wait_seconds": 0.0,
+                                        "analysis_seconds": 0.0, "worker": worker_id})
+                continue
+            if kind == "started":
+                in_flight[worker_id] = payload
+            elif kind == "file":
+                in_flight[worker_id] = None
+                timings.append(payload)
+            else:
+                finished.add(worker_id)
+                self.worker_reports.append(payload)
+        return timings
+
+    def print_report(self) -> None:
+        """Prints per-worker memory: what each worker holds privately vs shares with the parent."""
+        print("=" * 60)
+        print("WORKER POOL MEMORY")
+        print("=" * 60)
+        print(f"  {'process':<12}{'files':>6}{'RSS':>12}{'shared':>12}{'private':>12}{'peak RSS':>12}")
+        parent = self.parent_memory or {}
+        print(f"  {'parent':<12}{'-':>6}{format_bytes(parent.get('rss')):>12}"
+              f"{format_bytes(parent.get('shared')):>12}{format_bytes(parent.get('private')):>12}{'-':>12}")
+        private_total = parent.get("rss", 0)
+        for report in sorted(self.worker_reports, key=lambda r: r["worker"]):
+            memory = report["memory"] or {}
+            private_total += memory.get("private", 0)
+            print(f"  {'worker ' + str(report['worker']):<12}{report['files']:>6}{format_bytes(memory.get('rss')):>12}"
+                  f"{format_bytes(memory.get('shared')):>12}{format_bytes(memory.get('private')):>12}"
+                  f"{format_bytes(report['peak_rss_bytes']):>12}")
+        if parent and self.worker_reports:
+            # Independent processes would each hold what a worker maps (its RSS) on their own
+            independent = sum((report["memory"] or {}).get("rss", 0) for report in self.worker_reports)
+            print(f"  Total ≈ {format_bytes(private_total)} (parent + private worker memory); "
+                  f"{len(self.worker_reports)} independent processes ≈ {format_bytes(independent)}")
+        print("=" * 60)
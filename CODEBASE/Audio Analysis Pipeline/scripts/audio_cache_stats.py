@@ -0,0 +1,41 @@
+"""
+Audio Cache Report Script
+Shows hit/miss/bytes-saved statistics for the decoded-audio cache, and
+optionally clears it.
+
+Usage:
+    python scripts/audio_cache_stats.py [--cache_dir DIR] [--clear]
+"""
+
+import os
+import sys
+import argparse
+
+# Add project root to path to import pipeline modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from pipeline.audio_cache import AudioCache, DEFAULT_CACHE_DIR
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Report on (or clear) the decoded-audio cache.")
+    parser.add_argument("--cache_dir", default=DEFAULT_CACHE_DIR,
+                        help=f"Cache directory (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--clear", action="store_true", help="Delete all cached entries and statistics")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.cache_dir):
+        print(f"No audio cache found at {args.cache_dir}")
+        return
+
+    cache = AudioCache(args.cache_dir)
+    if args.clear:
+        cache.clear()
+        print(f"✓ Cleared audio cache at {args.cache_dir}")
+        return
+
+    cache.print_report()
+
+
+if __name__ == "__main__":
+    main()
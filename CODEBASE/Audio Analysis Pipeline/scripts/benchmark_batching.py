@@ -0,0 +1,104 @@
+"""
+Batching Benchmark Script
+Reports how much padding length-bucketed batches would need for real segment lengths.
+
+The segments analyzed in existing outputs (non-speech segments are left out) are
+planned with `LengthBucketScheduler` under each `--batch_seconds` budget, with the
+same padding the pipeline adds around every segment. For each budget the script
+prints the number of batches and the padding efficiency (real audio / padded audio)
+of the length-sorted plan next to batching in recording order. No models are loaded:
+this sizes the budget for a batched service before one exists.
+
+Usage:
+    python scripts/benchmark_batching.py [files ...] [--batch_seconds S ...] [--max_batch_size N]
+
+Example:
+    python scripts/benchmark_batching.py
+    python scripts/benchmark_batching.py data/output/GAS0001.json --batch_seconds 30 120 --per_batch
+"""
+
+import os
+import sys
+import glob
+import argparse
+from typing import List
+
+# Add project root to path to import pipeline modules
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+from pipeline.audio_segment import SEGMENT_PADDING_SECONDS
+from pipeline.batching import DEFAULT_BATCH_SAMPLES, LengthBucketScheduler, padding_report, print_padding_report
+from pipeline.output_formats import read_output
+
+SAMPLE_RATE = 16000
+
+
+def segment_lengths(path: str) -> List[int]:
+    """Sample count of every analyzed segment of one output, as sliced by the pipeline."""
+    lengths = []
+    for segment in read_output(path).get("segments", []):
+        if segment.get("skipped") is not None:
+            continue
+        seconds = segment["end_time"] - segment["start_time"] + 2 * SEGMENT_PADDING_SECONDS
+        lengths.append(int(round(seconds * SAMPLE_RATE)))
+    return lengths
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Padding efficiency of length-bucketed segment batches.")
+    parser.add_argument("files", nargs="*", help="Output files (default: data/output/*.json)")
+    parser.add_argument("--batch_seconds", type=float, nargs="+", default=[DEFAULT_BATCH_SAMPLES / SAMPLE_RATE],
+                        help=f"Padded audio per batch to compare (default: {DEFAULT_BATCH_SAMPLES / SAMPLE_RATE:.0f})")
+    parser.add_argument("--max_batch_size", type=int, default=None, help="Segments per batch at most (default: no limit)")
+    parser.add_argument("--per_batch", action="store_true", help="Also print one line per batch")
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob(os.path.join(PROJECT_ROOT, "data", "output", "*.json")))
+    if not files:
+        print("No output files found.")
+        return
+    # Batches never span recordings: each output is planned on its own and the totals summed
+    per_file = []
+    for path in files:
+        try:
+            lengths = segment_lengths(path)
+        except Exception as e:
+            print(f"⚠ Skipping {path}: {e}")
+            continue
+        if lengths:
+            per_file.append(lengths)
+    segments = sum(len(lengths) for lengths in per_file)
+
+    print("=" * 78)
+    print(f"BATCHING BENCHMARK ({len(per_file)} files, {segments} segments)")
+    print("=" * 78)
+    for seconds in args.batch_seconds:
+        scheduler = LengthBucketScheduler(max_batch_samples=int(seconds * SAMPLE_RATE),
+                                          max_batch_size=args.max_batch_size)
+        reports = [padding_report(scheduler, lengths) for lengths in per_file]
+        if len(reports) == 1:
+            print_padding_report(reports[0], SAMPLE_RATE, per_batch=args.per_batch)
+            continue
+        total = {"batches": 0, "real_samples": 0, "padded_samples": 0}
+        in_order = dict(total)
+        for report in reports:
+            for key in total:
+                total[key] += report[key]
+                in_order[key] += report["in_order"][key]
+        combined = {
+            "batches": total["batches"],
+            "efficiency": total["real_samples"] / total["padded_samples"] if total["padded_samples"] else 1.0,
+            "max_batch_samples": scheduler.max_batch_samples,
+            "in_order": {"batches": in_order["batches"],
+                         "efficiency": in_order["real_samples"] / in_order["padded_samples"]
+                         if in_order["padded_samples"] else 1.0},
+            "per_batch": [batch for report in reports for batch in report["per_batch"]],
+        }
+        print_padding_report(combined, SAMPLE_RATE, per_batch=args.per_batch)
+    print("-" * 78)
+    print("⏱ Efficiency = real samples / padded samples; no service batches its inference yet")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Corpus Index Benchmark Script
+Compares filtered queries on the SQLite corpus index with scanning the output JSONs.
+
+A synthetic corpus is built from the real outputs in data/output: their segments are
+replicated (with jittered scores and acoustic features, random speakers and flags)
+into `--segments` segments spread over output files of `--per_file` segments with
+spread-out modification times. The script then times the initial index build, an
+incremental re-index with a few new files, and a set of typical queries against both
+the index and a plain Python scan of every JSON file, checking they return the same
+segments.
+
+Usage:
+    python scripts/benchmark_corpus_index.py [--segments N] [--per_file N] [--seed N]
+
+Example:
+    python scripts/benchmark_corpus_index.py
+    python scripts/benchmark_corpus_index.py --segments 500000 --per_file 800
+"""
+
+import os
+import sys
+import json
+import glob
+import time
+import random
+import argparse
+import tempfile
+from typing import Any, Callable, Dict, List
+
+# Add project root to path to import pipeline modules
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+from pipeline.corpus_index import CorpusIndex
+from pipeline.profiling import format_bytes
+
+DAY_SECONDS = 24 * 3600
+
+
+def build_corpus(out_dir: str, templates: List[Dict[str, Any]], total: int, per_file: int,
+                 rng: random.Random, first: int = 0) -> List[str]:
+    """Writes synthetic (compact) output JSONs into `out_dir` and returns their paths."""
+    paths = []
+    now = time.time()
+    for number in range(first, first + (total + per_file - 1) // per_file):
+        segments = []
+        clock = 0.0
+        for segment_id in range(min(per_file, total - (number - first) * per_file)):
+            segment = json.loads(json.dumps(rng.choice(templates)))
+            segment["segment_id"] = segment_id
+            segment["speaker"] = f"SPEAKER_0{rng.randint(0, 1)}"
+            segment["start_time"] = round(clock, 3)
+            clock += segment["duration"] + rng.uniform(0.1, 2.0)
+            segment["end_time"] = round(segment["start_time"] + segment["duration"], 3)
+            emotion = segment.get("predicted_emotion")
+            if isinstance(emotion, dict):
+                emotion["score"] = round(rng.random(), 4)
+                emotion["sarcasm_flag"] = rng.random() < 0.03
+                emotion["mixed_emotion_flag"] = rng.random() < 0.2
+            acoustic = segment.get("acoustic_features")
+            if isinstance(acoustic, dict) and acoustic.get("hnr_mean") is not None:
+                acoustic["hnr_mean"] = rng.gauss(12.0, 4.0)
+                acoustic["jitter_local"] = abs(rng.gauss(0.015, 0.008))
+            segments.append(segment)
+        path = os.path.join(out_dir, f"SYN{number:05d}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"file": f"SYN{number:05d}.mp3", "segments": segments}, f, separators=(",", ":"))
+        # Outputs written over the past year
+        modified = now - rng.uniform(0, 365) * DAY_SECONDS
+        os.utime(path, (modified, modified))
+        paths.append(path)
+    return paths
+
+
+def scan(paths: List[str], predicate: Callable[[Dict[str, Any], float, str], bool]) -> List[tuple]:
+    """The baseline: json.load every output and filter its segments in Python."""
+    matches = []
+    for path in paths:
+        modified = os.path.getmtime(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            output = json.load(f)
+        matches += [(output["file"], segment["segment_id"]) for segment in output["segments"]
+                    if predicate(segment, modified, output["file"])]
+    return matches
+
+
+def _get(segment: Dict[str, Any], group: str, key: str) -> Any:
+    return (segment.get(group) or {}).get(key)
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Benchmark corpus index queries against scanning output JSONs.")
+    parser.add_argument("--segments", type=int, default=300000, help="Synthetic segments (default: 300000)")
+    parser.add_argument("--per_file", type=int, default=500, help="Segments per output file (default: 500)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args()
+
+    templates = []
+    for path in glob.glob(os.path.join(PROJECT_ROOT, "data", "output", "*.json")):
+        with open(path, 'r', encoding='utf-8') as f:
+            templates += [s for s in json.load(f).get("segments", []) if s.get("skipped") is None]
+    if not templates:
+        print("✗ No output JSONs with segments found in data/output")
+        sys.exit(1)
+
+    rng = random.Random(args.seed)
+    quarter_ago = time.time() - 91 * DAY_SECONDS
+    # (description, index filters, equivalent scan predicate)
+    queries = [
+        ("SPEAKER_01 sarcastic, HNR < 10 dB, written last quarter",
+         {"speakers": ["SPEAKER_01"], "flags": {"sarcasm_flag": True}, "ranges": {"hnr_mean": (None, 10.0)},
+          "modified_since": quarter_ago},
+         lambda s, m, f: s["speaker"] == "SPEAKER_01" and _get(s, "predicted_emotion", "sarcasm_flag") is True
+         and (_get(s, "acoustic_features", "hnr_mean") or 99) < 10.0 and m >= quarter_ago),
+        ("anger with score >= 0.9",
+         {"emotions": ["ang"], "ranges": {"emotion_score": (0.9, None)}},
+         lambda s, m, f: _get(s, "predicted_emotion", "label") == "ang"
+         and (_get(s, "predicted_emotion", "score") or 0) >= 0.9),
+        ("jitter >= 0.04",
+         {"ranges": {"jitter_local": (0.04, None)}},
+         lambda s, m, f: (_get(s, "acoustic_features", "jitter_local") or 0) >= 0.04),
+        ("files SYN0004*, segments longer than 10 s",
+         {"file": "SYN0004*", "ranges": {"duration": (10.0, None)}},
+         lambda s, m, f: f.startswith("SYN0004") and s["duration"] >= 10.0),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        out_dir = os.path.join(tmp_dir, "output")
+        os.makedirs(out_dir)
+        start = time.perf_counter()
+        paths = build_corpus(out_dir, templates, args.segments, args.per_file, rng)
+        corpus_bytes = sum(os.path.getsize(path) for path in paths)
+        print("=" * 78)
+        print(f"CORPUS INDEX BENCHMARK ({args.segments} segments in {len(paths)} files, "
+              f"{format_bytes(corpus_bytes)} of JSON, built in {time.perf_counter() - start:.1f}s)")
+        print("=" * 78)
+
+        index = CorpusIndex(os.path.join(tmp_dir, "corpus.sqlite"))
+        start = time.perf_counter()
+        counts = index.update([out_dir])
+        print(f"\n⏱ Initial index:        {time.perf_counter() - start:7.2f}s ({counts['segments']} segments)")
+        extra = build_corpus(out_dir, templates, 3 * args.per_file, args.per_file, rng, first=len(paths))
+        start = time.perf_counter()
+        counts = index.update([out_dir])
+        print(f"⏱ Incremental re-index: {time.perf_counter() - start:7.2f}s "
+              f"({counts['added']} new files, {counts['unchanged']} unchanged)")
+        paths += extra
+        print(f"  index size: {format_bytes(index.stats()['size_bytes'])}")
+
+        print(f"\n{'query':<48}{'matches':>9}{'index':>11}{'scan':>10}")
+        mismatches = []
+        for description, filters, predicate in queries:
+            start = time.perf_counter()
+            rows = index.query(limit=None, **filters)
+            index_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            expected = scan(paths, predicate)
+            scan_ms = (time.perf_counter() - start) * 1000
+            if sorted((row["file"], row["segment_id"]) for row in rows) != sorted(expected):
+                mismatches.append(description)
+            print(f"{description:<48}{len(rows):>9}{index_ms:>9.1f}ms{scan_ms:>8.0f}ms")
+        index.close()
+
+    print("-" * 78)
+    if mismatches:
+        print(f"✗ Index and scan disagree for: {', '.join(mismatches)}")
+    else:
+        print("✓ Index and scan return the same segments for every query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Decode Benchmark Script
+Measures decode time and peak RSS per input file for the audio loading paths
+used by the pipeline.
+
+Each measurement runs in a fresh Python process so that peak RSS reflects only
+that strategy (peak RSS can never go down inside a single process).
+
+Usage:
+    python scripts/benchmark_decode.py [files ...] [--suite diarization|backends] [--repeat N]
+
+Example:
+    python scripts/benchmark_decode.py data/input/GAS0001.mp3
+    python scripts/benchmark_decode.py --suite backends
+"""
+
+import os
+import sys
+import json
+import glob
+import time
+import argparse
+import subprocess
+from typing import Dict, Any, List
+
+# Add project root to path to import pipeline modules
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+
+
+# Strategy suites compared by this benchmark (the first strategy is the baseline).
+# diarization:
+# - double_decode: decode for the pipeline, then torchaudio.load again for diarization (old flow)
+# - shared_buffer: decode once and wrap the same buffer for diarization (current flow)
+# backends:
+# - torchaudio: full native-rate decode, channel mean and in-memory resample
+# - ffmpeg: streaming 16kHz mono decode from an ffmpeg pipe
+SUITES = {
+    "diarization": ["double_decode", "shared_buffer"],
+    "backends": ["torchaudio", "ffmpeg"],
+}
+
+
+def _measure(strategy: str, file_path: str) -> Dict[str, Any]:
+    """Runs one strategy on one file inside the current (child) process."""
+    import torch
+    import torchaudio
+    from pipeline import audio_utilities as au
+    from pipeline.profiling import peak_rss_bytes
+
+    start = time.perf_counter()
+    if strategy in SUITES["backends"]:
+        audio_array, sample_rate = au.load_and_resample_audio(file_path, backend=strategy)
+    else:
+        audio_array, sample_rate = au.load_and_resample_audio(file_path)
+        if strategy == "double_decode":
+            waveform, _ = torchaudio.load(file_path)
+        elif strategy == "shared_buffer":
+            waveform = torch.from_numpy(audio_array).unsqueeze(0)
+        else:
+            raise ValueError(f"Unknown strategy: {strategy}")
+
+    elapsed = time.perf_counter() - start
+    return {
+        "strategy": strategy,
+        "file": file_path,
+        "decode_seconds": elapsed,
+        "peak_rss_bytes": peak_rss_bytes(),
+        "audio_seconds": len(audio_array) / sample_rate,
+        "output_bytes": int(audio_array.nbytes),
+    }
+
+
+def _run_child(strategy: str, file_path: str) -> Dict[str, Any]:
+    """Spawns a fresh interpreter to measure one strategy."""
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", strategy, file_path],
+        capture_output=True, text=True, cwd=PROJECT_ROOT
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip() or f"child exited with {completed.returncode}")
+    # The JSON result is always the last line printed by the child
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def benchmark(files: List[str], strategies: List[str], repeat: int = 1) -> None:
+    """
+    Benchmarks every strategy on every file and prints a per-file comparison.
+
+    Args:
+        files (List[str]): Audio files to decode
+        strategies (List[str]): Strategy names to compare; the first is the baseline
+        repeat (int): Runs per (file, strategy); the fastest run is reported
+    """
+    from pipeline.profiling import format_bytes
+
+    print("=" * 78)
+    print("DECODE BENCHMARK")
+    print("=" * 78)
+
+    baseline = strategies[0]
+    for file_path in files:
+        print(f"\n{os.path.basename(file_path)}")
+        results = {}
+        for strategy in strategies:
+            try:
+                runs = [_run_child(strategy, file_path) for _ in range(repeat)]
+            except Exception as e:
+                print(f"  ✗ {strategy}: {e}")
+                continue
+            best = min(runs, key=lambda r: r["decode_seconds"])
+            best["peak_rss_bytes"] = max(r["peak_rss_bytes"] or 0 for r in runs) or None
+            results[strategy] = best
+            print(f"  {strategy:<16} decode {best['decode_seconds']:7.2f}s   "
+                  f"peak RSS {format_bytes(best['peak_rss_bytes']):>10}   "
+                  f"(audio {best['audio_seconds']:.1f}s, output {format_bytes(best['output_bytes'])})")
+
+        if baseline not in results:
+            continue
+        for strategy in strategies[1:]:
+            if strategy not in results:
+                continue
+            time_saved = results[baseline]["decode_seconds"] - results[strategy]["decode_seconds"]
+            rss_saved = None
+            if results[baseline]["peak_rss_bytes"] and results[strategy]["peak_rss_bytes"]:
+                rss_saved = results[baseline]["peak_rss_bytes"] - results[strategy]["peak_rss_bytes"]
+            print(f"  → {strategy} vs {baseline}: {time_saved:+.2f}s decode saved, "
+                  f"{format_bytes(rss_saved)} peak RSS saved")
+
+    print("\n" + "=" * 78)
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Benchmark audio decode time and peak RSS per file.")
+    parser.add_argument("files", nargs="*", help="Audio files (default: all files in data/input/)")
+    parser.add_argument("--suite", choices=sorted(SUITES), default="diarization",
+                        help="Which strategies to compare (default: diarization)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per file and strategy (default: 1)")
+    parser.add_argument("--child", nargs=2, metavar=("STRATEGY", "FILE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_measure(*args.child)))
+        return
+
+    files = args.files or sorted(glob.glob(os.path.join(PROJECT_ROOT, "data", "input", "*.*")))
+    if not files:
+        print("No input files found.")
+        return
+
+    benchmark(files, SUITES[args.suite], repeat=max(1, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
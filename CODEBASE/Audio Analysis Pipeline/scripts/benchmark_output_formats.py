@@ -0,0 +1,124 @@
+"""
+Output Format Benchmark Script
+Compares file size and load time of the output formats: indented JSON (default),
+compact JSON (--compact_json), Parquet and Arrow (--columnar).
+
+Every output JSON is rewritten in each format into a temporary directory, loaded
+back `--repeat` times (fastest run reported), and checked to round-trip to exactly
+the object of the original JSON. Columnar formats are timed twice: loading the typed
+segment table only (what analytics does) and rebuilding the full output dict.
+
+Usage:
+    python scripts/benchmark_output_formats.py [files ...] [--repeat N]
+
+Example:
+    python scripts/benchmark_output_formats.py
+    python scripts/benchmark_output_formats.py data/output/GAS0001.json --repeat 5
+"""
+
+import os
+import sys
+import json
+import glob
+import time
+import argparse
+import tempfile
+from typing import Any, Callable, Dict, List
+
+# Add project root to path to import pipeline modules
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+from pipeline.journal import write_streamed_json
+from pipeline.output_formats import (
+    COLUMNAR_FORMATS, read_output, read_table, require_pyarrow, split_output, write_columnar
+)
+from pipeline.profiling import format_bytes
+
+
+def _best_of(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _write(fmt: str, output: Dict[str, Any], path: str) -> None:
+    segments, summary, key_order = split_output(output)
+    if fmt in ("json", "compact_json"):
+        fields = [(key, None if key == "segments" else output[key]) for key in key_order]
+        write_streamed_json(path, fields, "segments", iter(segments), compact=fmt == "compact_json")
+    else:
+        write_columnar(path, fmt, segments, summary, key_order)
+
+
+def benchmark(files: List[str], repeat: int = 3) -> None:
+    """
+    Converts every file to every format and prints total size and load time per format.
+
+    Args:
+        files (List[str]): Output JSON files of the pipeline
+        repeat (int): Loads per (file, format); the fastest is counted
+    """
+    formats = ["json", "compact_json"]
+    try:
+        require_pyarrow()
+        formats += sorted(COLUMNAR_FORMATS)
+    except ImportError as e:
+        print(f"⚠ {e}: only comparing the JSON formats")
+
+    totals = {fmt: {"bytes": 0, "load": 0.0, "table": 0.0} for fmt in formats}
+    segments = 0
+    mismatches = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for file_path in files:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                original = json.load(f)
+            segments += len(original.get("segments", []))
+            stem = os.path.splitext(os.path.basename(file_path))[0]
+            for fmt in formats:
+                extension = COLUMNAR_FORMATS.get(fmt, ".json")
+                path = os.path.join(tmp_dir, f"{stem}.{fmt}{extension}")
+                _write(fmt, original, path)
+                totals[fmt]["bytes"] += os.path.getsize(path)
+                totals[fmt]["load"] += _best_of(lambda: read_output(path), repeat)
+                if fmt in COLUMNAR_FORMATS:
+                    totals[fmt]["table"] += _best_of(lambda: read_table(path), repeat)
+                # Compared serialized so key order and int/float types must match too
+                if json.dumps(read_output(path), ensure_ascii=False) != json.dumps(original, ensure_ascii=False):
+                    mismatches.append(f"{os.path.basename(file_path)} ({fmt})")
+
+    print("=" * 78)
+    print(f"OUTPUT FORMAT BENCHMARK ({len(files)} files, {segments} segments)")
+    print("=" * 78)
+    baseline = totals["json"]
+    print(f"{'format':<16}{'size':>12}{'vs json':>10}{'load s':>10}{'speedup':>10}{'table s':>10}")
+    for fmt in formats:
+        result = totals[fmt]
+        table = f"{result['table']:>10.3f}" if fmt in COLUMNAR_FORMATS else f"{'-':>10}"
+        print(f"{fmt:<16}{format_bytes(result['bytes']):>12}{result['bytes'] / baseline['bytes']:>9.0%} "
+              f"{result['load']:>10.3f}{baseline['load'] / result['load'] if result['load'] else 0.0:>9.1f}x{table}")
+    print("-" * 78)
+    if mismatches:
+        print(f"✗ Round trip differs for: {', '.join(mismatches)}")
+    else:
+        print("✓ Every format round-trips to the original JSON")
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Compare size and load time of the output formats.")
+    parser.add_argument("files", nargs="*", help="Output JSON files (default: data/output/*.json)")
+    parser.add_argument("--repeat", type=int, default=3, help="Loads per file and format (default: 3)")
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob(os.path.join(PROJECT_ROOT, "data", "output", "*.json")))
+    if not files:
+        print("No output files found.")
+        return
+    benchmark(files, repeat=max(1, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+CPU Budget Benchmark Script
+Compares full pipeline runs under different splits of the CPUs between the services.
+
+Every configuration runs `main.py` on the input in a fresh process (so PyTorch and
+CTranslate2 start with the thread counts of that configuration) with the result
+cache, audio cache and corpus index disabled, and reports wall time, segments/sec
+and real-time factor from the output's `metrics` block. The first configuration,
+`unshared`, gives every service all CPUs - what each library does on its own.
+
+With `--concurrent N`, N runs of the same input are started at once, each with
+`--cpus` set to its share of the machine (the `unshared` runs each get every CPU),
+which is how several pipelines share one server.
+
+Usage:
+    python scripts/benchmark_resources.py -i FILE [--budgets SPEC ...] [--concurrent N] [main.py options]
+
+Example:
+    python scripts/benchmark_resources.py -i data/input/GAS0001.mp3
+    python scripts/benchmark_resources.py -i data/input/GAS0001.mp3 --budgets auto asr=8,emotion=6,acoustic=2
+    python scripts/benchmark_resources.py -i data/input/GAS0001.mp3 --concurrent 4 --stage_workers asr=2
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import subprocess
+import tempfile
+from typing import Any, Dict, List
+
+# Add project root to path to import pipeline modules
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+from pipeline.resources import RESOURCE_SERVICES, available_cpus, parse_cpu_budget
+
+
+def unshared_budget(cpus: int) -> str:
+    """Every service sized for the whole machine (the Praat pool for all cores but one)."""
+    return ",".join(f"{name}={max(1, cpus - 1) if name == 'acoustic' else cpus}" for name in RESOURCE_SERVICES)
+
+
+def run_config(input_path: str, budget: str, cpus: int, concurrent: int, extra: List[str]) -> Dict[str, Any]:
+    """
+    Runs `concurrent` copies of main.py with one budget and collects their metrics.
+
+    Args:
+        input_path (str): Audio file to analyze
+        budget (str): --cpu_budget spec, or 'auto' for the default split of --cpus
+        cpus (int): --cpus of each run
+        concurrent (int): Runs started at once
+        extra (List[str]): Further main.py options (e.g. --stages, --stage_workers)
+
+    Returns:
+        Dict[str, Any]: Total wall time, segments, audio seconds and failed runs
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        processes = []
+        start = time.perf_counter()
+        for run in range(concurrent):
+            output_dir = os.path.join(tmp_dir, f"run{run}")
+            command = [sys.executable, os.path.join(PROJECT_ROOT, "main.py"), "-i", input_path,
+                       "-o", output_dir, "--cpus", str(cpus)] + extra
+            if budget != "auto":
+                command += ["--cpu_budget", budget]
+            processes.append(subprocess.Popen(command, cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL,
+                                              stderr=subprocess.DEVNULL))
+        failed = sum(1 for process in processes if process.wait() != 0)
+        wall = time.perf_counter() - start
+
+        segments, audio_seconds, plan = 0, 0.0, None
+        for path in glob.glob(os.path.join(tmp_dir, "run*", "*.json")):
+            with open(path, 'r', encoding='utf-8') as f:
+                output = json.load(f)
+            segments += sum(1 for s in output.get("segments", []) if s.get("skipped") is None)
+            metrics = output.get("metrics") or {}
+            audio_seconds += metrics.get("audio_seconds") or 0.0
+            plan = metrics.get("resources", plan)
+    return {"wall": wall, "segments": segments, "audio_seconds": audio_seconds, "failed": failed, "plan": plan}
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Benchmark pipeline throughput per CPU budget split.")
+    parser.add_argument("-i", "--input", required=True, help="Audio file to analyze")
+    parser.add_argument("--budgets", nargs="+", default=["auto"],
+                        help="--cpu_budget specs to compare, 'auto' for the default split (default: auto)")
+    parser.add_argument("--concurrent", type=int, default=1,
+                        help="Runs sharing the machine at once, each with its share of the CPUs (default: 1)")
+    parser.add_argument("--cpus", type=int, default=None, help="CPUs for all runs together (default: all available)")
+    args, extra = parser.parse_known_args()
+
+    if not os.path.exists(args.input):
+        print(f"✗ Input file not found: {args.input}")
+        sys.exit(1)
+    try:
+        for spec in args.budgets:
+            if spec != "auto":
+                parse_cpu_budget(spec)
+    except ValueError as e:
+        parser.error(str(e))
+
+    total = args.cpus or available_cpus()
+    concurrent = max(1, args.concurrent)
+    share = max(1, total // concurrent)
+    # (label, budget spec, --cpus of each run)
+    configs = [("unshared", unshared_budget(total), total)] + [(spec, spec, share) for spec in args.budgets]
+
+    print("=" * 78)
+    print(f"CPU BUDGET BENCHMARK ({os.path.basename(args.input)}, {total} CPUs, {concurrent} concurrent "
+          f"run{'s' if concurrent > 1 else ''})")
+    print("=" * 78)
+    print(f"{'budget':<36}{'wall s':>9}{'segments':>10}{'seg/s':>8}{'RTF':>8}")
+    baseline = None
+    for label, budget, cpus in configs:
+        result = run_config(args.input, budget, cpus, concurrent, extra)
+        if result["failed"] or not result["segments"]:
+            print(f"{label:<36}  ✗ {result['failed']} of {concurrent} runs failed")
+            continue
+        rate = result["segments"] / result["wall"]
+        # Real-time factor of the machine: wall time per second of audio analyzed
+        rtf = result["wall"] / result["audio_seconds"] if result["audio_seconds"] else 0.0
+        baseline = baseline or rate
+        print(f"{label:<36}{result['wall']:>9.1f}{result['segments']:>10}{rate:>8.2f}{rtf:>8.3f}"
+              f"  ({rate / baseline:.2f}x)")
+        if result["plan"]:
+            plan = result["plan"]
+            print(f"  {'':<34}budgets {plan['budgets']}, asr {plan['asr_workers']}×{plan['asr_threads']}, "
+                  f"acoustic pool {plan['acoustic_workers']}")
+    print("-" * 78)
+    print("⏱ seg/s counts analyzed segments of all concurrent runs over their shared wall time")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Stage Pipelining Benchmark Script
+Compares segments/sec of the serial segment loop with the pipelined StageExecutor
+(ASR, acoustics and emotion overlapping across segments).
+
+The recording is cut into fixed-length windows (no diarization), and every
+configuration processes the same windows with the same loaded services. Outputs of
+the pipelined runs are checked against the serial run.
+
+With --synthetic, the services are replaced by stand-ins that sleep for a fixed
+time per segment (sleep releases the GIL like CTranslate2 and Praat do), which
+shows the executor overhead and ideal overlap without loading any model.
+
+Usage:
+    python scripts/benchmark_stages.py -i FILE [--segment_seconds S] [--workers SPEC ...]
+    python scripts/benchmark_stages.py --synthetic [--segments N]
+
+Example:
+    python scripts/benchmark_stages.py -i data/input/GAS0001.mp3 --workers asr=1 asr=2,acoustic=2
+"""
+
+import os
+import sys
+import time
+import argparse
+from typing import Dict, Any, List, Optional
+
+# Add project root to path to import pipeline modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from pipeline.stage_executor import StageExecutor, SEGMENT_STAGES, parse_stage_workers, segment_stage
+
+# Per-segment cost of the synthetic stand-ins (seconds), roughly base.en / Praat / triple ensemble on CPU
+SYNTHETIC_COSTS = {"asr": 0.030, "acoustic": 0.015, "emotion": 0.040}
+
+
+def _model_stage_fns(sample_rate: int) -> Dict[str, Any]:
+    """Loads the real services and returns stage functions over {'view', 'segment'} payloads."""
+    from pipeline.services.asr_service import ASRService
+    from pipeline.services.acoustic_service import AcousticService
+    from pipeline.services.emotion_service import EmotionService
+
+    asr = ASRService(model_name="base.en")
+    acoustic = AcousticService(sample_rate=sample_rate)
+    emotion = EmotionService(mode='triple_ensemble')
+
+    def asr_stage(payload):
+        payload["segment"]["transcript"] = asr.process(payload["view"])
+
+    def acoustic_stage(payload):
+        payload["segment"]["acoustic_features"] = acoustic.process(payload["view"])
+
+    def emotion_stage(payload):
+        segment = payload["segment"]
+        segment["predicted_emotion"] = emotion.process(
+            payload["view"], transcript=segment["transcript"] or "",
+            acoustic_features=segment["acoustic_features"])
+
+    return {"asr": asr_stage, "acoustic": acoustic_stage, "emotion": emotion_stage}
+
+
+def _synthetic_stage_fns() -> Dict[str, Any]:
+    def make(name):
+        def stage(payload):
+            time.sleep(SYNTHETIC_COSTS[name])
+            payload["segment"][name] = payload["segment"]["segment_id"]
+        return stage
+    return {name: make(name) for name in SEGMENT_STAGES}
+
+
+def _payloads(views: List[Any]) -> List[Dict[str, Any]]:
+    return [{"view": view, "segment": {"segment_id": i}} for i, view in enumerate(views)]
+
+
+def run_serial(stage_fns: Dict[str, Any], views: List[Any]) -> List[Dict[str, Any]]:
+    payloads = _payloads(views)
+    for payload in payloads:
+        for name in SEGMENT_STAGES:
+            stage_fns[name](payload)
+    return [payload["segment"] for payload in payloads]
+
+
+def run_pipelined(stage_fns: Dict[str, Any], views: List[Any], workers: Dict[str, int]) -> List[Dict[str, Any]]:
+    stages = [segment_stage(name, stage_fns[name], workers[name]) for name in SEGMENT_STAGES]
+    return [payload["segment"] for payload in StageExecutor(stages).run(_payloads(views))]
+
+
+def _timed(fn, *args) -> Any:
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Benchmark serial vs pipelined segment stages.")
+    parser.add_argument("-i", "--input", help="Audio file to analyze (required unless --synthetic)")
+    parser.add_argument("--segment_seconds", type=float, default=8.0, help="Window length (default: 8)")
+    parser.add_argument("--segments", type=int, default=60, help="Synthetic segment count (default: 60)")
+    parser.add_argument("--workers", nargs="+", default=["asr=1,acoustic=1,emotion=1"],
+                        help="Worker specs to compare (default: asr=1,acoustic=1,emotion=1)")
+    parser.add_argument("--synthetic", action="store_true", help="Use sleeping stand-ins instead of models")
+    args = parser.parse_args()
+
+    configs = [(spec, parse_stage_workers(spec, SEGMENT_STAGES)) for spec in args.workers]
+
+    if args.synthetic:
+        stage_fns = _synthetic_stage_fns()
+        views: List[Optional[Any]] = [None] * args.segments
+        print(f"Synthetic stages (seconds per segment): {SYNTHETIC_COSTS}")
+    else:
+        if not args.input:
+            parser.error("-i/--input is required unless --synthetic is given")
+        from pipeline.audio_utilities import load_and_resample_audio
+        from pipeline.audio_segment import segment_view
+        audio, sample_rate = load_and_resample_audio(args.input)
+        duration = len(audio) / sample_rate
+        views = [segment_view(audio, sample_rate, start, min(start + args.segment_seconds, duration))
+                 for start in [k * args.segment_seconds for k in range(int(duration // args.segment_seconds))]]
+        stage_fns = _model_stage_fns(sample_rate)
+        # Warm-up so one-off lazy initialization is not billed to the first configuration
+        run_serial(stage_fns, views[:1])
+
+    baseline, serial_seconds = _timed(run_serial, stage_fns, views)
+    rows = [("serial", serial_seconds, True)]
+    for spec, workers in configs:
+        result, seconds = _timed(run_pipelined, stage_fns, views, workers)
+        rows.append((f"pipelined {spec}", seconds, result == baseline))
+
+    print("=" * 70)
+    print(f"SEGMENT THROUGHPUT ({len(views)} segments)")
+    print("=" * 70)
+    print(f"{'configuration':<40}{'seconds':>10}{'seg/s':>10}{'speedup':>10}")
+    for name, seconds, _ in rows:
+        print(f"{name:<40}{seconds:>10.2f}{len(views) / seconds:>10.2f}{serial_seconds / seconds:>9.2f}x")
+    print("-" * 70)
+    for name, _, identical in rows[1:]:
+        print(f"{'✓' if identical else '✗'} {name}: output {'identical to' if identical else 'DIFFERS from'} serial")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Startup Benchmark Script
+Measures startup time and peak RSS of AnalysisPipeline for common --stages subsets.
+
+Services are loaded lazily, so a stage subset only pays for its own models. Each
+subset is measured in a fresh Python process (peak RSS can never go down inside a
+single process): the time to import the pipeline, to construct it, and to load the
+selected models (`warm_up`, i.e. what the first segment would otherwise pay).
+
+Usage:
+    python scripts/benchmark_startup.py [--subsets SPEC ...] [--asr MODEL] [--repeat N]
+
+Example:
+    python scripts/benchmark_startup.py
+    python scripts/benchmark_startup.py --subsets acoustic asr all --repeat 3
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from typing import Dict, Any, List
+
+# Add project root to path to import pipeline modules
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+
+# Stage subsets measured by default (the first is the baseline)
+DEFAULT_SUBSETS = ["all", "diarize,asr", "asr,acoustic", "asr", "emotion", "acoustic"]
+
+
+def _measure(subset: str, asr_model: str) -> Dict[str, Any]:
+    """Builds and warms up the pipeline for one stage subset inside the current (child) process."""
+    start = time.perf_counter()
+    from pipeline.analysis_pipeline import AnalysisPipeline
+    from pipeline.stage_executor import parse_stages
+    from pipeline.profiling import peak_rss_bytes
+    imported = time.perf_counter()
+
+    stages = parse_stages(subset)
+    pipeline = AnalysisPipeline(
+        hf_token=os.environ.get("HF_TOKEN"),
+        asr_model=asr_model,
+        acoustic_workers=0,
+        stages=stages
+    )
+    constructed = time.perf_counter()
+    pipeline.warm_up()
+    loaded = time.perf_counter()
+
+    return {
+        "subset": subset,
+        "stages": list(stages),
+        "import_seconds": imported - start,
+        "construct_seconds": constructed - imported,
+        "load_seconds": loaded - constructed,
+        "total_seconds": loaded - start,
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+
+def _run_child(subset: str, asr_model: str) -> Dict[str, Any]:
+    """Spawns a fresh interpreter to measure one stage subset."""
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", subset, "--asr", asr_model],
+        capture_output=True, text=True, cwd=PROJECT_ROOT
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip() or f"child exited with {completed.returncode}")
+    # The JSON result is always the last line printed by the child
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def benchmark(subsets: List[str], asr_model: str, repeat: int = 1) -> None:
+    """
+    Measures every stage subset and prints a comparison table.
+
+    Args:
+        subsets (List[str]): --stages values to compare; the first is the baseline
+        asr_model (str): ASR model used by subsets that include 'asr'
+        repeat (int): Runs per subset; the fastest run is reported
+    """
+    from pipeline.profiling import format_bytes
+
+    print("=" * 78)
+    print("STARTUP BENCHMARK")
+    print("=" * 78)
+    print(f"\n{'stages':<24}{'import':>9}{'models':>9}{'total':>9}{'peak RSS':>12}")
+
+    results = {}
+    for subset in subsets:
+        try:
+            runs = [_run_child(subset, asr_model) for _ in range(repeat)]
+        except Exception as e:
+            print(f"  ✗ {subset}: {e}")
+            continue
+        best = min(runs, key=lambda r: r["total_seconds"])
+        best["peak_rss_bytes"] = max(r["peak_rss_bytes"] or 0 for r in runs) or None
+        results[subset] = best
+        print(f"{subset:<24}{best['import_seconds']:>8.2f}s"
+              f"{best['construct_seconds'] + best['load_seconds']:>8.2f}s"
+              f"{best['total_seconds']:>8.2f}s{format_bytes(best['peak_rss_bytes']):>12}")
+
+    baseline = results.get(subsets[0])
+    if baseline is not None:
+        print()
+        for subset in subsets[1:]:
+            if subset not in results:
+                continue
+            time_saved = baseline["total_seconds"] - results[subset]["total_seconds"]
+            rss_saved = None
+            if baseline["peak_rss_bytes"] and results[subset]["peak_rss_bytes"]:
+                rss_saved = baseline["peak_rss_bytes"] - results[subset]["peak_rss_bytes"]
+            print(f"  → {subset} vs {subsets[0]}: {time_saved:+.2f}s startup saved, "
+                  f"{format_bytes(rss_saved)} peak RSS saved")
+
+    print("\n" + "=" * 78)
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Benchmark pipeline startup time and peak RSS per stage subset.")
+    parser.add_argument("--subsets", nargs="+", default=DEFAULT_SUBSETS,
+                        help=f"--stages values to compare (default: {' '.join(DEFAULT_SUBSETS)})")
+    parser.add_argument("--asr", default="base.en", help="ASR model for subsets with 'asr' (default: base.en)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per subset (default: 1)")
+    parser.add_argument("--child", metavar="STAGES", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_measure(args.child, args.asr)))
+        return
+
+    if any("diarize" in subset or subset == "all" for subset in args.subsets) and not os.environ.get("HF_TOKEN"):
+        print("⚠ HF_TOKEN is not set: subsets with 'diarize' will fail to load pyannote")
+    benchmark(args.subsets, args.asr, repeat=max(1, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Worker Pool Benchmark Script
+Compares the shared-weight worker pool with independent pipeline processes.
+
+The same recordings are analyzed twice with N-way parallelism:
+- pool: one `main_batch.py --workers N` run, whose forked workers share the PyTorch
+  models loaded once by the parent
+- independent: N `main_batch.py` processes started at once, each on every N-th
+  recording with `--cpus` set to its share of the machine
+
+Caches and the corpus index are disabled and acoustics run inside each process, so
+both setups do the same work. While they run, the process trees are sampled from
+/proc: the total PSS (shared pages split between the processes mapping them, so it
+adds up to the real footprint) and the peak RSS of each process. Throughput is taken
+from the wall time and the audio duration in the written outputs. Linux only.
+
+Usage:
+    python scripts/benchmark_worker_pool.py -i INPUTS ... [--workers N] [main_batch.py options]
+
+Example:
+    python scripts/benchmark_worker_pool.py -i data/input/ --workers 4
+    python scripts/benchmark_worker_pool.py -i "data/input/*.mp3" --workers 2 --stages asr,emotion
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import threading
+import subprocess
+import tempfile
+from typing import Dict, Any, List
+
+# Add project root to path to import pipeline modules
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+from pipeline.batch import collect_inputs
+from pipeline.profiling import format_bytes, memory_breakdown
+from pipeline.resources import available_cpus
+
+SAMPLE_SECONDS = 0.5
+
+
+def _descendants(pid: int) -> List[int]:
+    """`pid` and every process below it, read from /proc/<pid>/task/*/children."""
+    found, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        found.append(current)
+        for children in glob.glob(f"/proc/{current}/task/*/children"):
+            try:
+                with open(children, "r") as f:
+                    stack.extend(int(child) for child in f.read().split())
+            except OSError:
+                pass
+    return found
+
+
+class TreeSampler:
+    """Samples the memory of process trees on a background thread."""
+
+    def __init__(self, roots: List[int]):
+        self.roots = roots
+        self.peak_pss = 0
+        self.peak_rss: Dict[int, int] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def _sample(self) -> None:
+        while not self._stop.is_set():
+            total = 0
+            for root in self.roots:
+                for pid in _descendants(root):
+                    memory = memory_breakdown(pid)
+                    if memory is None:
+                        continue
+                    total += memory["pss"]
+                    self.peak_rss[pid] = max(self.peak_rss.get(pid, 0), memory["rss"])
+            self.peak_pss = max(self.peak_pss, total)
+            self._stop.wait(SAMPLE_SECONDS)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def run_setup(name: str, inputs: List[str], workers: int, cpus: int, extra: List[str]) -> Dict[str, Any]:
+    """
+    Runs one setup ('pool' or 'independent') and measures it.
+
+    Args:
+        name (str): 'pool' or 'independent'
+        inputs (List[str]): Recordings to analyze
+        workers (int): Parallel workers / processes
+        cpus (int): CPUs for the whole setup
+        extra (List[str]): Further main_batch.py options
+
+    Returns:
+        Dict[str, Any]: wall seconds, files, audio seconds, peak total PSS and per-process peak RSS
+    """
+    common = ["--overwrite", "--acoustic_workers", "0"] + extra
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if name == "pool":
+            commands = [["-i"] + inputs + ["--workers", str(workers), "--cpus", str(cpus)]]
+        else:
+            commands = [["-i"] + inputs[k::workers] + ["--cpus", str(max(1, cpus // workers))]
+                        for k in range(workers) if inputs[k::workers]]
+        start = time.perf_counter()
+        processes = [subprocess.Popen([sys.executable, os.path.join(PROJECT_ROOT, "main_batch.py")] + command
+                                      + ["-o", os.path.join(tmp_dir, "output")] + common,
+                                      cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                     for command in commands]
+        sampler = TreeSampler([process.pid for process in processes])
+        failed = sum(1 for process in processes if process.wait() != 0)
+        wall = time.perf_counter() - start
+        sampler.stop()
+
+        files, audio_seconds = 0, 0.0
+        for path in glob.glob(os.path.join(tmp_dir, "output", "*.json")):
+            with open(path, 'r', encoding='utf-8') as f:
+                metrics = json.load(f).get("metrics") or {}
+            files += 1
+            audio_seconds += metrics.get("audio_seconds") or 0.0
+    # Busy processes only: the resource tracker and other helpers stay small
+    busy = sorted((rss for rss in sampler.peak_rss.values() if rss > 256 * 1024 ** 2), reverse=True)
+    return {"wall": wall, "files": files, "audio_seconds": audio_seconds, "failed": failed,
+            "peak_pss": sampler.peak_pss, "process_rss": busy}
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Benchmark the shared-weight worker pool against independent processes.")
+    parser.add_argument("-i", "--input", required=True, nargs="+", help="Recordings (files, directories, globs, manifests)")
+    parser.add_argument("--workers", type=int, default=2, help="Workers / independent processes (default: 2)")
+    parser.add_argument("--cpus", type=int, default=None, help="CPUs for each setup (default: all available)")
+    args, extra = parser.parse_known_args()
+
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        print("✗ Needs /proc/<pid>/smaps_rollup (Linux) to measure shared memory")
+        sys.exit(1)
+    inputs = collect_inputs(args.input)
+    if len(inputs) < args.workers:
+        print(f"✗ Need at least {args.workers} recordings for {args.workers} workers (found {len(inputs)})")
+        sys.exit(1)
+    cpus = args.cpus or available_cpus()
+
+    print("=" * 78)
+    print(f"WORKER POOL BENCHMARK ({len(inputs)} recordings, {args.workers} workers, {cpus} CPUs)")
+    print("=" * 78)
+    print(f"{'setup':<14}{'wall s':>9}{'files/h':>10}{'RTF':>8}{'total PSS':>12}{'RSS per process':>24}")
+    results = {}
+    for name in ("independent", "pool"):
+        result = results[name] = run_setup(name, inputs, args.workers, cpus, extra)
+        if result["failed"] or not result["files"]:
+            print(f"{name:<14}  ✗ {result['failed']} process(es) failed, {result['files']} outputs")
+            continue
+        files_per_hour = result["files"] * 3600.0 / result["wall"]
+        rtf = result["wall"] / result["audio_seconds"] if result["audio_seconds"] else 0.0
+        rss = ", ".join(format_bytes(value) for value in result["process_rss"]) or "n/a"
+        print(f"{name:<14}{result['wall']:>9.1f}{files_per_hour:>10.1f}{rtf:>8.3f}"
+              f"{format_bytes(result['peak_pss']):>12}  {rss}")
+    print("-" * 78)
+    independent, pool = results["independent"], results["pool"]
+    if independent["peak_pss"] and pool["peak_pss"] and not (independent["failed"] or pool["failed"]):
+        print(f"✓ Pool: {pool['peak_pss'] / independent['peak_pss']:.0%} of the memory of independent "
+              f"processes, {independent['wall'] / pool['wall']:.2f}x their throughput")
+    print("⏱ RSS counts shared weights in every process that maps them; PSS splits them")
+
+
+if __name__ == "__main__":
+    main()
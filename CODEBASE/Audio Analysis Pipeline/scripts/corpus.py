@@ -0,0 +1,213 @@
+"""
+Corpus Index Script
+Indexes pipeline outputs into a SQLite segment index and queries it.
+
+`index` is incremental: unchanged outputs are skipped, changed ones replaced and
+deleted ones dropped, so it can run after every batch (the pipeline also indexes each
+output it writes). `query` filters segments by file, speaker, output date, emotion
+label/score, flags and acoustic ranges; `search` ranks transcript matches for words,
+"phrases" and prefix* terms (with the same filters) and links each hit to its audio.
+
+Usage:
+    python scripts/corpus.py index [PATHS ...] [--index FILE]
+    python scripts/corpus.py query [filters] [--limit N] [--format table|json|csv]
+    python scripts/corpus.py search TEXT [filters] [--limit N]
+    python scripts/corpus.py stats
+
+Example:
+    python scripts/corpus.py index data/output
+    python scripts/corpus.py query --speaker SPEAKER_01 --sarcasm --max_hnr 10 --modified_since 2026-07-01
+    python scripts/corpus.py query --emotion ang sad --min_score 0.8 --range jitter_local=0.02: --count
+    python scripts/corpus.py search '"scan results"' hosp* --speaker SPEAKER_00
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+from typing import Dict, Any, List, Optional, Tuple
+
+# Add project root to path to import pipeline modules
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+from pipeline.corpus_index import CorpusIndex, DEFAULT_INDEX_PATH, NUMERIC_COLUMNS, audio_link, parse_date
+
+# (column, header, width) printed by --format table
+TABLE_COLUMNS = [("file", "file", 18), ("start_time", "start", 8), ("speaker", "speaker", 11),
+                 ("emotion_label", "emotion", 8), ("emotion_score", "score", 6), ("hnr_mean", "hnr", 6),
+                 ("transcript", "transcript", 50)]
+
+
+def parse_range(spec: str) -> Tuple[str, Tuple[Optional[float], Optional[float]]]:
+    """Parses 'column=low:high' (either bound may be empty) into (column, (low, high))."""
+    column, sep, bounds = spec.partition("=")
+    low, colon, high = bounds.partition(":")
+    if not sep or not colon or column not in NUMERIC_COLUMNS:
+        raise argparse.ArgumentTypeError(
+            f"'{spec}' is not COLUMN=LOW:HIGH with COLUMN one of: {', '.join(NUMERIC_COLUMNS)}")
+    try:
+        return column, (float(low) if low else None, float(high) if high else None)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{spec}': bounds must be numbers")
+
+
+def build_filters(args: argparse.Namespace) -> Dict[str, Any]:
+    """Translates the query options into `CorpusIndex.query` filters."""
+    ranges: Dict[str, Tuple[Optional[float], Optional[float]]] = dict(args.range or [])
+    for column, low, high in (("emotion_score", args.min_score, args.max_score),
+                              ("hnr_mean", args.min_hnr, args.max_hnr),
+                              ("duration", args.min_duration, None)):
+        if low is not None or high is not None:
+            ranges[column] = (low, high)
+    flags = {}
+    if args.sarcasm:
+        flags["sarcasm_flag"] = True
+    if args.mixed:
+        flags["mixed_emotion_flag"] = True
+    return {
+        "file": args.file,
+        "speakers": args.speaker,
+        "emotions": args.emotion,
+        "modified_since": parse_date(args.modified_since),
+        "modified_until": parse_date(args.modified_until),
+        "ranges": ranges,
+        "flags": flags,
+        "include_skipped": args.include_skipped,
+    }
+
+
+def print_rows(rows: List[Dict[str, Any]], fmt: str) -> None:
+    """Prints query results as an aligned table, JSON lines or CSV."""
+    if fmt == "json":
+        for row in rows:
+            print(json.dumps(row, ensure_ascii=False))
+    elif fmt == "csv":
+        if rows:
+            writer = csv.DictWriter(sys.stdout, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        print("  ".join(f"{header:<{width}}" for _, header, width in TABLE_COLUMNS).rstrip())
+        for row in rows:
+            cells = []
+            for column, _, width in TABLE_COLUMNS:
+                value = row.get(column)
+                text = f"{value:.3g}" if isinstance(value, float) and column != "start_time" else \
+                    f"{value:.1f}" if isinstance(value, float) else ("-" if value is None else str(value))
+                cells.append(f"{text[:width]:<{width}}")
+            print("  ".join(cells).rstrip())
+
+
+def print_hits(hits: List[Dict[str, Any]], fmt: str) -> None:
+    """Prints search hits: rank, recording, offsets, speaker, highlighted transcript and audio link."""
+    if fmt != "table":
+        print_rows(hits, fmt)
+        return
+    for rank, hit in enumerate(hits, start=1):
+        print(f"{rank:>3}. {hit['file']}  {hit['start_time']:.2f}-{hit['end_time']:.2f}s  "
+              f"{hit['speaker'] or '-'}  (score {hit['score']:.2f})")
+        print(f"     {hit['match']}")
+        print(f"     {hit['link']}")
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Index pipeline outputs and query segments across the corpus.")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help=f"Index database (default: {DEFAULT_INDEX_PATH})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = commands.add_parser("index", help="Add new and changed outputs to the index")
+    index_parser.add_argument("paths", nargs="*", default=[os.path.join(".", "data", "output")],
+                              help="Output files or directories (default: data/output)")
+    index_parser.add_argument("--keep_missing", action="store_true",
+                              help="Keep indexed outputs that no longer exist on disk")
+
+    # Filters shared by query and search
+    filters = argparse.ArgumentParser(add_help=False)
+    filters.add_argument("--file", help="Glob on the input file name or output path, e.g. 'GAS*'")
+    filters.add_argument("--speaker", nargs="+", help="Speaker labels, e.g. SPEAKER_01")
+    filters.add_argument("--emotion", nargs="+", help="Final emotion labels, e.g. ang sad")
+    filters.add_argument("--modified_since",
+                         help="Output files last modified on or after this date (YYYY-MM-DD); "
+                              "not the recording date")
+    filters.add_argument("--modified_until", help="Output files last modified before this date (YYYY-MM-DD)")
+    filters.add_argument("--min_score", type=float, help="Minimum emotion score")
+    filters.add_argument("--max_score", type=float, help="Emotion score below this")
+    filters.add_argument("--min_hnr", type=float, help="Minimum HNR (dB)")
+    filters.add_argument("--max_hnr", type=float, help="HNR below this (dB)")
+    filters.add_argument("--min_duration", type=float, help="Minimum segment duration (seconds)")
+    filters.add_argument("--range", type=parse_range, action="append", metavar="COLUMN=LOW:HIGH",
+                         help=f"Range on any numeric column ({', '.join(NUMERIC_COLUMNS)}); repeatable")
+    filters.add_argument("--sarcasm", action="store_true", help="Only segments flagged as sarcastic")
+    filters.add_argument("--mixed", action="store_true", help="Only segments flagged as mixed emotion")
+    filters.add_argument("--include_skipped", action="store_true", help="Include non-speech segments")
+    filters.add_argument("--format", choices=["table", "json", "csv"], default="table",
+                         help="Output format (default: table)")
+
+    query_parser = commands.add_parser("query", parents=[filters], help="Find segments matching all given filters")
+    query_parser.add_argument("--limit", type=int, default=50, help="Maximum rows printed, 0 for all (default: 50)")
+    query_parser.add_argument("--count", action="store_true", help="Only print the number of matches")
+
+    search_parser = commands.add_parser("search", parents=[filters],
+                                        help="Full-text search of the transcripts, best matches first")
+    search_parser.add_argument("text", nargs="+",
+                               help='Words (all must occur), "exact phrases", prefix* terms, OR, NOT')
+    search_parser.add_argument("--limit", type=int, default=20, help="Maximum hits printed, 0 for all (default: 20)")
+    search_parser.add_argument("--audio_dir", default=os.path.join(".", "data", "input"),
+                               help="Where to find recordings indexed without their path (default: data/input)")
+
+    commands.add_parser("stats", help="Summarize the index")
+    args = parser.parse_args()
+
+    if args.command != "index" and not os.path.exists(args.index):
+        print(f"No corpus index found at {args.index}. Run: python scripts/corpus.py index <output dir>")
+        sys.exit(1)
+
+    index = CorpusIndex(args.index)
+    try:
+        if args.command == "index":
+            start = time.perf_counter()
+            counts = index.update(args.paths, prune=not args.keep_missing)
+            print(f"✓ Indexed {counts['segments']} segments: {counts['added']} files added, "
+                  f"{counts['updated']} updated, {counts['unchanged']} unchanged, {counts['removed']} removed"
+                  + (f", {counts['failed']} skipped" if counts["failed"] else ""))
+            print(f"⏱ {time.perf_counter() - start:.2f}s")
+            index.print_report()
+        elif args.command == "query":
+            try:
+                filters = build_filters(args)
+            except ValueError as e:
+                print(f"✗ {e}")
+                sys.exit(2)
+            start = time.perf_counter()
+            if args.count:
+                print(index.count(**filters))
+            else:
+                rows = index.query(limit=args.limit or None, **filters)
+                print_rows(rows, args.format)
+            # Timing goes to stderr so json/csv output stays machine-readable
+            print(f"⏱ {(time.perf_counter() - start) * 1000:.1f} ms", file=sys.stderr)
+        elif args.command == "search":
+            try:
+                filters = build_filters(args)
+                start = time.perf_counter()
+                hits = index.search(" ".join(args.text), limit=args.limit or None, **filters)
+            except ValueError as e:
+                print(f"✗ {e}")
+                sys.exit(2)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            for hit in hits:
+                hit["link"] = audio_link(hit["file"], hit["start_time"], hit["end_time"],
+                                         audio_path=hit["audio_path"], audio_dir=args.audio_dir)
+            print_hits(hits, args.format)
+            print(f"⏱ {len(hits)} hits in {elapsed_ms:.1f} ms", file=sys.stderr)
+        else:
+            index.print_report()
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Import Budget Script
+Reports what importing each entry point costs, based on `python -X importtime`.
+
+Model libraries (torch, torchaudio, transformers, pyannote.audio, faster_whisper,
+parselmouth) are imported by the services when they are constructed, so `--help`
+and argument validation never pay for them. This script checks that it stays that
+way: every entry point is imported in a fresh interpreter, the slowest top-level
+packages are listed, and the run fails if an entry point exceeds the budget or
+pulls in one of the model libraries at import time. It also times the wall clock of
+`main.py --help` and of a validation failure (missing input file).
+
+Usage:
+    python scripts/import_budget.py [--modules MODULE ...] [--budget_ms MS] [--top N]
+
+Example:
+    python scripts/import_budget.py
+    python scripts/import_budget.py --modules main main_stream --budget_ms 300
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+from typing import Dict, Any, List, Tuple
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Entry points checked by default
+DEFAULT_MODULES = ["main", "main_batch", "main_phase2", "main_stream", "main_server"]
+
+# Libraries that must only be imported when a service is constructed
+HEAVY_MODULES = ("torch", "torchaudio", "transformers", "pyannote", "faster_whisper", "ctranslate2", "parselmouth")
+
+# Import time allowed per entry point (milliseconds)
+DEFAULT_BUDGET_MS = 500.0
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """
+    Parses `-X importtime` output.
+
+    Args:
+        stderr (str): Standard error of an interpreter run with -X importtime
+
+    Returns:
+        List[Tuple[str, int, int, int]]: (module, depth, self_us, cumulative_us) per import,
+                                         in the order Python reports them (children first)
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            stripped = name.lstrip()
+            # Nesting is shown as two spaces per level after the leading separator space
+            depth = (len(name) - len(stripped) - 1) // 2
+            rows.append((stripped.strip(), depth, int(self_us), int(cumulative_us)))
+        except ValueError:
+            continue
+    return rows
+
+
+def measure_import(module: str) -> Dict[str, Any]:
+    """
+    Imports one module in a fresh interpreter with -X importtime.
+
+    Args:
+        module (str): Module to import (relative to the project root)
+
+    Returns:
+        Dict[str, Any]: total_ms (cumulative import of `module`), per-package self ms
+                        and the heavy modules imported
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=PROJECT_ROOT
+    )
+    rows = parse_importtime(completed.stderr)
+    error = None
+    if completed.returncode != 0:
+        error = (completed.stderr.strip().splitlines() or ["import failed"])[-1]
+
+    # Self time grouped by top-level package shows who the time belongs to
+    packages: Dict[str, float] = {}
+    total_ms = 0.0
+    for name, depth, self_us, cumulative_us in rows:
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0.0) + self_us / 1000.0
+        if depth == 0 and name == module:
+            total_ms = cumulative_us / 1000.0
+    imported = {name.split(".")[0] for name, _, _, _ in rows}
+    return {
+        "module": module,
+        "total_ms": total_ms,
+        "packages": packages,
+        "heavy": sorted(imported.intersection(HEAVY_MODULES)),
+        "error": error,
+    }
+
+
+def time_command(args: List[str], env: Dict[str, str] = None) -> float:
+    """Wall-clock seconds of running `python <args>` from the project root."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable] + args, capture_output=True, cwd=PROJECT_ROOT,
+                   env=dict(os.environ, **(env or {})))
+    return time.perf_counter() - start
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Check the import-time budget of the entry points.")
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES,
+                        help=f"Modules to import (default: {' '.join(DEFAULT_MODULES)})")
+    parser.add_argument("--budget_ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Import time allowed per module in ms (default: {DEFAULT_BUDGET_MS:g})")
+    parser.add_argument("--top", type=int, default=8, help="Slowest packages listed per module (default: 8)")
+    args = parser.parse_args()
+
+    print("=" * 78)
+    print("IMPORT BUDGET")
+    print("=" * 78)
+
+    failed = False
+    for module in args.modules:
+        result = measure_import(module)
+        over_budget = result["total_ms"] > args.budget_ms
+        ok = not (over_budget or result["heavy"] or result["error"])
+        failed = failed or not ok
+        print(f"\n{'✓' if ok else '✗'} {module}: {result['total_ms']:.0f} ms "
+              f"(budget {args.budget_ms:.0f} ms)")
+        if result["error"]:
+            print(f"  ✗ import failed: {result['error']}")
+        if result["heavy"]:
+            print(f"  ✗ model libraries imported eagerly: {', '.join(result['heavy'])}")
+        slowest = sorted(result["packages"].items(), key=lambda item: item[1], reverse=True)[:args.top]
+        for package, ms in slowest:
+            print(f"    {package:<28}{ms:8.1f} ms")
+
+    # End-to-end: the time a user waits before argument errors are reported
+    print("\n⏱ main.py wall clock:")
+    print(f"  --help                          {time_command(['main.py', '--help']):6.2f}s")
+    missing = os.path.join(PROJECT_ROOT, "data", "input", "__missing__.mp3")
+    print(f"  missing input file              "
+          f"{time_command(['main.py', '-i', missing], env={'HF_TOKEN': 'unused'}):6.2f}s")
+
+    print("\n" + "=" * 78)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
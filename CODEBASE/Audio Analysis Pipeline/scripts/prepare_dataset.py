@@ -9,12 +9,13 @@ import json
 import glob
 import pandas as pd
 from tqdm import tqdm
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import sys
 
 # Add project root to path to import pipeline modules
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from pipeline import audio_utilities as au
+from pipeline.audio_cache import AudioCache, DEFAULT_CACHE_DIR
 
 # We will use torchaudio to save the wave files
 import torchaudio
@@ -25,7 +26,8 @@ def create_labeling_dataset(
     json_input_dir: str,
     original_audio_dir: str,
     output_csv_path: str,
-    output_segments_dir: str
+    output_segments_dir: str,
+    audio_cache_dir: Optional[str] = None
 ):
     """
     Aggregates all Phase 1 JSON outputs into a single CSV for human labeling,
@@ -39,8 +41,12 @@ def create_labeling_dataset(
         original_audio_dir (str): Directory containing original audio files
         output_csv_path (str): Path where the CSV will be saved
         output_segments_dir (str): Directory where audio segments will be saved
+        audio_cache_dir (Optional[str]): Decoded-audio cache shared with main.py
+                                         (`--audio_cache`), so recordings analysed in
+                                         Phase 1 are not decoded again. None disables it.
     """
     os.makedirs(output_segments_dir, exist_ok=True)
+    audio_cache = AudioCache(audio_cache_dir) if audio_cache_dir else None
 
     all_segments_data = []
 
@@ -64,7 +70,9 @@ def create_labeling_dataset(
 
         # Load the original audio *once* per file
         try:
-            full_audio, sr = au.load_and_resample_audio(original_audio_path, target_sample_rate=16000)
+            full_audio, sr = au.load_and_resample_audio(
+                original_audio_path, target_sample_rate=16000, cache=audio_cache
+            )
         except Exception as e:
             print(f"Warning: Could not load {original_audio_path}. Skipping. Error: {e}")
             continue
@@ -115,6 +123,9 @@ def create_labeling_dataset(
     print(f"4. Run train_emotion_model.py to fine-tune the model")
     print(f"{'='*60}\n")
 
+    if audio_cache is not None:
+        audio_cache.print_report()
+
 
 if __name__ == "__main__":
     # Example usage
@@ -122,6 +133,8 @@ if __name__ == "__main__":
         json_input_dir="./data/output/",
         original_audio_dir="./data/input/",
         output_csv_path="./data/dataset_for_labeling.csv",
-        output_segments_dir="./data/segments/"
+        output_segments_dir="./data/segments/",
+        # Reuse the decoded audio of Phase 1 if it ran with --audio_cache
+        audio_cache_dir=DEFAULT_CACHE_DIR if os.path.isdir(DEFAULT_CACHE_DIR) else None
     )
 
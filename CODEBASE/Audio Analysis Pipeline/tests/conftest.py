@@ -0,0 +1,13 @@
+"""
+Shared test setup.
+
+The tests cover the pipeline's pure-Python plumbing and load no models, so they run
+without torch, faster-whisper or the Hugging Face checkpoints.
+"""
+
+import os
+import sys
+
+# Add project root to path to import pipeline modules
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
@@ -0,0 +1,104 @@
+"""Tests for the acoustic worker pool (pipeline/services/acoustic_service.py)."""
+
+import multiprocessing
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("parselmouth")
+
+from pipeline.audio_segment import AudioSegmentView
+from pipeline.services.acoustic_service import AcousticService
+
+SR = 16000
+
+pytestmark = pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(),
+                                reason="the pool tests fork workers")
+
+
+def voiced(seconds=4.0):
+    t = np.arange(int(seconds * SR), dtype=np.float32) / SR
+    return (0.3 * np.sin(2 * np.pi * 150.0 * t) * (1.0 + 0.1 * np.sin(2 * np.pi * 3.0 * t))).astype(np.float32)
+
+
+def views(audio, count=4):
+    step = len(audio) // count
+    return [AudioSegmentView(audio, SR, i * step, (i + 1) * step) for i in range(count)]
+
+
+def in_threads(function, items):
+    results = [None] * len(items)
+
+    def run(i):
+        results[i] = function(items[i])
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(items))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = AcousticService(workers=1)
+    starts = []
+    start_pool = service._start_pool
+
+    def counting():
+        starts.append(threading.get_ident())
+        start_pool()
+
+    monkeypatch.setattr(service, "_start_pool", counting)
+    service.starts = starts
+    yield service
+    service.close()
+
+
+def test_pool_matches_in_process_features(service):
+    audio = voiced()
+    with service.share(audio) as shared:
+        futures = [(service.submit(shared, view), view) for view in views(audio)]
+        pooled = [service.result(future, shared, view) for future, view in futures]
+    assert pooled == [service.process(view) for view in views(audio)]
+    assert pooled[0]["pitch_mean_f0"] == pytest.approx(150.0, rel=0.05)
+
+
+def test_broken_pool_is_replaced_once(service):
+    audio = voiced()
+    with service.share(audio) as shared:
+        broken = service._executor
+        futures = [(service.submit(shared, view), view) for view in views(audio)]
+        for process in list(broken._processes.values()):
+            process.kill()
+        # Every stage thread sees the failure; each segment is retried in isolation
+        results = in_threads(lambda item: service.result(item[0], shared, item[1]), futures)
+        assert all(result is not None for result in results)
+        assert service._executor is None
+
+        # Concurrent submissions start exactly one new pool
+        pending = in_threads(lambda view: (service.submit(shared, view), view), views(audio))
+        assert len(service.starts) == 1
+        fresh = service._executor
+        assert fresh is not None and fresh is not broken
+        assert [service.result(future, shared, view) for future, view in pending] == results
+
+        # A late failure report for the old pool does not drop the new one
+        service._discard_pool(broken)
+        assert service._executor is fresh
+
+
+def test_close_shuts_the_pool_down(service):
+    audio = voiced(1.0)
+    executor = service._executor
+    service.close()
+    assert service._executor is None
+    with pytest.raises(RuntimeError):
+        executor.submit(int)
+    # The service stays usable: the next submission starts a pool again
+    with service.share(audio) as shared:
+        view = views(audio, 1)[0]
+        assert service.result(service.submit(shared, view), shared, view) == service.process(view)
+    assert len(service.starts) == 1
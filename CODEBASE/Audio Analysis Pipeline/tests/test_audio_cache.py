@@ -0,0 +1,93 @@
+"""Tests for the decoded-audio cache (pipeline/audio_cache.py)."""
+
+import os
+
+import numpy as np
+import pytest
+
+from pipeline.audio_cache import AudioCache
+
+SAMPLES = 1000
+# One entry on disk: the samples plus the 128-byte .npy header
+ENTRY_BYTES = SAMPLES * 4 + 128
+BASE_TIME = 1700000000.0
+
+
+def audio(value):
+    return np.full(SAMPLES, value, dtype=np.float32)
+
+
+def age(cache, key, seconds):
+    """Sets an entry's mtime, which is what eviction orders by."""
+    os.utime(cache._entry_path(key), (BASE_TIME + seconds, BASE_TIME + seconds))
+
+
+def keys(cache):
+    return sorted(name[:-4] for name in os.listdir(cache.cache_dir) if name.endswith(".npy"))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    # Room for three entries
+    return AudioCache(str(tmp_path / "audio"), max_bytes=3 * ENTRY_BYTES + 10)
+
+
+def test_put_and_get(cache):
+    cache.put("a", audio(0.5))
+    cached = cache.get("a")
+    np.testing.assert_array_equal(cached, audio(0.5))
+    assert isinstance(cached, np.memmap)
+    assert cache.get("missing") is None
+    assert cache.session_stats == {"hits": 1, "misses": 1, "bytes_saved": SAMPLES * 4, "evictions": 0}
+    assert cache.size_bytes() == ENTRY_BYTES
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    for i, key in enumerate("abc"):
+        cache.put(key, audio(i))
+        age(cache, key, i)
+    # Reading 'a' makes it the most recently used
+    cache.get("a")
+    cache.put("d", audio(3))
+    assert keys(cache) == ["a", "c", "d"]
+    assert cache.session_stats["evictions"] == 1
+    assert cache.size_bytes() <= cache.max_bytes
+
+
+def test_eviction_removes_oldest_first_until_it_fits(cache):
+    for i, key in enumerate("abc"):
+        cache.put(key, audio(i))
+        age(cache, key, i)
+    cache.max_bytes = ENTRY_BYTES
+    assert cache.evict() == 2
+    assert keys(cache) == ["c"]
+
+
+def test_limit_counts_the_file_size(tmp_path):
+    # The samples fit the limit, the file with its header does not: nothing is kept
+    cache = AudioCache(str(tmp_path / "audio"), max_bytes=SAMPLES * 4)
+    cache.put("a", audio(1))
+    assert keys(cache) == []
+    # Rejected up front rather than written and then evicted
+    assert cache.session_stats["evictions"] == 0
+    assert [name for name in os.listdir(cache.cache_dir) if name.endswith(".tmp")] == []
+
+
+def test_entry_exactly_at_the_limit_is_kept(tmp_path):
+    cache = AudioCache(str(tmp_path / "audio"), max_bytes=ENTRY_BYTES)
+    cache.put("a", audio(1))
+    assert keys(cache) == ["a"]
+    cache.put("b", audio(2))
+    assert keys(cache) == ["b"]
+
+
+def test_lifetime_stats_persist_across_instances(cache):
+    cache.put("a", audio(1))
+    cache.get("a")
+    reopened = AudioCache(cache.cache_dir, max_bytes=cache.max_bytes)
+    reopened.get("a")
+    reopened.get("missing")
+    lifetime = reopened.lifetime_stats()
+    assert (lifetime["hits"], lifetime["misses"]) == (2, 1)
+    reopened.clear()
+    assert keys(reopened) == [] and reopened.lifetime_stats()["hits"] == 0
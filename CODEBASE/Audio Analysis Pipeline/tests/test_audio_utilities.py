@@ -0,0 +1,55 @@
+"""Tests for reading the ffmpeg PCM pipe (pipeline/audio_utilities.py)."""
+
+import io
+
+import numpy as np
+import pytest
+
+from pipeline.audio_utilities import read_pcm_stream
+
+CHUNK = 1000
+# Not a multiple of the chunk size: the last read is partial
+NUM_SAMPLES = 5 * CHUNK + 537
+
+
+def pcm(num_samples=NUM_SAMPLES, trailing=b""):
+    samples = np.sin(np.arange(num_samples, dtype=np.float32) / 7.0).astype("<f4")
+    return samples, io.BytesIO(samples.tobytes() + trailing)
+
+
+@pytest.mark.parametrize("expected_samples", [None, NUM_SAMPLES, NUM_SAMPLES + 10, 1200])
+def test_decodes_every_sample(expected_samples):
+    samples, stream = pcm()
+    decoded = read_pcm_stream(stream, expected_samples=expected_samples, chunk_samples=CHUNK)
+    assert decoded.dtype == np.float32 and decoded.ndim == 1
+    np.testing.assert_array_equal(decoded, samples)
+
+
+def test_trailing_partial_sample_is_dropped():
+    samples, stream = pcm(trailing=b"\x01\x02")
+    np.testing.assert_array_equal(read_pcm_stream(stream, chunk_samples=CHUNK), samples)
+
+
+def test_exact_hint_is_filled_without_growing():
+    decoded = read_pcm_stream(pcm()[1], expected_samples=NUM_SAMPLES, chunk_samples=CHUNK)
+    # A view of the preallocated buffer: only the spare end-of-stream sample is unused
+    assert decoded.base is not None
+    assert decoded.base.size == NUM_SAMPLES + 1
+
+
+def test_short_hint_grows_the_buffer():
+    decoded = read_pcm_stream(pcm()[1], expected_samples=NUM_SAMPLES - 300, chunk_samples=CHUNK)
+    assert decoded.base is not None
+    assert decoded.size == NUM_SAMPLES
+
+
+def test_large_unused_tail_is_released():
+    # Without a hint the first buffer holds 16 chunks; most of it would stay allocated
+    decoded = read_pcm_stream(pcm()[1], chunk_samples=CHUNK)
+    assert decoded.base is None
+    assert decoded.size == NUM_SAMPLES
+
+
+def test_empty_stream():
+    decoded = read_pcm_stream(io.BytesIO(b""), chunk_samples=CHUNK)
+    assert decoded.size == 0 and decoded.dtype == np.float32
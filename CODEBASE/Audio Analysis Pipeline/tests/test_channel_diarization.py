@@ -0,0 +1,111 @@
+"""Tests for channel-energy diarization of dual-channel recordings (pipeline/channel_diarization.py)."""
+
+import numpy as np
+import pytest
+
+from pipeline.channel_diarization import ChannelDiarizer
+
+SR = 16000
+
+
+def voiced(seconds, f0):
+    t = np.arange(int(seconds * SR)) / SR
+    return sum(0.2 / k * np.sin(2 * np.pi * k * f0 * t) for k in range(1, 6)).astype(np.float32)
+
+
+def quiet(seconds):
+    return np.zeros(int(seconds * SR), dtype=np.float32)
+
+
+def noise(num_samples, seed):
+    return (1e-4 * np.random.default_rng(seed).standard_normal(num_samples)).astype(np.float32)
+
+
+def conversation():
+    """Clinician on channel 0 (0.5-2.5 s), patient on channel 1 (3.5-5.5 s)."""
+    clinician = np.concatenate([quiet(0.5), voiced(2.0, 140.0), quiet(4.5)])
+    patient = np.concatenate([quiet(3.5), voiced(2.0, 210.0), quiet(1.5)])
+    # Each microphone picks up the other speaker 30 dB down
+    left = clinician + 0.03 * patient + noise(len(clinician), 0)
+    right = patient + 0.03 * clinician + noise(len(patient), 1)
+    return left, right
+
+
+def test_separated_channels_give_one_speaker_each():
+    left, right = conversation()
+    diarizer = ChannelDiarizer()
+    segments = diarizer.process(np.stack([left, right]), SR)
+    assert diarizer.last_stats["reason"] == "channel-separated"
+    assert diarizer.last_stats["separation"] == 1.0
+    assert abs(diarizer.last_stats["correlation"]) < 0.2
+    assert [segment["speaker"] for segment in segments] == ["SPEAKER_00", "SPEAKER_01"]
+    # Turn boundaries within the 200 ms hangover (plus a frame)
+    for segment, (start, end) in zip(segments, [(0.5, 2.5), (3.5, 5.5)]):
+        assert segment["start_time"] == pytest.approx(start, abs=0.25)
+        assert segment["end_time"] == pytest.approx(end, abs=0.25)
+
+
+def test_interleaved_layout_gives_the_same_segments():
+    left, right = conversation()
+    # ffmpeg decodes interleaved frames; the pipeline passes a transposed view of them
+    interleaved = np.stack([left, right], axis=1).reshape(-1).reshape(-1, 2).T
+    assert not interleaved.flags.c_contiguous
+    assert ChannelDiarizer().process(interleaved, SR) == ChannelDiarizer().process(np.stack([left, right]), SR)
+
+
+def test_bleeding_channels_are_declined():
+    # A room recording: both microphones carry both speakers, so pyannote has to decide
+    left, right = conversation()
+    mix = left + right
+    diarizer = ChannelDiarizer()
+    assert diarizer.process(np.stack([mix, 0.8 * mix + noise(len(mix), 2)]), SR) is None
+    assert diarizer.last_stats["reason"] == "channels bleed into each other"
+    assert diarizer.last_stats["correlation"] > 0.9
+
+
+def test_overlapping_speakers_are_declined():
+    # Uncorrelated channels that are active at the same time are not separated either
+    left = np.concatenate([quiet(0.5), voiced(5.0, 140.0), quiet(0.5)])
+    right = np.concatenate([quiet(0.5), voiced(5.0, 210.0), quiet(0.5)])
+    diarizer = ChannelDiarizer()
+    assert diarizer.process(np.stack([left, right]), SR) is None
+    assert diarizer.last_stats["reason"] == "channels bleed into each other"
+    assert diarizer.last_stats["separation"] < diarizer.min_separation
+
+
+@pytest.mark.parametrize("channels, reason", [
+    (np.zeros((1, SR), dtype=np.float32), "not a two-channel recording"),
+    (np.zeros(SR, dtype=np.float32), "not a two-channel recording"),
+    (np.zeros((2, 100), dtype=np.float32), "recording too short"),
+    (np.stack([noise(2 * SR, 0), noise(2 * SR, 1)]), "no speech detected"),
+])
+def test_declines_without_two_usable_channels(channels, reason):
+    diarizer = ChannelDiarizer()
+    assert diarizer.process(channels, SR) is None
+    assert diarizer.last_stats["reason"] == reason
+
+
+def test_pipeline_falls_back_to_pyannote_when_declined():
+    pytest.importorskip("tqdm")
+    from pipeline.analysis_pipeline import AnalysisPipeline
+    from pipeline.metrics import MetricsCollector
+
+    class StandInDiarization:
+        """DiarizationService without pyannote: one turn over the whole buffer."""
+
+        def __init__(self):
+            self.calls = 0
+
+        def process(self, audio, num_speakers=2, sample_rate=16000):
+            self.calls += 1
+            return [{"speaker": "SPEAKER_00", "start_time": 0.0, "end_time": len(audio) / sample_rate}]
+
+    left, right = conversation()
+    mix = left + right
+    channels = np.stack([mix, 0.8 * mix])
+    pipeline = AnalysisPipeline(stages=("diarize",), split_channels=True, use_vad=False)
+    pipeline._services["diarize"] = diarization = StandInDiarization()
+    planned = pipeline._plan_segments(mix, channels, SR, len(mix) / SR, 2, MetricsCollector())
+    _, _, method, channel_stats, _ = planned
+    assert method == "pyannote" and diarization.calls == 1
+    assert channel_stats["reason"] == "channels bleed into each other"
@@ -0,0 +1,203 @@
+"""Tests for the SQLite corpus index (pipeline/corpus_index.py)."""
+
+import json
+import os
+
+import pytest
+
+from pipeline import corpus_index
+from pipeline.corpus_index import CorpusIndex, audio_link, find_outputs, fts_query
+
+DAY = 86400.0
+BASE_TIME = 1700000000.0
+
+
+def segment(i, speaker="SPEAKER_00", transcript="hello there", label="neu", hnr=12.0, sarcasm=False, skipped=None):
+    result = {"segment_id": i, "speaker": speaker, "start_time": i * 2.0, "end_time": i * 2.0 + 1.5,
+              "duration": 1.5, "transcript": transcript}
+    if skipped is not None:
+        result["skipped"] = skipped
+        return result
+    result["predicted_emotion"] = {"label": label, "score": 0.8, "sarcasm_flag": sarcasm,
+                                   "mixed_emotion_flag": False}
+    result["acoustic_features"] = {"pitch_mean_f0": 180.0, "jitter_local": 0.01,
+                                   "shimmer_local": 0.05, "hnr_mean": hnr}
+    return result
+
+
+def write_output(path, file, segments, mtime=BASE_TIME):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"file": file, "segments": segments}, f)
+    os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    out = tmp_path / "output"
+    out.mkdir()
+    write_output(out / "a.json", "a.wav", [
+        segment(0, transcript="the scan results came back"),
+        segment(1, speaker="SPEAKER_01", transcript="I was in the hospital", label="sad", hnr=8.0),
+        segment(2, skipped="no_speech"),
+    ])
+    write_output(out / "b.json", "b.wav", [
+        segment(0, transcript="great, just great", label="hap", sarcasm=True),
+        segment(1, speaker="SPEAKER_01", transcript="hospitals are busy", label="ang", hnr=9.5),
+    ], mtime=BASE_TIME + 10 * DAY)
+    index = CorpusIndex(str(tmp_path / "index" / "corpus.sqlite"))
+    yield index, out
+    index.close()
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """Paths of the outputs the index actually opens."""
+    opened = []
+    read_output = corpus_index.read_output
+
+    def counting(path):
+        opened.append(os.path.basename(path))
+        return read_output(path)
+
+    monkeypatch.setattr(corpus_index, "read_output", counting)
+    return opened
+
+
+def test_first_update_adds_every_output(corpus):
+    index, out = corpus
+    counts = index.update([str(out)])
+    assert counts == {"added": 2, "updated": 0, "unchanged": 0, "removed": 0, "failed": 0, "segments": 5}
+    stats = index.stats()
+    assert stats["files"] == 2 and stats["segments"] == 5
+
+
+def test_unchanged_outputs_are_not_read_again(corpus, reads):
+    index, out = corpus
+    index.update([str(out)])
+    reads.clear()
+    counts = index.update([str(out)])
+    assert counts["unchanged"] == 2 and counts["added"] == counts["updated"] == 0
+    assert reads == []
+
+
+def test_new_and_changed_outputs_are_the_only_ones_read(corpus, reads):
+    index, out = corpus
+    index.update([str(out)])
+    reads.clear()
+    write_output(out / "b.json", "b.wav", [segment(0, transcript="rewritten")], mtime=BASE_TIME + 20 * DAY)
+    write_output(out / "c.json", "c.wav", [segment(0), segment(1)])
+    counts = index.update([str(out)])
+    assert sorted(reads) == ["b.json", "c.json"]
+    assert (counts["added"], counts["updated"], counts["unchanged"], counts["segments"]) == (1, 1, 1, 3)
+
+
+def test_rewritten_output_replaces_its_rows(corpus):
+    index, out = corpus
+    index.update([str(out)])
+    write_output(out / "b.json", "b.wav", [segment(0, transcript="rewritten")], mtime=BASE_TIME + 20 * DAY)
+    index.update([str(out)])
+    rows = index.query(file="b.wav")
+    assert [row["transcript"] for row in rows] == ["rewritten"]
+    assert index.search("busy") == []
+    assert index.stats()["segments"] == 4
+
+
+def test_deleted_outputs_are_pruned(corpus):
+    index, out = corpus
+    index.update([str(out)])
+    os.remove(out / "a.json")
+    counts = index.update([str(out)])
+    assert counts["removed"] == 1
+    assert index.query(file="a.wav") == []
+    assert index.search("scan") == []
+    assert index.stats()["files"] == 1
+
+
+def test_prune_can_be_turned_off(corpus):
+    index, out = corpus
+    index.update([str(out)])
+    os.remove(out / "a.json")
+    assert index.update([str(out)], prune=False)["removed"] == 0
+    assert index.stats()["files"] == 2
+
+
+def test_non_outputs_are_skipped(corpus):
+    index, out = corpus
+    (out / "config.json").write_text(json.dumps({"threshold": 3}), encoding="utf-8")
+    counts = index.update([str(out)])
+    assert counts["failed"] == 1 and counts["added"] == 2
+
+
+def test_find_outputs_skips_journals_and_columnar_copies(tmp_path):
+    for name in ("a.json", "a.parquet", "b.arrow", "a.journal.jsonl", "notes.txt"):
+        (tmp_path / name).write_text("", encoding="utf-8")
+    assert [os.path.basename(path) for path in find_outputs([str(tmp_path)])] == ["a.json", "b.arrow"]
+
+
+def test_query_filters(corpus):
+    index, out = corpus
+    index.update([str(out)])
+    assert [row["file"] for row in index.query(speakers=["SPEAKER_01"])] == ["a.wav", "b.wav"]
+    assert [row["emotion_label"] for row in index.query(emotions=["sad", "ang"])] == ["sad", "ang"]
+    assert [row["transcript"] for row in index.query(ranges={"hnr_mean": (None, 9.0)})] == ["I was in the hospital"]
+    sarcastic = index.query(flags={"sarcasm_flag": True})
+    assert len(sarcastic) == 1 and sarcastic[0]["sarcasm_flag"] is True
+    assert len(index.query(file="a*")) == 2
+    assert len(index.query(file="a*", include_skipped=True)) == 3
+    assert index.count() == 4
+    assert len(index.query(limit=1)) == 1
+
+
+def test_modified_filters_use_the_output_mtime(corpus):
+    index, out = corpus
+    index.update([str(out)])
+    assert {row["file"] for row in index.query(modified_since=BASE_TIME + DAY)} == {"b.wav"}
+    assert {row["file"] for row in index.query(modified_until=BASE_TIME + DAY)} == {"a.wav"}
+    assert index.query(modified_since=BASE_TIME + 11 * DAY) == []
+
+
+def test_unknown_columns_are_rejected(corpus):
+    index, out = corpus
+    index.update([str(out)])
+    with pytest.raises(ValueError):
+        index.query(ranges={"transcript": (0, 1)})
+    with pytest.raises(ValueError):
+        index.query(flags={"hnr_mean": True})
+
+
+def test_search_ranks_and_highlights(corpus):
+    index, out = corpus
+    index.update([str(out)])
+    hits = index.search("hospital")
+    # Porter stemming: 'hospitals' matches too
+    assert sorted(hit["file"] for hit in hits) == ["a.wav", "b.wav"]
+    assert all("[" in hit["match"] for hit in hits)
+    assert [hit["file"] for hit in index.search('"scan results"')] == ["a.wav"]
+    assert [hit["file"] for hit in index.search("hosp*", speakers=["SPEAKER_01"], emotions=["ang"])] == ["b.wav"]
+    assert index.search("results NOT scan") == []
+
+
+def test_fts_query_quotes_terms():
+    assert fts_query("don't x-ray") == '"don\'t" "x-ray"'
+    assert fts_query("hosp* OR") == '"hosp"*'
+    with pytest.raises(ValueError):
+        fts_query("  AND ")
+
+
+def test_index_output_links_the_recording(corpus, tmp_path):
+    index, out = corpus
+    audio = tmp_path / "a.wav"
+    audio.write_bytes(b"RIFF")
+    index.index_output(str(out / "a.json"), audio_path=str(audio))
+    hit = index.search("scan")[0]
+    assert hit["audio_path"] == str(audio)
+    assert audio_link(hit["file"], 0.0, 1.5, hit["audio_path"]) == f"file://{audio}#t=0.000,1.500"
+    # A later incremental update of the unchanged file keeps the link
+    index.update([str(out)])
+    assert index.search("scan")[0]["audio_path"] == str(audio)
+
+
+def test_audio_link_without_a_recording():
+    assert audio_link("missing.wav", 1.0, 2.25) == "missing.wav#t=1.000,2.250"
+    assert audio_link(None, 0.0, 1.0) == "unknown#t=0.000,1.000"
@@ -0,0 +1,112 @@
+"""Tests for the segment journal and streamed JSON writer (pipeline/journal.py)."""
+
+import json
+
+import pytest
+
+from pipeline.journal import SegmentJournal, journal_path_for, write_streamed_json
+
+SOURCE = {"name": "session.wav", "size": 1234, "mtime_ns": 1}
+PARAMS = {"asr_model": "base.en", "vad": {"margin_db": 12.0}, "stages": ["asr", "emotion"], "num_speakers": 2}
+
+
+def segment(i):
+    return {"segment_id": i, "speaker": "SPEAKER_00", "start_time": i * 1.5, "end_time": i * 1.5 + 1.0,
+            "transcript": f"sätze {i}", "predicted_emotion": {"label": "neu", "score": 0.5}}
+
+
+def started(path, plan_size=6):
+    journal = SegmentJournal(str(path))
+    journal.start({"source": SOURCE, "params": PARAMS, "plan": [[None, i * 1.5, i * 1.5 + 1.0]
+                                                                 for i in range(plan_size)]})
+    return journal
+
+
+def test_round_trip(tmp_path):
+    journal = started(tmp_path / "out.json.journal.jsonl")
+    for i in (0, 2, 1):  # segments may finish out of order
+        journal.append(segment(i))
+    journal.close()
+
+    loaded = SegmentJournal(journal.path)
+    assert loaded.load()
+    assert loaded.matches(SOURCE, PARAMS)
+    assert loaded.header["plan"][1] == [None, 1.5, 2.5]
+    assert sorted(loaded.offsets) == [0, 1, 2]
+    assert list(loaded.iter_segments(range(6))) == [segment(0), segment(1), segment(2)]
+
+
+def test_resume_continues_after_the_finished_segments(tmp_path):
+    journal = started(tmp_path / "out.json.journal.jsonl")
+    journal.append(segment(0))
+    journal.append(segment(1))
+    journal.close()
+
+    resumed = SegmentJournal(journal.path)
+    assert resumed.load() and resumed.matches(SOURCE, PARAMS)
+    resumed.reopen()
+    todo = [i for i in range(4) if not resumed.done(i)]
+    assert todo == [2, 3]
+    for i in todo:
+        resumed.append(segment(i))
+    assert list(resumed.iter_segments(range(4))) == [segment(i) for i in range(4)]
+    resumed.close()
+
+
+def test_torn_last_line_is_dropped_on_resume(tmp_path):
+    journal = started(tmp_path / "out.json.journal.jsonl")
+    journal.append(segment(0))
+    journal.close()
+    # The process died while writing segment 1
+    with open(journal.path, "ab") as f:
+        f.write(json.dumps({"type": "segment", "segment": segment(1)}).encode()[:25])
+
+    resumed = SegmentJournal(journal.path)
+    assert resumed.load()
+    assert list(resumed.offsets) == [0]
+    resumed.reopen()
+    resumed.append(segment(1))
+    resumed.close()
+    with open(journal.path, "rb") as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 3 and all(json.loads(line) for line in lines)
+
+
+@pytest.mark.parametrize("source, params", [
+    (dict(SOURCE, size=999), PARAMS),                               # input file changed
+    (SOURCE, dict(PARAMS, num_speakers=3)),                         # other setting
+    (SOURCE, dict(PARAMS, vad={"margin_db": 6.0})),                 # other VAD threshold
+])
+def test_journal_of_other_input_or_settings_does_not_match(tmp_path, source, params):
+    journal = started(tmp_path / "out.json.journal.jsonl")
+    journal.close()
+    loaded = SegmentJournal(journal.path)
+    assert loaded.load()
+    assert not loaded.matches(source, params)
+
+
+def test_missing_or_foreign_file_is_not_loaded(tmp_path):
+    assert not SegmentJournal(str(tmp_path / "absent.jsonl")).load()
+    foreign = tmp_path / "foreign.jsonl"
+    foreign.write_text('{"type": "header", "version": 0}\n')
+    assert not SegmentJournal(str(foreign)).load()
+
+
+def test_remove(tmp_path):
+    journal = started(tmp_path / "out.json.journal.jsonl")
+    journal.remove()
+    assert not (tmp_path / "out.json.journal.jsonl").exists()
+    assert journal_path_for("out.json") == "out.json.journal.jsonl"
+
+
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize("count", [0, 1, 3])
+def test_streamed_json_is_identical_to_json_dump(tmp_path, compact, count):
+    segments = [segment(i) for i in range(count)]
+    fields = [("file", "session.wav"), ("segments", None), ("metrics", lambda: {"segments": count})]
+    path = tmp_path / "out.json"
+    assert write_streamed_json(str(path), fields, "segments", iter(segments), compact=compact) == count
+
+    expected = {"file": "session.wav", "segments": segments, "metrics": {"segments": count}}
+    dump_options = {"separators": (",", ":")} if compact else {"indent": 4}
+    assert path.read_text(encoding="utf-8") == json.dumps(expected, ensure_ascii=False, **dump_options)
@@ -0,0 +1,106 @@
+"""Tests for run metrics and their Prometheus textfile export (pipeline/metrics.py)."""
+
+import os
+import re
+
+import pytest
+
+from pipeline import metrics as metrics_module
+from pipeline.metrics import MetricsCollector, measure, write_prometheus_textfile
+
+# metric_name{label="value",...} number (label values may contain escaped quotes)
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{(?:[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\]|\\.)*",?)*\})? (\S+)$')
+
+
+def summary():
+    collector = MetricsCollector()
+    with collector.measure("asr"):
+        pass
+    collector.add("asr", 0.5, 0.25)
+    collector.add("emotion.hubert", 1.0, 0.5, calls=4)
+    collector.count("analyzed", 3)
+    collector.count("skipped")
+    return collector.summary(audio_seconds=10.0)
+
+
+def parse(text):
+    """Checks the exposition format and returns {metric: [(labels, value)]}."""
+    samples, declared = {}, {}
+    for line in text.splitlines():
+        if line.startswith("# HELP "):
+            continue
+        if line.startswith("# TYPE "):
+            _, _, metric, kind = line.split(" ")
+            assert metric not in declared and kind == "gauge"
+            declared[metric] = kind
+            continue
+        match = SAMPLE.match(line)
+        assert match, line
+        metric, labels, value = match.group(1), match.group(2) or "", match.group(3)
+        # Every sample follows its TYPE line
+        assert metric in declared
+        samples.setdefault(metric, []).append((labels, float(value)))
+    return samples
+
+
+def test_summary_accumulates_per_stage():
+    result = summary()
+    asr = result["stages"]["asr"]
+    assert asr["calls"] == 2
+    assert asr["wall_seconds"] == pytest.approx(0.5, abs=0.01)
+    assert result["stages"]["emotion.hubert"] == {"calls": 4, "wall_seconds": 1.0, "cpu_seconds": 0.5,
+                                                  "mean_ms": 250.0, "real_time_factor": 0.1}
+    assert result["counters"] == {"analyzed": 3, "skipped": 1}
+    assert result["audio_seconds"] == 10.0
+
+
+def test_measure_without_a_collector_is_a_no_op():
+    with measure(None, "asr"):
+        pass
+
+
+def test_textfile_exposition_format(tmp_path):
+    path = str(tmp_path / "pipeline.prom")
+    write_prometheus_textfile(summary(), path, labels={"file": 'clinic "A"\\room.wav'})
+    text = open(path, encoding="utf-8").read()
+    assert text.endswith("\n")
+    samples = parse(text)
+
+    file_label = 'file="clinic \\"A\\"\\\\room.wav"'
+    assert samples["audio_pipeline_audio_seconds"] == [("{" + file_label + "}", 10.0)]
+    calls = dict(samples["audio_pipeline_stage_calls"])
+    assert calls == {"{" + file_label + ',stage="asr"}': 2.0, "{" + file_label + ',stage="emotion.hubert"}': 4.0}
+    outcomes = dict(samples["audio_pipeline_segments"])
+    assert outcomes["{" + file_label + ',outcome="analyzed"}'] == 3.0
+    assert set(samples) >= {"audio_pipeline_wall_seconds", "audio_pipeline_cpu_seconds",
+                            "audio_pipeline_real_time_factor", "audio_pipeline_peak_rss_bytes",
+                            "audio_pipeline_stage_wall_seconds", "audio_pipeline_stage_cpu_seconds"}
+
+
+def test_textfile_skips_missing_values_and_labels(tmp_path):
+    path = str(tmp_path / "pipeline.prom")
+    write_prometheus_textfile(MetricsCollector().summary(audio_seconds=0.0), path)
+    samples = parse(open(path, encoding="utf-8").read())
+    # No real-time factor for an empty recording, no counters, and no label braces
+    assert "audio_pipeline_real_time_factor" not in samples
+    assert "audio_pipeline_segments" not in samples
+    assert samples["audio_pipeline_audio_seconds"] == [("", 0.0)]
+
+
+def test_textfile_is_replaced_atomically(tmp_path, monkeypatch):
+    path = str(tmp_path / "textfile" / "pipeline.prom")
+    write_prometheus_textfile(summary(), path, labels={"file": "first.wav"})
+    assert 'file="first.wav"' in open(path, encoding="utf-8").read()
+    write_prometheus_textfile(summary(), path, labels={"file": "second.wav"})
+    text = open(path, encoding="utf-8").read()
+    assert 'file="second.wav"' in text and "first.wav" not in text
+
+    # A failed write leaves the previous file intact and no temporary file behind
+    def failing_replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(metrics_module.os, "replace", failing_replace)
+    with pytest.raises(OSError):
+        write_prometheus_textfile(summary(), path, labels={"file": "third.wav"})
+    assert open(path, encoding="utf-8").read() == text
+    assert os.listdir(os.path.dirname(path)) == ["pipeline.prom"]
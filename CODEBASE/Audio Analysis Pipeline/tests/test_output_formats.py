@@ -0,0 +1,93 @@
+"""Tests for the columnar (Parquet / Arrow) output (pipeline/output_formats.py)."""
+
+import os
+import json
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+from pipeline.output_formats import (
+    columnar_path, flatten_segment, read_output, read_table, split_output, unflatten_segment, write_columnar
+)
+
+
+def segment(i):
+    result = {"segment_id": i, "speaker": f"SPEAKER_0{i % 2}", "start_time": i * 2.0, "end_time": i * 2.0 + 1.5,
+              "duration": 1.5, "transcript": f"sätze {i}",
+              "predicted_emotion": {"label": "neu", "score": 0.5, "confidence": "low",
+                                    "hubert_emotion": "neu", "hubert_score": 0.6,
+                                    "wav2vec2_emotion": "sad", "wav2vec2_score": 0.4,
+                                    "text_emotion": "neu", "text_score": 0.7, "agreement": "2/3",
+                                    "sarcasm_flag": False, "mixed_emotion_flag": i % 3 == 0,
+                                    "method": "ensemble"},
+              "acoustic_features": {"pitch_mean_f0": 180.0 + i, "jitter_local": 0.01,
+                                    "shimmer_local": 0.05, "hnr_mean": 12.5}}
+    if i == 3:
+        result["skipped"] = "no_speech"
+        result["predicted_emotion"] = None
+        result["acoustic_features"] = None
+        result["transcript"] = ""
+    return result
+
+
+OUTPUT = {"file": "session.wav", "num_speakers": 2, "diarization_method": "pyannote",
+          "segments": [segment(i) for i in range(10)], "metrics": {"wall_seconds": 12.5}}
+
+
+def test_flatten_round_trips_typed_segments():
+    for item in OUTPUT["segments"]:
+        row = flatten_segment(item)
+        assert row["segment_json"] is None
+        assert unflatten_segment(row) == item
+
+
+def test_untyped_values_keep_their_json():
+    odd = dict(segment(0), start_time=2, extra={"stage": "plugin"})
+    row = flatten_segment(odd)
+    assert row["start_time"] is None and row["segment_json"] is not None
+    assert json.dumps(unflatten_segment(row)) == json.dumps(odd)
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_write_and_read_back_with_typed_columns(tmp_path, fmt):
+    path = columnar_path(str(tmp_path / "session.json"), fmt)
+    segments, summary, key_order = split_output(OUTPUT)
+    # Several batches, the last one partial
+    assert write_columnar(path, fmt, iter(segments), summary, key_order, batch_rows=4) == 10
+
+    table = read_table(path)
+    assert table.num_rows == 10
+    assert table.schema.field("start_time").type == pa.float64()
+    assert table.schema.field("segment_id").type == pa.int32()
+    assert table.schema.field("sarcasm_flag").type == pa.bool_()
+    assert table.column("hnr_mean").to_pylist()[:3] == [12.5, 12.5, 12.5]
+    assert table.column("skipped").to_pylist()[3] == "no_speech"
+    assert json.dumps(read_output(path)) == json.dumps(OUTPUT)
+    assert not os.path.exists(path + ".tmp")
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_empty_output(tmp_path, fmt):
+    path = str(tmp_path / f"empty.{fmt}")
+    output = {"file": "silence.wav", "segments": []}
+    segments, summary, key_order = split_output(output)
+    assert write_columnar(path, fmt, segments, summary, key_order) == 0
+    assert read_output(path) == output
+
+
+def test_failed_write_leaves_no_file(tmp_path):
+    path = str(tmp_path / "broken.parquet")
+
+    def failing():
+        yield segment(0)
+        raise RuntimeError("journal unreadable")
+
+    with pytest.raises(RuntimeError):
+        write_columnar(path, "parquet", failing(), {"file": "x.wav"})
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        write_columnar(str(tmp_path / "x.csv"), "csv", [], {})
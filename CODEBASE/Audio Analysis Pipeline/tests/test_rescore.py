@@ -0,0 +1,105 @@
+"""Tests for pairing Phase 1 outputs with their recordings (pipeline/rescore.py)."""
+
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("tqdm")
+from pipeline.rescore import resolve_rescore_jobs  # noqa: E402
+
+
+def write_output(path, recording):
+    path.write_text(json.dumps({"file": recording, "segments": []}), encoding="utf-8")
+
+
+def test_directory_outputs_are_named_after_their_json(tmp_path):
+    outputs, audio = tmp_path / "output", tmp_path / "input"
+    outputs.mkdir()
+    audio.mkdir()
+    (audio / "session.mp3").write_bytes(b"audio")
+    # Two Phase 1 runs of the same recording must not overwrite each other's re-score
+    write_output(outputs / "session.json", "session.mp3")
+    write_output(outputs / "session_large.json", "session.mp3")
+    write_output(outputs / "session_phase2.json", "session.mp3")  # earlier re-score, skipped
+    jobs = resolve_rescore_jobs(str(outputs), str(audio), str(tmp_path / "rescored"))
+    assert [(json_path.split("/")[-1], output.split("/")[-1]) for json_path, _, output in jobs] == [
+        ("session.json", "session_phase2.json"),
+        ("session_large.json", "session_large_phase2.json"),
+    ]
+    assert all(audio_path == str(audio / "session.mp3") for _, audio_path, _ in jobs)
+
+
+def test_single_json_with_single_recording(tmp_path):
+    write_output(tmp_path / "run1.json", "session.mp3")
+    (tmp_path / "session.mp3").write_bytes(b"audio")
+    jobs = resolve_rescore_jobs(str(tmp_path / "run1.json"), str(tmp_path / "session.mp3"), str(tmp_path))
+    assert jobs == [(str(tmp_path / "run1.json"), str(tmp_path / "session.mp3"), str(tmp_path / "run1_phase2.json"))]
+
+
+def test_directory_of_json_with_one_recording_is_rejected(tmp_path):
+    write_output(tmp_path / "a.json", "a.mp3")
+    write_output(tmp_path / "b.json", "b.mp3")
+    (tmp_path / "a.mp3").write_bytes(b"audio")
+    with pytest.raises(ValueError, match="directory of recordings"):
+        resolve_rescore_jobs(str(tmp_path), str(tmp_path / "a.mp3"), str(tmp_path / "out"))
+
+
+def test_missing_recordings_are_skipped(tmp_path):
+    outputs = tmp_path / "output"
+    outputs.mkdir()
+    write_output(outputs / "gone.json", "gone.mp3")
+    assert resolve_rescore_jobs(str(outputs), str(tmp_path), str(tmp_path / "out")) == []
+
+
+class StandInEmotion:
+    """EmotionService without models: a fixed label for every segment."""
+
+    def __init__(self, **kwargs):
+        self.metrics = None
+
+    def process(self, audio_slice, transcript="", acoustic_features=None):
+        return {"label": "neu", "score": 1.0}
+
+
+def voiced(seconds, f0=140.0, sample_rate=16000):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return sum(0.2 / k * np.sin(2 * np.pi * k * f0 * t) for k in range(1, 6)).astype(np.float32)
+
+
+@pytest.mark.parametrize("split_channels", [False, True])
+def test_rescore_hits_the_results_of_the_full_pipeline(tmp_path, monkeypatch, split_channels):
+    from pipeline import audio_utilities
+    from pipeline import rescore
+    from pipeline.analysis_pipeline import AnalysisPipeline
+    from pipeline.result_cache import ResultCache
+
+    silence = np.zeros(16000 * 3, dtype=np.float32)
+    left = np.concatenate([silence, voiced(2.0), silence, np.zeros(16000 * 3, dtype=np.float32), silence])
+    right = np.concatenate([silence, np.zeros(16000 * 2, dtype=np.float32), silence, voiced(3.0, f0=210.0), silence])
+
+    def decode(path, target_sample_rate=16000, cache=None, backend="torchaudio", keep_channels=False):
+        # Mixing after decoding rounds differently from a mono decode (as with real decoders)
+        if keep_channels:
+            return np.stack([left, right]), 16000
+        return (left + right) / np.float32(2.0) + np.float32(1e-7), 16000
+
+    monkeypatch.setattr(audio_utilities, "load_and_resample_audio", decode)
+    monkeypatch.setattr(rescore, "EmotionService", StandInEmotion)
+    recording = tmp_path / "session.wav"
+    recording.write_bytes(b"stand-in recording")
+    cache = ResultCache(str(tmp_path / "results.sqlite"))
+
+    pipeline = AnalysisPipeline(stages=("acoustic",), acoustic_workers=0, result_cache=cache,
+                                split_channels=split_channels)
+    pipeline.run(str(recording), str(tmp_path / "session.json"))
+    phase1 = json.loads((tmp_path / "session.json").read_text(encoding="utf-8"))
+    analyzed = [s for s in phase1["segments"] if not s.get("skipped")]
+    assert analyzed and cache.stats()["acoustic"] == {"hits": 0, "misses": len(analyzed)}
+    assert ("channel_diarization" in phase1) == split_channels
+
+    rescorer = rescore.RescorePipeline(result_cache=cache, rescore_acoustics=True, acoustic_workers=0)
+    rescored = rescorer.run(str(tmp_path / "session.json"), str(recording), str(tmp_path / "session_phase2.json"))
+    assert cache.stats()["acoustic"] == {"misses": len(analyzed), "hits": len(analyzed)}
+    assert [s["acoustic_features"] for s in rescored["segments"]] == [s["acoustic_features"] for s in phase1["segments"]]
+    cache.close()
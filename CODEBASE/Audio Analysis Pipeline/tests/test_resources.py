@@ -0,0 +1,112 @@
+"""Tests for the CPU budget arithmetic (pipeline/resources.py)."""
+
+import sys
+import types
+
+import pytest
+
+from pipeline.resources import RESOURCE_SERVICES, parse_cpu_budget, plan_resources
+
+SEGMENT_STAGES = ("asr", "acoustic", "emotion")
+PIPELINED = {"asr": 1, "acoustic": 1, "emotion": 1}
+
+
+def test_parse_cpu_budget():
+    assert parse_cpu_budget(None) == {}
+    assert parse_cpu_budget("asr=8, emotion=6,acoustic=2") == {"asr": 8, "emotion": 6, "acoustic": 2}
+
+
+@pytest.mark.parametrize("spec", ["asr=0", "gpu=2", "asr", "asr=two"])
+def test_parse_cpu_budget_rejects_bad_specs(spec):
+    with pytest.raises(ValueError):
+        parse_cpu_budget(spec)
+
+
+@pytest.mark.parametrize("cpus", [1, 2, 4, 8, 32])
+def test_serial_run_without_a_budget_keeps_the_unshared_sizes(monkeypatch, cpus):
+    monkeypatch.setattr("pipeline.resources.available_cpus", lambda: cpus)
+    plan = plan_resources(RESOURCE_SERVICES)
+    assert plan.cpus == cpus
+    assert plan.acoustic_workers == max(1, cpus - 1)
+    assert plan.budgets == {"diarize": cpus, "asr": cpus, "acoustic": max(1, cpus - 1), "emotion": cpus}
+    assert plan.asr_threads == cpus
+    assert not plan.oversubscribed
+
+
+@pytest.mark.parametrize("cpus, acoustic", [(1, 1), (2, 1), (4, 1), (5, 1), (10, 2), (32, 6)])
+def test_serial_run_with_cpus_gives_acoustics_a_fifth(cpus, acoustic):
+    plan = plan_resources(RESOURCE_SERVICES, cpus=cpus)
+    assert plan.acoustic_workers == acoustic
+    # ASR and emotion take turns, so each gets what the acoustic pool leaves
+    assert plan.budgets["asr"] == plan.budgets["emotion"] == max(1, cpus - acoustic)
+    assert plan.budgets["diarize"] == cpus
+
+
+@pytest.mark.parametrize("cpus", [2, 3, 4, 7, 16, 33])
+def test_pipelined_shares_use_every_cpu(cpus):
+    plan = plan_resources(SEGMENT_STAGES, cpus=cpus, stage_workers=PIPELINED)
+    assert sum(plan.budgets[name] for name in SEGMENT_STAGES) == max(cpus, len(SEGMENT_STAGES))
+    assert all(plan.budgets[name] >= 1 for name in SEGMENT_STAGES)
+    # ASR and emotion have equal default shares; acoustics the smallest
+    assert abs(plan.budgets["asr"] - plan.budgets["emotion"]) <= 1
+    assert plan.budgets["acoustic"] <= min(plan.budgets["asr"], plan.budgets["emotion"])
+
+
+def test_pipelined_on_one_cpu_is_flagged():
+    plan = plan_resources(SEGMENT_STAGES, cpus=1, stage_workers=PIPELINED)
+    assert plan.budgets == {"asr": 1, "acoustic": 1, "emotion": 1}
+    assert not plan.oversubscribed  # one CPU per overlapping stage is the least possible
+    assert plan_resources(SEGMENT_STAGES, cpus=4, budget={"asr": 4, "emotion": 4},
+                          stage_workers=PIPELINED).oversubscribed
+
+
+def test_explicit_budget_and_remaining_split():
+    plan = plan_resources(RESOURCE_SERVICES, cpus=16, budget={"asr": 8}, stage_workers=PIPELINED)
+    assert plan.budgets["asr"] == 8
+    # acoustic:emotion = 0.2:0.4 of the remaining 8, rounded down, leftover to emotion first
+    assert plan.budgets["acoustic"] == 2
+    assert plan.budgets["emotion"] == 6
+    assert plan.budgets["diarize"] == 16
+
+
+def test_asr_threads_are_divided_between_asr_workers():
+    plan = plan_resources(("asr",), cpus=8, budget={"asr": 8}, stage_workers={"asr": 2})
+    assert plan.asr_options() == {"cpu_threads": 4, "num_workers": 2}
+
+
+def test_explicit_acoustic_workers():
+    plan = plan_resources(RESOURCE_SERVICES, cpus=8, acoustic_workers=3)
+    assert plan.acoustic_workers == 3
+    assert plan.budgets["asr"] == 5
+    in_process = plan_resources(RESOURCE_SERVICES, cpus=8, acoustic_workers=0)
+    assert in_process.acoustic_workers == 0
+    # In-process extraction still occupies a core
+    assert in_process.budgets["acoustic"] == 1
+    assert plan_resources(("asr", "emotion"), cpus=8).acoustic_workers == 0
+
+
+def test_torch_threads_cover_only_the_torch_services():
+    plan = plan_resources(RESOURCE_SERVICES, cpus=10)
+    assert plan.torch_threads == {"diarize": 10, "emotion": 8}
+    assert plan.as_dict()["acoustic_workers"] == 2
+
+
+def test_torch_is_sized_for_asr_when_no_torch_model_runs():
+    # ASRService and the torchaudio decoder import torch even without diarize/emotion
+    plan = plan_resources(("asr", "acoustic"), cpus=10)
+    assert plan.torch_threads == {"asr": plan.budgets["asr"]}
+    assert plan_resources(("acoustic",), cpus=10).torch_threads == {}
+    assert "asr" not in plan_resources(("asr", "emotion"), cpus=10).torch_threads
+
+
+def test_apply_torch_sets_the_asr_share(monkeypatch):
+    calls = []
+    torch = types.SimpleNamespace(get_num_threads=lambda: 10, set_num_threads=calls.append,
+                                  set_num_interop_threads=lambda n: None)
+    monkeypatch.delitem(sys.modules, "torch", raising=False)
+    plan = plan_resources(("asr", "acoustic"), cpus=10)
+    plan.apply_torch("asr")
+    assert calls == []  # torch not imported yet
+    monkeypatch.setitem(sys.modules, "torch", torch)
+    plan.apply_torch("asr")
+    assert calls == [plan.budgets["asr"]]
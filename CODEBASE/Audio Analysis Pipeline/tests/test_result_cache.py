@@ -0,0 +1,111 @@
+"""Tests for the per-stage result cache and its keys (pipeline/result_cache.py)."""
+
+import os
+
+import numpy as np
+import pytest
+
+from pipeline.audio_segment import AudioSegmentView
+from pipeline.result_cache import MISS, ResultCache, content_id, fingerprint, segment_key
+from pipeline.services.asr_service import whisper_revision
+
+SR = 16000
+KEY = ("0123abcd-torchaudio@16000", 16000, 48000)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache" / "results.sqlite"))
+    yield cache
+    cache.close()
+
+
+def asr_params(model="base.en", revision="c1a2b3", compute_type="int8"):
+    return fingerprint(model=model, revision=revision, device="cpu", compute_type=compute_type, language="en")
+
+
+def test_hit_with_the_same_params(cache):
+    cache.put("asr", KEY, asr_params(), "hello there")
+    assert cache.get("asr", KEY, asr_params()) == "hello there"
+    # None is a result too (e.g. silent segments in the acoustic stage)
+    cache.put("acoustic", KEY, "params", None)
+    assert cache.get("acoustic", KEY, "params") is None
+    assert cache.stats() == {"asr": {"hits": 1, "misses": 0}, "acoustic": {"hits": 1, "misses": 0}}
+
+
+@pytest.mark.parametrize("changed", [
+    {"model": "small.en"},
+    {"revision": "d4e5f6"},
+    {"revision": None},
+    {"compute_type": "float32"},
+])
+def test_changed_params_miss(cache, changed):
+    cache.put("asr", KEY, asr_params(), "hello there")
+    assert cache.get("asr", KEY, asr_params(**changed)) is MISS
+    assert cache.stats()["asr"] == {"hits": 0, "misses": 1}
+    # Both results are kept side by side
+    cache.put("asr", KEY, asr_params(**changed), "hello their")
+    assert cache.get("asr", KEY, asr_params()) == "hello there"
+    assert cache.entry_counts() == {"asr": 2}
+
+
+def test_other_stage_or_bounds_miss(cache):
+    cache.put("asr", KEY, "params", "hello there")
+    assert cache.get("emotion", KEY, "params") is MISS
+    assert cache.get("asr", (KEY[0], KEY[1], KEY[2] + 1), "params") is MISS
+    assert cache.get("asr", ("other-torchaudio@16000", KEY[1], KEY[2]), "params") is MISS
+
+
+def test_fingerprint_is_order_independent():
+    assert fingerprint(model="base.en", revision="a") == fingerprint(revision="a", model="base.en")
+    assert fingerprint(model="base.en", revision="a") != fingerprint(model="base.en", revision="b")
+
+
+def test_results_persist_across_connections(cache):
+    cache.put("emotion", KEY, "params", {"label": "neu", "score": 0.5})
+    reopened = ResultCache(cache.path)
+    assert reopened.get("emotion", KEY, "params") == {"label": "neu", "score": 0.5}
+    reopened.clear()
+    assert reopened.get("emotion", KEY, "params") is MISS
+    reopened.close()
+
+
+def test_unserializable_values_are_not_cached(cache):
+    cache.put("asr", KEY, "params", object())
+    assert cache.get("asr", KEY, "params") is MISS
+
+
+def test_segment_key_needs_a_source_id():
+    audio = np.zeros(SR, dtype=np.float32)
+    assert segment_key(AudioSegmentView(audio, SR, 100, 900, source_id="abc-ffmpeg")) == ("abc-ffmpeg@16000", 100, 900)
+    assert segment_key(AudioSegmentView(audio, SR, 100, 900)) is None
+    assert segment_key(audio[100:900]) is None
+
+
+def test_content_id_covers_the_decoding(tmp_path):
+    recording = tmp_path / "session.wav"
+    recording.write_bytes(b"stand-in recording")
+    copy = tmp_path / "renamed.wav"
+    copy.write_bytes(b"stand-in recording")
+    assert content_id(str(recording), "torchaudio") == content_id(str(copy), "torchaudio")
+    assert content_id(str(recording), "torchaudio") != content_id(str(recording), "ffmpeg")
+    assert content_id(str(recording), "ffmpeg", downmix=True).endswith("-ffmpeg-downmix")
+
+
+def test_whisper_revision_of_a_hub_snapshot(tmp_path):
+    snapshot = tmp_path / "models--Systran--faster-whisper-base.en" / "snapshots" / "ebe41f70d5b6dfa9166e2c581c45c9c0cfc57b66"
+    snapshot.mkdir(parents=True)
+    assert whisper_revision(str(snapshot) + os.sep) == "ebe41f70d5b6dfa9166e2c581c45c9c0cfc57b66"
+
+
+def test_whisper_revision_of_a_local_model(tmp_path):
+    model = tmp_path / "whisper-clinic"
+    model.mkdir()
+    assert whisper_revision(str(model)) is None
+    (model / "model.bin").write_bytes(b"weights")
+    first = whisper_revision(str(model))
+    assert first is not None
+    # Retrained weights in the same directory give a new revision
+    (model / "model.bin").write_bytes(b"new weights")
+    os.utime(model / "model.bin", ns=(0, 10 ** 18))
+    assert whisper_revision(str(model)) not in (None, first)
@@ -0,0 +1,148 @@
+"""Tests for the analysis server's request handling (pipeline/server.py)."""
+
+import json
+import threading
+import http.client
+
+import pytest
+
+from pipeline.server import AnalysisServer, make_http_server, parse_speakers, parse_wait
+
+
+class StandInPipeline:
+    """Writes a fixed result instead of analyzing the audio."""
+
+    def __init__(self):
+        self.calls = []
+
+    def run(self, audio_file_path, output_json_path, num_speakers, **kwargs):
+        self.calls.append((audio_file_path, num_speakers, kwargs))
+        with open(output_json_path, "w", encoding="utf-8") as f:
+            json.dump({"segments": []}, f)
+        return {"segment_count": 0, "metrics": {}}
+
+
+@pytest.fixture
+def server(tmp_path):
+    pipeline = StandInPipeline()
+    app = AnalysisServer(pipeline, output_dir=str(tmp_path / "output"), upload_dir=str(tmp_path / "uploads"))
+    http_server = make_http_server(app, port=0)
+    thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+    thread.start()
+    yield http_server, app, pipeline
+    http_server.shutdown()
+    http_server.server_close()
+    app.close(timeout=5)
+
+
+def post(http_server, path, body, content_type="application/json"):
+    connection = http.client.HTTPConnection(*http_server.server_address, timeout=10)
+    connection.request("POST", path, body=body, headers={"Content-Type": content_type})
+    response = connection.getresponse()
+    payload = json.loads(response.read() or b"{}")
+    connection.close()
+    return response.status, payload
+
+
+@pytest.mark.parametrize("value, expected", [(None, 2), (3, 3), ("4", 4), (1.0, 1)])
+def test_parse_speakers_accepts_whole_numbers(value, expected):
+    assert parse_speakers(value, default=2) == expected
+
+
+@pytest.mark.parametrize("value", [[1, 2], {"n": 2}, "two", 1.5, True, 0, -1, float("inf")])
+def test_parse_speakers_rejects_other_values(value):
+    with pytest.raises(ValueError):
+        parse_speakers(value, default=2)
+
+
+@pytest.mark.parametrize("body", [b"[1, 2]", b'"clip.wav"', b"3", b"{not json"])
+def test_post_rejects_bodies_that_are_not_json_objects(server, body):
+    http_server, _, pipeline = server
+    status, payload = post(http_server, "/jobs", body)
+    assert status == 400
+    assert "error" in payload
+    assert pipeline.calls == []
+
+
+def test_post_rejects_bad_fields(server, tmp_path):
+    http_server, _, pipeline = server
+    audio = tmp_path / "clip.wav"
+    audio.write_bytes(b"RIFF")
+    for fields in ({"path": str(audio), "num_speakers": [1, 2]},
+                   {"path": str(audio), "num_speakers": "two"},
+                   {"path": 5}):
+        status, payload = post(http_server, "/jobs", json.dumps(fields).encode())
+        assert status == 400, fields
+        assert "error" in payload
+    assert pipeline.calls == []
+
+
+@pytest.mark.parametrize("value", ["false", "0", 1, [], {}])
+def test_parse_wait_accepts_only_booleans(value):
+    assert parse_wait(None, default=True) is True
+    assert parse_wait(False, default=True) is False
+    with pytest.raises(ValueError):
+        parse_wait(value)
+
+
+def test_json_wait_must_be_a_boolean(server, tmp_path):
+    http_server, _, pipeline = server
+    audio = tmp_path / "clip.wav"
+    audio.write_bytes(b"RIFF")
+    status, payload = post(http_server, "/jobs", json.dumps({"path": str(audio), "wait": "false"}).encode())
+    assert status == 400 and "wait" in payload["error"]
+    assert pipeline.calls == []
+    status, payload = post(http_server, "/jobs", json.dumps({"path": str(audio), "wait": False}).encode())
+    assert status == 202 and payload["status"] in ("queued", "running", "done")
+
+
+@pytest.mark.parametrize("content_type", ["application/json", "audio/wav"])
+def test_bodies_over_the_limit_are_rejected(server, tmp_path, content_type):
+    http_server, app, pipeline = server
+    audio = tmp_path / "clip.wav"
+    audio.write_bytes(b"RIFF")
+    app.max_upload_bytes = 64
+    body = json.dumps({"path": str(audio), "note": "x" * 100}).encode()
+    status, payload = post(http_server, "/jobs", body, content_type)
+    assert status == 413 and "64 bytes" in payload["error"]
+    assert pipeline.calls == []
+    assert list((tmp_path / "uploads").glob("*")) == []
+
+
+def test_upload_with_bad_speakers_is_rejected(server, tmp_path):
+    http_server, _, pipeline = server
+    status, _ = post(http_server, "/jobs?filename=a.wav&num_speakers=x", b"RIFF" * 64, "audio/wav")
+    assert status == 400
+    assert list((tmp_path / "uploads").iterdir()) == []
+    assert pipeline.calls == []
+
+
+def test_valid_job_runs(server, tmp_path):
+    http_server, _, pipeline = server
+    audio = tmp_path / "clip.wav"
+    audio.write_bytes(b"RIFF")
+    status, payload = post(http_server, "/jobs?wait=1", json.dumps({"path": str(audio), "num_speakers": 3}).encode())
+    assert status == 200
+    assert payload == {"segments": []}
+    assert pipeline.calls[0][:2] == (str(audio), 3)
+
+
+def test_upload_is_named_after_the_client_file_and_not_linked(server, tmp_path):
+    http_server, app, pipeline = server
+    status, _ = post(http_server, "/jobs?filename=../session%2001.wav&wait=1", b"RIFF" * 64, "audio/wav")
+    assert status == 200
+    upload_path, _, kwargs = pipeline.calls[0]
+    assert kwargs == {"source_name": "session 01.wav", "link_audio": False}
+    # The temporary upload is gone once the job finished
+    assert list((tmp_path / "uploads").iterdir()) == []
+    assert app.list_jobs()["jobs"][0]["file"] == "session 01.wav"
+
+
+def test_path_job_keeps_the_default_naming(server, tmp_path):
+    http_server, app, pipeline = server
+    audio = tmp_path / "clip.wav"
+    audio.write_bytes(b"RIFF")
+    status, _ = post(http_server, "/jobs?wait=1", json.dumps({"path": str(audio)}).encode())
+    assert status == 200
+    assert pipeline.calls[0][2] == {}
+    assert app.list_jobs()["jobs"][0]["file"] == "clip.wav"
@@ -0,0 +1,138 @@
+"""Tests for the pipelined segment stages (pipeline/stage_executor.py)."""
+
+import random
+import threading
+import time
+
+import pytest
+
+from pipeline.stage_executor import (
+    SEGMENT_STAGES, Stage, StageExecutor, StageGraph, parse_stage_workers, parse_stages, segment_stage
+)
+
+
+def jittered(fn, seed):
+    """Wraps a stage function with random delays, so segments finish out of order."""
+    rng = random.Random(seed)
+    lock = threading.Lock()
+
+    def stage(payload):
+        with lock:
+            delay = rng.uniform(0, 0.004)
+        time.sleep(delay)
+        fn(payload)
+    return stage
+
+
+def built_in_stages(workers, seed=0, fail=None):
+    """asr, acoustic and emotion stand-ins; `fail` maps stage name -> segment index to raise on."""
+    fail = fail or {}
+
+    def make(name, field, value):
+        def fn(payload):
+            if fail.get(name) == payload["index"]:
+                raise RuntimeError(f"{name} failed on segment {payload['index']}")
+            payload[field] = value(payload)
+        return jittered(fn, seed + len(name))
+
+    return [
+        segment_stage("asr", make("asr", "transcript", lambda p: f"words {p['index']}"), workers["asr"]),
+        segment_stage("acoustic", make("acoustic", "acoustic_features", lambda p: {"f0": p["index"]}),
+                      workers["acoustic"]),
+        # Emotion reads what ASR and acoustics wrote, so it must run after both
+        segment_stage("emotion", make("emotion", "predicted_emotion",
+                                      lambda p: (p["transcript"], p["acoustic_features"]["f0"])),
+                      workers["emotion"]),
+    ]
+
+
+def serial(payloads, stages):
+    for payload in payloads:
+        for stage in stages:
+            stage.fn(payload)
+        yield payload
+
+
+@pytest.mark.parametrize("workers", [{"asr": 1, "acoustic": 1, "emotion": 1},
+                                     {"asr": 3, "acoustic": 2, "emotion": 4}])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_results_match_the_serial_loop_in_input_order(workers, seed):
+    expected = list(serial([{"index": i, "audio": None} for i in range(40)], built_in_stages(workers, seed)))
+    executor = StageExecutor(built_in_stages(workers, seed), queue_size=2)
+    results = list(executor.run({"index": i, "audio": None} for i in range(40)))
+    assert [payload["index"] for payload in results] == list(range(40))
+    assert results == expected
+
+
+def test_segments_in_flight_are_bounded():
+    in_flight, peak = set(), [0]
+    lock = threading.Lock()
+
+    def enter(payload):
+        with lock:
+            in_flight.add(payload["index"])
+            peak[0] = max(peak[0], len(in_flight))
+        time.sleep(0.001)
+
+    executor = StageExecutor([Stage("only", enter, workers=4)], queue_size=2)
+    for payload in executor.run({"index": i} for i in range(30)):
+        with lock:
+            in_flight.discard(payload["index"])
+    assert peak[0] <= executor.max_in_flight
+
+
+def test_first_error_in_input_order_is_raised_after_earlier_results():
+    # Segment 7 fails in a fast stage, segment 3 in a slow one: the consumer still sees
+    # segments 0-2 and then segment 3's error, as a serial loop would
+    workers = {"asr": 2, "acoustic": 2, "emotion": 2}
+    stages = built_in_stages(workers, fail={"emotion": 3, "asr": 7})
+    executor = StageExecutor(stages)
+    received = []
+    with pytest.raises(RuntimeError, match="emotion failed on segment 3"):
+        for payload in executor.run({"index": i, "audio": None} for i in range(20)):
+            received.append(payload["index"])
+    assert received == [0, 1, 2]
+
+
+def test_failed_segment_skips_its_remaining_stages():
+    ran = []
+
+    def asr(payload):
+        if payload["index"] == 0:
+            raise ValueError("bad audio")
+        payload["transcript"] = "ok"
+
+    def emotion(payload):
+        ran.append(payload["index"])
+        payload["predicted_emotion"] = "neu"
+
+    executor = StageExecutor([segment_stage("asr", asr), segment_stage("emotion", emotion)])
+    with pytest.raises(ValueError):
+        next(executor.run([{"index": 0, "audio": None}]))
+    assert ran == []
+
+
+def test_stage_graph_runs_independent_stages_side_by_side():
+    graph = StageGraph([segment_stage(name, lambda p: None) for name in SEGMENT_STAGES])
+    assert graph.describe() == "asr | acoustic -> emotion"
+    assert graph.dependencies["emotion"] == ("asr", "acoustic")
+
+
+def test_stage_graph_rejects_bad_declarations():
+    with pytest.raises(ValueError, match="written by both"):
+        StageGraph([Stage("a", None, inputs=("audio",), outputs=("x",)),
+                    Stage("b", None, inputs=("audio",), outputs=("x",))])
+    with pytest.raises(ValueError, match="no stage produces"):
+        StageGraph([Stage("a", None, inputs=("missing",), outputs=("x",))])
+    with pytest.raises(ValueError, match="cycle"):
+        StageGraph([Stage("a", None, inputs=("y",), outputs=("x",)),
+                    Stage("b", None, inputs=("x",), outputs=("y",))])
+
+
+def test_parse_stage_workers_and_stages():
+    assert parse_stage_workers("asr=2", SEGMENT_STAGES) == {"asr": 2, "acoustic": 1, "emotion": 1}
+    with pytest.raises(ValueError):
+        parse_stage_workers("asr=0", SEGMENT_STAGES)
+    with pytest.raises(ValueError):
+        parse_stage_workers("ocr=1", SEGMENT_STAGES)
+    assert parse_stages("emotion,asr") == ("asr", "emotion")
@@ -0,0 +1,201 @@
+"""Tests for online turn detection and per-turn streaming analysis (pipeline/streaming.py)."""
+
+import io
+import time
+
+import numpy as np
+import pytest
+
+from pipeline.streaming import StreamingAnalyzer, StreamingTurnDetector, latency_percentiles, read_pcm_stream
+
+SR = 16000
+FRAME = 480  # 30 ms
+
+
+def voiced(seconds, f0=140.0):
+    t = np.arange(int(seconds * SR)) / SR
+    return sum(0.2 / k * np.sin(2 * np.pi * k * f0 * t) for k in range(1, 6)).astype(np.float32)
+
+
+def quiet(seconds, seed=0):
+    return (1e-4 * np.random.default_rng(seed).standard_normal(int(seconds * SR))).astype(np.float32)
+
+
+def chunked(audio, seconds=0.25):
+    step = int(seconds * SR)
+    return [audio[..., offset:offset + step] for offset in range(0, audio.shape[-1], step)]
+
+
+def detect(audio, detector=None, chunk_seconds=0.25):
+    """Feeds `audio` chunk by chunk; returns [(turn, seconds of audio pushed when it was returned)]."""
+    detector = detector or StreamingTurnDetector(SR)
+    found, pushed = [], 0
+    for chunk in chunked(audio, chunk_seconds):
+        pushed += chunk.shape[-1]
+        found += [(turn, pushed / SR) for turn in detector.push(chunk)]
+    found += [(turn, None) for turn in detector.flush()]
+    return found
+
+
+def seconds(turn):
+    return turn[0] / SR, turn[1] / SR
+
+
+def test_turn_ends_after_the_end_silence():
+    found = detect(np.concatenate([quiet(1.0), voiced(2.0), quiet(2.0)]))
+    assert len(found) == 1
+    (turn, returned_at), = found
+    start, end = seconds(turn)
+    assert start == pytest.approx(1.0, abs=0.03) and end == pytest.approx(3.0, abs=0.03)
+    assert turn[2] == 0
+    # Closed once 600 ms of silence have passed, in the chunk where that happens
+    assert end + 0.6 <= returned_at < end + 0.6 + 0.25 + 0.03
+
+
+def test_short_pauses_stay_in_the_turn():
+    audio = np.concatenate([quiet(1.0), voiced(1.0), quiet(0.3, seed=1), voiced(1.0), quiet(1.5, seed=2)])
+    turns = [seconds(turn) for turn, _ in detect(audio)]
+    assert len(turns) == 1
+    assert turns[0][1] == pytest.approx(3.3, abs=0.03)
+
+
+def test_longer_pauses_split_turns():
+    audio = np.concatenate([quiet(1.0), voiced(1.0), quiet(1.0, seed=1), voiced(1.0), quiet(1.5, seed=2)])
+    turns = [seconds(turn) for turn, _ in detect(audio)]
+    assert turns == [pytest.approx((1.0, 2.0), abs=0.03), pytest.approx((3.0, 4.0), abs=0.03)]
+
+
+def test_clicks_are_dropped():
+    audio = np.concatenate([quiet(1.0), voiced(0.15), quiet(2.0, seed=1)])
+    assert detect(audio) == []
+
+
+def test_continuous_speech_is_cut_at_max_turn():
+    detector = StreamingTurnDetector(SR, max_turn_seconds=2.0)
+    found = detect(np.concatenate([quiet(1.0), voiced(5.0), quiet(1.5, seed=1)]), detector)
+    turns = [seconds(turn) for turn, _ in found]
+    assert len(turns) == 3
+    assert [end - start for start, end in turns[:2]] == pytest.approx([2.0, 2.0], abs=0.03)
+    # Consecutive pieces, no gap and no overlap
+    assert turns[0][1] == turns[1][0] and turns[1][1] == turns[2][0]
+    assert turns[2][1] == pytest.approx(6.0, abs=0.03)
+    # The first cut is returned while the speaker is still talking
+    assert found[0][1] <= turns[0][1] + 0.25
+
+
+def test_chunk_size_does_not_change_the_turns():
+    audio = np.concatenate([quiet(1.0), voiced(1.0), quiet(1.0, seed=1), voiced(1.5), quiet(1.5, seed=2)])
+    reference = [turn for turn, _ in detect(audio, chunk_seconds=0.25)]
+    # 0.1 s chunks are not a multiple of the frame length, so frames span chunks
+    assert [turn for turn, _ in detect(audio, chunk_seconds=0.1)] == reference
+    assert [turn for turn, _ in detect(audio, chunk_seconds=1.0)] == reference
+
+
+def test_flush_closes_the_open_turn():
+    detector = StreamingTurnDetector(SR)
+    assert detector.push(np.concatenate([quiet(1.0), voiced(1.0)])) == []
+    detector_start = detector.open_turn_start
+    assert detector_start == pytest.approx(SR, abs=FRAME)
+    (start, end, _), = detector.flush()
+    assert start == detector_start and end == pytest.approx(2 * SR, abs=FRAME)
+    assert detector.open_turn_start is None and detector.flush() == []
+
+
+def test_dominant_channel_labels_the_turn():
+    left = np.concatenate([quiet(1.0), voiced(1.0), quiet(1.0, seed=1), 0.05 * voiced(1.0, 210.0), quiet(1.5, seed=2)])
+    right = np.concatenate([quiet(1.0, seed=3), 0.05 * voiced(1.0), quiet(1.0, seed=4), voiced(1.0, 210.0),
+                            quiet(1.5, seed=5)])
+    assert [turn[2] for turn, _ in detect(np.stack([left, right]))] == [0, 1]
+
+
+def test_read_pcm_stream_decodes_interleaved_s16le():
+    samples = (np.arange(-8, 8, dtype=np.int16) * 1000).reshape(-1, 2)
+    # A trailing half frame is ignored
+    chunks = list(read_pcm_stream(io.BytesIO(samples.tobytes() + b"\x01"), chunk_seconds=4 / SR, channels=2))
+    assert [chunk.shape for chunk in chunks] == [(2, 4), (2, 4)]
+    np.testing.assert_allclose(np.concatenate(chunks, axis=1), samples.T / 32768.0)
+
+
+def test_latency_percentiles():
+    assert latency_percentiles([])["p50"] is None
+    summary = latency_percentiles([0.1, 0.2, 0.3, 0.4, 1.0])
+    assert summary["p50"] == 0.3 and summary["max"] == 1.0
+
+
+class StandInASR:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    def process(self, audio_slice):
+        time.sleep(self.delay)
+        return f"{audio_slice.size} samples"
+
+
+class StandInAcoustic:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    def process(self, audio_slice):
+        time.sleep(self.delay)
+        return {"pitch_mean_f0": 140.0}
+
+
+class StandInEmotion:
+    def __init__(self):
+        self.metrics = None
+        self.calls = 0
+
+    def process(self, audio_slice, transcript="", acoustic_features=None):
+        self.calls += 1
+        return {"label": "neu", "score": 1.0, "had_features": acoustic_features is not None}
+
+
+def conversation():
+    return np.concatenate([quiet(0.5), voiced(1.0), quiet(1.0, seed=1), voiced(1.0), quiet(1.0, seed=2)])
+
+
+def test_turns_are_analyzed_and_emitted_in_order():
+    emotion = StandInEmotion()
+    analyzer = StreamingAnalyzer(StandInASR(), StandInAcoustic(), emotion, sample_rate=SR)
+    emitted = []
+    summary = analyzer.run(chunked(conversation()), emitted.append)
+    assert [segment["turn_id"] for segment in emitted] == [0, 1]
+    for segment in emitted:
+        assert "skipped" not in segment and segment["speaker"] is None
+        assert segment["acoustic_features"] == {"pitch_mean_f0": 140.0}
+        assert segment["predicted_emotion"]["had_features"] is True
+        assert segment["latency_seconds"] <= analyzer.latency_target
+    assert emitted[0]["start_time"] == pytest.approx(0.5, abs=0.03)
+    assert summary["turns"] == 2 and summary["within_target"] == 1.0
+    assert summary["metrics"]["stages"]["asr"]["calls"] == 2
+
+
+def test_turns_over_the_latency_budget_skip_emotion():
+    emotion = StandInEmotion()
+    # ASR alone takes longer than the latency target
+    analyzer = StreamingAnalyzer(StandInASR(delay=0.2), StandInAcoustic(), emotion, sample_rate=SR,
+                                 latency_target=0.1)
+    emitted = []
+    summary = analyzer.run(chunked(conversation()), emitted.append)
+    assert len(emitted) == 2
+    for segment in emitted:
+        assert segment["skipped"] == "latency_budget"
+        # The transcript is still delivered; emotion (which waits for it) is dropped
+        assert segment["transcript"].endswith("samples")
+        assert segment["predicted_emotion"] is None
+    assert emotion.calls == 0
+    assert summary["within_target"] == 0.0
+
+
+def test_backlog_skips_acoustics_that_would_start_late():
+    emotion = StandInEmotion()
+    # Both turns arrive at once; the second waits for the first one's slow acoustics
+    analyzer = StreamingAnalyzer(StandInASR(), StandInAcoustic(delay=0.2), emotion, sample_rate=SR,
+                                 latency_target=0.1)
+    emitted = []
+    analyzer.run(chunked(conversation()), emitted.append)
+    first, second = emitted
+    assert first["acoustic_features"] == {"pitch_mean_f0": 140.0}
+    assert first["skipped"] == "latency_budget" and first["predicted_emotion"] is None
+    assert second["skipped"] == "latency_budget" and second["acoustic_features"] is None
+    assert emotion.calls == 0
@@ -0,0 +1,135 @@
+"""Tests for the energy VAD and the compacted-to-original time map (pipeline/vad.py)."""
+
+import numpy as np
+import pytest
+
+from pipeline.vad import TimeMap, VoiceActivityDetector, find_runs
+
+SR = 16000
+
+
+def tone(seconds, amplitude=0.3, freq=220.0):
+    t = np.arange(int(seconds * SR), dtype=np.float32) / SR
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+def silence(seconds, level=1e-4, seed=0):
+    rng = np.random.default_rng(seed)
+    return (level * rng.standard_normal(int(seconds * SR))).astype(np.float32)
+
+
+def approx(pieces):
+    return [pytest.approx(piece, abs=1e-6) for piece in pieces]
+
+
+def test_find_runs():
+    starts, ends = find_runs(np.array([0, 1, 1, 0, 1, 0, 0, 1], dtype=bool))
+    assert starts.tolist() == [1, 4, 7]
+    assert ends.tolist() == [3, 5, 8]
+
+
+def test_single_region_from_zero_is_identity():
+    time_map = TimeMap([(0, 10 * SR)], SR)
+    assert time_map.is_identity
+    assert time_map.compact_samples == 10 * SR
+    assert time_map.map_segment(1.0, 2.5) == approx([(1.0, 2.5)])
+
+
+def test_single_trimmed_region_is_shifted():
+    time_map = TimeMap([(3 * SR, 8 * SR)], SR)
+    assert not time_map.is_identity
+    assert time_map.map_segment(0.5, 2.0) == approx([(3.5, 5.0)])
+
+
+def test_segments_map_into_later_regions():
+    # Kept: [1 s, 3 s) and [10 s, 14 s) -> compacted [0, 2) and [2, 6)
+    time_map = TimeMap([(1 * SR, 3 * SR), (10 * SR, 14 * SR)], SR)
+    assert time_map.compact_samples == 6 * SR
+    assert time_map.map_segment(0.5, 1.5) == approx([(1.5, 2.5)])
+    assert time_map.map_segment(3.0, 5.5) == approx([(11.0, 13.5)])
+
+
+def test_segment_across_a_splice_is_split():
+    time_map = TimeMap([(1 * SR, 3 * SR), (10 * SR, 14 * SR), (20 * SR, 21 * SR)], SR)
+    # Compacted [1.5, 6.5) covers the end of region 0, all of region 1 and half of region 2
+    assert time_map.map_segment(1.5, 6.5) == approx([(2.5, 3.0), (10.0, 14.0), (20.0, 20.5)])
+
+
+def test_segment_ending_on_a_splice_is_not_split():
+    time_map = TimeMap([(1 * SR, 3 * SR), (10 * SR, 14 * SR)], SR)
+    assert time_map.map_segment(0.0, 2.0) == approx([(1.0, 3.0)])
+    assert time_map.map_segment(2.0, 3.0) == approx([(10.0, 11.0)])
+
+
+def test_empty_time_map_maps_nothing():
+    time_map = TimeMap([], SR)
+    assert time_map.compact_samples == 0
+    assert time_map.map_segment(0.0, 1.0) == []
+
+
+def test_process_finds_the_tone():
+    audio = np.concatenate([silence(2.0), tone(3.0), silence(2.0)])
+    result = VoiceActivityDetector().process(audio, SR)
+    regions = result.speech_regions()
+    assert len(regions) == 1
+    start, end = regions[0]
+    # Hangover (300 ms) extends the region on both sides
+    assert 1.6 <= start <= 2.0
+    assert 5.0 <= end <= 5.4
+    assert result.speech_fraction(2.5, 4.5) == 1.0
+    assert result.speech_fraction(0.0, 1.0) == 0.0
+    assert result.speech_fraction(3.0, 3.0) == 0.0
+    assert result.total_seconds == pytest.approx(7.0)
+
+
+def test_short_bursts_are_not_speech():
+    audio = np.concatenate([silence(2.0), tone(0.03), silence(2.0)])
+    result = VoiceActivityDetector().process(audio, SR)
+    assert result.speech_regions() == []
+
+
+def test_buffer_shorter_than_a_frame():
+    result = VoiceActivityDetector().process(np.zeros(100, dtype=np.float32), SR)
+    assert len(result.speech_mask) == 0
+    assert result.speech_fraction(0.0, 1.0) == 0.0
+
+
+def test_compact_removes_long_gaps_and_maps_back():
+    audio = np.concatenate([silence(3.0), tone(2.0), silence(6.0), tone(2.0), silence(3.0)])
+    vad = VoiceActivityDetector()
+    result = vad.process(audio, SR)
+    compacted, time_map = vad.compact(audio, result)
+
+    assert len(time_map.regions) == 2
+    assert len(compacted) == time_map.compact_samples < len(audio)
+    # The kept samples are the original samples, in order
+    offset = 0
+    for start, end in time_map.regions:
+        np.testing.assert_array_equal(compacted[offset:offset + end - start], audio[start:end])
+        offset += end - start
+
+    # A segment over the whole compacted buffer maps to both tones, without the gap
+    pieces = time_map.map_segment(0.0, time_map.compact_samples / SR)
+    assert len(pieces) == 2
+    assert pieces[0][0] <= 3.0 and pieces[0][1] >= 5.0
+    assert pieces[1][0] <= 11.0 and pieces[1][1] >= 13.0
+    assert pieces[0][1] < 6.0 < 10.0 < pieces[1][0]
+
+
+def test_compact_keeps_short_pauses():
+    audio = np.concatenate([silence(3.0), tone(2.0), silence(1.0), tone(2.0), silence(3.0)])
+    vad = VoiceActivityDetector()
+    compacted, time_map = vad.compact(audio, vad.process(audio, SR))
+    assert len(time_map.regions) == 1
+    start, end = time_map.regions[0]
+    # Leading/trailing silence is trimmed with a view of the original buffer
+    assert np.shares_memory(compacted, audio)
+    assert time_map.map_segment(0.0, 1.0) == approx([(start / SR, start / SR + 1.0)])
+
+
+def test_compact_of_silence_is_empty():
+    audio = silence(5.0)
+    vad = VoiceActivityDetector()
+    compacted, time_map = vad.compact(audio, vad.process(audio, SR))
+    assert len(compacted) == 0
+    assert time_map.regions == []